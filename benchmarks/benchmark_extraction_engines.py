@@ -0,0 +1,84 @@
+import argparse
+import tracemalloc
+from pprint import pprint
+from time import perf_counter
+
+from src.db.connection import connect_db
+from src.db.db_helpers import get_totesys_table_names
+from src.utilities.extraction.extract_table import EXTRACTION_ENGINES, extract_table
+
+
+def benchmark_engine(conn, table_names, engine, batch_size, trace_memory=False) -> dict:
+    """
+    Extracts every table in full with one engine, measuring wall time and, optionally,
+    the peak memory allocated by Python while doing so. Tracing memory slows the run
+    down, so timings and memory are best taken from separate runs.
+
+    Args:
+        conn: An open connection to the TOTESYS database.
+        table_names (list[str]): The tables to extract.
+        engine (str): The extraction engine to benchmark.
+        batch_size (int): Rows per batch for the batched engines.
+        trace_memory (bool): Whether to trace memory allocations.
+
+    Returns:
+        dict: Rows extracted, parquet bytes written, seconds taken and, when traced,
+            peak memory in MB.
+    """
+    row_count = 0
+    parquet_bytes = 0
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = perf_counter()
+
+    for table_name in table_names:
+        extraction = extract_table(
+            conn, table_name, engine=engine, batch_size=batch_size
+        )
+
+        if extraction:
+            row_count += extraction["row_count"]
+            parquet_bytes += extraction["parquet_file"].getbuffer().nbytes
+
+    seconds = perf_counter() - start
+    result = {
+        "rows": row_count,
+        "parquet_bytes": parquet_bytes,
+        "seconds": round(seconds, 3),
+    }
+
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_memory_mb"] = round(peak / 1024**2, 2)
+
+    return result
+
+
+if __name__ == "__main__":
+    # run from the project root against a seeded database, e.g.
+    # uv run python -m benchmarks.benchmark_extraction_engines --tables sales_order
+    parser = argparse.ArgumentParser(description="Compare the extraction engines.")
+    parser.add_argument("--engines", nargs="+", default=EXTRACTION_ENGINES)
+    parser.add_argument("--tables", nargs="+")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with connect_db("TOTESYS") as conn:
+        table_names = args.tables or get_totesys_table_names(conn)
+
+        results = {}
+        for engine in args.engines:
+            runs = [
+                benchmark_engine(conn, table_names, engine, args.batch_size)
+                for _ in range(args.repeat)
+            ]
+            results[engine] = min(runs, key=lambda run: run["seconds"])
+            results[engine]["peak_memory_mb"] = benchmark_engine(
+                conn, table_names, engine, args.batch_size, trace_memory=True
+            )["peak_memory_mb"]
+
+    pprint(results, sort_dicts=False)
@@ -0,0 +1,97 @@
+import argparse
+import statistics
+from pprint import pprint
+from time import perf_counter
+
+import boto3
+
+from src.db.connection import connect_db
+from src.utilities.resource_manager import ResourceManager
+
+
+def fresh_setup() -> None:
+    """
+    Sets up an invocation the way the handlers used to: a new connection and a new
+    S3 client every time.
+    """
+    s3_client = boto3.client("s3")  # noqa: F841
+
+    with connect_db("TOTESYS") as conn:
+        conn.execute("SELECT 1")
+
+
+def pooled_setup(resources: ResourceManager) -> None:
+    """
+    Sets up an invocation through the resource manager, reusing the pooled connection
+    and the S3 client of earlier invocations.
+    """
+    resources.get_s3_client()
+
+    with resources.connection("TOTESYS") as conn:
+        conn.execute("SELECT 1")
+
+
+def time_invocations(setup, invocations: int) -> list[float]:
+    """
+    Times a setup function over several simulated invocations.
+
+    Args:
+        setup (Callable): The setup to time.
+        invocations (int): How many invocations to simulate.
+
+    Returns:
+        list[float]: The duration of each invocation in milliseconds.
+    """
+    durations = []
+
+    for _ in range(invocations):
+        start = perf_counter()
+        setup()
+        durations.append((perf_counter() - start) * 1000)
+
+    return durations
+
+
+def summarise(durations: list[float]) -> dict:
+    """
+    Summarises invocation durations, keeping the first (cold) invocation apart.
+
+    Args:
+        durations (list[float]): Durations in milliseconds, in invocation order.
+
+    Returns:
+        dict: The cold invocation and the median and max of the warm ones.
+    """
+    warm = durations[1:]
+
+    return {
+        "cold_ms": round(durations[0], 2),
+        "warm_median_ms": round(statistics.median(warm), 2),
+        "warm_max_ms": round(max(warm), 2),
+    }
+
+
+if __name__ == "__main__":
+    # run from the project root against a running TOTESYS database, e.g.
+    # uv run python -m benchmarks.benchmark_invocation_setup --invocations 50
+    parser = argparse.ArgumentParser(
+        description="Compare per-invocation setup latency with and without reuse."
+    )
+    parser.add_argument("--invocations", type=int, default=20)
+    args = parser.parse_args()
+
+    resources = ResourceManager()
+
+    try:
+        results = {
+            "before (fresh connection and client)": summarise(
+                time_invocations(fresh_setup, args.invocations)
+            ),
+            "after (resource manager)": summarise(
+                time_invocations(lambda: pooled_setup(resources), args.invocations)
+            ),
+        }
+    finally:
+        resources.close()
+
+    pprint(results, sort_dicts=False)
@@ -0,0 +1,130 @@
+import argparse
+from io import BytesIO
+from pathlib import Path
+from pprint import pprint
+from time import perf_counter
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utilities.parquets.create_parquet_from_batches import (
+    create_parquet_from_batches,
+)
+
+SEED_DATA = Path(__file__).parents[1] / "sql_local_tests" / "seed_data"
+
+CODECS = ["none", "snappy", "lz4", "zstd:1", "zstd:3", "zstd:9", "gzip:1", "gzip"]
+
+
+def load_seed_tables() -> dict[str, pa.Table]:
+    """
+    Reads the seed data Parquet files, one table per file.
+
+    Returns:
+        dict: The tables by name, e.g. "sales_order".
+    """
+    return {
+        path.name.split("_20")[0]: pq.read_table(path)
+        for path in sorted(SEED_DATA.glob("*.parquet"))
+    }
+
+
+def scale_table(table: pa.Table, rows: int, seed: int = 0) -> pa.Table:
+    """
+    Builds a synthetic table of the given size by sampling rows of a seed table at
+    random, with a fresh sequential primary key in its first column. Sampling
+    rather than repeating the table keeps runs of identical pages, which every
+    codec compresses to nothing, out of the measurement.
+
+    Args:
+        table (pa.Table): The seed table.
+        rows (int): The rows of the synthetic table.
+        seed (int): The random seed.
+
+    Returns:
+        pa.Table: The synthetic table.
+    """
+    indices = np.random.default_rng(seed).integers(0, table.num_rows, rows)
+    scaled = table.take(pa.array(indices))
+
+    return scaled.set_column(
+        0,
+        table.schema.field(0),
+        pa.array(np.arange(1, rows + 1), type=table.schema.field(0).type),
+    )
+
+
+def benchmark_codec(tables: list[pa.Table], compression: str, repeat: int) -> dict:
+    """
+    Writes and reads back tables with one compression setting, through the same
+    writer the extraction uses, keeping the fastest of several runs.
+
+    Throughputs are in MB of uncompressed Arrow data per second, and the ratio is
+    the Arrow size over the Parquet size.
+
+    Args:
+        tables (list[pa.Table]): The tables to write.
+        compression (str): The codec and optional level, e.g. "zstd:3".
+        repeat (int): The runs to take the fastest of.
+
+    Returns:
+        dict: encode_mb_per_s, decode_mb_per_s, parquet_bytes and ratio.
+    """
+    arrow_bytes = sum(table.nbytes for table in tables)
+    encode_seconds = decode_seconds = float("inf")
+
+    for _ in range(repeat):
+        start = perf_counter()
+        parquet_files = [
+            create_parquet_from_batches(table.to_batches(), table.schema, compression)
+            for table in tables
+        ]
+        encode_seconds = min(encode_seconds, perf_counter() - start)
+
+        contents = [parquet_file.getvalue() for parquet_file in parquet_files]
+        start = perf_counter()
+        for content in contents:
+            pq.read_table(BytesIO(content))
+        decode_seconds = min(decode_seconds, perf_counter() - start)
+
+    parquet_bytes = sum(len(content) for content in contents)
+
+    return {
+        "encode_mb_per_s": round(arrow_bytes / 1024**2 / encode_seconds, 1),
+        "decode_mb_per_s": round(arrow_bytes / 1024**2 / decode_seconds, 1),
+        "parquet_bytes": parquet_bytes,
+        "ratio": round(arrow_bytes / parquet_bytes, 2),
+    }
+
+
+if __name__ == "__main__":
+    # run from the project root, e.g.
+    # uv run python -m benchmarks.benchmark_parquet_codecs --scaled-rows 1000000
+    parser = argparse.ArgumentParser(description="Compare the Parquet codecs.")
+    parser.add_argument("--codecs", nargs="+", default=CODECS)
+    parser.add_argument("--scaled-table", default="sales_order")
+    parser.add_argument("--scaled-rows", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seed_tables = load_seed_tables()
+    datasets = {
+        "seed_data": list(seed_tables.values()),
+        f"{args.scaled_table}_x{args.scaled_rows}": [
+            scale_table(seed_tables[args.scaled_table], args.scaled_rows)
+        ],
+    }
+
+    results = {
+        name: {
+            "arrow_bytes": sum(table.nbytes for table in tables),
+            **{
+                codec: benchmark_codec(tables, codec, args.repeat)
+                for codec in args.codecs
+            },
+        }
+        for name, tables in datasets.items()
+    }
+
+    pprint(results, sort_dicts=False)
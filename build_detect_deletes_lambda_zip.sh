@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# Create directories if they don't exist
+mkdir -p build
+mkdir -p dist
+mkdir -p build/detect_deletes_lambda/
+
+# Copy all files from src into build/detect_deletes_lambda/src so they can be zipped.
+rsync -av --exclude='__pycache__' --exclude='*.pyc' --exclude='.pytest_cache' --exclude='.git' --exclude='*.DS_Store' ./src/ ./build/detect_deletes_lambda/src/
+
+# zip detect deletes lambda source code
+cd ./build/detect_deletes_lambda && zip -r ../../dist/detect_deletes_lambda.zip . && cd ../..
+
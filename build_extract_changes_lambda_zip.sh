@@ -0,0 +1,13 @@
+#!/bin/bash
+
+# Create directories if they don't exist
+mkdir -p build
+mkdir -p dist
+mkdir -p build/extract_changes_lambda/
+
+# Copy all files from src into build/extract_changes_lambda/src so they can be zipped.
+rsync -av --exclude='__pycache__' --exclude='*.pyc' --exclude='.pytest_cache' --exclude='.git' --exclude='*.DS_Store' ./src/ ./build/extract_changes_lambda/src/
+
+# zip extract changes lambda source code
+cd ./build/extract_changes_lambda && zip -r ../../dist/extract_changes_lambda.zip . && cd ../..
+
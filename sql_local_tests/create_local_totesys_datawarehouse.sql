@@ -18,40 +18,49 @@ CREATE TABLE "dim_date" (
 );
 
 CREATE TABLE "dim_staff" (
-  "staff_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "staff_id" int NOT NULL,
   "first_name" varchar NOT NULL,
   "last_name" varchar NOT NULL,
   "department_name" varchar NOT NULL,
   "location" varchar NOT NULL,
-  "email_address" varchar NOT NULL
+  "email_address" varchar NOT NULL,
+  PRIMARY KEY ("source", "staff_id")
 );
 
 CREATE TABLE "dim_location" (
-  "location_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "location_id" int NOT NULL,
   "address_line_1" varchar NOT NULL,
   "address_line_2" varchar,
   "district" varchar,
   "city" varchar NOT NULL,
   "postal_code" varchar NOT NULL,
   "country" varchar NOT NULL,
-  "phone" varchar NOT NULL
+  "phone" varchar NOT NULL,
+  PRIMARY KEY ("source", "location_id")
 );
 
 CREATE TABLE "dim_currency" (
-  "currency_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "currency_id" int NOT NULL,
   "currency_code" varchar NOT NULL,
-  "currency_name" varchar NOT NULL
+  "currency_name" varchar NOT NULL,
+  PRIMARY KEY ("source", "currency_id")
 );
 
 CREATE TABLE "dim_design" (
-  "design_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "design_id" int NOT NULL,
   "design_name" varchar NOT NULL,
   "file_location" varchar NOT NULL,
-  "file_name" varchar NOT NULL
+  "file_name" varchar NOT NULL,
+  PRIMARY KEY ("source", "design_id")
 );
 
 CREATE TABLE "dim_counterparty" (
-  "counterparty_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "counterparty_id" int NOT NULL,
   "counterparty_legal_name" varchar NOT NULL,
   "counterparty_legal_address_line_1" varchar NOT NULL,
   "counterparty_legal_address_line_2" varchar,
@@ -59,71 +68,92 @@ CREATE TABLE "dim_counterparty" (
   "counterparty_legal_city" varchar NOT NULL,
   "counterparty_legal_postal_code" varchar NOT NULL,
   "counterparty_legal_country" varchar NOT NULL,
-  "counterparty_legal_phone_number" varchar NOT NULL
+  "counterparty_legal_phone_number" varchar NOT NULL,
+  PRIMARY KEY ("source", "counterparty_id")
 );
 
 CREATE TABLE "dim_payment_type" (
-  "payment_type_id" INT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY NOT NULL,
-  "payment_type_name" varchar NOT NULL
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "payment_type_id" INT GENERATED BY DEFAULT AS IDENTITY NOT NULL,
+  "payment_type_name" varchar NOT NULL,
+  PRIMARY KEY ("source", "payment_type_id")
 );
 
 CREATE TABLE "dim_transaction" (
-  "transaction_id" int PRIMARY KEY NOT NULL,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
+  "transaction_id" int NOT NULL,
   "transaction_type" varchar NOT NULL,
   "sales_order_id" int,
-  "purchase_order_id" int
+  "purchase_order_id" int,
+  PRIMARY KEY ("source", "transaction_id")
 );
 
 -- --- Create Fact Tables Second (since they reference dimension tables) ---
 
 CREATE TABLE "fact_sales_order" (
   "sales_record_id" SERIAL PRIMARY KEY,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
   "sales_order_id" int NOT NULL,
   "created_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "created_time" time NOT NULL,
   "last_updated_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "last_updated_time" time NOT NULL,
-  "sales_staff_id" int NOT NULL REFERENCES "dim_staff" ("staff_id"),
-  "counterparty_id" int NOT NULL REFERENCES "dim_counterparty" ("counterparty_id"),
+  "sales_staff_id" int NOT NULL,
+  "counterparty_id" int NOT NULL,
   "units_sold" int NOT NULL,
   "unit_price" numeric(10, 2) NOT NULL, -- Corrected: Removed quotes
-  "currency_id" int NOT NULL REFERENCES "dim_currency" ("currency_id"),
-  "design_id" int NOT NULL REFERENCES "dim_design" ("design_id"),
+  "currency_id" int NOT NULL,
+  "design_id" int NOT NULL,
   "agreed_payment_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "agreed_delivery_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
-  "agreed_delivery_location_id" int NOT NULL REFERENCES "dim_location" ("location_id")
+  "agreed_delivery_location_id" int NOT NULL,
+  FOREIGN KEY ("source", "sales_staff_id") REFERENCES "dim_staff" ("source", "staff_id"),
+  FOREIGN KEY ("source", "counterparty_id") REFERENCES "dim_counterparty" ("source", "counterparty_id"),
+  FOREIGN KEY ("source", "currency_id") REFERENCES "dim_currency" ("source", "currency_id"),
+  FOREIGN KEY ("source", "design_id") REFERENCES "dim_design" ("source", "design_id"),
+  FOREIGN KEY ("source", "agreed_delivery_location_id") REFERENCES "dim_location" ("source", "location_id")
 );
 
 CREATE TABLE "fact_purchase_order" (
   "purchase_record_id" SERIAL PRIMARY KEY,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
   "purchase_order_id" INT NOT NULL,
   "created_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "created_time" time NOT NULL,
   "last_updated_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "last_updated_time" time NOT NULL,
-  "staff_id" int NOT NULL REFERENCES "dim_staff" ("staff_id"),
-  "counterparty_id" int NOT NULL REFERENCES "dim_counterparty" ("counterparty_id"),
+  "staff_id" int NOT NULL,
+  "counterparty_id" int NOT NULL,
   "item_code" varchar NOT NULL,
   "item_quantity" int NOT NULL,
   "item_unit_price" numeric NOT NULL, -- Corrected: Removed quotes
-  "currency_id" int NOT NULL REFERENCES "dim_currency" ("currency_id"),
+  "currency_id" int NOT NULL,
   "agreed_delivery_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "agreed_payment_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
-  "agreed_delivery_location_id" int NOT NULL REFERENCES "dim_location" ("location_id")
+  "agreed_delivery_location_id" int NOT NULL,
+  FOREIGN KEY ("source", "staff_id") REFERENCES "dim_staff" ("source", "staff_id"),
+  FOREIGN KEY ("source", "counterparty_id") REFERENCES "dim_counterparty" ("source", "counterparty_id"),
+  FOREIGN KEY ("source", "currency_id") REFERENCES "dim_currency" ("source", "currency_id"),
+  FOREIGN KEY ("source", "agreed_delivery_location_id") REFERENCES "dim_location" ("source", "location_id")
 );
 
 CREATE TABLE "fact_payment" (
   "payment_record_id" SERIAL PRIMARY KEY,
+  "source" varchar NOT NULL DEFAULT 'TOTESYS',
   "payment_id" int NOT NULL,
   "created_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "created_time" time NOT NULL,
   "last_updated_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
   "last_updated_time" time NOT NULL,
-  "transaction_id" int NOT NULL REFERENCES "dim_transaction" ("transaction_id"),
-  "counterparty_id" int NOT NULL REFERENCES "dim_counterparty" ("counterparty_id"),
+  "transaction_id" int NOT NULL,
+  "counterparty_id" int NOT NULL,
   "payment_amount" numeric NOT NULL, -- Corrected: Removed quotes
-  "currency_id" int NOT NULL REFERENCES "dim_currency" ("currency_id"),
-  "payment_type_id" int NOT NULL REFERENCES "dim_payment_type" ("payment_type_id"),
+  "currency_id" int NOT NULL,
+  "payment_type_id" int NOT NULL,
   "paid" boolean NOT NULL,
-  "payment_date" date NOT NULL REFERENCES "dim_date" ("date_id")
+  "payment_date" date NOT NULL REFERENCES "dim_date" ("date_id"),
+  FOREIGN KEY ("source", "transaction_id") REFERENCES "dim_transaction" ("source", "transaction_id"),
+  FOREIGN KEY ("source", "counterparty_id") REFERENCES "dim_counterparty" ("source", "counterparty_id"),
+  FOREIGN KEY ("source", "currency_id") REFERENCES "dim_currency" ("source", "currency_id"),
+  FOREIGN KEY ("source", "payment_type_id") REFERENCES "dim_payment_type" ("source", "payment_type_id")
 );
\ No newline at end of file
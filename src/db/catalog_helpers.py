@@ -0,0 +1,115 @@
+import logging
+from typing import Any, Dict, List
+
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# one row per column of every public table, straight from pg_catalog; udt_name is
+# the pg_type name, as in information_schema.columns
+CATALOG_COLUMNS_QUERY = """
+    SELECT c.relname AS table_name,
+           a.attname AS column_name,
+           t.typname AS udt_name,
+           a.attnum AS ordinal_position,
+           COALESCE(a.attnum = ANY(i.indkey), false) AS is_primary_key
+      FROM pg_class c
+      JOIN pg_namespace n
+        ON n.oid = c.relnamespace
+      JOIN pg_attribute a
+        ON a.attrelid = c.oid
+       AND a.attnum > 0
+       AND NOT a.attisdropped
+      JOIN pg_type t
+        ON t.oid = a.atttypid
+      LEFT JOIN pg_index i
+        ON i.indrelid = c.oid
+       AND i.indisprimary
+     WHERE n.nspname = 'public'
+       AND c.relkind IN ('r', 'p')
+"""
+
+
+def get_catalog_fingerprint(conn: Connection[DictRow]) -> str:
+    """
+    Get a fingerprint of the public tables, their columns, column types and primary
+    keys. It only changes when one of them does, and costs a single row to fetch.
+
+    Args:
+        conn: A database connection.
+
+    Returns:
+        The md5 hex digest of the catalog.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = f"""
+        SELECT md5(
+                   COALESCE(
+                       string_agg(
+                           concat_ws(':', table_name, column_name, udt_name,
+                                     is_primary_key),
+                           ',' ORDER BY table_name, ordinal_position
+                       ),
+                       ''
+                   )
+               ) AS fingerprint
+          FROM ({CATALOG_COLUMNS_QUERY}) AS catalog
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)  # type: ignore
+        return cursor.fetchone()["fingerprint"]  # type: ignore
+
+
+def get_catalog_tables(
+    conn: Connection[DictRow],
+    table_names_to_filter_out: List[str] = ["_prisma_migrations"],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the columns, column types and primary key of every public table.
+
+    Args:
+        conn: A database connection.
+        table_names_to_filter_out: Tables to leave out. Defaults to
+            ['_prisma_migrations'].
+
+    Returns:
+        A dict of tables by name, each with "columns", a list of dicts with
+        column_name and udt_name in table order, and "primary_key", the name of its
+        single-column primary key or None.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = f"{CATALOG_COLUMNS_QUERY} ORDER BY table_name, ordinal_position"
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)  # type: ignore
+        response = cursor.fetchall()
+
+    tables: Dict[str, Dict[str, Any]] = {}
+    primary_keys: Dict[str, List[str]] = {}
+
+    for row in response:
+        table_name = row["table_name"]
+
+        if table_name in table_names_to_filter_out:
+            continue
+
+        table = tables.setdefault(table_name, {"columns": [], "primary_key": None})
+        table["columns"].append(
+            {"column_name": row["column_name"], "udt_name": row["udt_name"]}
+        )
+
+        if row["is_primary_key"]:
+            primary_keys.setdefault(table_name, []).append(row["column_name"])
+
+    for table_name, key_columns in primary_keys.items():
+        if len(key_columns) == 1:
+            tables[table_name]["primary_key"] = key_columns[0]
+
+    return tables
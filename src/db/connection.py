@@ -1,32 +1,33 @@
 import logging
 import os
-from typing import Literal
 
 from psycopg import Connection, Error, connect
 from psycopg.rows import DictRow, dict_row
 
+from src.db.source_registry import DEFAULT_SOURCE, get_source_names
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def connect_db(db_source: Literal["TOTESYS", "DATAWAREHOUSE"]) -> Connection[DictRow]:
+def get_conninfo(db_source: str) -> str:
     """
-    Connect to the TOTESYS or DATAWAREHOUSE database using environment variables.
+    Build the connection string of the TOTESYS or DATAWAREHOUSE database, or of a
+    source listed in EXTRACT_SOURCES, from environment variables.
 
     Args:
-        db_source: Either "TOTESYS" or "DATAWAREHOUSE".
+        db_source: "TOTESYS", "DATAWAREHOUSE" or a source listed in EXTRACT_SOURCES.
 
     Returns:
-        A psycopg connection with rows returned as dictionaries.
+        A libpq connection string.
 
     Raises:
         ValueError: If db_source is not valid.
-        Error: If a database error occurs.
-        Exception: For any other error.
     """
-    if db_source not in ["TOTESYS", "DATAWAREHOUSE"]:
+    if db_source not in [DEFAULT_SOURCE, "DATAWAREHOUSE", *get_source_names()]:
         raise ValueError(
-            "db_source invalid, must be either 'TOTESYS' or 'DATAWAREHOUSE'"
+            "db_source invalid, must be either 'TOTESYS', 'DATAWAREHOUSE' or a source "
+            "listed in EXTRACT_SOURCES"
         )
 
     user = os.getenv(f"{db_source}_DB_USER")
@@ -35,9 +36,30 @@ def connect_db(db_source: Literal["TOTESYS", "DATAWAREHOUSE"]) -> Connection[Dic
     dbname = os.getenv(f"{db_source}_DB_DATABASE")
     port = os.getenv(f"{db_source}_DB_PORT")
 
+    return f"user={user} password={password} host={host} dbname={dbname} port={int(port or 0000)}"
+
+
+def connect_db(db_source: str) -> Connection[DictRow]:
+    """
+    Connect to the TOTESYS or DATAWAREHOUSE database, or to a source listed in
+    EXTRACT_SOURCES, using environment variables.
+
+    Args:
+        db_source: "TOTESYS", "DATAWAREHOUSE" or a source listed in EXTRACT_SOURCES.
+
+    Returns:
+        A psycopg connection with rows returned as dictionaries.
+
+    Raises:
+        ValueError: If db_source is not valid.
+        Error: If a database error occurs.
+        Exception: For any other error.
+    """
+    conninfo = get_conninfo(db_source)
+
     try:
         conn: Connection[DictRow] = connect(
-            f"user={user} password={password} host={host} dbname={dbname} port={int(port or 0000)}",
+            conninfo,
             row_factory=dict_row,  # type: ignore
         )
 
@@ -1,9 +1,10 @@
 import logging
 from datetime import datetime
-from typing import List
+from itertools import islice
+from typing import Any, Collection, Dict, Generator, List, NamedTuple
 
-from psycopg import Connection, sql
-from psycopg.rows import DictRow
+from psycopg import Column, Connection, Cursor, IsolationLevel, sql
+from psycopg.rows import DictRow, tuple_row
 
 from src.db.error_map import ERROR_MAP
 
@@ -11,6 +12,22 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+class KeyRange(NamedTuple):
+    """A half-open range [start, end) of values of a table's primary key column."""
+
+    column: str
+    start: int
+    end: int
+
+
+# varchar columns of the OLTP schema that only ever hold ISO dates
+VARCHAR_DATE_COLUMNS: Dict[str, List[str]] = {
+    "sales_order": ["agreed_delivery_date", "agreed_payment_date"],
+    "purchase_order": ["agreed_delivery_date", "agreed_payment_date"],
+    "payment": ["payment_date"],
+}
+
+
 def filter_out_values(values: List[str], values_to_filter: List[str]) -> List[str]:
     """
     Remove specific values from a list.
@@ -118,8 +135,263 @@ def get_table_last_updated_timestamp(
         return handle_db_exception(e)
 
 
+def get_tables_last_updated_timestamps(
+    conn: Connection[DictRow], table_names: List[str]
+) -> Dict[str, datetime | None]:
+    """
+    Get the latest 'last_updated' timestamp of several tables in a single query.
+
+    Args:
+        conn: A PostgreSQL connection object.
+        table_names: The tables to query.
+
+    Returns:
+        A dict with each table's latest 'last_updated' value, None for empty tables.
+
+    Raises:
+        psycopg.Error: If there's a database error.
+    """
+    if not table_names:
+        return {}
+
+    query = sql.SQL(" UNION ALL ").join(
+        sql.SQL(
+            "SELECT {} AS table_name, MAX(last_updated) AS last_updated FROM public.{}"
+        ).format(sql.Literal(table_name), sql.Identifier(table_name))
+        for table_name in table_names
+    )
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        response = cursor.fetchall()
+
+    return {row["table_name"]: row["last_updated"] for row in response}
+
+
+def get_projected_type_name(table_name: str, column: dict) -> str:
+    """
+    Get the Postgres type a column is extracted as by build_column_projection.
+
+    Args:
+        table_name: The table the column belongs to.
+        column: A dict with column_name and udt_name as in information_schema.columns.
+
+    Returns:
+        The type name, e.g. "float8" for a numeric column.
+    """
+    udt_name = column["udt_name"]
+
+    if column["column_name"] in VARCHAR_DATE_COLUMNS.get(table_name, []):
+        if udt_name == "varchar":
+            return "date"
+
+        logger.warning(
+            f"{table_name}.{column['column_name']} is listed in VARCHAR_DATE_COLUMNS "
+            f"but is {udt_name}, it is not cast to date"
+        )
+
+    if udt_name == "numeric":
+        return "float8"
+
+    if udt_name.startswith("_"):
+        return "text"
+
+    return udt_name
+
+
+def build_column_projection(table_name: str, columns: List[dict]) -> sql.Composed:
+    """
+    Build the select list extracting a table's columns as fixed-width types, so they
+    are decoded into native values instead of Python objects:
+
+    - numeric columns are cast to float8 rather than decoded as Decimal objects.
+    - varchar columns listed in VARCHAR_DATE_COLUMNS are cast to date, with empty
+      strings read as NULL.
+    - array columns are joined into comma separated text rather than decoded as
+      lists.
+
+    Other columns are selected unchanged, and every column keeps its name. See
+    get_projected_type_name for the resulting types.
+
+    Args:
+        table_name: The table the columns belong to.
+        columns: The table's columns in order, as dicts with column_name and
+            udt_name as in information_schema.columns.
+
+    Returns:
+        A composed SQL select list.
+
+    Raises:
+        None
+    """
+    projection = []
+
+    for column in columns:
+        name = sql.Identifier(column["column_name"])
+        udt_name = column["udt_name"]
+        projected_type_name = get_projected_type_name(table_name, column)
+
+        if projected_type_name == udt_name:
+            projection.append(name)
+            continue
+
+        if udt_name == "numeric":
+            expression = sql.SQL("{}::float8").format(name)
+        elif udt_name.startswith("_"):
+            expression = sql.SQL("array_to_string({}, ',')").format(name)
+        else:
+            expression = sql.SQL("NULLIF({}, '')::date").format(name)
+
+        projection.append(sql.SQL("{} AS {}").format(expression, name))
+
+    return sql.SQL(", ").join(projection)
+
+
+def select_table_columns(
+    table_name: str, table_columns: List[dict], columns: Collection[str] | None = None
+) -> List[dict]:
+    """
+    Keep the requested columns of a table's column list.
+
+    Args:
+        table_name: The table the columns belong to.
+        table_columns: The table's columns in order, as dicts with column_name and
+            udt_name as in information_schema.columns.
+        columns: The column names to keep. Keeps every column when None.
+
+    Returns:
+        The requested columns, in table order.
+
+    Raises:
+        ValueError: If the table has no columns, e.g. it does not exist, or lacks
+            any of the requested columns.
+    """
+    if not table_columns:
+        raise ValueError(f"Table {table_name} has no columns")
+
+    if columns is None:
+        return table_columns
+
+    missing_columns = set(columns) - {row["column_name"] for row in table_columns}
+
+    if missing_columns:
+        raise ValueError(f"Table {table_name} has no columns {sorted(missing_columns)}")
+
+    return [row for row in table_columns if row["column_name"] in columns]
+
+
+def get_table_projection(
+    conn: Connection[DictRow],
+    table_name: str,
+    columns: Collection[str] | None = None,
+) -> sql.Composed:
+    """
+    Get the extraction projection of a table from its column types in
+    information_schema. See build_column_projection.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to project.
+        columns: Only select these columns, in table order. Selects every column
+            when None.
+
+    Returns:
+        A composed SQL select list.
+
+    Raises:
+        ValueError: If the table has no columns, e.g. it does not exist, or lacks
+            any of the requested columns.
+        psycopg.Error: On database errors.
+    """
+    return build_column_projection(
+        table_name,
+        select_table_columns(table_name, get_table_columns(conn, table_name), columns),
+    )
+
+
+def get_table_columns(conn: Connection[DictRow], table_name: str) -> List[dict]:
+    """
+    Get the columns of a table and their types from information_schema.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to inspect.
+
+    Returns:
+        The columns in table order, as dicts with column_name and udt_name. Empty if
+        the table does not exist.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = """
+        SELECT column_name, udt_name
+          FROM information_schema.columns
+         WHERE table_schema = 'public'
+           AND table_name = %s
+         ORDER BY ordinal_position
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, (table_name,))
+        response = cursor.fetchall()
+
+    return response
+
+
+def build_table_data_query(
+    table_name: str,
+    last_updated: datetime | None = None,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+) -> sql.Composed:
+    """
+    Build the query selecting the rows of a table, optionally filtered by last_updated
+    and by a primary key range.
+
+    Args:
+        table_name: The table to query.
+        last_updated: Filter for rows updated after this datetime.
+        key_range: Filter for rows whose key lies in the range.
+        projection: The select list, e.g. from get_table_projection. Defaults to *.
+
+    Returns:
+        A composed SQL query.
+
+    Raises:
+        None
+    """
+    query = sql.SQL("SELECT {} FROM public.{}").format(
+        projection or sql.SQL("*"), sql.Identifier(table_name)
+    )
+    conditions = []
+
+    if last_updated:
+        conditions.append(
+            sql.SQL("last_updated > {}").format(sql.Literal(last_updated))
+        )
+
+    if key_range:
+        conditions.append(
+            sql.SQL("{column} >= {start} AND {column} < {end}").format(
+                column=sql.Identifier(key_range.column),
+                start=sql.Literal(key_range.start),
+                end=sql.Literal(key_range.end),
+            )
+        )
+
+    if conditions:
+        query += sql.SQL(" WHERE ") + sql.SQL(" AND ").join(conditions)
+
+    return query
+
+
 def get_table_data(
-    conn: Connection[DictRow], table_name: str, last_updated: datetime | None = None
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None = None,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
 ) -> List[DictRow]:
     """
     Get all rows from a table, optionally filtered by last_updated.
@@ -128,6 +400,8 @@ def get_table_data(
         conn: A database connection.
         table_name: The table to query.
         last_updated: Filter for rows updated after this datetime.
+        key_range: Filter for rows whose key lies in the range.
+        projection: The select list. Defaults to *.
 
     Returns:
         A list of row dictionaries.
@@ -137,14 +411,342 @@ def get_table_data(
         Exception: On other errors.
     """
 
-    query = sql.SQL("SELECT * FROM public.{}").format(sql.Identifier(table_name))
+    query = build_table_data_query(table_name, last_updated, key_range, projection)
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        result = cursor.fetchall()
+
+    return result
+
+
+def fetch_columns(cursor: Cursor[Any], chunk_size: int = 10000) -> Dict[str, list]:
+    """
+    Fetch the remaining rows of an executed cursor as lists of column values keyed
+    by column name.
+
+    Rows are fetched in chunks and each chunk is transposed straight into the column
+    lists, so no per-row dictionary is built and only one chunk of row tuples is
+    alive at a time. The cursor should use the tuple_row row factory.
+
+    Args:
+        cursor: A cursor that has executed a query returning rows as tuples.
+        chunk_size: Number of rows fetched and transposed at a time.
+
+    Returns:
+        A dict with one list of values per column, in the cursor's column order. The
+        lists are empty if there are no rows.
+
+    Raises:
+        ValueError: If chunk_size is not a positive integer.
+        psycopg.Error: On database errors.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    columns: Dict[str, list] = {column.name: [] for column in cursor.description or []}
+    column_values = list(columns.values())
+
+    while rows := cursor.fetchmany(chunk_size):
+        for values, chunk_values in zip(column_values, zip(*rows)):
+            values.extend(chunk_values)
+
+    return columns
+
+
+def get_table_data_columns(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None = None,
+    key_range: KeyRange | None = None,
+    chunk_size: int = 10000,
+    projection: sql.Composable | None = None,
+) -> Dict[str, list]:
+    """
+    Get all rows from a table as lists of column values, optionally filtered by
+    last_updated. Reads the same rows as get_table_data without building a
+    dictionary per row, which saves time and memory on wide tables.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to query.
+        last_updated: Filter for rows updated after this datetime.
+        key_range: Filter for rows whose key lies in the range.
+        chunk_size: Number of rows fetched and transposed at a time.
+        projection: The select list. Defaults to *.
+
+    Returns:
+        A dict with one list of values per column, empty lists if there are no rows.
+
+    Raises:
+        ValueError: If chunk_size is not a positive integer.
+        psycopg.Error: On database errors.
+    """
+    query = build_table_data_query(table_name, last_updated, key_range, projection)
+
+    with conn.cursor(row_factory=tuple_row) as cursor:
+        cursor.execute(query)
+        columns = fetch_columns(cursor, chunk_size)
+
+    return columns
+
+
+def get_table_rows_by_keys(
+    conn: Connection[DictRow],
+    table_name: str,
+    key_column: str,
+    keys: List[Any],
+    projection: sql.Composable | None = None,
+) -> Dict[str, list]:
+    """
+    Get the current rows of a table with the given keys as lists of column values.
+    Keys whose row no longer exists are skipped.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to query.
+        key_column: The unique key column the keys belong to.
+        keys: The keys of the rows to read.
+        projection: The select list. Defaults to *.
+
+    Returns:
+        A dict with one list of values per column, empty lists if no row was found.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = sql.SQL("SELECT {} FROM public.{} WHERE {} = ANY(%s)").format(
+        projection or sql.SQL("*"),
+        sql.Identifier(table_name),
+        sql.Identifier(key_column),
+    )
+
+    with conn.cursor(row_factory=tuple_row) as cursor:
+        cursor.execute(query, (keys,))
+        columns = fetch_columns(cursor)
+
+    return columns
+
+
+def get_table_primary_key(conn: Connection[DictRow], table_name: str) -> str:
+    """
+    Get the name of the primary key column of a table.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to inspect.
+
+    Returns:
+        The primary key column name.
+
+    Raises:
+        ValueError: If the table has no single-column primary key.
+        psycopg.Error: On database errors.
+    """
+    query = """
+        SELECT a.attname AS column_name
+          FROM pg_index i
+          JOIN pg_attribute a
+            ON a.attrelid = i.indrelid
+           AND a.attnum = ANY(i.indkey)
+         WHERE i.indrelid = %s::regclass
+           AND i.indisprimary
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, (f"public.{table_name}",))
+        response = cursor.fetchall()
+
+    if len(response) != 1:
+        raise ValueError(f"Table {table_name} has no single-column primary key")
+
+    return response[0]["column_name"]
+
+
+def get_table_key_range_stats(
+    conn: Connection[DictRow],
+    table_name: str,
+    primary_key: str,
+    last_updated: datetime | None = None,
+) -> dict:
+    """
+    Get the number of rows updated after last_updated, along with their lowest and
+    highest primary key and latest last_updated value.
+
+    The rows are counted by the same pass that finds the key range, which is a
+    sequential scan of the table unless last_updated is indexed.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to inspect.
+        primary_key: The primary key column of the table.
+        last_updated: Only consider rows updated after this datetime.
+
+    Returns:
+        A dict with row_count, and min_key, max_key and last_updated (all None
+        when there are no rows).
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = sql.SQL(
+        "SELECT COUNT(*) AS row_count,"
+        " MIN({primary_key}) AS min_key, MAX({primary_key}) AS max_key,"
+        " MAX(last_updated) AS last_updated"
+        " FROM public.{table_name}"
+    ).format(
+        primary_key=sql.Identifier(primary_key),
+        table_name=sql.Identifier(table_name),
+    )
 
     if last_updated:
-        query_with_last_updated = sql.SQL("WHERE last_updated > {}").format(
-            sql.Literal(last_updated)
+        query += sql.SQL(" WHERE last_updated > {}").format(sql.Literal(last_updated))
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        response = cursor.fetchone()
+
+    return dict(response)  # type: ignore
+
+
+def build_table_page_query(
+    table_name: str,
+    primary_key: str,
+    last_updated: datetime | None = None,
+    last_primary_key: int | None = None,
+    page_size: int = 10000,
+    projection: sql.Composable | None = None,
+) -> sql.Composed:
+    """
+    Build the query selecting the next page of a table in (last_updated, primary key)
+    order, starting after a compound watermark.
+
+    A watermark without a primary key only filters on last_updated, which matches the
+    watermarks written before keyset pagination was introduced.
+
+    Args:
+        table_name: The table to query.
+        primary_key: The primary key column of the table.
+        last_updated: The last_updated value of the last row already extracted.
+        last_primary_key: The primary key of the last row already extracted.
+        page_size: Maximum number of rows in the page.
+        projection: The select list. Defaults to *.
+
+    Returns:
+        A composed SQL query.
+
+    Raises:
+        None
+    """
+    query = sql.SQL("SELECT {} FROM public.{}").format(
+        projection or sql.SQL("*"), sql.Identifier(table_name)
+    )
+
+    if last_updated and last_primary_key is not None:
+        query += sql.SQL(" WHERE (last_updated, {}) > ({}, {})").format(
+            sql.Identifier(primary_key),
+            sql.Literal(last_updated),
+            sql.Literal(last_primary_key),
         )
+    elif last_updated:
+        query += sql.SQL(" WHERE last_updated > {}").format(sql.Literal(last_updated))
+
+    query += sql.SQL(" ORDER BY last_updated, {} LIMIT {}").format(
+        sql.Identifier(primary_key), sql.Literal(page_size)
+    )
+
+    return query
+
+
+def get_keyset_index_name(
+    conn: Connection[DictRow], table_name: str, primary_key: str
+) -> str | None:
+    """
+    Get the name of a btree index of a table whose leading columns are
+    (last_updated, primary key), the index get_table_data_page needs to read each
+    page as an index range scan.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to inspect.
+        primary_key: The primary key column of the table.
+
+    Returns:
+        The name of such an index, None if the table has none.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = """
+        SELECT c.relname AS index_name
+          FROM pg_index i
+          JOIN pg_class c ON c.oid = i.indexrelid
+          JOIN pg_am am ON am.oid = c.relam
+          JOIN pg_attribute first_column
+            ON first_column.attrelid = i.indrelid
+           AND first_column.attnum = i.indkey[0]
+          JOIN pg_attribute second_column
+            ON second_column.attrelid = i.indrelid
+           AND second_column.attnum = i.indkey[1]
+         WHERE i.indrelid = %s::regclass
+           AND am.amname = 'btree'
+           AND i.indpred IS NULL
+           AND first_column.attname = 'last_updated'
+           AND second_column.attname = %s
+         LIMIT 1
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, (f"public.{table_name}", primary_key))
+        response = cursor.fetchall()
+
+    return response[0]["index_name"] if response else None
+
+
+def get_table_data_page(
+    conn: Connection[DictRow],
+    table_name: str,
+    primary_key: str,
+    last_updated: datetime | None = None,
+    last_primary_key: int | None = None,
+    page_size: int = 10000,
+    projection: sql.Composable | None = None,
+) -> List[DictRow]:
+    """
+    Get the next page of rows of a table using keyset pagination on
+    (last_updated, primary key). Each page starts where the previous page ended, so
+    no OFFSET is needed and rows sharing the boundary last_updated value are never
+    skipped.
+
+    A page is only an index range scan when the table has a btree index leading
+    with (last_updated, primary key), see get_keyset_index_name, e.g.
+    CREATE INDEX CONCURRENTLY ON public.sales_order (last_updated, sales_order_id).
+    The TOTESYS schema has none, and without it every page is a sequential scan of
+    the table plus a top-N sort, so paging through a delta costs about as many
+    scans as it has pages.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to query.
+        primary_key: The primary key column of the table.
+        last_updated: The last_updated value of the last row already extracted.
+        last_primary_key: The primary key of the last row already extracted.
+        page_size: Maximum number of rows in the page.
+        projection: The select list. Defaults to *.
+
+    Returns:
+        A list of row dictionaries, empty once the table is exhausted.
+
+    Raises:
+        ValueError: If page_size is not a positive integer.
+        psycopg.Error: On database errors.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be a positive integer")
 
-        query = query + query_with_last_updated
+    query = build_table_page_query(
+        table_name, primary_key, last_updated, last_primary_key, page_size, projection
+    )
 
     with conn.cursor() as cursor:
         cursor.execute(query)
@@ -153,6 +755,324 @@ def get_table_data(
     return result
 
 
+def get_table_description(
+    conn: Connection[DictRow],
+    table_name: str,
+    projection: sql.Composable | None = None,
+) -> List[Column]:
+    """
+    Get the column descriptions of a table without fetching any rows.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to describe.
+        projection: The select list to describe. Defaults to *.
+
+    Returns:
+        A list of psycopg Column objects (name, type OID, precision and scale).
+
+    Raises:
+        psycopg.Error: On database errors.
+        Exception: On other errors.
+    """
+    query = sql.SQL("SELECT {} FROM public.{} LIMIT 0").format(
+        projection or sql.SQL("*"), sql.Identifier(table_name)
+    )
+
+    with conn.cursor() as cursor:
+        cursor.execute(query)
+        description = list(cursor.description or [])
+
+    return description
+
+
+def stream_table_data(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None = None,
+    batch_size: int = 10000,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+) -> Generator[List[DictRow], None, None]:
+    """
+    Stream rows from a table in fixed-size batches using a server-side cursor,
+    optionally filtered by last_updated.
+
+    Only one batch is held in memory at a time, so memory use is bounded by
+    batch_size rather than by the size of the table.
+
+    Args:
+        conn: A database connection (must not be in autocommit mode).
+        table_name: The table to query.
+        last_updated: Filter for rows updated after this datetime.
+        batch_size: Maximum number of rows per yielded batch.
+        key_range: Filter for rows whose key lies in the range.
+        projection: The select list. Defaults to *.
+
+    Yields:
+        Lists of row dictionaries with at most batch_size rows each.
+
+    Raises:
+        ValueError: If batch_size is not a positive integer.
+        psycopg.Error: On database errors.
+        Exception: On other errors.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+
+    query = build_table_data_query(table_name, last_updated, key_range, projection)
+
+    with conn.cursor(name=f"stream_{table_name}") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query)
+
+        while True:
+            batch = cursor.fetchmany(batch_size)
+
+            if not batch:
+                break
+
+            yield batch
+
+
+def stream_primary_keys(
+    conn: Connection[DictRow],
+    table_name: str,
+    key_column: str,
+    batch_size: int = 100000,
+) -> Generator[List[Any], None, None]:
+    """
+    Stream every primary key of a table in ascending order using a server-side cursor.
+    The keys are read in primary key index order, so no sort is needed on either side.
+
+    Args:
+        conn: A database connection (must not be in autocommit mode).
+        table_name: The table to query.
+        key_column: The table's primary key column, see get_table_primary_key.
+        batch_size: Maximum number of keys per yielded batch.
+
+    Yields:
+        Lists of at most batch_size keys, in ascending order.
+
+    Raises:
+        ValueError: If batch_size is not a positive integer.
+        psycopg.Error: On database errors.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+
+    query = sql.SQL("SELECT {key} FROM public.{table} ORDER BY {key}").format(
+        key=sql.Identifier(key_column), table=sql.Identifier(table_name)
+    )
+
+    with conn.cursor(name=f"keys_{table_name}", row_factory=tuple_row) as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query)
+
+        while True:
+            batch = cursor.fetchmany(batch_size)
+
+            if not batch:
+                break
+
+            yield [row[0] for row in batch]
+
+
+def copy_table_columns(
+    conn: Connection[DictRow],
+    table_name: str,
+    type_codes: List[int | str],
+    last_updated: datetime | None = None,
+    batch_size: int = 10000,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+) -> Generator[List[list], None, None]:
+    """
+    Stream rows from a table with a binary COPY TO STDOUT, optionally filtered by
+    last_updated, and yield them transposed into per-column value lists.
+
+    Values are decoded by psycopg's binary loaders into plain tuples and transposed
+    per batch, without building a dictionary per row.
+
+    Args:
+        conn: A database connection.
+        table_name: The table to query.
+        type_codes: The type OIDs or names of the selected columns, in order, e.g.
+            the type_code of each column returned by get_table_description for the
+            same projection.
+        last_updated: Filter for rows updated after this datetime.
+        batch_size: Maximum number of rows per yielded batch.
+        key_range: Filter for rows whose key lies in the range.
+        projection: The select list. Defaults to *.
+
+    Yields:
+        Lists with one list of values per column, each holding at most
+        batch_size values.
+
+    Raises:
+        ValueError: If batch_size is not a positive integer.
+        psycopg.Error: On database errors.
+        Exception: On other errors.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+
+    query = sql.SQL("COPY ({}) TO STDOUT (FORMAT BINARY)").format(
+        build_table_data_query(table_name, last_updated, key_range, projection)
+    )
+
+    with conn.cursor() as cursor:
+        with cursor.copy(query) as copy:
+            copy.set_types(type_codes)
+            rows = copy.rows()
+
+            while batch := list(islice(rows, batch_size)):
+                yield [list(column) for column in zip(*batch)]
+
+
+def export_snapshot(conn: Connection[DictRow]) -> str:
+    """
+    Export the snapshot of the connection's current transaction so other connections
+    can read the database as it was at the same point in time.
+
+    The snapshot stays importable only while this connection's transaction is open.
+
+    Args:
+        conn: A database connection (must not be in autocommit mode).
+
+    Returns:
+        The snapshot identifier returned by pg_export_snapshot().
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_export_snapshot() AS snapshot_id")
+        response = cursor.fetchone()
+
+    return response["snapshot_id"]  # type: ignore
+
+
+def import_snapshot(conn: Connection[DictRow], snapshot_id: str) -> None:
+    """
+    Start a REPEATABLE READ transaction on the connection that uses a snapshot
+    exported by another connection.
+
+    Args:
+        conn: An idle database connection (no transaction in progress).
+        snapshot_id: A snapshot identifier returned by export_snapshot.
+
+    Returns:
+        None
+
+    Raises:
+        psycopg.Error: On database errors, e.g. if the snapshot no longer exists.
+    """
+    conn.isolation_level = IsolationLevel.REPEATABLE_READ
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("SET TRANSACTION SNAPSHOT {}").format(sql.Literal(snapshot_id))
+        )
+
+
+def get_source_load(
+    conn: Connection[DictRow], excluded_pids: List[int] | None = None
+) -> Dict[str, int]:
+    """
+    Sample how busy the database is from pg_stat_activity: the client sessions
+    running a query and the sessions waiting on a lock, ignoring the given backends,
+    e.g. the extraction's own connections.
+
+    The activity snapshot Postgres caches per transaction is cleared first, so the
+    sample is current even inside a long-running transaction.
+
+    Args:
+        conn: A database connection.
+        excluded_pids: Backend process ids to leave out of the counts. The sampling
+            connection itself is always left out.
+
+    Returns:
+        A dict with active_sessions and lock_waits.
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    query = """
+        SELECT count(*) FILTER (WHERE state = 'active') AS active_sessions,
+               count(*) FILTER (WHERE wait_event_type = 'Lock') AS lock_waits
+          FROM pg_stat_activity
+         WHERE backend_type = 'client backend'
+           AND datname = current_database()
+           AND pid <> pg_backend_pid()
+           AND pid <> ALL(%s)
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(query, (list(excluded_pids or []),))
+        response = cursor.fetchone()
+
+    return dict(response)  # type: ignore
+
+
+def get_table_change_stats(
+    conn: Connection[DictRow], table_names: List[str]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Get the planner's row estimate of several tables from pg_class.reltuples and
+    their cumulative insert and update counters from pg_stat_user_tables, in a
+    single query and without touching the tables themselves.
+
+    The counters only ever grow until the statistics are reset, so the rows changed
+    between two runs are about the difference of their changed_rows. Backends report
+    their counters up to a few seconds late, changes one sample misses are counted by
+    the next one.
+
+    Args:
+        conn: A database connection.
+        table_names: The tables to query.
+
+    Returns:
+        A dict with each table's estimated_rows (-1 if the table has never been
+        analyzed), live_rows and changed_rows (rows inserted plus rows updated since
+        the statistics were last reset).
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    if not table_names:
+        return {}
+
+    query = """
+        SELECT c.relname AS table_name,
+               c.reltuples::bigint AS estimated_rows,
+               COALESCE(s.n_live_tup, 0) AS live_rows,
+               COALESCE(s.n_tup_ins + s.n_tup_upd, 0) AS changed_rows
+          FROM pg_class c
+          JOIN pg_namespace n
+            ON n.oid = c.relnamespace
+          LEFT JOIN pg_stat_user_tables s
+            ON s.relid = c.oid
+         WHERE n.nspname = 'public'
+           AND c.relname = ANY(%s)
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(query, (list(table_names),))
+        response = cursor.fetchall()
+
+    return {
+        row["table_name"]: {
+            "estimated_rows": row["estimated_rows"],
+            "live_rows": row["live_rows"],
+            "changed_rows": row["changed_rows"],
+        }
+        for row in response
+    }
+
+
 def handle_db_exception(e: Exception) -> dict:
     """
     Format and log a database exception.
@@ -0,0 +1,87 @@
+import logging
+from typing import List
+
+from psycopg import Connection, sql
+from psycopg.rows import DictRow
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+NOTIFY_FUNCTION = sql.SQL("""
+    CREATE OR REPLACE FUNCTION public.notify_table_change() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);
+        RETURN NULL;
+    END
+    $$
+""")
+
+
+def install_change_notify_triggers(
+    conn: Connection[DictRow], table_names: List[str], channel: str
+) -> None:
+    """
+    Install statement-level triggers that NOTIFY a channel with the table name
+    whenever rows of the tables are inserted, updated, deleted or truncated.
+
+    Statement-level triggers fire once per statement rather than once per row, and
+    Postgres delivers identical notifications of a transaction only once, so a bulk
+    update costs a single notification. Existing triggers are replaced.
+
+    Args:
+        conn: A database connection.
+        table_names: The tables to watch.
+        channel: The channel to notify.
+
+    Returns:
+        None
+
+    Raises:
+        psycopg.Error: On database errors, e.g. missing privileges.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(NOTIFY_FUNCTION)
+
+        for table_name in table_names:
+            table = sql.SQL("public.{}").format(sql.Identifier(table_name))
+            cursor.execute(
+                sql.SQL("DROP TRIGGER IF EXISTS notify_table_change ON {}").format(
+                    table
+                )
+            )
+            cursor.execute(
+                sql.SQL(
+                    "CREATE TRIGGER notify_table_change"
+                    " AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {}"
+                    " FOR EACH STATEMENT"
+                    " EXECUTE FUNCTION public.notify_table_change({})"
+                ).format(table, sql.Literal(channel))
+            )
+
+    logger.info(f"Installed change triggers notifying {channel} on {table_names}")
+
+
+def remove_change_notify_triggers(
+    conn: Connection[DictRow], table_names: List[str]
+) -> None:
+    """
+    Remove the triggers installed by install_change_notify_triggers.
+
+    Args:
+        conn: A database connection.
+        table_names: The tables to stop watching.
+
+    Returns:
+        None
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    with conn.cursor() as cursor:
+        for table_name in table_names:
+            cursor.execute(
+                sql.SQL(
+                    "DROP TRIGGER IF EXISTS notify_table_change ON public.{}"
+                ).format(sql.Identifier(table_name))
+            )
@@ -0,0 +1,194 @@
+import logging
+from typing import Any, Dict, List
+
+from psycopg import Connection, sql
+from psycopg.rows import DictRow
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def ensure_publication(
+    conn: Connection[DictRow], publication_name: str, table_names: List[str]
+) -> None:
+    """
+    Create a publication of the given tables if it does not exist yet, and add any of
+    the tables it does not publish already.
+
+    Args:
+        conn: A database connection.
+        publication_name: The publication to create or extend.
+        table_names: The tables whose changes should be published.
+
+    Returns:
+        None
+
+    Raises:
+        psycopg.Error: On database errors, e.g. missing privileges.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT tablename FROM pg_publication_tables WHERE pubname = %s",
+            (publication_name,),
+        )
+        published_tables = {row["tablename"] for row in cursor.fetchall()}
+
+        cursor.execute(
+            "SELECT 1 FROM pg_publication WHERE pubname = %s", (publication_name,)
+        )
+        publication_exists = cursor.fetchone() is not None
+
+        new_tables = [
+            sql.SQL("public.{}").format(sql.Identifier(table_name))
+            for table_name in table_names
+            if table_name not in published_tables
+        ]
+
+        if not new_tables:
+            return
+
+        statement = (
+            "ALTER PUBLICATION {} ADD TABLE {}"
+            if publication_exists
+            else "CREATE PUBLICATION {} FOR TABLE {}"
+        )
+        cursor.execute(
+            sql.SQL(statement).format(
+                sql.Identifier(publication_name), sql.SQL(", ").join(new_tables)
+            )
+        )
+
+    logger.info(f"Publishing changes of {len(new_tables)} tables in {publication_name}")
+
+
+def ensure_replication_slot(conn: Connection[DictRow], slot_name: str) -> bool:
+    """
+    Create a logical replication slot using the built-in pgoutput plugin if it does
+    not exist yet. The slot only sees changes committed after it was created, so
+    existing rows must be extracted some other way first.
+
+    Must run before the transaction performs any writes.
+
+    Args:
+        conn: A database connection.
+        slot_name: The replication slot to create.
+
+    Returns:
+        True if the slot was created, False if it already existed.
+
+    Raises:
+        psycopg.Error: On database errors, e.g. wal_level is not logical.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (slot_name,)
+        )
+
+        if cursor.fetchone() is not None:
+            return False
+
+        cursor.execute(
+            "SELECT pg_create_logical_replication_slot(%s, 'pgoutput')", (slot_name,)
+        )
+
+    logger.info(f"Created logical replication slot {slot_name}")
+
+    return True
+
+
+def peek_replication_changes(
+    conn: Connection[DictRow],
+    slot_name: str,
+    publication_name: str,
+    max_changes: int | None = None,
+) -> List[bytes]:
+    """
+    Read the pending pgoutput messages of a replication slot without consuming them.
+    The slot only moves forward once advance_replication_slot is called, so changes
+    read by a run that fails are read again by the next one.
+
+    Args:
+        conn: A database connection.
+        slot_name: The replication slot to read.
+        publication_name: The publication whose tables are decoded.
+        max_changes: Stop after the transaction in which this many messages have been
+            read. Reads every pending change when None.
+
+    Returns:
+        The binary pgoutput messages, in commit order.
+
+    Raises:
+        psycopg.Error: On database errors, e.g. the slot does not exist.
+    """
+    query = """
+        SELECT data
+          FROM pg_logical_slot_peek_binary_changes(
+               %s, NULL, %s, 'proto_version', '1', 'publication_names', %s)
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, (slot_name, max_changes, publication_name))
+        response = cursor.fetchall()
+
+    return [bytes(row["data"]) for row in response]
+
+
+def advance_replication_slot(
+    conn: Connection[DictRow], slot_name: str, lsn: str
+) -> None:
+    """
+    Mark every change of a replication slot up to lsn as consumed, letting the
+    server recycle the WAL that held them.
+
+    Args:
+        conn: A database connection.
+        slot_name: The replication slot to advance.
+        lsn: The log sequence number to advance to, e.g. "0/2F18FC8".
+
+    Returns:
+        None
+
+    Raises:
+        psycopg.Error: On database errors.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_replication_slot_advance(%s, %s::pg_lsn)", (slot_name, lsn)
+        )
+
+
+def get_replication_slot_lag(
+    conn: Connection[DictRow], slot_name: str
+) -> Dict[str, Any]:
+    """
+    Get how far a replication slot is behind the current write-ahead log position.
+
+    Args:
+        conn: A database connection.
+        slot_name: The replication slot to inspect.
+
+    Returns:
+        A dict with confirmed_flush_lsn, current_lsn and lag_bytes, the amount of
+        WAL written since the last consumed change.
+
+    Raises:
+        ValueError: If the slot does not exist.
+        psycopg.Error: On database errors.
+    """
+    query = """
+        SELECT confirmed_flush_lsn::text AS confirmed_flush_lsn,
+               pg_current_wal_lsn()::text AS current_lsn,
+               pg_wal_lsn_diff(pg_current_wal_lsn(), confirmed_flush_lsn)::bigint
+               AS lag_bytes
+          FROM pg_replication_slots
+         WHERE slot_name = %s
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, (slot_name,))
+        response = cursor.fetchone()
+
+    if response is None:
+        raise ValueError(f"Replication slot {slot_name} does not exist")
+
+    return dict(response)
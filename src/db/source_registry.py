@@ -0,0 +1,78 @@
+import os
+import re
+from typing import List
+
+# the original source, whose keys and state are not namespaced
+DEFAULT_SOURCE = "TOTESYS"
+
+SOURCE_NAME_PATTERN = re.compile(r"[A-Z][A-Z0-9_]*")
+
+
+def get_source_names() -> List[str]:
+    """
+    Get the source databases the extract stage reads, from the comma separated
+    EXTRACT_SOURCES environment variable, e.g. "TOTESYS,TOTESYS_EU,TOTESYS_US".
+
+    Every source is a TOTESYS-compatible database configured like the TOTESYS one,
+    with its name as the prefix of its connection variables: TOTESYS_EU_DB_USER,
+    TOTESYS_EU_DB_PASSWORD, TOTESYS_EU_DB_HOST, TOTESYS_EU_DB_DATABASE and
+    TOTESYS_EU_DB_PORT.
+
+    Returns:
+        The source names in order, ["TOTESYS"] if EXTRACT_SOURCES is not set.
+
+    Raises:
+        ValueError: If a name is not an upper case environment variable prefix, is
+            "DATAWAREHOUSE" or is listed twice.
+    """
+    setting = os.environ.get("EXTRACT_SOURCES")
+
+    if not setting:
+        return [DEFAULT_SOURCE]
+
+    source_names = [name.strip() for name in setting.split(",") if name.strip()]
+
+    for source_name in source_names:
+        if (
+            not SOURCE_NAME_PATTERN.fullmatch(source_name)
+            or source_name == "DATAWAREHOUSE"
+        ):
+            raise ValueError(f"Invalid source name '{source_name}' in EXTRACT_SOURCES")
+
+    if len(set(source_names)) != len(source_names):
+        raise ValueError(f"Duplicate source names in EXTRACT_SOURCES: {setting}")
+
+    return source_names
+
+
+def get_source_prefix(source_name: str) -> str | None:
+    """
+    Get the prefix namespacing a source's ingest keys and state keys.
+
+    Args:
+        source_name: A source name, see get_source_names.
+
+    Returns:
+        None for the default TOTESYS source, so its keys stay where they always
+        were, and the lower case source name otherwise, e.g. "totesys_eu".
+    """
+    if source_name == DEFAULT_SOURCE:
+        return None
+
+    return source_name.lower()
+
+
+def add_source_prefix(source_name: str, key: str) -> str:
+    """
+    Namespace an S3 key by source, see get_source_prefix.
+
+    Args:
+        source_name: A source name, see get_source_names.
+        key: The key of the default source.
+
+    Returns:
+        The key of the source, e.g. "totesys_eu/lambda_state.json".
+    """
+    prefix = get_source_prefix(source_name)
+
+    return f"{prefix}/{key}" if prefix else key
@@ -0,0 +1,178 @@
+import logging
+import os
+from pprint import pformat
+from time import perf_counter
+
+import orjson
+from psycopg import Error
+
+from src.db.db_helpers import get_totesys_table_names, handle_psycopg_exceptions
+from src.db.source_registry import add_source_prefix, get_source_names
+from src.utilities.extract_lambda_utils import parse_table_settings
+from src.utilities.extraction.detect_deleted_rows import (
+    DELETE_STATE_KEY,
+    add_log_to_delete_state,
+    detect_deleted_rows_to_s3,
+)
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.resource_manager import resources
+from src.utilities.state.state_session import StateSession
+from src.utilities.typing_utils import ExtractEvent
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def lambda_handler(event: ExtractEvent, context):
+    """
+    Detects rows hard-deleted from the source tables, which the last_updated
+    watermark of extract_lambda cannot see. Deployed by terraform with its own hourly
+    schedule, outside the ETL state machine.
+
+    Every run streams each table's primary keys, compares them with the key snapshot
+    the previous run saved under key_snapshots/ in the ingest bucket and uploads the
+    keys that disappeared as a tombstone file, in the same format as the delete files
+    of extract_changes_lambda. Only keys are ever held in memory, as one sorted
+    integer array per table, so a table of ten million rows takes about 40MB to
+    diff. The first run of a table only saves its snapshot.
+
+    Every tombstone file is recorded in delete_state.json in the state bucket, under
+    "delete_state" and the table name, with its key in a delete log as extract_lambda
+    records its files in the ingest log. The state is saved after each table and
+    before the table's snapshot is replaced. It is kept apart from
+    lambda_state.json, which the ETL state machine may be rewriting at the same
+    time. Neither the transform nor the load reads the delete log yet, so deleted
+    rows still remain in the warehouse dimensions. Removing them needs a decision
+    the warehouse schema does not make yet, as fact_sales_order rows keep
+    referencing them.
+
+    Every source database listed in EXTRACT_SOURCES is checked in turn, see
+    extract_lambda. The snapshots, tombstone files and delete state of every source
+    other than TOTESYS are namespaced under its lower case name, e.g.
+    "totesys_eu/key_snapshots/sales_order.parquet", so one source's keys are never
+    diffed against another's. Their metrics are reported under the namespaced table name, e.g.
+    "totesys_eu/sales_order".
+
+    DETECT_DELETES_BATCH_SIZE (default 100000) sets the keys fetched per round trip.
+    The tombstone files are compressed as the extraction's files, with
+    EXTRACT_COMPRESSION and EXTRACT_TABLE_COMPRESSION, see extract_lambda.
+
+    Args:
+    event (ExtractEvent): AWS Lambda event object. Its optional "tables" limits the
+        run to those tables.
+    context: AWS Lambda context object (not used, included for compatibility).
+
+    Returns:
+    A JSON-encoded summary with the tombstone files under "deletes_to_process" and
+    the keys, deletions and seconds of every table under "delete_metrics".
+
+    Example of the output:
+    {
+        "deletes_to_process": [
+            {
+                "table_name": "sales_order",
+                "extraction_timestamp": "2025-06-10T20:51:34.260407",
+                "last_updated": "2025-06-10T20:51:34.260407",
+                "file_name": "sales_order_2025-6-10_20-51-34_260407_deletes_snapshot.parquet",
+                "key": "2025/6/10/sales_order_2025-6-10_20-51-34_260407_deletes_snapshot.parquet",
+                "row_count": 2,
+            }
+        ],
+        "delete_metrics": {
+            "sales_order": {
+                "keys": 11245,
+                "deleted": 2,
+                "snapshot_bytes": 1433,
+                "seconds": 0.041,
+            }
+        }
+    }
+
+    Raises:
+    Error: If a database error occurs.
+    Exception: If any other error occurs, such as an S3 upload failure.
+    """
+    s3_client = resources.get_s3_client()
+    INGEST_ZONE_BUCKET_NAME = os.environ.get("INGEST_ZONE_BUCKET_NAME")
+    LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
+    DETECT_DELETES_BATCH_SIZE = int(os.environ.get("DETECT_DELETES_BATCH_SIZE", 100000))
+    EXTRACT_COMPRESSION = os.environ.get("EXTRACT_COMPRESSION", DEFAULT_COMPRESSION)
+    EXTRACT_TABLE_COMPRESSION = parse_table_settings(
+        os.environ.get("EXTRACT_TABLE_COMPRESSION")
+    )
+    result = {"deletes_to_process": [], "delete_metrics": {}}
+
+    # fail before reading any key rather than on the first tombstone
+    for compression in [EXTRACT_COMPRESSION, *EXTRACT_TABLE_COMPRESSION.values()]:
+        get_parquet_compression_options(compression)
+
+    try:
+        for source_name in get_source_names():
+            with (
+                resources.connection(source_name) as conn,
+                StateSession(
+                    s3_client,
+                    LAMBDA_STATE_BUCKET_NAME,
+                    add_source_prefix(source_name, DELETE_STATE_KEY),
+                    checkpoint_interval=1,
+                ) as state_session,
+            ):
+                table_names = get_totesys_table_names(conn)
+
+                if event and event.get("tables"):
+                    table_names = [
+                        name for name in table_names if name in event["tables"]
+                    ]
+
+                for table_name in table_names:
+                    start = perf_counter()
+                    detected = detect_deleted_rows_to_s3(
+                        conn,
+                        s3_client,
+                        INGEST_ZONE_BUCKET_NAME,  # type: ignore
+                        table_name,
+                        DETECT_DELETES_BATCH_SIZE,
+                        EXTRACT_TABLE_COMPRESSION.get(table_name, EXTRACT_COMPRESSION),
+                        record_log_entry=lambda entry: state_session.update(
+                            entry["table_name"],
+                            lambda state: add_log_to_delete_state(state, entry),
+                        ),
+                        source_name=source_name,
+                    )
+                    # the key cursor holds a snapshot, release it between tables
+                    conn.commit()
+
+                    if detected["log_entry"]:
+                        result["deletes_to_process"].append(detected["log_entry"])
+
+                    result["delete_metrics"][
+                        add_source_prefix(source_name, table_name)
+                    ] = {
+                        "keys": detected["key_count"],
+                        "deleted": (
+                            detected["log_entry"]["row_count"]
+                            if detected["log_entry"]
+                            else 0
+                        ),
+                        "snapshot_bytes": detected["snapshot_bytes"],
+                        "seconds": round(perf_counter() - start, 3),
+                    }
+
+        logger.info("Result of delete detection:\n%s", pformat(result))
+
+        return orjson.dumps(result)
+
+    except Error as err:
+        handle_psycopg_exceptions(err)
+        raise err
+
+    except Exception as err:
+        logger.critical(err, exc_info=err)
+        raise err
@@ -0,0 +1,220 @@
+import logging
+import os
+from datetime import datetime, timezone
+from pprint import pformat
+
+import orjson
+from psycopg import Error
+
+from src.db.db_helpers import get_totesys_table_names, handle_psycopg_exceptions
+from src.db.replication_helpers import (
+    advance_replication_slot,
+    ensure_publication,
+    ensure_replication_slot,
+    get_replication_slot_lag,
+    peek_replication_changes,
+)
+from src.utilities.extract_lambda_utils import (
+    add_log_to_ingest_state,
+    parse_table_settings,
+)
+from src.utilities.extraction.decode_pgoutput_messages import (
+    decode_pgoutput_messages,
+)
+from src.utilities.extraction.extract_changes_to_s3 import extract_changes_to_s3
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.resource_manager import resources
+from src.utilities.state.catalog_cache import load_catalog
+from src.utilities.state.state_session import StateSession
+from src.utilities.typing_utils import EmptyDict
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s | %(levelname)s: %(message)s",
+)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def lambda_handler(event: EmptyDict, context: EmptyDict):
+    """
+    Extracts the rows inserted, updated and deleted in the TOTESYS database since the
+    last run by consuming a logical replication slot, instead of polling every table's
+    last_updated column. Hard deletes, which polling cannot see, are written as delete
+    files next to the usual upsert files.
+
+    The database must run with wal_level=logical. On first use the handler creates
+    the CDC_PUBLICATION_NAME publication (default "totesys_cdc") of every TOTESYS table
+    and the CDC_SLOT_NAME slot (default "totesys_cdc") using the built-in pgoutput
+    plugin. A slot only sees changes made after it was created, so rows that existed
+    before are extracted by a regular extract_lambda run.
+
+    Changes are peeked rather than consumed: the slot is only advanced once every file
+    is uploaded and the state is saved, so a failed run is retried from the same
+    position. CDC_MAX_CHANGES (default 10000) caps the changes read per run, rounded
+    up to a whole transaction. Upsert files are recorded in the ingest state like any
+    other extraction, so the polling extraction can take over at any time.
+
+    Upsert files are built from the new row values in the replication stream rather
+    than by querying the tables, only rows with an unchanged TOASTed value are read
+    back by key. They are typed by the same cached catalog and compressed with the
+    same EXTRACT_COMPRESSION and EXTRACT_TABLE_COMPRESSION settings as the files of
+    extract_lambda, so the transform reads both alike.
+
+    Terraform deploys the handler next to extract_lambda. Setting the extract_mode
+    variable to "cdc" makes it the extract step of the ETL state machine, whose
+    transform and load then process its upsert files on the usual schedule. The
+    remaining changes of a capped run are left to the next scheduled run, so the
+    handler always returns "continue": false. The delete files are only written to
+    the ingest zone: applying them in the transform and load is out of the scope of
+    this handler, the transform does not read them yet.
+
+    To try it against a local Postgres, start the server with
+    "-c wal_level=logical" and invoke the handler with the TOTESYS_DB_* variables
+    pointing at it.
+
+    Args:
+    event (EmptyDict): AWS Lambda event object (not used, included for compatibility).
+    context (EmptyDict): AWS Lambda context object (not used, included for compatibility).
+
+    Returns:
+    A JSON-encoded summary with the same "files_to_process" entries as extract_lambda,
+    the delete files under "deletes_to_process" and the slot's progress and lag.
+
+    Example of the output:
+    {
+        "files_to_process": [
+            {
+                "table_name": "sales_order",
+                "extraction_timestamp": "2025-06-10T20:51:34.260407",
+                "last_updated": "2025-06-10T20:50:02.112000",
+                "file_name": "sales_order_2025-6-10_20-50-2_112000_cdc_0-2F18FC8.parquet",
+                "key": "2025/6/10/sales_order_2025-6-10_20-50-2_112000_cdc_0-2F18FC8.parquet",
+            }
+        ],
+        "deletes_to_process": [],
+        "continue": false,
+        "replication_metrics": {
+            "changes": 12,
+            "transactions": 3,
+            "truncated_tables": [],
+            "end_lsn": "0/2F18FC8",
+            "confirmed_flush_lsn": "0/2F18FC8",
+            "current_lsn": "0/2F19140",
+            "lag_bytes": 376,
+            "lag_seconds": 0.0,
+        }
+    }
+
+    Raises:
+    Error: If a database error occurs.
+    Exception: If any other error occurs, such as an S3 upload failure.
+    """
+    s3_client = resources.get_s3_client()
+    INGEST_ZONE_BUCKET_NAME = os.environ.get("INGEST_ZONE_BUCKET_NAME")
+    LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
+    CDC_SLOT_NAME = os.environ.get("CDC_SLOT_NAME", "totesys_cdc")
+    CDC_PUBLICATION_NAME = os.environ.get("CDC_PUBLICATION_NAME", "totesys_cdc")
+    CDC_MAX_CHANGES = int(os.environ.get("CDC_MAX_CHANGES", 10000))
+    EXTRACT_COMPRESSION = os.environ.get("EXTRACT_COMPRESSION", DEFAULT_COMPRESSION)
+    EXTRACT_TABLE_COMPRESSION = parse_table_settings(
+        os.environ.get("EXTRACT_TABLE_COMPRESSION")
+    )
+    result = {"files_to_process": [], "deletes_to_process": [], "continue": False}
+
+    # fail before reading the slot rather than on the first file
+    for compression in [EXTRACT_COMPRESSION, *EXTRACT_TABLE_COMPRESSION.values()]:
+        get_parquet_compression_options(compression)
+
+    try:
+        with resources.connection("TOTESYS") as conn:
+            # the publication must exist before the slot decodes any change, and a
+            # slot cannot be created by a transaction that has written anything
+            ensure_publication(
+                conn, CDC_PUBLICATION_NAME, get_totesys_table_names(conn)
+            )
+            conn.commit()
+            ensure_replication_slot(conn, CDC_SLOT_NAME)
+            conn.commit()
+
+            decoded = decode_pgoutput_messages(
+                peek_replication_changes(
+                    conn, CDC_SLOT_NAME, CDC_PUBLICATION_NAME, CDC_MAX_CHANGES
+                )
+            )
+            logger.info(
+                f"Read {len(decoded['changes'])} changes in "
+                f"{decoded['transactions']} transactions from {CDC_SLOT_NAME}"
+            )
+
+            if decoded["changes"]:
+                catalog = load_catalog(
+                    conn,
+                    s3_client,
+                    LAMBDA_STATE_BUCKET_NAME,  # type: ignore
+                )
+
+                with StateSession(s3_client, LAMBDA_STATE_BUCKET_NAME) as state_session:
+                    result.update(
+                        extract_changes_to_s3(
+                            conn,
+                            s3_client,
+                            INGEST_ZONE_BUCKET_NAME,  # type: ignore
+                            decoded["changes"],
+                            suffix=f"cdc_{decoded['end_lsn'].replace('/', '-')}",
+                            table_catalogs=catalog["tables"],
+                            compression=EXTRACT_COMPRESSION,
+                            table_compression=EXTRACT_TABLE_COMPRESSION,
+                        )
+                    )
+
+                    for log_entry in result["files_to_process"]:
+                        state_session.update(
+                            log_entry["table_name"],
+                            lambda state, entry=log_entry: add_log_to_ingest_state(
+                                state, entry
+                            ),
+                        )
+
+            # only consumed once the files and the state are saved
+            if decoded["end_lsn"]:
+                advance_replication_slot(conn, CDC_SLOT_NAME, decoded["end_lsn"])
+
+            lag = get_replication_slot_lag(conn, CDC_SLOT_NAME)
+            pending = decode_pgoutput_messages(
+                peek_replication_changes(conn, CDC_SLOT_NAME, CDC_PUBLICATION_NAME, 1)
+            )
+            oldest_pending_commit = pending["first_commit_timestamp"]
+
+            result["replication_metrics"] = {
+                "changes": len(decoded["changes"]),
+                "transactions": decoded["transactions"],
+                "truncated_tables": decoded["truncated_tables"],
+                "end_lsn": decoded["end_lsn"],
+                **lag,
+                "lag_seconds": (
+                    round(
+                        (
+                            datetime.now(timezone.utc) - oldest_pending_commit
+                        ).total_seconds(),
+                        3,
+                    )
+                    if oldest_pending_commit
+                    else 0.0
+                ),
+            }
+
+        logger.info("Result of change extraction:\n%s", pformat(result))
+
+        return orjson.dumps(result)
+
+    except Error as err:
+        handle_psycopg_exceptions(err)
+        raise err
+
+    except Exception as err:
+        logger.critical(err, exc_info=err)
+        raise err
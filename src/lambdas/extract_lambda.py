@@ -1,32 +1,60 @@
 import logging
 import os
-from copy import deepcopy
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pprint import pformat
+from time import perf_counter
 
-import boto3
 import orjson
 from psycopg import Error
 
-from src.db.connection import connect_db
 from src.db.db_helpers import (
-    get_table_data,
-    get_totesys_table_names,
+    get_source_load,
+    get_table_change_stats,
+    get_tables_last_updated_timestamps,
     handle_psycopg_exceptions,
 )
+from src.db.source_registry import (
+    add_source_prefix,
+    get_source_names,
+    get_source_prefix,
+)
 from src.utilities.extract_lambda_utils import (
-    create_data_frame_from_list,
-    create_parquet_metadata,
-    get_last_updated_from_raw_table_data,
-    initialize_table_state,
+    add_log_to_ingest_state,
+    get_tables_with_new_data,
+    parse_table_settings,
+)
+from src.utilities.extraction.adaptive_throttle import AdaptiveThrottle
+from src.utilities.extraction.column_requirements import get_missing_required_columns
+from src.utilities.extraction.extract_table_pages_to_s3 import (
+    extract_table_pages_to_s3,
+)
+from src.utilities.extraction.extract_table_partitions_to_s3 import (
+    extract_table_partitions_to_s3,
+    plan_table_partitions,
+)
+from src.utilities.extraction.extract_table_to_s3 import extract_table_to_s3
+from src.utilities.extraction.extract_tables_in_parallel import (
+    extract_tables_in_parallel,
+    get_extraction_metrics,
+    timed_extraction,
 )
-from src.utilities.parquets.create_parquet_from_data_frame import (
-    create_parquet_from_data_frame,
+from src.utilities.extraction.extraction_planner import (
+    get_plan_report,
+    plan_extraction,
+    record_extraction_history,
 )
-from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
-from src.utilities.state.get_current_state import get_current_state
-from src.utilities.state.set_current_state import set_current_state
-from src.utilities.typing_utils import EmptyDict
+from src.utilities.extraction.row_hash_index import RowHashIndex
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.resource_manager import resources
+from src.utilities.state.catalog_cache import CATALOG_KEY, load_catalog
+from src.utilities.state.checkpoints import get_checkpoint, set_checkpoint
+from src.utilities.state.state_session import StateSession
+from src.utilities.time_budget import TimeBudget
+from src.utilities.typing_utils import ExtractEvent
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,15 +64,138 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def lambda_handler(event: EmptyDict, context: EmptyDict):
+def lambda_handler(event: ExtractEvent, context):
     """
     Extracts new or updated data from all tables in the TOTESYS database, converts the data into parquet files,
     uploads them to an S3 bucket, and updates the extraction state. Designed to run as an AWS Lambda function
     for incremental ETL processing.
 
+    The extraction engine is selected with the EXTRACT_ENGINE environment variable:
+    "fetchall" (default) loads each table delta into memory at once, while "stream" reads it
+    through a server-side cursor in batches of EXTRACT_BATCH_SIZE rows (default 10000),
+    each written as a row group before the next is read, so only the compressed Parquet
+    file, not the uncompressed rows, grows with the table size. "copy" reads it with a binary COPY TO STDOUT and builds Arrow batches directly,
+    skipping per-row dictionaries and pandas. EXTRACT_TABLE_ENGINES overrides the engine for individual tables, e.g.
+    "sales_order=copy,payment=copy".
+
+    Setting EXTRACT_PAGE_SIZE to N switches to keyset pagination: each table is walked in
+    (last_updated, primary key) order in pages of N rows, each page is uploaded as its own
+    file and the compound watermark of its last row is saved in the ingest state as
+    "last_primary_key" next to "last_updated". EXTRACT_MAX_PAGES caps the pages extracted
+    per table in one run; the next run resumes from the saved watermark. Each page is
+    only an index range scan when the table has an index on (last_updated, primary
+    key), which the TOTESYS schema lacks: without it every page scans and sorts the
+    whole table, see get_table_data_page.
+
+    Setting EXTRACT_MAX_PARTITIONS above 1 splits large table deltas into primary key
+    ranges extracted in parallel worker threads, one part file per range, all reading the
+    same snapshot. A delta gets one range per EXTRACT_PARTITION_ROWS rows (default
+    100000), up to EXTRACT_MAX_PARTITIONS. Set EXTRACT_PARTITION_EXECUTOR to "process" to
+    use worker processes instead where they are available, which AWS Lambda does not.
+
+    Setting EXTRACT_CONCURRENCY above 1 extracts that many tables at a time, each on its own
+    connection. All connections import the same exported snapshot so the extract stays
+    transactionally consistent across tables. Per-table timings and the speed-up over a
+    sequential run are reported under "extraction_metrics".
+
+    Before extracting, a single query probes MAX(last_updated) of every table and only the
+    tables updated since their stored watermark are extracted. The others are listed under
+    "idle_tables" in "extraction_metrics". An event with a "tables" list, as sent by the
+    change listener (src/listeners/change_listener.py), restricts the run to those tables.
+
+    Setting EXTRACT_THROTTLE to "true" keeps the extraction inside a source load budget.
+    After every batch of the "stream" and "copy" engines, and after every table read
+    otherwise, the throttle samples pg_stat_activity and the latency of its own
+    batches. Concurrency (up to EXTRACT_CONCURRENCY) and the batch size (between
+    EXTRACT_MIN_BATCH_SIZE and EXTRACT_MAX_BATCH_SIZE) grow while the load stays
+    within budget, and are halved when more than EXTRACT_MAX_ACTIVE_SESSIONS other
+    sessions are running queries, more than EXTRACT_MAX_LOCK_WAITS sessions are waiting
+    on locks, or a batch took longer than EXTRACT_MAX_BATCH_SECONDS. Only the "stream"
+    and "copy" engines read in batches, so the batch size is left unchanged by, and
+    not reported for, tables extracted with "fetchall" or keyset pagination. Key range
+    partitions run in their own workers and count per table. The rate chosen for each
+    table is reported under "throttle" in "extraction_metrics".
+
+    Setting EXTRACT_ROW_HASHING to "true" drops rows whose content did not change,
+    such as touch-updates that only move last_updated forward. Every extracted row is
+    hashed on its columns other than created_at and last_updated and compared with
+    a primary key to hash index kept per table under row_hashes/ in the ingest
+    bucket. The indexes are saved after the state, so an interrupted run can only
+    let unchanged rows through, never lose changed ones. A table whose rows were all
+    unchanged uploads no file, its watermark still moves forward. The rows dropped
+    per table are reported under "suppressed_rows" in "extraction_metrics".
+    Partitioned extractions are not hashed.
+
+    The table names, column types and primary keys come from a catalog cached as
+    catalog.json in the state bucket. Each run only queries a fingerprint of the
+    schema and re-reads the catalog when it changed, reporting the differences as a
+    "schema_drift" event with the added and removed tables and the added, removed and
+    retyped columns of every changed table. The catalog's column types build the
+    extraction projection and an explicit Arrow schema, so no engine leaves the types
+    to pandas. Tables that lost a column the transforms need are not extracted and are
+    listed under "blocked_tables" with the missing columns, instead of failing the run.
+
+    The tables are extracted largest first, so a big table never starts last and runs
+    alone at the end. A planner estimates the rows each table will read from the
+    insert and update counters of pg_stat_user_tables since the previous run, or its
+    pg_class.reltuples size on its first extraction, and the seconds they will take
+    from the rate measured in previous runs, kept per table under
+    "extraction_history" in the state file. Handing the tables in that order to
+    whichever of the EXTRACT_CONCURRENCY workers frees up first is a longest
+    processing time schedule. The order and the predicted and actual rows and
+    seconds of every table and of the whole run are reported under "plan" in
+    "extraction_metrics".
+
+    EXTRACT_COMPRESSION sets the codec of the Parquet files, optionally with a level:
+    "snappy", "zstd" (default), "lz4", "gzip", "brotli" or "none", e.g. "zstd:3".
+    EXTRACT_TABLE_COMPRESSION overrides it for individual tables, e.g.
+    "sales_order=zstd:9,staff=snappy". benchmarks/benchmark_parquet_codecs.py
+    measures the codecs on the seed data.
+
+    Every table, or key range of a partitioned table, is written in Parquet parts of
+    about EXTRACT_MAX_PART_BYTES bytes (default 64 MiB, 0 for a single part). Each
+    part is uploaded as its own ingest file while the next one is filled, so the
+    compressed table is never held in memory whole. Part keys are named after the
+    start of the extraction with a "part-N" suffix, as the table's last_updated is
+    only known once its last row is read.
+
+    EXTRACT_SOURCES lists the TOTESYS-compatible databases to extract, e.g.
+    "TOTESYS,TOTESYS_EU", each configured with its own <SOURCE>_DB_* connection
+    variables (default "TOTESYS"). Sources are extracted concurrently, each on its
+    own connections with every setting above applying per source. The ingest keys,
+    state file, catalog and row hash indexes of every source other than TOTESYS are
+    namespaced under its lower case name, e.g. "totesys_eu/2025/6/10/...", so the
+    watermarks of one source never move another's. Every file carries the "source"
+    it came from. The transform stage unions the files of a table across sources
+    and keeps it in a "source" column of every dimension and fact, which the
+    warehouse keys rows by together with their ids, as the ids of different sources
+    may overlap. With more than one source, the metrics, drift and blocked and pending
+    tables are reported per source under "sources". The run only hands its files
+    over once every source has finished.
+
+    The database connections and S3 client come from a process-wide resource manager, so
+    warm invocations reuse health-checked pooled connections instead of reconnecting.
+    Each source's pool holds up to EXTRACT_CONCURRENCY + 1 connections, the
+    coordinating one and one per worker.
+
+    The state file is read once and written once per run. Setting STATE_CHECKPOINT_INTERVAL
+    to N also saves it after every N extracted tables, so a crash only loses the tables
+    extracted since the last checkpoint.
+
+    The handler stops starting new tables or pages once less than
+    CHECKPOINT_RESERVE_SECONDS (default 60) are left before the Lambda timeout. The
+    files extracted so far and the pending tables are then saved under
+    "checkpoints" in the state file and the handler returns "continue": true with
+    no files, so the orchestrator invokes it again. The run that finishes returns the
+    files of every run since. Only keyset pages can stop part way through a table, so
+    with a deadline the handler requires EXTRACT_PAGE_SIZE and raises a ValueError
+    without it. Setting CHECKPOINT_RESERVE_SECONDS to 0 runs without checkpoints,
+    e.g. to use the "stream" or "copy" engines.
+
     Args:
-    event (EmptyDict): AWS Lambda event object (not used, included for compatibility).
-    context (EmptyDict): AWS Lambda context object (not used, included for compatibility).
+    event (ExtractEvent): AWS Lambda event object. An optional "tables" list limits the
+        extraction to those tables, every table is considered otherwise.
+    context: AWS Lambda context object, its remaining time bounds the run.
 
     Returns:
     A JSON-encoded summary of the files processed, including table name, extraction timestamp,
@@ -59,6 +210,7 @@ def lambda_handler(event: EmptyDict, context: EmptyDict):
                 "last_updated": "2022-11-03T14:20:51.563000",
                 "file_name": "counterparty_2022-11-3_14-20-51_563000.parquet",
                 "key": "2022/11/3/counterparty_2022-11-3_14-20-51_563000.parquet",
+                "source": "TOTESYS",
             },
             {
                 "table_name": "address",
@@ -66,92 +218,530 @@ def lambda_handler(event: EmptyDict, context: EmptyDict):
                 "last_updated": "2022-11-03T14:20:49.962000",
                 "file_name": "address_2022-11-3_14-20-49_962000.parquet",
                 "key": "2022/11/3/address_2022-11-3_14-20-49_962000.parquet",
+                "source": "TOTESYS",
             }
+        ],
+        "extraction_metrics": {
+            "concurrency": 4,
+            "wall_time_seconds": 3.215,
+            "table_durations_seconds": {"counterparty": 2.921, "address": 3.102},
+            "total_table_seconds": 6.023,
+            "speed_up": 1.87,
+            "idle_tables": ["currency", "department"],
+            "plan": {
+                "order": ["address", "counterparty"],
+                "workers": 4,
+                "predicted_seconds": 3.05,
+                "actual_seconds": 3.215,
+                "tables": {
+                    "address": {
+                        "predicted_rows": 150000,
+                        "actual_rows": 148211,
+                        "predicted_seconds": 3.05,
+                        "actual_seconds": 3.102,
+                    },
+                    ...
+                },
+            },
+        },
+        "continue": false
     }
 
     Raises:
     Error: If a database error occurs during extraction.
+    ValueError: If the context has a deadline and EXTRACT_PAGE_SIZE is not set, or a
+        compression setting is invalid.
     Exception: If any other error occurs during the process, such as S3 upload failure or unexpected issues.
     """
-    conn = connect_db("TOTESYS")
-    s3_client = boto3.client("s3")
+    s3_client = resources.get_s3_client()
     INGEST_ZONE_BUCKET_NAME = os.environ.get("INGEST_ZONE_BUCKET_NAME")
     LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
-    result = {"files_to_process": []}
+    EXTRACT_ENGINE = os.environ.get("EXTRACT_ENGINE", "fetchall")
+    EXTRACT_TABLE_ENGINES = parse_table_settings(
+        os.environ.get("EXTRACT_TABLE_ENGINES")
+    )
+    EXTRACT_BATCH_SIZE = int(os.environ.get("EXTRACT_BATCH_SIZE", 10000))
+    EXTRACT_CONCURRENCY = int(os.environ.get("EXTRACT_CONCURRENCY", 1))
+    EXTRACT_PAGE_SIZE = int(os.environ.get("EXTRACT_PAGE_SIZE", 0))
+    EXTRACT_MAX_PAGES = int(os.environ.get("EXTRACT_MAX_PAGES", 0))
+    EXTRACT_MAX_PARTITIONS = int(os.environ.get("EXTRACT_MAX_PARTITIONS", 1))
+    EXTRACT_PARTITION_ROWS = int(os.environ.get("EXTRACT_PARTITION_ROWS", 100000))
+    EXTRACT_PARTITION_EXECUTOR = os.environ.get("EXTRACT_PARTITION_EXECUTOR", "thread")
+    STATE_CHECKPOINT_INTERVAL = int(os.environ.get("STATE_CHECKPOINT_INTERVAL", 0))
+    CHECKPOINT_RESERVE_SECONDS = float(os.environ.get("CHECKPOINT_RESERVE_SECONDS", 60))
+    EXTRACT_THROTTLE = os.environ.get("EXTRACT_THROTTLE") == "true"
+    EXTRACT_MAX_ACTIVE_SESSIONS = int(os.environ.get("EXTRACT_MAX_ACTIVE_SESSIONS", 10))
+    EXTRACT_MAX_LOCK_WAITS = int(os.environ.get("EXTRACT_MAX_LOCK_WAITS", 0))
+    EXTRACT_MAX_BATCH_SECONDS = float(os.environ.get("EXTRACT_MAX_BATCH_SECONDS", 5))
+    EXTRACT_MIN_BATCH_SIZE = int(os.environ.get("EXTRACT_MIN_BATCH_SIZE", 1000))
+    EXTRACT_MAX_BATCH_SIZE = int(os.environ.get("EXTRACT_MAX_BATCH_SIZE", 100000))
+    EXTRACT_ROW_HASHING = os.environ.get("EXTRACT_ROW_HASHING") == "true"
+    EXTRACT_MAX_PART_BYTES = int(os.environ.get("EXTRACT_MAX_PART_BYTES", 64 * 2**20))
+    EXTRACT_SOURCES = get_source_names()
+    EXTRACT_COMPRESSION = os.environ.get("EXTRACT_COMPRESSION", DEFAULT_COMPRESSION)
+    EXTRACT_TABLE_COMPRESSION = parse_table_settings(
+        os.environ.get("EXTRACT_TABLE_COMPRESSION")
+    )
+
+    # fail before extracting anything rather than on the first file
+    for compression in [EXTRACT_COMPRESSION, *EXTRACT_TABLE_COMPRESSION.values()]:
+        get_parquet_compression_options(compression)
+
+    # 0 opts out of checkpoints, the run then ignores the Lambda deadline
+    budget = TimeBudget(
+        context if CHECKPOINT_RESERVE_SECONDS else {}, CHECKPOINT_RESERVE_SECONDS
+    )
+
+    # a stream, copy or fetchall table cannot stop part way and resume from its
+    # last_updated watermark, a keyset page can
+    if budget.remaining_seconds() is not None and not EXTRACT_PAGE_SIZE:
+        raise ValueError(
+            "Checkpointing before the deadline requires EXTRACT_PAGE_SIZE, set "
+            "CHECKPOINT_RESERVE_SECONDS to 0 to extract without checkpoints"
+        )
+
+    result = {"files_to_process": [], "continue": False}
+    row_hash_indexes: list[RowHashIndex] = []
+
+    def extract_source(source_name, state_session):
+        # extracts one source database on its own connection and state, the
+        # deadline checkpoint is left to the caller which sees every source
+        source_result: dict = {"files_to_process": [], "pending_tables": []}
+        pending_tables = source_result["pending_tables"]
+        started_tables: list[str] = []
+        source_row_hash_indexes: dict[str, RowHashIndex] = {}
+        key_prefix = get_source_prefix(source_name)
+        # the coordinating connection and one per worker, reused by warm invocations
+        resources.get_connection_pool(source_name, max_size=EXTRACT_CONCURRENCY + 1)
+
+        with resources.connection(source_name) as conn:
+            logger.info(f"Starting extraction process for all tables of {source_name}")
+
+            # files extracted by runs that stopped at their deadline, not handed to
+            # the transform stage yet
+            checkpoint = get_checkpoint(state_session.state, "extract")
+            source_result["checkpoint"] = checkpoint
+
+            if checkpoint:
+                source_result["files_to_process"].extend(checkpoint["files_to_process"])
+
+            catalog = load_catalog(
+                conn,
+                s3_client,
+                LAMBDA_STATE_BUCKET_NAME,  # type: ignore
+                add_source_prefix(source_name, CATALOG_KEY),
+            )
+
+            if catalog["drift"]:
+                source_result["schema_drift"] = catalog["drift"]
+
+            blocked_tables = {
+                table_name: missing_columns
+                for table_name, table_catalog in catalog["tables"].items()
+                if (
+                    missing_columns := get_missing_required_columns(
+                        table_name, table_catalog["columns"]
+                    )
+                )
+            }
 
-    try:
-        with conn:
-            logger.info("Starting extraction process for all tables")
+            if blocked_tables:
+                logger.error(f"Not extracting tables missing columns: {blocked_tables}")
+                source_result["blocked_tables"] = blocked_tables
+
+            totesys_tables = [
+                table_name
+                for table_name in catalog["tables"]
+                if table_name not in blocked_tables
+            ]
+            requested_tables = (event or {}).get("tables")
+
+            if requested_tables:
+                totesys_tables = [
+                    table_name
+                    for table_name in totesys_tables
+                    if table_name in requested_tables
+                ]
+
+            # one batched MAX(last_updated) probe so idle tables are never scanned
+            tables_to_extract = get_tables_with_new_data(
+                get_tables_last_updated_timestamps(conn, totesys_tables),  # type: ignore
+                state_session.state["ingest_state"],
+            )
+            idle_tables = [
+                table_name
+                for table_name in totesys_tables
+                if table_name not in tables_to_extract
+            ]
+            logger.info(f"Skipping tables with no new data: {idle_tables}")
+
+            # read every watermark up front, worker threads only write to the state
+            # through the thread safe state_session.update
+            table_watermarks: dict[str, dict] = {
+                table_name: dict(
+                    state_session.state["ingest_state"].get(table_name, {})
+                )
+                for table_name in tables_to_extract
+            }
+
+            # sampled before extracting, rows changed from here on count next run
+            table_stats = get_table_change_stats(conn, tables_to_extract)
+            extraction_plan = plan_extraction(
+                tables_to_extract,
+                table_stats,
+                table_watermarks,
+                state_session.state.get("extraction_history", {}),
+                workers=EXTRACT_CONCURRENCY,
+            )
+            tables_to_extract = extraction_plan["order"]
+            logger.info(
+                f"Extraction plan over {EXTRACT_CONCURRENCY} worker(s), predicted "
+                f"{extraction_plan['predicted_seconds']}s: "
+                f"{pformat(extraction_plan['tables'], sort_dicts=False)}"
+            )
+
+            # our own connections are not load on the source the budget is about
+            own_pids = {conn.info.backend_pid}
+            throttle = (
+                AdaptiveThrottle(
+                    lambda: get_source_load(conn, list(own_pids)),
+                    max_concurrency=EXTRACT_CONCURRENCY,
+                    batch_size=EXTRACT_BATCH_SIZE,
+                    min_batch_size=min(EXTRACT_MIN_BATCH_SIZE, EXTRACT_BATCH_SIZE),
+                    max_batch_size=max(EXTRACT_MAX_BATCH_SIZE, EXTRACT_BATCH_SIZE),
+                    max_active_sessions=EXTRACT_MAX_ACTIVE_SESSIONS,
+                    max_lock_waits=EXTRACT_MAX_LOCK_WAITS,
+                    max_batch_seconds=EXTRACT_MAX_BATCH_SECONDS,
+                )
+                if EXTRACT_THROTTLE
+                else None
+            )
+
+            def record_extraction(log_entry):
+                state_session.update(
+                    log_entry["table_name"],
+                    lambda state: add_log_to_ingest_state(state, log_entry),
+                )
+
+            def load_row_hash_index(table_name):
+                primary_key = catalog["tables"][table_name]["primary_key"]
 
-            totesys_tables = get_totesys_table_names(conn)
+                # rows are indexed by their primary key
+                if not EXTRACT_ROW_HASHING or primary_key is None:
+                    return None
 
-            for table_name in totesys_tables:
+                source_row_hash_indexes[table_name] = RowHashIndex.load(
+                    s3_client,
+                    INGEST_ZONE_BUCKET_NAME,
+                    table_name,
+                    primary_key,
+                    key_prefix,
+                )
+
+                return source_row_hash_indexes[table_name]
+
+            def extract_table_func(worker_conn, table_name, batch_size, on_batch=None):
                 logger.info(f"Starting extraction of {table_name}")
+                watermark = table_watermarks[table_name]
+                compression = EXTRACT_TABLE_COMPRESSION.get(
+                    table_name, EXTRACT_COMPRESSION
+                )
 
-                current_state = get_current_state(s3_client, LAMBDA_STATE_BUCKET_NAME)
-                current_state = initialize_table_state(current_state, table_name)
+                if EXTRACT_PAGE_SIZE:
+                    log_entries = []
+
+                    for log_entry in extract_table_pages_to_s3(
+                        worker_conn,
+                        s3_client,
+                        INGEST_ZONE_BUCKET_NAME,  # type: ignore
+                        table_name,
+                        watermark.get("last_updated"),
+                        watermark.get("last_primary_key"),
+                        page_size=EXTRACT_PAGE_SIZE,
+                        max_pages=EXTRACT_MAX_PAGES or None,
+                        row_hash_index=load_row_hash_index(table_name),
+                        table_catalog=catalog["tables"][table_name],
+                        key_prefix=key_prefix,
+                        compression=compression,
+                    ):
+                        # saved page by page so a failed run resumes mid-table
+                        record_extraction(log_entry)
+                        log_entries.append(log_entry)
+
+                        if log_entry["has_more"] and budget.exhausted():
+                            pending_tables.append(table_name)
+                            break
+
+                    return log_entries
+
+                engine = EXTRACT_TABLE_ENGINES.get(table_name, EXTRACT_ENGINE)
+                plan = (
+                    plan_table_partitions(
+                        worker_conn,
+                        table_name,
+                        watermark.get("last_updated"),
+                        max_partitions=EXTRACT_MAX_PARTITIONS,
+                        rows_per_partition=EXTRACT_PARTITION_ROWS,
+                    )
+                    if EXTRACT_MAX_PARTITIONS > 1
+                    else None
+                )
 
-                current_state_last_updated: datetime | None = current_state[
-                    "ingest_state"
-                ][table_name]["last_updated"]
+                if plan:
+                    log_entries = extract_table_partitions_to_s3(
+                        worker_conn,
+                        INGEST_ZONE_BUCKET_NAME,  # type: ignore
+                        table_name,
+                        plan,
+                        watermark.get("last_updated"),
+                        engine=engine,  # type: ignore
+                        batch_size=batch_size,
+                        executor=EXTRACT_PARTITION_EXECUTOR,  # type: ignore
+                        table_catalog=catalog["tables"][table_name],
+                        db_source=source_name,
+                        key_prefix=key_prefix,
+                        compression=compression,
+                        max_part_bytes=EXTRACT_MAX_PART_BYTES or None,
+                    )
+
+                    for log_entry in log_entries:
+                        record_extraction(log_entry)
+
+                    return log_entries
+
+                log_entries = extract_table_to_s3(
+                    worker_conn,
+                    s3_client,
+                    INGEST_ZONE_BUCKET_NAME,  # type: ignore
+                    table_name,
+                    watermark.get("last_updated"),
+                    engine=engine,  # type: ignore
+                    batch_size=batch_size,
+                    row_hash_index=load_row_hash_index(table_name),
+                    table_catalog=catalog["tables"][table_name],
+                    key_prefix=key_prefix,
+                    compression=compression,
+                    max_part_bytes=EXTRACT_MAX_PART_BYTES or None,
+                    on_batch=on_batch,
+                )
 
-                table_data = get_table_data(
+                for log_entry in log_entries:
+                    record_extraction(log_entry)
+
+                return log_entries
+
+            def extract_func(worker_conn, table_name):
+                # every run extracts at least one table so the pipeline progresses
+                if started_tables and budget.exhausted():
+                    pending_tables.append(table_name)
+                    return []
+
+                started_tables.append(table_name)
+
+                if throttle is None:
+                    return extract_table_func(
+                        worker_conn, table_name, EXTRACT_BATCH_SIZE
+                    )
+
+                own_pids.add(worker_conn.info.backend_pid)
+                # pages and the "fetchall" engine do not read in batch_size batches
+                batched = not EXTRACT_PAGE_SIZE and EXTRACT_TABLE_ENGINES.get(
+                    table_name, EXTRACT_ENGINE
+                ) in ("stream", "copy")
+
+                with throttle.permit(table_name, batched) as ticket:
+                    log_entries = extract_table_func(
+                        worker_conn,
+                        table_name,
+                        ticket["batch_size"] or EXTRACT_BATCH_SIZE,
+                        ticket["on_batch"],
+                    )
+                    ticket["rows"] = sum(
+                        log_entry.get("row_count", 0)
+                        + log_entry.get("suppressed_rows", 0)
+                        for log_entry in log_entries
+                    )
+
+                return log_entries
+
+            extraction_start = perf_counter()
+
+            if EXTRACT_CONCURRENCY > 1:
+                extractions = extract_tables_in_parallel(
                     conn,
-                    table_name,  # type: ignore
-                    current_state_last_updated,
+                    tables_to_extract,
+                    extract_func,
+                    concurrency=EXTRACT_CONCURRENCY,
+                    connect_func=lambda: resources.connection(source_name),
+                )
+            else:
+                extractions = (
+                    timed_extraction(conn, table_name, extract_func)
+                    for table_name in tables_to_extract
                 )
-                extraction_timestamp = datetime.now()
 
-                if not len(table_data):
-                    logger.info(f"No new data to extract from table: {table_name}")
-                    continue
+            completed_extractions = []
 
-                new_table_data_last_updated: datetime = (
-                    get_last_updated_from_raw_table_data(table_data)
+            for extraction in extractions:
+                completed_extractions.append(extraction)
+                table_name = extraction["table_name"]
+                extraction["rows"] = sum(
+                    log_entry.get("row_count", 0) + log_entry.get("suppressed_rows", 0)
+                    for log_entry in extraction["result"] or []
                 )
 
-                table_df = create_data_frame_from_list(table_data)
-                parquet_file = create_parquet_from_data_frame(table_df)
+                if not extraction["result"]:
+                    continue
 
-                filename, key = create_parquet_metadata(
-                    new_table_data_last_updated, table_name
+                # entries of tables whose rows were all unchanged have no file
+                source_result["files_to_process"].extend(
+                    {**log_entry, "source": source_name}
+                    for log_entry in extraction["result"]
+                    if log_entry["key"]
                 )
 
-                response = add_file_to_s3_bucket(
-                    s3_client, INGEST_ZONE_BUCKET_NAME, key, parquet_file
+                logger.info(
+                    f"Finish extracting table:{table_name} data of {source_name}"
                 )
 
-                # ! REVIEW should I get raw error object from add_file_to_s3_bucket function??
-                if response.get("error"):
-                    raise response["error"]["raw_response"]  # type: ignore
-
-                new_state_log_entry = {
-                    "table_name": table_name,
-                    "extraction_timestamp": extraction_timestamp,
-                    "last_updated": new_table_data_last_updated,
-                    "file_name": filename,
-                    "key": key,
+            source_result["extraction_metrics"] = get_extraction_metrics(
+                completed_extractions,
+                perf_counter() - extraction_start,
+                EXTRACT_CONCURRENCY,
+            )
+            source_result["extraction_metrics"]["idle_tables"] = idle_tables
+
+            # tables stopped at the deadline were not read up to their counters
+            planned_extractions = [
+                extraction
+                for extraction in completed_extractions
+                if extraction["table_name"] not in pending_tables
+            ]
+            source_result["extraction_metrics"]["plan"] = get_plan_report(
+                extraction_plan,
+                planned_extractions,
+                perf_counter() - extraction_start,
+            )
+            logger.info(
+                "Predicted vs actual extraction:\n%s",
+                pformat(source_result["extraction_metrics"]["plan"], sort_dicts=False),
+            )
+
+            def record_history(state):
+                history = state.setdefault("extraction_history", {})
+
+                for extraction in planned_extractions:
+                    record_extraction_history(
+                        history,
+                        extraction["table_name"],
+                        table_stats.get(extraction["table_name"]),
+                        extraction["rows"],
+                        extraction["duration_seconds"],
+                    )
+
+            if planned_extractions:
+                state_session.update("extraction_history", record_history)
+
+            if throttle is not None:
+                source_result["extraction_metrics"]["throttle"] = throttle.get_metrics()
+
+            if EXTRACT_ROW_HASHING:
+                source_result["extraction_metrics"]["suppressed_rows"] = {
+                    table_name: index.suppressed_rows
+                    for table_name, index in sorted(source_row_hash_indexes.items())
                 }
 
-                result["files_to_process"].append(new_state_log_entry)
+            row_hash_indexes.extend(source_row_hash_indexes.values())
 
-                updated_state_all = deepcopy(current_state)
-                updated_state_all["ingest_state"][table_name]["last_updated"] = (
-                    #  TODO THEO check unbound error when not ignoring types
-                    new_table_data_last_updated  # type: ignore
-                )
-                updated_state_all["ingest_state"][table_name]["ingest_log"].append(
-                    new_state_log_entry  # type: ignore
-                )
+        return source_result
 
-                set_current_state(
-                    updated_state_all, LAMBDA_STATE_BUCKET_NAME, s3_client
+    try:
+        with ExitStack() as stack:
+            state_sessions = {
+                source_name: stack.enter_context(
+                    StateSession(
+                        s3_client,
+                        LAMBDA_STATE_BUCKET_NAME,
+                        key=add_source_prefix(source_name, "lambda_state.json"),
+                        checkpoint_interval=STATE_CHECKPOINT_INTERVAL,
+                    )
                 )
+                for source_name in EXTRACT_SOURCES
+            }
+
+            if len(EXTRACT_SOURCES) > 1:
+                with ThreadPoolExecutor(max_workers=len(EXTRACT_SOURCES)) as executor:
+                    source_results = dict(
+                        zip(
+                            EXTRACT_SOURCES,
+                            executor.map(
+                                extract_source,
+                                state_sessions.keys(),
+                                state_sessions.values(),
+                            ),
+                        )
+                    )
+            else:
+                source_results = {
+                    source_name: extract_source(source_name, state_session)
+                    for source_name, state_session in state_sessions.items()
+                }
 
-                logger.info(f"Finish extracting table:{table_name} data")
+            # hand the files over once every table of every source is extracted, the
+            # orchestrator invokes the handler again for the pending tables
+            result["continue"] = any(
+                source_result["pending_tables"]
+                for source_result in source_results.values()
+            )
+
+            for source_name, source_result in source_results.items():
+                state_session = state_sessions[source_name]
+                checkpoint = source_result.pop("checkpoint")
+                pending_tables = sorted(source_result.pop("pending_tables"))
+
+                if pending_tables:
+                    logger.info(
+                        f"Stopping {source_name} before the deadline, "
+                        f"pending: {pending_tables}"
+                    )
+                    source_result["pending_tables"] = pending_tables
+
+                if not result["continue"]:
+                    result["files_to_process"].extend(source_result["files_to_process"])
+
+                if result["continue"] and (
+                    source_result["files_to_process"] or pending_tables
+                ):
+                    state_session.update(
+                        "checkpoints",
+                        lambda state: set_checkpoint(
+                            state,
+                            "extract",
+                            {
+                                "files_to_process": source_result["files_to_process"],
+                                "pending_tables": pending_tables,
+                            },
+                        ),
+                    )
+                elif checkpoint:
+                    state_session.update(
+                        "checkpoints",
+                        lambda state: set_checkpoint(state, "extract", None),
+                    )
+
+                del source_result["files_to_process"]
+
+            if len(EXTRACT_SOURCES) > 1:
+                result["sources"] = source_results
+            else:
+                result.update(*source_results.values())
+
+        # only once the state is saved, see EXTRACT_ROW_HASHING
+        for row_hash_index in row_hash_indexes:
+            row_hash_index.save(s3_client, INGEST_ZONE_BUCKET_NAME)  # type: ignore
 
         logger.info("Result of extraction process:\n%s", pformat(result))
-        logger.info("End of extraction process for all tables")
+        logger.info("End of extraction process for all sources")
 
         return orjson.dumps(result)
 
@@ -2,17 +2,18 @@ import json
 import logging
 import os
 
-import boto3
 import orjson
 import pandas as pd
 
-from src.db.connection import connect_db
 from src.utilities.load_lambda_utils import create_db_entries_from_df
 from src.utilities.parquets.create_data_frame_from_parquet import (
     create_data_frame_from_parquet,
 )
+from src.utilities.resource_manager import resources
 from src.utilities.s3.get_file_from_s3_bucket import get_file_from_s3_bucket
-from src.utilities.typing_utils import EmptyDict
+from src.utilities.state.checkpoints import get_checkpoint, set_checkpoint
+from src.utilities.state.state_session import StateSession
+from src.utilities.time_budget import TimeBudget
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,86 +23,105 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def lambda_handler(event: dict, context: EmptyDict):
-    s3_client = boto3.client("s3")
-    PROCESS_ZONE_BUCKET_NAME = os.environ.get("PROCESS_ZONE_BUCKET_NAME")
-    # LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
-    conn = connect_db("DATAWAREHOUSE")
-
-    files_to_process = orjson.loads(json.dumps(event)).get("files_to_process")
-    logger.info("Start Loading files into Data Warehouse")
-
+def lambda_handler(event: dict, context):
     """
-    Loads data from parquet files stored in S3 into the DATAWAREHOUSE database. 
-    Differentiates between dimension and fact tables, processes each accordingly,
-    and logs the progress. Intended to run as an AWS Lambda function as part of 
+    Loads data from parquet files stored in S3 into the DATAWAREHOUSE database.
+    Dimension tables are loaded before fact tables, one file at a time, and the
+    progress is logged. Intended to run as an AWS Lambda function as part of
     the ETL pipeline.
-    
+
+    Once less than CHECKPOINT_RESERVE_SECONDS (default 60) are left before the Lambda
+    timeout, no further file is started. The files not loaded yet are saved under
+    "checkpoints" in the state file and {"continue": true} is returned so the
+    orchestrator invokes the handler again, which loads them before the files of its
+    own event.
+
     Args:
-    event (dict): AWS Lambda event object containing a list of files to process, 
+    event (dict): AWS Lambda event object containing a list of files to process,
     with metadata including table names and S3 keys.
-    context (EmptyDict): AWS Lambda context object (not used, included for compatibility).
-        
+    context: AWS Lambda context object, its remaining time bounds the run.
+
     Returns:
-    None (Although will log whether or not files have been processed successfully).
-    
+    A JSON-encoded {"continue": bool}, true if files are left for another invocation.
+
     Raises:
-    Exception: If any error occurs during S3 file retrieval, parquet conversion, 
+    Exception: If any error occurs during S3 file retrieval, parquet conversion,
     or database loading.
     """
+    s3_client = resources.get_s3_client()
+    PROCESS_ZONE_BUCKET_NAME = os.environ.get("PROCESS_ZONE_BUCKET_NAME")
+    LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
+    CHECKPOINT_RESERVE_SECONDS = float(os.environ.get("CHECKPOINT_RESERVE_SECONDS", 60))
 
-    if not files_to_process:
-        logger.info("No files to process")
-        return
+    files_to_process = orjson.loads(json.dumps(event)).get("files_to_process") or []
+    budget = TimeBudget(context, CHECKPOINT_RESERVE_SECONDS)
+    logger.info("Start Loading files into Data Warehouse")
 
     try:
-        dims_to_process = []
-        facts_to_process = []
+        with StateSession(s3_client, LAMBDA_STATE_BUCKET_NAME) as state_session:
+            checkpoint = get_checkpoint(state_session.state, "load")
 
-        for file_data in files_to_process:
-            response = get_file_from_s3_bucket(
-                s3_client, bucket_name=PROCESS_ZONE_BUCKET_NAME, key=file_data["key"]
-            )
-            df: pd.DataFrame = create_data_frame_from_parquet(
-                response["success"]["data"]
-            )
-
-            if file_data["table_name"].startswith("dim"):
-                dims_to_process.append(
-                    {
-                        "table_name": file_data["table_name"],
-                        "data_frame": df,
-                    }
-                )
-            else:
-                facts_to_process.append(
-                    {
-                        "table_name": file_data["table_name"],
-                        "data_frame": df,
-                    }
-                )
+            if checkpoint:
+                files_to_process = checkpoint["files_to_process"] + files_to_process
 
-        with conn:
-            for file_data in dims_to_process:
-                logger.info(
-                    f"Processing {len(file_data['data_frame'])} rows into table {file_data['table_name']}."
-                )
-                create_db_entries_from_df(
-                    conn, file_data["table_name"], file_data["data_frame"]
-                )
+            if not files_to_process:
+                logger.info("No files to process")
+                return orjson.dumps({"continue": False})
 
-            for file_data in facts_to_process:
-                create_db_entries_from_df(
-                    conn, file_data["table_name"], file_data["data_frame"]
+            # dimensions first, facts reference them
+            files_to_process = sorted(
+                files_to_process,
+                key=lambda file_data: not file_data["table_name"].startswith("dim"),
+            )
+            loaded_count = 0
+
+            with resources.connection("DATAWAREHOUSE") as conn:
+                for file_data in files_to_process:
+                    # every run loads at least one file so the pipeline progresses
+                    if loaded_count and budget.exhausted():
+                        break
+
+                    response = get_file_from_s3_bucket(
+                        s3_client,
+                        bucket_name=PROCESS_ZONE_BUCKET_NAME,
+                        key=file_data["key"],
+                    )
+                    df: pd.DataFrame = create_data_frame_from_parquet(
+                        response["success"]["data"]
+                    )
+                    logger.info(
+                        f"Processing {len(df)} rows into table {file_data['table_name']}."
+                    )
+                    create_db_entries_from_df(conn, file_data["table_name"], df)
+                    loaded_count += 1
+
+            remaining_files = files_to_process[loaded_count:]
+
+            if remaining_files or checkpoint:
+                state_session.update(
+                    "checkpoints",
+                    lambda state: set_checkpoint(
+                        state,
+                        "load",
+                        {"files_to_process": remaining_files}
+                        if remaining_files
+                        else None,
+                    ),
                 )
 
     except Exception as err:
         logger.critical(err)
         raise err
 
+    if remaining_files:
+        logger.info(
+            f"Stopping before the deadline with {len(remaining_files)} files left"
+        )
+        return orjson.dumps({"continue": True})
+
     logger.info("Finish loading files into Data Warehouse")
-    # logger.info("Result of loading process:\n%s", pformat(result))
-    return
+
+    return orjson.dumps({"continue": False})
 
 
 # 2025-06-10 23:45:24,580 | ERROR: Failed to insert records into fact_sales_order: insert or update on table "fact_sales_order" violates foreign key constraint "fact_sales_order_agreed_delivery_location_id_fkey"
@@ -1,10 +1,10 @@
 import json
 import logging
 import os
-from copy import deepcopy
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from functools import partial
 
-import boto3
 import orjson
 
 from src.utilities.dimensions.dim_counterparty_transform import (
@@ -15,22 +15,34 @@ from src.utilities.dimensions.dim_date_transform import dim_date_dataframe
 from src.utilities.dimensions.dim_design_transform import dim_design_dataframe
 from src.utilities.dimensions.dim_location_transform import dim_location_dataframe
 from src.utilities.dimensions.dim_staff_transform import dim_staff_dataframe
+from src.utilities.extract_lambda_utils import parse_table_settings
 from src.utilities.facts.create_fact_sales_order_from_df import (
     create_fact_sales_order_from_df,
 )
 from src.utilities.parquets.create_parquet_from_data_frame import (
     create_parquet_from_data_frame,
 )
+from src.utilities.parquets.create_parquets_from_data_frames import (
+    encode_data_frame,
+)
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.parquets.table_schemas import get_output_table_schema
 from src.utilities.pydantic_models import (
     FilesToProcessList,
     State,
 )
-from src.utilities.state.get_current_state import get_current_state
-from src.utilities.state.set_current_state import set_current_state
+from src.utilities.resource_manager import resources
+from src.utilities.state.checkpoints import get_checkpoint, set_checkpoint
+from src.utilities.state.state_session import StateSession
+from src.utilities.time_budget import TimeBudget
 from src.utilities.transform_lambda_utils.transform_lambda_utils import (
     add_log_to_result_and_state,
     get_dataframes_from_files_to_process,
-    get_log_item_df_s3_upload,
+    get_latest_file_per_table,
+    get_log_item_parquet_s3_upload,
     initialize_dim_date,
     initialize_transform_state,
 )
@@ -47,21 +59,51 @@ def lambda_handler(event, context):
     PROCESS_ZONE_BUCKET_NAME = os.environ.get("PROCESS_ZONE_BUCKET_NAME")
     INGEST_ZONE_BUCKET_NAME = os.environ.get("INGEST_ZONE_BUCKET_NAME")
     LAMBDA_STATE_BUCKET_NAME = os.environ.get("LAMBDA_STATE_BUCKET_NAME")
+    STATE_CHECKPOINT_INTERVAL = int(os.environ.get("STATE_CHECKPOINT_INTERVAL", 0))
+    CHECKPOINT_RESERVE_SECONDS = float(os.environ.get("CHECKPOINT_RESERVE_SECONDS", 60))
+    # codec of the dimension and fact files, overridable per output table, e.g.
+    # TRANSFORM_TABLE_COMPRESSION="fact_sales_order=zstd:9"
+    TRANSFORM_COMPRESSION = os.environ.get("TRANSFORM_COMPRESSION", DEFAULT_COMPRESSION)
+    TRANSFORM_TABLE_COMPRESSION = parse_table_settings(
+        os.environ.get("TRANSFORM_TABLE_COMPRESSION")
+    )
 
-    s3_client = boto3.client("s3")
+    # output tables encoded at a time, arrow compresses outside the GIL so worker
+    # threads encode on as many cores as the lambda has. Every table is uploaded and
+    # recorded as soon as it is encoded, so at most this many are held in memory
+    TRANSFORM_ENCODE_WORKERS = int(os.environ.get("TRANSFORM_ENCODE_WORKERS", 1))
+
+    for compression in [TRANSFORM_COMPRESSION, *TRANSFORM_TABLE_COMPRESSION.values()]:
+        get_parquet_compression_options(compression)
+
+    s3_client = resources.get_s3_client()
     logger.info("Starting Transformation Lambda")
 
     # # ! fix datetime not coming in
     files_to_process = FilesToProcessList.validate_python(
         orjson.loads(json.dumps(event)).get("files_to_process")
     )
-    current_state = State.model_validate(
-        get_current_state(s3_client, LAMBDA_STATE_BUCKET_NAME)
-    ).model_dump()
+    state_session = StateSession(
+        s3_client,
+        LAMBDA_STATE_BUCKET_NAME,
+        checkpoint_interval=STATE_CHECKPOINT_INTERVAL,
+    )
+    current_state = State.model_validate(state_session.state).model_dump()
+    budget = TimeBudget(context, CHECKPOINT_RESERVE_SECONDS)
+
+    result: dict = {"files_to_process": [], "continue": False}
+    transformed_keys: set[str] = set()
 
-    final_state = deepcopy(current_state)
+    # a run that stopped at its deadline left the rest of its files to this one
+    checkpoint = get_checkpoint(state_session.state, "transform")
 
-    result: dict[str, list[dict]] = {"files_to_process": []}
+    if checkpoint:
+        files_to_process = (
+            FilesToProcessList.validate_python(checkpoint["files_to_process"])
+            + files_to_process
+        )
+        transformed_keys.update(checkpoint["transformed_keys"])
+        result["files_to_process"].extend(checkpoint["result"])
 
     if not files_to_process:
         logger.info("Finish Transformation Lambda with no files to process.")
@@ -72,16 +114,28 @@ def lambda_handler(event, context):
             "Running transform process for the first time. Initializing dim_date table"
         )
 
-        final_state = initialize_transform_state(
-            final_state, [file.table_name for file in files_to_process]
+        table_names = [file.table_name for file in files_to_process]
+        state_session.update(
+            "transform_state",
+            lambda state: state.update(initialize_transform_state(state, table_names)),
         )
 
-        initialize_dim_date(
-            create_dim_date_df_func=dim_date_dataframe,  # type: ignore
-            s3_client=s3_client,
-            bucket_name=PROCESS_ZONE_BUCKET_NAME,  # type: ignore
-            result=result,
-            final_state=final_state,
+        state_session.update(
+            "dim_date",
+            lambda state: initialize_dim_date(
+                create_dim_date_df_func=dim_date_dataframe,  # type: ignore
+                s3_client=s3_client,
+                bucket_name=PROCESS_ZONE_BUCKET_NAME,  # type: ignore
+                result=result,
+                final_state=state,
+                create_parquet_from_df_func=partial(
+                    create_parquet_from_data_frame,
+                    compression=TRANSFORM_TABLE_COMPRESSION.get(
+                        "dim_date", TRANSFORM_COMPRESSION
+                    ),
+                    schema=get_output_table_schema("dim_date"),
+                ),
+            ),
         )
 
     logger.info(
@@ -94,68 +148,146 @@ def lambda_handler(event, context):
         files_to_process,
     )
 
-    for file_to_process in files_to_process:
-        table_name = file_to_process.table_name
-        last_updated = file_to_process.last_updated
-
-        logger.info(f"Running transform on {table_name}.")
-
-        match table_name:
-            case "counterparty":
-                df = dim_counterparty_dataframe(
-                    counterparty=all_tables_dfs["counterparty"],
-                    address=all_tables_dfs["address"],
-                )
-                new_table_name = "dim_counterparty"
-            case "design":
-                df = dim_design_dataframe(
-                    design=all_tables_dfs["design"],
-                )
-                new_table_name = "dim_design"
-            case "currency":
-                df = dim_currency_dataframe(currency=all_tables_dfs["currency"])
-                new_table_name = "dim_currency"
-            case "staff":
-                df = dim_staff_dataframe(
-                    department=all_tables_dfs["department"],
-                    staff=all_tables_dfs["staff"],
-                )
-                new_table_name = "dim_staff"
-            case "dim_date":
-                df = dim_date_dataframe("20221102", "20500101")
-                new_table_name = "dim_date"
-            case "address":
-                df = dim_location_dataframe(address=all_tables_dfs["address"])
-                new_table_name = "dim_location"
-            case "sales_order":
-                df = create_fact_sales_order_from_df(all_tables_dfs["sales_order"])
-                new_table_name = "fact_sales_order"
-            case _:
-                continue
-        transformation_timestamp = datetime.now()
-
-        log_item = get_log_item_df_s3_upload(
-            s3_client=s3_client,
-            bucket_name=PROCESS_ZONE_BUCKET_NAME,  # type: ignore
-            last_updated=last_updated,
-            new_table_name=new_table_name,
-            df=df,
-            transformation_timestamp=transformation_timestamp,
-            create_parquet_from_df_func=create_parquet_from_data_frame,  # type: ignore
+    stopped_early = False
+    transformed_count = 0
+    encoder = ThreadPoolExecutor(max_workers=TRANSFORM_ENCODE_WORKERS)
+    encodings: list = []
+
+    def save_encoded_tables(return_when: str = FIRST_COMPLETED) -> None:
+        done, _ = wait(
+            [encoding["future"] for encoding in encodings], None, return_when
         )
-        add_log_to_result_and_state(
-            log=log_item,  # type: ignore
-            result=result,
-            state=final_state,
-            last_updated=transformation_timestamp,
-            processing_timestamp=transformation_timestamp,
-            table_name=table_name,
+
+        for encoding in [e for e in encodings if e["future"] in done]:
+            encodings.remove(encoding)
+            file_to_process = encoding["file_to_process"]
+            parquet = encoding["future"].result()
+            log_item = get_log_item_parquet_s3_upload(
+                s3_client=s3_client,
+                bucket_name=PROCESS_ZONE_BUCKET_NAME,  # type: ignore
+                last_updated=file_to_process.last_updated,
+                new_table_name=encoding["new_table_name"],
+                parquet=parquet["parquet_file"],
+                transformation_timestamp=encoding["transformation_timestamp"],
+            )
+            state_session.update(
+                file_to_process.table_name,
+                lambda state: add_log_to_result_and_state(
+                    log=log_item,  # type: ignore
+                    result=result,
+                    state=state,
+                    last_updated=encoding["transformation_timestamp"],
+                    processing_timestamp=encoding["transformation_timestamp"],
+                    table_name=file_to_process.table_name,
+                ),
+            )
+            transformed_keys.add(file_to_process.key)
+            logger.info(
+                f"Encoded {encoding['new_table_name']} in {parquet['encode_seconds']}s, "
+                f"{parquet['size']} bytes."
+            )
+
+    try:
+        for file_to_process in get_latest_file_per_table(files_to_process):
+            table_name = file_to_process.table_name
+
+            if file_to_process.key in transformed_keys:
+                continue
+
+            # a worker is free once an earlier table is uploaded, so the budget below
+            # accounts for the time spent encoding it
+            if len(encodings) >= TRANSFORM_ENCODE_WORKERS:
+                save_encoded_tables()
+
+            # every run transforms at least one table so the pipeline always progresses
+            if transformed_count and budget.exhausted():
+                stopped_early = True
+                break
+
+            transformed_count += 1
+
+            logger.info(f"Running transform on {table_name}.")
+
+            match table_name:
+                case "counterparty":
+                    df = dim_counterparty_dataframe(
+                        counterparty=all_tables_dfs["counterparty"],
+                        address=all_tables_dfs["address"],
+                    )
+                    new_table_name = "dim_counterparty"
+                case "design":
+                    df = dim_design_dataframe(
+                        design=all_tables_dfs["design"],
+                    )
+                    new_table_name = "dim_design"
+                case "currency":
+                    df = dim_currency_dataframe(currency=all_tables_dfs["currency"])
+                    new_table_name = "dim_currency"
+                case "staff":
+                    df = dim_staff_dataframe(
+                        department=all_tables_dfs["department"],
+                        staff=all_tables_dfs["staff"],
+                    )
+                    new_table_name = "dim_staff"
+                case "dim_date":
+                    df = dim_date_dataframe("20221102", "20500101")
+                    new_table_name = "dim_date"
+                case "address":
+                    df = dim_location_dataframe(address=all_tables_dfs["address"])
+                    new_table_name = "dim_location"
+                case "sales_order":
+                    df = create_fact_sales_order_from_df(all_tables_dfs["sales_order"])
+                    new_table_name = "fact_sales_order"
+                case _:
+                    transformed_keys.add(file_to_process.key)
+                    continue
+            encodings.append(
+                {
+                    "file_to_process": file_to_process,
+                    "new_table_name": new_table_name,
+                    "transformation_timestamp": datetime.now(),
+                    "future": encoder.submit(
+                        encode_data_frame,
+                        df,
+                        TRANSFORM_TABLE_COMPRESSION.get(
+                            new_table_name, TRANSFORM_COMPRESSION
+                        ),
+                        get_output_table_schema(new_table_name),
+                    ),
+                }
+            )
+            logger.info(
+                f"Transform for {table_name} --> {new_table_name} completed with {len(df)} new records transformed."
+            )
+
+        if encodings:
+            save_encoded_tables(ALL_COMPLETED)
+    finally:
+        encoder.shutdown(cancel_futures=True)
+
+    if stopped_early:
+        logger.info("Stopping before the deadline, saving a transform checkpoint.")
+        state_session.update(
+            "checkpoints",
+            lambda state: set_checkpoint(
+                state,
+                "transform",
+                {
+                    "files_to_process": [
+                        file.model_dump() for file in files_to_process
+                    ],
+                    "transformed_keys": sorted(transformed_keys),
+                    "result": result["files_to_process"],
+                },
+            ),
         )
-        logger.info(
-            f"Transform for {table_name} --> {new_table_name} completed with {len(df)} new records transformed."
+        result = {"files_to_process": [], "continue": True}
+    elif checkpoint:
+        state_session.update(
+            "checkpoints", lambda state: set_checkpoint(state, "transform", None)
         )
 
-    set_current_state(final_state, LAMBDA_STATE_BUCKET_NAME, s3_client)
+    state_session.flush()
 
     logger.info("Transform process successfully ended.")
 
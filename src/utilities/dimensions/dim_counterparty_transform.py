@@ -7,11 +7,13 @@ def dim_counterparty_dataframe(**dataframes) -> pd.DataFrame:
 
     Args:
         dataframes: Keyword arguments containing:
-            - counterparty: DataFrame with 'counterparty_id', 'counterparty_legal_name', 'legal_address_id'.
-            - address: DataFrame with 'address_id' and address fields.
+            - counterparty: DataFrame with 'source', 'counterparty_id', 'counterparty_legal_name', 'legal_address_id'.
+            - address: DataFrame with 'source', 'address_id' and address fields.
 
     Returns:
-        A transformed DataFrame with counterparty and legal address fields.
+        A transformed DataFrame with counterparty and legal address fields. Ids are
+        only unique within their source, so counterparties are joined to the
+        addresses of the same source.
 
     Raises:
         ValueError: If 'counterparty' or 'address' is missing.
@@ -43,11 +45,12 @@ def dim_counterparty_dataframe(**dataframes) -> pd.DataFrame:
 
         counterparty_address_merged_df = counterparty_df.merge(
             renamed_address_df,
-            on="legal_address_id",
+            on=["source", "legal_address_id"],
         )
 
         dim_counterparty_df = counterparty_address_merged_df[
             [
+                "source",
                 "counterparty_id",
                 "counterparty_legal_name",
                 "counterparty_legal_address_line_1",
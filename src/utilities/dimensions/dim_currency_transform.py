@@ -1,16 +1,38 @@
+import numpy as np
 import pandas as pd
 
 
+def get_currency_code(currency_code):
+    """
+    Get the code of a currency_code value, which is a varchar[] in TOTESYS.
+
+    Args:
+        currency_code: The code as text, as comma separated codes joined by the
+            extraction projection, or as a list of codes from files extracted before
+            it. Missing values are returned as they are.
+
+    Returns:
+        The first code, e.g. "GBP" for "GBP", "GBP,USD" or ["GBP"].
+    """
+    if isinstance(currency_code, (list, tuple, np.ndarray)):
+        return currency_code[0] if len(currency_code) else None
+
+    if isinstance(currency_code, str):
+        return currency_code.split(",")[0].strip()
+
+    return currency_code
+
+
 def dim_currency_dataframe(**dataframes) -> pd.DataFrame:
     """
     Create a currency dimension table with currency codes and names.
 
     Args:
         dataframes: Keyword arguments containing:
-            - currency: DataFrame with 'currency_id' and 'currency_code'.
+            - currency: DataFrame with 'source', 'currency_id' and 'currency_code'.
 
     Returns:
-        A DataFrame with 'currency_id', 'currency_code', and 'currency_name'.
+        A DataFrame with 'source', 'currency_id', 'currency_code', and 'currency_name'.
 
     Raises:
         ValueError: If the 'currency' dataframe is missing.
@@ -46,6 +68,9 @@ def dim_currency_dataframe(**dataframes) -> pd.DataFrame:
                 raise ValueError(f"Error: Missing required dataframe '{key}'.")
 
         currency_df = dataframes.get("currency")
+        currency_df = currency_df.assign(
+            currency_code=currency_df["currency_code"].map(get_currency_code)
+        )
 
         lookup_df = (
             pd.DataFrame.from_dict(
@@ -61,7 +86,9 @@ def dim_currency_dataframe(**dataframes) -> pd.DataFrame:
             on="currency_code",
         )
 
-        dim_currency = currency_df[["currency_id", "currency_code", "currency_name"]]
+        dim_currency = currency_df[
+            ["source", "currency_id", "currency_code", "currency_name"]
+        ]
         return dim_currency
 
     except Exception as e:
@@ -7,7 +7,7 @@ def dim_design_dataframe(**dataframes) -> pd.DataFrame:
 
     Args:
         dataframes: Keyword arguments containing:
-            - design: DataFrame with 'design_id', 'design_name', 'file_location', 'file_name'.
+            - design: DataFrame with 'source', 'design_id', 'design_name', 'file_location', 'file_name'.
 
     Returns:
         A DataFrame with design dimension columns, duplicates removed.
@@ -26,7 +26,7 @@ def dim_design_dataframe(**dataframes) -> pd.DataFrame:
 
     try:
         dim_design = design_df[
-            ["design_id", "design_name", "file_location", "file_name"]
+            ["source", "design_id", "design_name", "file_location", "file_name"]
         ].drop_duplicates()
 
         return dim_design
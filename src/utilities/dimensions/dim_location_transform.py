@@ -7,7 +7,7 @@ def dim_location_dataframe(**dataframes) -> pd.DataFrame:
 
     Args:
         dataframes: Keyword arguments containing:
-            - address: DataFrame with address fields.
+            - address: DataFrame with 'source' and address fields.
 
     Returns:
         A DataFrame with location dimension columns and renamed 'location_id'.
@@ -25,6 +25,7 @@ def dim_location_dataframe(**dataframes) -> pd.DataFrame:
     try:
         dim_location = address_df[
             [
+                "source",
                 "address_id",
                 "address_line_1",
                 "address_line_2",
@@ -7,11 +7,13 @@ def dim_staff_dataframe(**dataframes) -> pd.DataFrame:
 
     Args:
         dataframes: Keyword arguments containing:
-            - staff: DataFrame with 'staff_id', 'first_name', 'last_name', 'department_id', 'email_address'.
-            - department: DataFrame with 'department_id', 'department_name', 'location'.
+            - staff: DataFrame with 'source', 'staff_id', 'first_name', 'last_name', 'department_id', 'email_address'.
+            - department: DataFrame with 'source', 'department_id', 'department_name', 'location'.
 
     Returns:
         A DataFrame with staff dimension columns including department name and location.
+        Ids are only unique within their source, so staff are joined to the
+        departments of the same source.
 
     Raises:
         ValueError: If required DataFrames are missing.
@@ -29,13 +31,14 @@ def dim_staff_dataframe(**dataframes) -> pd.DataFrame:
 
     try:
         staff_df = staff_df.merge(
-            departments_df[["department_id", "department_name", "location"]],
+            departments_df[["source", "department_id", "department_name", "location"]],
             how="left",
-            on="department_id",
+            on=["source", "department_id"],
         )
 
         dim_staff = staff_df[
             [
+                "source",
                 "staff_id",
                 "first_name",
                 "last_name",
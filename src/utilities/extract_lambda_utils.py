@@ -1,7 +1,7 @@
 import logging
 from copy import deepcopy
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 import pandas as pd
 
@@ -56,6 +56,50 @@ def get_last_updated_from_raw_table_data(rows: List[dict]) -> datetime:
     return max(list_of_datetimes)
 
 
+def create_data_frame_from_columns(columns: Dict[str, list]) -> pd.DataFrame:
+    """
+    Converts lists of column values keyed by column name into a pandas DataFrame.
+    Produces the same DataFrame as create_data_frame_from_list does for the
+    equivalent row dictionaries.
+
+    Args:
+        columns (Dict[str, list]): Equal length lists of values, one per column.
+
+    Returns:
+        pd.DataFrame: The resulting DataFrame.
+
+    Raises:
+        InvalidEmptyList: If there are no columns or no rows.
+    """
+    if not columns or not len(next(iter(columns.values()))):
+        raise InvalidEmptyList("ERROR: List is empty")
+
+    return pd.DataFrame(columns)
+
+
+def get_last_updated_from_columns(columns: Dict[str, list]) -> datetime:
+    """
+    Extracts the most recent datetime from the 'last_updated' column of lists of
+    column values.
+
+    Args:
+        columns (Dict[str, list]): Lists of values keyed by column name, including
+            'last_updated'.
+
+    Returns:
+        datetime: The latest 'last_updated' datetime found.
+
+    Raises:
+        InvalidEmptyList: If the 'last_updated' column is missing or empty.
+    """
+    last_updated_values = columns.get("last_updated")
+
+    if not last_updated_values:
+        raise InvalidEmptyList("ERROR: List is empty")
+
+    return max(value for value in last_updated_values if isinstance(value, datetime))
+
+
 def initialize_table_state(current_state, table_name):
     """
     Ensures the ingest state for a given table exists in the current state dictionary.
@@ -80,7 +124,10 @@ def initialize_table_state(current_state, table_name):
 
 
 def create_parquet_metadata(
-    new_table_data_last_updated: datetime, table_name: str
+    new_table_data_last_updated: datetime,
+    table_name: str,
+    suffix: str | None = None,
+    prefix: str | None = None,
 ) -> tuple[str, str]:
     """
     Generates a filename and S3 key for storing a Parquet file based on a timestamp.
@@ -88,6 +135,10 @@ def create_parquet_metadata(
     Args:
         new_table_data_last_updated (datetime): The timestamp to include in the metadata.
         table_name (str): The name of the table the data belongs to.
+        suffix (str | None): Appended to the filename to tell apart files sharing the
+            same timestamp, e.g. the pages of a keyset-paginated extraction.
+        prefix (str | None): Prepended to the key, e.g. the namespace of a source
+            database, see get_source_prefix.
 
     Returns:
         tuple[str, str]: A tuple containing the filename and the S3 key.
@@ -97,9 +148,122 @@ def create_parquet_metadata(
     day = new_table_data_last_updated.day
 
     # currency_2025-06-13_10-35-20_012023.parquet
-    filename = f"{table_name}_{year}-{month}-{day}_{new_table_data_last_updated.hour}-{new_table_data_last_updated.minute}-{new_table_data_last_updated.second}_{new_table_data_last_updated.microsecond}.parquet"
+    filename = f"{table_name}_{year}-{month}-{day}_{new_table_data_last_updated.hour}-{new_table_data_last_updated.minute}-{new_table_data_last_updated.second}_{new_table_data_last_updated.microsecond}"
+
+    if suffix:
+        filename += f"_{suffix}"
+
+    filename += ".parquet"
 
     # 2025/06/13/currency_2025-06-13_10-35-20_012023.parquet
     key = f"{year}/{month}/{day}/{filename}"
 
+    if prefix:
+        key = f"{prefix}/{key}"
+
     return filename, key
+
+
+def add_log_to_ingest_state(current_state: dict, log_entry: dict) -> None:
+    """
+    Records a completed table extraction in the ingest state, moving the table's
+    last_updated watermark forward and appending the entry to its ingest log.
+    Entries from keyset-paginated extractions also carry 'last_primary_key', which is
+    stored next to last_updated as the compound watermark to resume from.
+    Mutates current_state in place.
+
+    Args:
+        current_state (dict): The state dictionary to update.
+        log_entry (dict): The ingest log entry, including 'table_name' and 'last_updated'.
+
+    Returns:
+        None
+    """
+    table_state = current_state["ingest_state"].setdefault(
+        log_entry["table_name"], {"last_updated": None, "ingest_log": []}
+    )
+    table_state["last_updated"] = log_entry["last_updated"]
+
+    if "last_primary_key" in log_entry:
+        table_state["last_primary_key"] = log_entry["last_primary_key"]
+    else:
+        table_state.pop("last_primary_key", None)
+
+    table_state.setdefault("ingest_log", []).append(log_entry)
+
+
+def parse_table_settings(setting: str | None) -> dict[str, str]:
+    """
+    Parses a per-table setting from a comma-separated "table=value" string, as used by
+    environment variables such as EXTRACT_TABLE_ENGINES="sales_order=copy,payment=copy".
+
+    Args:
+        setting (str | None): The raw setting. Empty or None gives no overrides.
+
+    Returns:
+        dict[str, str]: The value for each table named in the setting.
+
+    Raises:
+        ValueError: If an entry is not in the "table=value" form.
+    """
+    table_settings: dict[str, str] = {}
+
+    for entry in (setting or "").split(","):
+        if not entry.strip():
+            continue
+
+        table_name, separator, value = entry.partition("=")
+
+        if not separator or not table_name.strip() or not value.strip():
+            raise ValueError(f"Invalid table setting '{entry}', expected 'table=value'")
+
+        table_settings[table_name.strip()] = value.strip()
+
+    return table_settings
+
+
+def get_tables_with_new_data(
+    tables_last_updated: Dict[str, datetime | None], ingest_state: dict
+) -> List[str]:
+    """
+    Compares the latest 'last_updated' value of each table with its watermark in the
+    ingest state and keeps the tables that have changed since they were last extracted.
+
+    A keyset extraction that stopped before the end of the table (its last log entry
+    has 'has_more') may have stopped part way through rows sharing the watermark's
+    timestamp, so such tables are kept while their latest value equals the watermark.
+
+    Args:
+        tables_last_updated (Dict[str, datetime | None]): The latest 'last_updated'
+            value of each table, None for empty tables.
+        ingest_state (dict): The ingest state holding each table's watermark.
+
+    Returns:
+        List[str]: The names of the tables with new or updated rows.
+    """
+    tables_with_new_data = []
+
+    for table_name, latest_last_updated in tables_last_updated.items():
+        table_state = ingest_state.get(table_name) or {}
+        watermark = table_state.get("last_updated")
+
+        if latest_last_updated is None:
+            continue
+
+        if watermark is None:
+            tables_with_new_data.append(table_name)
+            continue
+
+        # watermarks read back from the state file are ISO strings
+        if isinstance(watermark, str):
+            watermark = datetime.fromisoformat(watermark)
+
+        ingest_log = table_state.get("ingest_log") or [{}]
+        stopped_mid_table = ingest_log[-1].get("has_more", False)
+
+        if latest_last_updated > watermark or (
+            stopped_mid_table and latest_last_updated == watermark
+        ):
+            tables_with_new_data.append(table_name)
+
+    return tables_with_new_data
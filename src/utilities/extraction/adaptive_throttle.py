@@ -0,0 +1,232 @@
+import logging
+from contextlib import contextmanager
+from threading import Condition
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class AdaptiveThrottle:
+    """
+    Limits how hard the extraction loads the source database, with additive increase
+    and multiplicative decrease of the number of tables extracted at a time and of the
+    batch size.
+
+    After every batch the throttle compares its latency and a sample of the source
+    load against the load budget. Within budget, the concurrency grows by one and the
+    batch size by min_batch_size; over budget, both are halved. Extraction starts at
+    a concurrency of one and ramps up only while the source keeps up. The source load
+    is sampled without holding the throttle's lock, so other tables are permitted
+    and report their batches while the sample query runs.
+
+    Only tables extracted in batches, permitted with batched=True, use and adjust
+    the batch size. A new batch size applies from the next table. Tables that report
+    no batch, e.g. read in one fetch, have their whole latency, per batch_size rows,
+    count once they are extracted.
+
+    Usage:
+        with throttle.permit(table_name) as ticket:
+            ...extract using ticket["batch_size"], calling
+            ticket["on_batch"](rows, seconds) after every batch...
+            ticket["rows"] = row_count
+
+    Args:
+        sample_load: Returns the current active_sessions and lock_waits of the
+            source, e.g. a partial of get_source_load.
+        max_concurrency: The most tables extracted at a time.
+        batch_size: The initial batch size.
+        min_batch_size: The smallest batch size, also the additive increase step.
+        max_batch_size: The largest batch size.
+        max_active_sessions: The budget of other sessions running a query.
+        max_lock_waits: The budget of sessions waiting on a lock.
+        max_batch_seconds: The budget of seconds to extract batch_size rows.
+        sample_interval_seconds: The least time between two load samples.
+
+    Raises:
+        ValueError: If the limits are not positive or the batch sizes are not
+            ordered.
+    """
+
+    def __init__(
+        self,
+        sample_load: Callable[[], Dict[str, int]],
+        max_concurrency: int = 1,
+        batch_size: int = 10000,
+        min_batch_size: int = 1000,
+        max_batch_size: int = 100000,
+        max_active_sessions: int = 10,
+        max_lock_waits: int = 0,
+        max_batch_seconds: float = 5.0,
+        sample_interval_seconds: float = 1.0,
+    ):
+        if max_concurrency < 1 or min_batch_size < 1:
+            raise ValueError("max_concurrency and min_batch_size must be positive")
+
+        if not min_batch_size <= batch_size <= max_batch_size:
+            raise ValueError("batch_size must lie between min and max batch size")
+
+        self.sample_load = sample_load
+        self.max_concurrency = max_concurrency
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.max_active_sessions = max_active_sessions
+        self.max_lock_waits = max_lock_waits
+        self.max_batch_seconds = max_batch_seconds
+        self.sample_interval_seconds = sample_interval_seconds
+
+        self.concurrency = 1
+        self.batch_size = batch_size
+        self.in_flight = 0
+        self.adjustments = 0
+        self.source_load: Dict[str, int] | None = None
+        self.table_rates: Dict[str, Dict[str, Any]] = {}
+        self._last_sample_at: float | None = None
+        self._condition = Condition()
+
+    @contextmanager
+    def permit(self, table_name: str, batched: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Wait until the throttle allows another table to be extracted.
+
+        Args:
+            table_name: The table about to be extracted.
+            batched: Whether the table is read in batches of the ticket's
+                batch_size, e.g. not by the "fetchall" engine.
+
+        Yields:
+            A ticket dict with the batch_size to use, None when not batched, and
+            on_batch, to be called with the rows and seconds of every batch. Set its
+            "rows" to the number of rows extracted so the table's rate, and the
+            latency of a table without batches, can be measured.
+        """
+        with self._condition:
+            while self.in_flight >= self.concurrency:
+                self._condition.wait()
+
+            self.in_flight += 1
+            ticket: Dict[str, Any] = {
+                "concurrency": self.concurrency,
+                "batch_size": self.batch_size if batched else None,
+                "rows": 0,
+                "batches": 0,
+            }
+
+        def on_batch(rows: int, seconds: float) -> None:
+            ticket["batches"] += 1
+            # a batch holds at most batch_size rows, a shorter one counts as whole
+            self._adjust(seconds, batched)
+
+        ticket["on_batch"] = on_batch
+        start = perf_counter()
+        succeeded = False
+
+        try:
+            yield ticket
+            succeeded = True
+        finally:
+            seconds = perf_counter() - start
+
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+            if succeeded:
+                self._record(table_name, ticket, seconds)
+
+    def _record(self, table_name: str, ticket: Dict[str, Any], seconds: float) -> None:
+        rows = ticket["rows"]
+
+        with self._condition:
+            batch_size = ticket["batch_size"] or self.batch_size
+            self.table_rates[table_name] = {
+                "concurrency": ticket["concurrency"],
+                "batch_size": ticket["batch_size"],
+                "rows": rows,
+                "batches": ticket["batches"],
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(rows / seconds, 1) if seconds else None,
+            }
+
+        if not ticket["batches"]:
+            # the time the table's rows took per batch_size rows, a table smaller
+            # than a batch counts as one batch
+            self._adjust(
+                seconds * batch_size / max(rows, batch_size),
+                ticket["batch_size"] is not None,
+            )
+
+    def _sample_source_load(self) -> Dict[str, int]:
+        with self._condition:
+            now = perf_counter()
+            due = (
+                self._last_sample_at is None
+                or now - self._last_sample_at >= self.sample_interval_seconds
+            )
+
+            # claimed under the lock, so concurrent batches reuse the last sample
+            if due:
+                self._last_sample_at = now
+
+        if due:
+            load = self.sample_load()
+
+            with self._condition:
+                self.source_load = load
+
+        with self._condition:
+            return self.source_load or {}
+
+    def _adjust(self, batch_seconds: float, batched: bool) -> None:
+        load = self._sample_source_load()
+        overloaded = (
+            batch_seconds > self.max_batch_seconds
+            or load.get("active_sessions", 0) > self.max_active_sessions
+            or load.get("lock_waits", 0) > self.max_lock_waits
+        )
+
+        with self._condition:
+            if overloaded:
+                concurrency = max(1, self.concurrency // 2)
+                batch_size = max(self.min_batch_size, self.batch_size // 2)
+            else:
+                concurrency = min(self.max_concurrency, self.concurrency + 1)
+                batch_size = min(
+                    self.max_batch_size, self.batch_size + self.min_batch_size
+                )
+
+            if not batched:
+                batch_size = self.batch_size
+
+            if (concurrency, batch_size) != (self.concurrency, self.batch_size):
+                self.adjustments += 1
+                logger.info(
+                    f"Throttle {'down' if overloaded else 'up'} to concurrency "
+                    f"{concurrency} and batch size {batch_size} (source load {load}, "
+                    f"{batch_seconds:.3f}s per batch)"
+                )
+
+            self.concurrency = concurrency
+            self.batch_size = batch_size
+            # a raised concurrency lets waiting tables start mid-table
+            self._condition.notify_all()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get the throttle's current settings and the rate chosen for every table.
+
+        Returns:
+            A dict with concurrency, batch_size, adjustments, source_load and
+            table_rates, the concurrency, batch size, batches and rows per second
+            each table was extracted with. The batch size is None for tables not
+            read in batches.
+        """
+        with self._condition:
+            return {
+                "concurrency": self.concurrency,
+                "batch_size": self.batch_size,
+                "adjustments": self.adjustments,
+                "source_load": self.source_load,
+                "table_rates": dict(self.table_rates),
+            }
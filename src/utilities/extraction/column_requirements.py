@@ -0,0 +1,76 @@
+from typing import Dict, List
+
+# The columns the dimension and fact builders read from each source table, plus the
+# primary key and the last_updated watermark every extraction needs. Tables that are
+# not listed, like sales_order whose columns all pass through to fact_sales_order,
+# are extracted whole.
+SOURCE_COLUMN_REQUIREMENTS: Dict[str, List[str]] = {
+    "address": [
+        "address_id",
+        "address_line_1",
+        "address_line_2",
+        "district",
+        "city",
+        "postal_code",
+        "country",
+        "phone",
+        "last_updated",
+    ],
+    "counterparty": [
+        "counterparty_id",
+        "counterparty_legal_name",
+        "legal_address_id",
+        "last_updated",
+    ],
+    "currency": ["currency_id", "currency_code", "last_updated"],
+    "department": ["department_id", "department_name", "location", "last_updated"],
+    "design": [
+        "design_id",
+        "design_name",
+        "file_location",
+        "file_name",
+        "last_updated",
+    ],
+    "staff": [
+        "staff_id",
+        "first_name",
+        "last_name",
+        "department_id",
+        "email_address",
+        "last_updated",
+    ],
+}
+
+
+def get_required_columns(table_name: str) -> List[str] | None:
+    """
+    Get the columns of a source table the transforms need.
+
+    Args:
+        table_name (str): The source table.
+
+    Returns:
+        List[str] | None: The columns to extract, None to extract every column.
+    """
+    return SOURCE_COLUMN_REQUIREMENTS.get(table_name)
+
+
+def get_missing_required_columns(
+    table_name: str, table_columns: List[dict]
+) -> List[str]:
+    """
+    Get the columns the transforms need that a source table no longer has, e.g. after
+    a column was dropped or renamed. Tables extracted whole still need last_updated.
+
+    Args:
+        table_name (str): The source table.
+        table_columns (List[dict]): The table's columns as dicts with column_name,
+            e.g. from the catalog.
+
+    Returns:
+        List[str]: The missing columns, sorted. Empty when the table can be extracted.
+    """
+    required_columns = get_required_columns(table_name) or ["last_updated"]
+    present_columns = {column["column_name"] for column in table_columns}
+
+    return sorted(set(required_columns) - present_columns)
@@ -0,0 +1,282 @@
+import logging
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Literal, NamedTuple, Set, Tuple
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+POSTGRES_EPOCH = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+ChangeOperation = Literal["insert", "update", "delete"]
+
+
+class RowChange(NamedTuple):
+    """
+    One row inserted, updated or deleted by a committed transaction. Inserts and
+    updates carry the text values of the new row by column name, without the
+    unchanged TOASTed values pgoutput leaves out, and the type of every column.
+    """
+
+    table_name: str
+    operation: ChangeOperation
+    key_column: str
+    key_type_oid: int
+    key: str
+    commit_timestamp: datetime
+    values: Dict[str, str | None] | None = None
+    column_type_oids: Dict[str, int] | None = None
+
+
+def format_lsn(lsn: int) -> str:
+    """
+    Formats a 64-bit log sequence number the way Postgres prints pg_lsn values.
+
+    Args:
+        lsn (int): The log sequence number.
+
+    Returns:
+        str: The LSN as two hexadecimal halves, e.g. "0/2F18FC8".
+    """
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
+
+
+def read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Reads a null-terminated string of a pgoutput message.
+
+    Args:
+        data (bytes): The message.
+        offset (int): Where the string starts.
+
+    Returns:
+        Tuple[str, int]: The string and the offset after its terminator.
+    """
+    end = data.index(b"\0", offset)
+
+    return data[offset:end].decode(), end + 1
+
+
+def read_tuple_data(data: bytes, offset: int) -> Tuple[List[str | None], Set[int], int]:
+    """
+    Reads the TupleData of a pgoutput message. Values are kept in their text form,
+    NULLs and unchanged TOASTed values are returned as None.
+
+    Args:
+        data (bytes): The message.
+        offset (int): Where the TupleData starts.
+
+    Returns:
+        Tuple[List[str | None], Set[int], int]: The column values, the indexes of the
+        unchanged TOASTed values, which the message does not hold, and the offset
+        after them.
+
+    Raises:
+        ValueError: If a column has an unknown kind.
+    """
+    (column_count,) = struct.unpack_from("!H", data, offset)
+    offset += 2
+    values: List[str | None] = []
+    unchanged: Set[int] = set()
+
+    for index in range(column_count):
+        kind = data[offset : offset + 1]
+        offset += 1
+
+        if kind == b"n":
+            values.append(None)
+        elif kind == b"u":
+            values.append(None)
+            unchanged.add(index)
+        elif kind == b"t":
+            (length,) = struct.unpack_from("!i", data, offset)
+            offset += 4
+            values.append(data[offset : offset + length].decode())
+            offset += length
+        else:
+            raise ValueError(f"Unknown pgoutput tuple column kind {kind!r}")
+
+    return values, unchanged, offset
+
+
+def read_relation(data: bytes) -> Tuple[int, Dict[str, Any]]:
+    """
+    Reads a pgoutput Relation message, which describes a table before its first
+    change in a decoding session.
+
+    Args:
+        data (bytes): The message, starting with its "R" type byte.
+
+    Returns:
+        Tuple[int, dict]: The relation id and a dictionary with table_name, the
+        columns as (name, type oid) pairs in table order and the key_index,
+        key_column and key_type_oid of its replica identity column, or None for
+        those when the table has no single-column replica identity.
+    """
+    (relation_id,) = struct.unpack_from("!I", data, 1)
+    _, offset = read_string(data, 5)
+    table_name, offset = read_string(data, offset)
+    (column_count,) = struct.unpack_from("!H", data, offset + 1)
+    offset += 3
+    key_columns = []
+    columns = []
+
+    for index in range(column_count):
+        flags = data[offset]
+        column_name, offset = read_string(data, offset + 1)
+        (type_oid,) = struct.unpack_from("!I", data, offset)
+        offset += 8
+        columns.append((column_name, type_oid))
+
+        if flags & 1:
+            key_columns.append((index, column_name, type_oid))
+
+    key_index, key_column, key_type_oid = (
+        key_columns[0] if len(key_columns) == 1 else (None, None, None)
+    )
+
+    return relation_id, {
+        "table_name": table_name,
+        "columns": columns,
+        "key_index": key_index,
+        "key_column": key_column,
+        "key_type_oid": key_type_oid,
+    }
+
+
+def decode_pgoutput_messages(messages: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    Decodes the binary messages of the pgoutput logical decoding plugin (protocol
+    version 1) into the rows each transaction changed: the keys of deleted rows and
+    the new values of inserted and updated ones.
+
+    An update that changes a row's key is decoded as a delete of the old key followed
+    by an update of the new one.
+
+    Args:
+        messages (Iterable[bytes]): The messages read from a replication slot, in
+            order, e.g. from peek_replication_changes.
+
+    Returns:
+        dict: A dictionary with:
+            - changes (List[RowChange]): Every row change, in commit order.
+            - transactions (int): The number of committed transactions read.
+            - end_lsn (str | None): The LSN after the last commit read, which the slot
+              can be advanced to once the changes are saved. None if no transaction
+              was read.
+            - first_commit_timestamp (datetime | None): When the oldest transaction
+              read was committed.
+            - truncated_tables (List[str]): Tables that were truncated. Truncates
+              carry no keys, so they are not part of changes.
+
+    Raises:
+        ValueError: If a change belongs to a table without a single-column replica
+            identity, or a message is malformed.
+    """
+    relations: Dict[int, Dict[str, Any]] = {}
+    changes: List[RowChange] = []
+    truncated_tables: List[str] = []
+    transactions = 0
+    end_lsn = None
+    first_commit_timestamp = None
+    commit_timestamp = POSTGRES_EPOCH
+
+    def add_change(
+        relation_id: int,
+        operation: ChangeOperation,
+        values: list,
+        unchanged: Set[int] | None = None,
+    ):
+        relation = relations[relation_id]
+
+        if relation["key_index"] is None:
+            raise ValueError(
+                f"Table {relation['table_name']} has no single-column replica identity"
+            )
+
+        row_values = None
+        column_type_oids = None
+
+        if operation != "delete":
+            row_values = {
+                name: value
+                for index, ((name, _), value) in enumerate(
+                    zip(relation["columns"], values)
+                )
+                if index not in (unchanged or ())
+            }
+            column_type_oids = dict(relation["columns"])
+
+        changes.append(
+            RowChange(
+                relation["table_name"],
+                operation,
+                relation["key_column"],
+                relation["key_type_oid"],
+                values[relation["key_index"]],
+                commit_timestamp,
+                row_values,
+                column_type_oids,
+            )
+        )
+
+    for data in messages:
+        message_type = data[:1]
+
+        match message_type:
+            case b"B":
+                (timestamp,) = struct.unpack_from("!q", data, 9)
+                commit_timestamp = POSTGRES_EPOCH + timedelta(microseconds=timestamp)
+                first_commit_timestamp = first_commit_timestamp or commit_timestamp
+            case b"C":
+                (commit_end_lsn,) = struct.unpack_from("!Q", data, 10)
+                end_lsn = format_lsn(commit_end_lsn)
+                transactions += 1
+            case b"R":
+                relation_id, relation = read_relation(data)
+                relations[relation_id] = relation
+            case b"I":
+                (relation_id,) = struct.unpack_from("!I", data, 1)
+                values, unchanged, _ = read_tuple_data(data, 6)
+                add_change(relation_id, "insert", values, unchanged)
+            case b"U":
+                (relation_id,) = struct.unpack_from("!I", data, 1)
+                offset = 5
+
+                if data[offset : offset + 1] in (b"K", b"O"):
+                    old_values, _, offset = read_tuple_data(data, offset + 1)
+                    key_index = relations[relation_id]["key_index"]
+                    new_values, unchanged, _ = read_tuple_data(data, offset + 1)
+
+                    if key_index is not None and (
+                        old_values[key_index] != new_values[key_index]
+                    ):
+                        add_change(relation_id, "delete", old_values)
+                else:
+                    new_values, unchanged, _ = read_tuple_data(data, offset + 1)
+
+                add_change(relation_id, "update", new_values, unchanged)
+            case b"D":
+                (relation_id,) = struct.unpack_from("!I", data, 1)
+                values, _, _ = read_tuple_data(data, 6)
+                add_change(relation_id, "delete", values)
+            case b"T":
+                (relation_count,) = struct.unpack_from("!I", data, 1)
+                relation_ids = struct.unpack_from(f"!{relation_count}I", data, 6)
+                truncated_tables.extend(
+                    relations[relation_id]["table_name"] for relation_id in relation_ids
+                )
+            case _:
+                # Origin, Type and logical Message messages carry no row changes
+                continue
+
+    if truncated_tables:
+        logger.warning(f"Tables truncated since the last run: {truncated_tables}")
+
+    return {
+        "changes": changes,
+        "transactions": transactions,
+        "end_lsn": end_lsn,
+        "first_commit_timestamp": first_commit_timestamp,
+        "truncated_tables": truncated_tables,
+    }
@@ -0,0 +1,299 @@
+import logging
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.db.db_helpers import get_table_primary_key, stream_primary_keys
+from src.db.source_registry import DEFAULT_SOURCE, add_source_prefix, get_source_prefix
+from src.utilities.extract_lambda_utils import create_parquet_metadata
+from src.utilities.extraction.extract_changes_to_s3 import (
+    create_delete_schema,
+    upload_data_frame,
+)
+from src.utilities.parquets.create_arrow_table_from_parquet import (
+    create_arrow_table_from_parquet,
+)
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+from src.utilities.s3.get_file_from_s3_bucket import get_file_from_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+KEY_SNAPSHOT_PREFIX = "key_snapshots"
+
+# the tombstone log lives apart from lambda_state.json, which the hourly detection
+# would otherwise race the ETL state machine to rewrite
+DELETE_STATE_KEY = "delete_state.json"
+
+
+def read_primary_keys(
+    conn: Connection[DictRow], table_name: str, key_column: str, batch_size: int
+) -> np.ndarray:
+    """
+    Reads every primary key of a table into one sorted integer array, as int32 when
+    the keys fit so a million keys take 4MB.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to read.
+        key_column (str): The table's integer primary key column.
+        batch_size (int): Number of keys fetched per round trip.
+
+    Returns:
+        np.ndarray: The keys in ascending order.
+    """
+    chunks = []
+
+    for batch in stream_primary_keys(conn, table_name, key_column, batch_size):
+        chunk = np.array(batch, dtype=np.int64)
+
+        if chunk[0] >= np.iinfo(np.int32).min and chunk[-1] <= np.iinfo(np.int32).max:
+            chunk = chunk.astype(np.int32)
+
+        chunks.append(chunk)
+
+    if not chunks:
+        return np.empty(0, dtype=np.int32)
+
+    return np.concatenate(chunks)
+
+
+def find_deleted_keys(
+    previous_keys: np.ndarray, current_keys: np.ndarray
+) -> np.ndarray:
+    """
+    Finds the keys of a previous snapshot missing from the current one. Both arrays
+    must be sorted; a binary search per previous key avoids building a hash set of
+    either snapshot.
+
+    Args:
+        previous_keys (np.ndarray): The sorted keys of the previous snapshot.
+        current_keys (np.ndarray): The sorted keys of the current snapshot.
+
+    Returns:
+        np.ndarray: The deleted keys, in ascending order.
+    """
+    if not len(current_keys):
+        return previous_keys
+
+    positions = np.searchsorted(current_keys, previous_keys)
+    np.minimum(positions, len(current_keys) - 1, out=positions)
+
+    return previous_keys[current_keys[positions] != previous_keys]
+
+
+def add_log_to_delete_state(current_state: dict, log_entry: dict) -> None:
+    """
+    Records a tombstone file in the delete state, appending the entry to its table's
+    delete log so a later stage can find and apply the deletions. Mutates
+    current_state in place.
+
+    Args:
+        current_state (dict): The state dictionary to update.
+        log_entry (dict): The log entry of the tombstone file, including
+            'table_name' and 'last_updated'.
+
+    Returns:
+        None
+    """
+    table_state = current_state.setdefault("delete_state", {}).setdefault(
+        log_entry["table_name"], {"last_detected": None, "delete_log": []}
+    )
+    table_state["last_detected"] = log_entry["last_updated"]
+    table_state["delete_log"].append(log_entry)
+
+
+def get_key_snapshot_key(table_name: str, source_name: str = DEFAULT_SOURCE) -> str:
+    return add_source_prefix(source_name, f"{KEY_SNAPSHOT_PREFIX}/{table_name}.parquet")
+
+
+def load_key_snapshot(
+    s3_client, bucket_name: str, table_name: str, source_name: str = DEFAULT_SOURCE
+) -> np.ndarray | None:
+    """
+    Loads the primary key snapshot saved by the previous detection run of a table.
+
+    Args:
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket.
+        table_name (str): The table of the snapshot.
+        source_name (str): The source database of the table, see get_source_names.
+
+    Returns:
+        np.ndarray | None: The sorted keys, None if there is no snapshot yet.
+
+    Raises:
+        Exception: For any S3 error other than a missing snapshot.
+    """
+    response = get_file_from_s3_bucket(
+        s3_client, bucket_name, get_key_snapshot_key(table_name, source_name)
+    )
+
+    if response.get("error"):
+        if response["error"]["message"].startswith("NoSuchKey"):
+            return None
+
+        raise Exception(response["error"]["message"])
+
+    table = create_arrow_table_from_parquet(response["success"]["data"])
+
+    return table.column(0).to_numpy()
+
+
+def save_key_snapshot(
+    s3_client,
+    bucket_name: str,
+    table_name: str,
+    keys: np.ndarray,
+    source_name: str = DEFAULT_SOURCE,
+) -> int:
+    """
+    Saves a primary key snapshot as a single column Parquet file. Sorted keys are
+    delta encoded, so a dense key range costs well under a byte per key.
+
+    Args:
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket.
+        table_name (str): The table of the snapshot.
+        keys (np.ndarray): The sorted keys.
+        source_name (str): The source database of the table, see get_source_names.
+
+    Returns:
+        int: The size of the snapshot file in bytes.
+
+    Raises:
+        Exception: If the S3 upload fails.
+    """
+    snapshot_file = BytesIO()
+    pq.write_table(
+        pa.table({"key": keys}),
+        snapshot_file,
+        compression="zstd",
+        use_dictionary=False,
+        column_encoding={"key": "DELTA_BINARY_PACKED"},
+    )
+
+    response = add_file_to_s3_bucket(
+        s3_client,
+        bucket_name,
+        get_key_snapshot_key(table_name, source_name),
+        snapshot_file.getvalue(),
+    )
+
+    if response.get("error"):
+        raise response["error"]["raw_response"]
+
+    return snapshot_file.tell()
+
+
+def detect_deleted_rows_to_s3(
+    conn: Connection[DictRow],
+    s3_client,
+    bucket_name: str,
+    table_name: str,
+    batch_size: int = 100000,
+    compression: str = DEFAULT_COMPRESSION,
+    record_log_entry: Callable[[dict], Any] | None = None,
+    source_name: str = DEFAULT_SOURCE,
+) -> dict:
+    """
+    Detects rows hard-deleted from a table since the previous run by diffing its
+    primary keys against the snapshot that run saved, and uploads the deleted keys as
+    a tombstone file shaped like the delete files of the change data capture
+    extraction: the integer key column and deleted_at, here the time of detection,
+    written with the same schema, see create_delete_schema.
+
+    The snapshot is only replaced once the tombstones are uploaded and recorded, so
+    a failed run finds the same deletions again. The first run of a table only
+    saves a snapshot. The snapshots and tombstones of every source other than
+    TOTESYS are namespaced under its name, see get_source_prefix.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the source database.
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket for snapshots and tombstones.
+        table_name (str): The table to check.
+        batch_size (int): Number of keys fetched per round trip.
+        compression (str): The codec and optional level of the tombstone file, e.g.
+            "zstd:3", see get_parquet_compression_options.
+        record_log_entry (Callable[[dict], Any] | None): Called with the log entry
+            of the tombstone file once it is uploaded, before the snapshot is
+            replaced, e.g. to add it to the delete state.
+        source_name (str): The source database conn is connected to, see
+            get_source_names.
+
+    Returns:
+        dict: A dictionary with:
+            - log_entry (dict | None): The ingest log entry of the tombstone file, with
+              table_name, extraction_timestamp, last_updated, file_name, key,
+              row_count and source. None when no row was deleted.
+            - key_count (int): Number of keys in the table.
+            - snapshot_bytes (int): Size of the saved key snapshot.
+
+    Raises:
+        ValueError: If the table has no single-column primary key.
+        Exception: If reading the keys or an S3 operation fails.
+    """
+    key_column = get_table_primary_key(conn, table_name)
+    current_keys = read_primary_keys(conn, table_name, key_column, batch_size)
+    previous_keys = load_key_snapshot(s3_client, bucket_name, table_name, source_name)
+    log_entry = None
+
+    if previous_keys is not None:
+        deleted_keys = find_deleted_keys(previous_keys, current_keys)
+
+        if len(deleted_keys):
+            detected_at = datetime.now()
+            filename, key = create_parquet_metadata(
+                detected_at,
+                table_name,
+                suffix="deletes_snapshot",
+                prefix=get_source_prefix(source_name),
+            )
+            upload_data_frame(
+                s3_client,
+                bucket_name,
+                key,
+                pd.DataFrame(
+                    {
+                        key_column: deleted_keys,
+                        "deleted_at": pd.Timestamp(
+                            detected_at.astimezone(timezone.utc)
+                        ),
+                    }
+                ),
+                # read_primary_keys only reads integer keys
+                create_delete_schema(key_column, "int8"),
+                compression,
+            )
+            log_entry = {
+                "table_name": table_name,
+                "extraction_timestamp": detected_at,
+                "last_updated": detected_at,
+                "file_name": filename,
+                "key": key,
+                "row_count": len(deleted_keys),
+                "source": source_name,
+            }
+            logger.info(f"Detected {len(deleted_keys)} deleted rows of {table_name}")
+
+            if record_log_entry is not None:
+                record_log_entry(log_entry)
+
+    snapshot_bytes = save_key_snapshot(
+        s3_client, bucket_name, table_name, current_keys, source_name
+    )
+
+    return {
+        "log_entry": log_entry,
+        "key_count": len(current_keys),
+        "snapshot_bytes": snapshot_bytes,
+    }
@@ -0,0 +1,407 @@
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+import pyarrow as pa
+from psycopg import Connection, postgres, pq
+from psycopg.rows import DictRow
+
+from src.db.db_helpers import (
+    build_column_projection,
+    get_projected_type_name,
+    get_table_columns,
+    get_table_rows_by_keys,
+    select_table_columns,
+)
+from src.utilities.extract_lambda_utils import (
+    create_data_frame_from_columns,
+    create_parquet_metadata,
+    get_last_updated_from_columns,
+)
+from src.utilities.extraction.column_requirements import get_required_columns
+from src.utilities.extraction.decode_pgoutput_messages import RowChange
+from src.utilities.parquets.create_arrow_schema_from_columns import (
+    create_arrow_schema_from_columns,
+)
+from src.utilities.parquets.create_arrow_schema_from_description import (
+    PG_TYPE_TO_ARROW,
+)
+from src.utilities.parquets.create_parquet_from_data_frame import (
+    create_parquet_from_data_frame,
+)
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def get_latest_changes(changes: List[RowChange]) -> Dict[str, Dict[str, RowChange]]:
+    """
+    Keeps only the last change of every row, grouped by table. A row inserted and
+    then updated is one upsert, and a row updated and then deleted is one delete.
+
+    Args:
+        changes (List[RowChange]): Row changes in commit order.
+
+    Returns:
+        Dict[str, Dict[str, RowChange]]: The last change of each key, by table name.
+    """
+    latest_changes: Dict[str, Dict[str, RowChange]] = {}
+
+    for change in changes:
+        table_changes = latest_changes.setdefault(change.table_name, {})
+        # re-inserting moves the key to the end, keeping commit order
+        table_changes.pop(change.key, None)
+        table_changes[change.key] = change
+
+    return latest_changes
+
+
+def get_text_loader(conn: Connection[DictRow], type_oid: int) -> Callable[[str], Any]:
+    """
+    Gets a function converting a value in Postgres text format, as pgoutput sends
+    it, to the python value psycopg loads for its type.
+
+    Args:
+        conn (Connection[DictRow]): The connection whose adapters load the values.
+        type_oid (int): The Postgres type of the values.
+
+    Returns:
+        Callable[[str], Any]: The loader. Values of types psycopg has no loader for
+        are left as text.
+    """
+    loader_class = conn.adapters.get_loader(type_oid, pq.Format.TEXT)
+
+    if loader_class is None:
+        return str
+
+    loader = loader_class(type_oid)
+
+    return lambda value: loader.load(value.encode())
+
+
+def load_keys(conn: Connection[DictRow], changes: List[RowChange]) -> List[Any]:
+    """
+    Converts the text keys of row changes to python values of their column type, so
+    they can be compared with the key column in a query.
+
+    Args:
+        conn (Connection[DictRow]): The connection whose adapters load the keys.
+        changes (List[RowChange]): Changes of the same table.
+
+    Returns:
+        List[Any]: The keys, in the order of the changes. Keys of types psycopg has
+        no loader for are left as text.
+    """
+    load = get_text_loader(conn, changes[0].key_type_oid)
+
+    return [load(change.key) for change in changes]
+
+
+def get_projected_loader(
+    conn: Connection[DictRow], table_name: str, column: dict, type_oid: int
+) -> Callable[[str], Any]:
+    """
+    Gets a function converting a column's text value, as pgoutput sends it, to the
+    value its extraction projection selects, see build_column_projection.
+
+    Args:
+        conn (Connection[DictRow]): The connection whose adapters load the values.
+        table_name (str): The table the column belongs to.
+        column (dict): The column, with column_name and udt_name.
+        type_oid (int): The column's type in the replicated relation.
+
+    Returns:
+        Callable[[str], Any]: The loader, typed as get_projected_type_name.
+    """
+    udt_name = column["udt_name"]
+
+    if get_projected_type_name(table_name, column) == udt_name:
+        return get_text_loader(conn, type_oid)
+
+    if udt_name == "numeric":
+        return float
+
+    if udt_name.startswith("_"):
+        load_array = get_text_loader(conn, type_oid)
+
+        return lambda value: ",".join(
+            str(element) for element in load_array(value) if element is not None
+        )
+
+    load_date = get_text_loader(conn, postgres.types["date"].oid)
+
+    return lambda value: load_date(value) if value else None
+
+
+def create_columns_from_changes(
+    conn: Connection[DictRow],
+    table_name: str,
+    columns: List[dict],
+    changes: List[RowChange],
+) -> Dict[str, List[Any]]:
+    """
+    Builds the extracted columns of upserted rows from the new row values decoded
+    from the replication stream, projected as the polling extraction selects them.
+
+    Args:
+        conn (Connection[DictRow]): The connection whose adapters load the values.
+        table_name (str): The table the changes belong to.
+        columns (List[dict]): The extracted columns, see get_extracted_columns.
+        changes (List[RowChange]): Inserts and updates carrying a value for every
+            extracted column.
+
+    Returns:
+        Dict[str, List[Any]]: The values of every column, in the order of the
+        changes.
+    """
+    loaders: Dict[tuple, Callable[[str], Any]] = {}
+    result: Dict[str, List[Any]] = {column["column_name"]: [] for column in columns}
+
+    for change in changes:
+        for column in columns:
+            name = column["column_name"]
+            value = change.values[name]
+
+            if value is not None:
+                type_oid = change.column_type_oids[name]
+
+                if (name, type_oid) not in loaders:
+                    loaders[(name, type_oid)] = get_projected_loader(
+                        conn, table_name, column, type_oid
+                    )
+
+                value = loaders[(name, type_oid)](value)
+
+            result[name].append(value)
+
+    return result
+
+
+def create_delete_schema(key_column: str, key_type_name: str) -> pa.Schema:
+    """
+    Builds the schema of a delete file: the deleted keys, typed as the extraction
+    types the key column, and when they were deleted as a UTC timestamp.
+
+    Args:
+        key_column (str): The table's key column.
+        key_type_name (str): The Postgres type name of the key column, e.g. "int4".
+
+    Returns:
+        pa.Schema: The schema of the key and deleted_at columns. Keys of unknown
+        types are strings, as load_keys leaves them as text.
+    """
+    return pa.schema(
+        [
+            pa.field(key_column, PG_TYPE_TO_ARROW.get(key_type_name, pa.string())),
+            pa.field("deleted_at", PG_TYPE_TO_ARROW["timestamptz"]),
+        ]
+    )
+
+
+def get_extracted_columns(
+    conn: Connection[DictRow],
+    table_name: str,
+    table_catalog: Dict[str, Any] | None = None,
+) -> List[dict]:
+    """
+    Gets the columns of a table the extraction selects, as extract_table does for
+    the polling engines.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to extract.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog, see
+            load_catalog. Its columns are used without querying the database.
+            Queried from information_schema when None.
+
+    Returns:
+        List[dict]: The columns in table order, with column_name and udt_name.
+    """
+    if table_catalog is None:
+        table_columns = get_table_columns(conn, table_name)
+    else:
+        table_columns = table_catalog["columns"]
+
+    return select_table_columns(
+        table_name, table_columns, get_required_columns(table_name)
+    )
+
+
+def upload_data_frame(
+    s3_client,
+    bucket_name: str,
+    key: str,
+    data_frame: pd.DataFrame,
+    schema: pa.Schema,
+    compression: str = DEFAULT_COMPRESSION,
+) -> None:
+    """
+    Uploads a DataFrame to S3 as a Parquet file.
+
+    Args:
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The bucket to upload the file to.
+        key (str): The S3 key of the file.
+        data_frame (pd.DataFrame): The non-empty DataFrame to upload.
+        schema (pa.Schema): The schema the file is written with, so its column
+            types do not depend on the values pandas happened to see.
+        compression (str): The codec and optional level of the Parquet file, e.g.
+            "zstd:3", see get_parquet_compression_options.
+
+    Returns:
+        None
+
+    Raises:
+        Exception: If the S3 upload fails.
+    """
+    response = add_file_to_s3_bucket(
+        s3_client,
+        bucket_name,
+        key,
+        create_parquet_from_data_frame(data_frame, compression, schema),
+    )
+
+    if response.get("error"):
+        raise response["error"]["raw_response"]
+
+
+def extract_changes_to_s3(
+    conn: Connection[DictRow],
+    s3_client,
+    bucket_name: str,
+    changes: List[RowChange],
+    suffix: str,
+    table_catalogs: Dict[str, Dict[str, Any]] | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    table_compression: Dict[str, str] | None = None,
+) -> Dict[str, List[dict]]:
+    """
+    Writes the changes read from a replication slot to S3 as Parquet deltas, one
+    upsert file and one delete file per changed table, under the same key layout as
+    the polling extraction.
+
+    Upsert files are built from the new row values pgoutput decoded, projected and
+    typed as the polling extraction selects them, so they hold the same columns and
+    types as any other extraction of the table without querying it. Only rows whose
+    update left a TOASTed value out of the stream are read back by key. Delete files
+    hold the deleted keys and when they were deleted, see create_delete_schema.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket to upload the files to.
+        changes (List[RowChange]): Row changes in commit order, e.g. from
+            decode_pgoutput_messages.
+        suffix (str): Appended to every filename to tell this batch of changes apart,
+            e.g. derived from the slot position it ends at.
+        table_catalogs (Dict[str, Dict[str, Any]] | None): The catalog entries of
+            the tables by name, see load_catalog. The columns of tables without one
+            are queried.
+        compression (str): The codec and optional level of every file, e.g.
+            "zstd:3", see get_parquet_compression_options. Defaults to "zstd".
+        table_compression (Dict[str, str] | None): Overrides compression for
+            individual tables, by table name.
+
+    Returns:
+        dict: A dictionary with:
+            - files_to_process (List[dict]): The ingest log entry of every upsert
+              file, with table_name, extraction_timestamp, last_updated, file_name
+              and key.
+            - deletes_to_process (List[dict]): The same entries for the delete
+              files, with the latest deletion time as last_updated.
+
+    Raises:
+        Exception: If reading the rows or an S3 upload fails.
+    """
+    result: Dict[str, List[dict]] = {"files_to_process": [], "deletes_to_process": []}
+
+    for table_name, table_changes in get_latest_changes(changes).items():
+        upserts = [c for c in table_changes.values() if c.operation != "delete"]
+        deletes = [c for c in table_changes.values() if c.operation == "delete"]
+        file_compression = (table_compression or {}).get(table_name, compression)
+
+        if upserts:
+            columns = get_extracted_columns(
+                conn, table_name, (table_catalogs or {}).get(table_name)
+            )
+            names = [column["column_name"] for column in columns]
+            decoded = [c for c in upserts if all(n in c.values for n in names)]
+            toasted = [c for c in upserts if not all(n in c.values for n in names)]
+            rows = create_columns_from_changes(conn, table_name, columns, decoded)
+
+            # pgoutput leaves out TOASTed values an update did not change
+            if toasted:
+                toasted_rows = get_table_rows_by_keys(
+                    conn,
+                    table_name,
+                    toasted[0].key_column,
+                    load_keys(conn, toasted),
+                    build_column_projection(table_name, columns),
+                )
+
+                for name in names:
+                    rows[name].extend(toasted_rows[name])
+
+            # TOASTed rows deleted since the change was committed come back empty
+            if len(rows[names[0]]):
+                last_updated = get_last_updated_from_columns(rows)
+                filename, key = create_parquet_metadata(
+                    last_updated, table_name, suffix=suffix
+                )
+                upload_data_frame(
+                    s3_client,
+                    bucket_name,
+                    key,
+                    create_data_frame_from_columns(rows),
+                    create_arrow_schema_from_columns(table_name, columns),
+                    file_compression,
+                )
+                result["files_to_process"].append(
+                    {
+                        "table_name": table_name,
+                        "extraction_timestamp": datetime.now(),
+                        "last_updated": last_updated,
+                        "file_name": filename,
+                        "key": key,
+                    }
+                )
+
+        if deletes:
+            key_column = deletes[0].key_column
+            key_type = postgres.types.get(deletes[0].key_type_oid)
+            deleted_at = max(change.commit_timestamp for change in deletes)
+            filename, key = create_parquet_metadata(
+                deleted_at, table_name, suffix=f"deletes_{suffix}"
+            )
+            upload_data_frame(
+                s3_client,
+                bucket_name,
+                key,
+                pd.DataFrame(
+                    {
+                        key_column: load_keys(conn, deletes),
+                        "deleted_at": [change.commit_timestamp for change in deletes],
+                    }
+                ),
+                create_delete_schema(key_column, key_type.name if key_type else ""),
+                file_compression,
+            )
+            result["deletes_to_process"].append(
+                {
+                    "table_name": table_name,
+                    "extraction_timestamp": datetime.now(),
+                    "last_updated": deleted_at,
+                    "file_name": filename,
+                    "key": key,
+                }
+            )
+
+        logger.info(
+            f"Extracted {len(upserts)} upserts and {len(deletes)} deletes of "
+            f"{table_name}"
+        )
+
+    return result
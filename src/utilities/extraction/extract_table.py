@@ -0,0 +1,534 @@
+import logging
+from datetime import datetime
+from io import BytesIO
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Literal
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from psycopg import Connection, sql
+from psycopg.rows import DictRow
+
+from src.db.db_helpers import (
+    KeyRange,
+    build_column_projection,
+    copy_table_columns,
+    get_projected_type_name,
+    get_table_data_columns,
+    get_table_description,
+    get_table_projection,
+    select_table_columns,
+    stream_table_data,
+)
+from src.utilities.extract_lambda_utils import (
+    get_last_updated_from_columns,
+)
+from src.utilities.extraction.column_requirements import get_required_columns
+from src.utilities.extraction.row_hash_index import RowHashIndex
+from src.utilities.parquets.create_arrow_schema_from_columns import (
+    create_arrow_schema_from_columns,
+)
+from src.utilities.parquets.create_arrow_schema_from_description import (
+    create_arrow_schema_from_description,
+)
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.parquets.parquet_part_writer import (
+    DEFAULT_ROW_GROUP_SIZE,
+    ParquetPartWriter,
+)
+from src.utilities.parquets.table_schemas import get_source_table_schema
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ExtractionEngine = Literal["fetchall", "stream", "copy"]
+
+EXTRACTION_ENGINES = ["fetchall", "stream", "copy"]
+
+
+def extract_table(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None = None,
+    engine: ExtractionEngine = "fetchall",
+    batch_size: int = 10000,
+    key_range: KeyRange | None = None,
+    row_hash_index: RowHashIndex | None = None,
+    table_catalog: Dict[str, Any] | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+    on_batch: Callable[[int, float], Any] | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Extracts new or updated rows from a table into Parquet parts, see
+    ParquetPartWriter.
+
+    Every engine reads the table through its extraction projection, so numeric,
+    date-like varchar and array columns arrive as float, date and text values. See
+    get_table_projection. Tables listed in SOURCE_COLUMN_REQUIREMENTS only have the
+    columns the transforms need extracted.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted. Extracts the whole table when None.
+        engine (ExtractionEngine): "fetchall" loads the whole delta into memory as
+            lists of column values before writing it, "stream" reads it through a
+            server-side cursor in batches of batch_size rows and writes each batch as
+            it arrives, "copy" reads it with a binary COPY and builds Arrow batches
+            without per-row dictionaries.
+        batch_size (int): Number of rows per batch for the "stream" and "copy"
+            engines, and the rows of their row groups, so no more than a batch of
+            rows is buffered before it is encoded. Larger batches compress better,
+            see DEFAULT_ROW_GROUP_SIZE, at the cost of memory.
+        key_range (KeyRange | None): Only rows whose primary key lies in this range
+            are extracted, e.g. one partition of a partitioned extraction.
+        row_hash_index (RowHashIndex | None): Drops the rows whose content has not
+            changed since they were indexed.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog, see
+            load_catalog. Its column types give the projection and an explicit Arrow
+            schema without querying the database, so the "fetchall" engine does not
+            leave the types to pandas. Queried and inferred when None.
+        compression (str): The codec and optional level of the Parquet file, e.g.
+            "zstd:3", see get_parquet_compression_options.
+        max_part_bytes (int | None): The size from which a part is closed and the
+            next rows go to a new one. None writes a single part.
+        upload_part (Callable[[BytesIO, int], Any] | None): Called with the Parquet
+            file and number of every part as soon as it is closed, while the next
+            one is filled. The parts are kept in memory when None.
+        on_batch (Callable[[int, float], Any] | None): Called by the "stream" and
+            "copy" engines with the rows read and the seconds taken by every batch,
+            from its fetch until it is written, e.g. to adapt the extraction to the
+            source's load.
+
+    Returns:
+        dict | None: None if there is no new data, otherwise a dictionary with:
+            - parts (List[dict]): The Parquet parts, see ParquetPartWriter.close.
+              Those handed to upload_part hold its result in "upload" and no
+              longer their file. Empty when every row was dropped by
+              row_hash_index.
+            - last_updated (datetime): The latest 'last_updated' value extracted,
+              dropped rows included.
+            - row_count (int): Number of rows written to the parts.
+            - suppressed_rows (int): Number of unchanged rows dropped.
+
+    Raises:
+        ValueError: If the engine is not supported.
+        psycopg.Error: On database errors.
+    """
+    if engine not in EXTRACTION_ENGINES:
+        raise ValueError(
+            f"Invalid extraction engine '{engine}', must be one of {EXTRACTION_ENGINES}"
+        )
+
+    schema = None
+    type_names = None
+
+    if table_catalog is None:
+        projection = get_table_projection(
+            conn, table_name, get_required_columns(table_name)
+        )
+    else:
+        columns = select_table_columns(
+            table_name, table_catalog["columns"], get_required_columns(table_name)
+        )
+        projection = build_column_projection(table_name, columns)
+        schema = create_arrow_schema_from_columns(table_name, columns)
+        type_names = [get_projected_type_name(table_name, column) for column in columns]
+
+    match engine:
+        case "fetchall":
+            return extract_table_with_fetchall(
+                conn,
+                table_name,
+                last_updated,
+                key_range,
+                projection,
+                row_hash_index,
+                schema,
+                compression,
+                max_part_bytes,
+                upload_part,
+            )
+        case "stream":
+            return extract_table_with_stream(
+                conn,
+                table_name,
+                last_updated,
+                batch_size,
+                key_range,
+                projection,
+                row_hash_index,
+                schema,
+                compression,
+                max_part_bytes,
+                upload_part,
+                on_batch,
+            )
+        case "copy":
+            return extract_table_with_copy(
+                conn,
+                table_name,
+                last_updated,
+                batch_size,
+                key_range,
+                projection,
+                row_hash_index,
+                schema,
+                type_names,
+                compression,
+                max_part_bytes,
+                upload_part,
+                on_batch,
+            )
+
+
+def extract_table_with_fetchall(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+    row_hash_index: RowHashIndex | None = None,
+    schema: pa.Schema | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Extracts a table delta by fetching every row at once into lists of column values
+    and converting them straight to Arrow.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted.
+        key_range (KeyRange | None): Only rows whose key lies in this range are
+            extracted.
+        projection (sql.Composable | None): The select list. Defaults to *.
+        row_hash_index (RowHashIndex | None): Drops the unchanged rows.
+        schema (pa.Schema | None): The schema of the projected columns. Described
+            by the database when None.
+        compression (str): The codec and optional level of the Parquet file.
+        max_part_bytes (int | None): See extract_table.
+        upload_part (Callable[[BytesIO, int], Any] | None): See extract_table.
+
+    Returns:
+        dict | None: See extract_table.
+    """
+    table_columns = get_table_data_columns(
+        conn, table_name, last_updated, key_range, projection=projection
+    )
+    row_count = len(next(iter(table_columns.values()), []))
+
+    if not row_count:
+        return None
+
+    if schema is None:
+        schema = get_source_table_schema(
+            table_name,
+            create_arrow_schema_from_description(
+                get_table_description(conn, table_name, projection)
+            ),
+        )
+
+    table = pa.Table.from_pydict(table_columns, schema=schema)
+
+    if row_hash_index is not None:
+        table = table.filter(pa.array(row_hash_index.get_changed_mask(table)))
+
+    return {
+        "parts": write_extraction_parts(
+            table.to_batches(),
+            schema,
+            compression,
+            max_part_bytes=max_part_bytes,
+            upload_part=upload_part,
+        ),
+        "last_updated": get_last_updated_from_columns(table_columns),
+        "row_count": table.num_rows,
+        "suppressed_rows": row_count - table.num_rows,
+    }
+
+
+def write_extraction_parts(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    compression: str = DEFAULT_COMPRESSION,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Writes record batches to Parquet parts as they are received, see
+    ParquetPartWriter.
+
+    Args:
+        batches (Iterable[pa.RecordBatch]): The batches to write, produced lazily.
+        schema (pa.Schema): The schema of the batches.
+        compression (str): The codec and optional level of the parts.
+        row_group_size (int): The rows of every row group but the last of each part.
+        max_part_bytes (int | None): See extract_table.
+        upload_part (Callable[[BytesIO, int], Any] | None): See extract_table.
+
+    Returns:
+        List[dict]: The parts, see ParquetPartWriter.close. Empty, and nothing is
+        uploaded, when the batches hold no row.
+    """
+    with ParquetPartWriter(
+        schema, compression, row_group_size, max_part_bytes, upload_part
+    ) as writer:
+        row_count = 0
+
+        for batch in batches:
+            writer.write_batch(batch)
+            row_count += batch.num_rows
+
+        if not row_count:
+            writer.abort()
+
+    return writer.parts
+
+
+def get_last_updated_from_record_batch(batch: pa.RecordBatch) -> datetime | None:
+    """
+    Gets the most recent 'last_updated' value of a record batch as a python datetime.
+
+    Args:
+        batch (pa.RecordBatch): A record batch with a 'last_updated' timestamp column.
+
+    Returns:
+        datetime | None: The latest 'last_updated' value, or None if it is all NULL.
+    """
+    last_updated_column = batch["last_updated"]
+    # microseconds is the finest unit a python datetime can hold
+    microsecond_type = pa.timestamp("us", tz=last_updated_column.type.tz)
+
+    return pc.max(last_updated_column).cast(microsecond_type).as_py()
+
+
+def create_extraction_from_record_batches(
+    record_batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    row_hash_index: RowHashIndex | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+    on_batch: Callable[[int, float], Any] | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Writes record batches to Parquet parts while tracking the row count and the
+    latest 'last_updated' value seen.
+
+    Args:
+        record_batches (Iterable[pa.RecordBatch]): The batches to write, produced lazily.
+        schema (pa.Schema): The schema of the batches.
+        row_hash_index (RowHashIndex | None): Drops the unchanged rows of every
+            batch before it is written.
+        compression (str): The codec and optional level of the Parquet file.
+        row_group_size (int): The rows of every row group but the last of each part,
+            the batch size of the engines.
+        max_part_bytes (int | None): See extract_table.
+        upload_part (Callable[[BytesIO, int], Any] | None): See extract_table.
+        on_batch (Callable[[int, float], Any] | None): See extract_table.
+
+    Returns:
+        dict | None: See extract_table.
+    """
+    summary: Dict[str, Any] = {"row_count": 0, "read_rows": 0, "last_updated": None}
+
+    def tracked_batches():
+        batch_start = perf_counter()
+
+        for batch in record_batches:
+            batch_last_updated = get_last_updated_from_record_batch(batch)
+            read_rows = batch.num_rows
+
+            summary["read_rows"] += read_rows
+            if summary["last_updated"] is None or (
+                batch_last_updated and batch_last_updated > summary["last_updated"]
+            ):
+                summary["last_updated"] = batch_last_updated
+
+            if row_hash_index is not None:
+                batch = row_hash_index.filter_changed_batch(batch)
+
+            summary["row_count"] += batch.num_rows
+
+            yield batch
+
+            # resumed once the batch is written
+            if on_batch is not None:
+                on_batch(read_rows, perf_counter() - batch_start)
+
+            batch_start = perf_counter()
+
+    parts = write_extraction_parts(
+        tracked_batches(),
+        schema,
+        compression,
+        row_group_size,
+        max_part_bytes,
+        upload_part,
+    )
+
+    if not summary["read_rows"]:
+        return None
+
+    return {
+        "parts": parts,
+        "last_updated": summary["last_updated"],
+        "row_count": summary["row_count"],
+        "suppressed_rows": summary["read_rows"] - summary["row_count"],
+    }
+
+
+def extract_table_with_stream(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None,
+    batch_size: int,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+    row_hash_index: RowHashIndex | None = None,
+    schema: pa.Schema | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+    on_batch: Callable[[int, float], Any] | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Extracts a table delta through a server-side cursor, converting each batch of rows
+    to an Arrow record batch and writing it to Parquet before the next one is fetched.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted.
+        batch_size (int): Number of rows fetched and written per batch.
+        key_range (KeyRange | None): Only rows whose key lies in this range are
+            extracted.
+        projection (sql.Composable | None): The select list. Defaults to *.
+        row_hash_index (RowHashIndex | None): Drops the unchanged rows.
+        schema (pa.Schema | None): The schema of the projected columns. Described
+            by the database when None.
+        compression (str): The codec and optional level of the Parquet file.
+        max_part_bytes (int | None): See extract_table.
+        upload_part (Callable[[BytesIO, int], Any] | None): See extract_table.
+        on_batch (Callable[[int, float], Any] | None): See extract_table.
+
+    Returns:
+        dict | None: See extract_table.
+    """
+    if schema is None:
+        schema = get_source_table_schema(
+            table_name,
+            create_arrow_schema_from_description(
+                get_table_description(conn, table_name, projection)
+            ),
+        )
+
+    record_batches = (
+        pa.RecordBatch.from_pylist(rows, schema=schema)
+        for rows in stream_table_data(
+            conn, table_name, last_updated, batch_size, key_range, projection
+        )
+    )
+
+    return create_extraction_from_record_batches(
+        record_batches,
+        schema,
+        row_hash_index,
+        compression,
+        batch_size,
+        max_part_bytes,
+        upload_part,
+        on_batch,
+    )
+
+
+def extract_table_with_copy(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None,
+    batch_size: int,
+    key_range: KeyRange | None = None,
+    projection: sql.Composable | None = None,
+    row_hash_index: RowHashIndex | None = None,
+    schema: pa.Schema | None = None,
+    type_names: List[str] | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+    upload_part: Callable[[BytesIO, int], Any] | None = None,
+    on_batch: Callable[[int, float], Any] | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Extracts a table delta with a binary COPY TO STDOUT, building Arrow arrays
+    directly from the decoded column values. No row dictionaries or pandas
+    DataFrames are created on the way to Parquet.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted.
+        batch_size (int): Number of rows converted and written per batch.
+        key_range (KeyRange | None): Only rows whose key lies in this range are
+            extracted.
+        projection (sql.Composable | None): The select list. Defaults to *.
+        row_hash_index (RowHashIndex | None): Drops the unchanged rows.
+        schema (pa.Schema | None): The schema of the projected columns.
+        type_names (List[str] | None): The Postgres types of the projected columns
+            the binary values are decoded as, see get_projected_type_name. The
+            schema and types are described by the database when either is None.
+        compression (str): The codec and optional level of the Parquet file.
+        max_part_bytes (int | None): See extract_table.
+        upload_part (Callable[[BytesIO, int], Any] | None): See extract_table.
+        on_batch (Callable[[int, float], Any] | None): See extract_table.
+
+    Returns:
+        dict | None: See extract_table.
+    """
+    if schema is None or type_names is None:
+        description = get_table_description(conn, table_name, projection)
+        schema = get_source_table_schema(
+            table_name, create_arrow_schema_from_description(description)
+        )
+        type_codes: List[int | str] = [column.type_code for column in description]
+    else:
+        type_codes = list(type_names)
+
+    record_batches = (
+        pa.RecordBatch.from_arrays(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(columns, schema)
+            ],
+            schema=schema,
+        )
+        for columns in copy_table_columns(
+            conn,
+            table_name,
+            type_codes,
+            last_updated,
+            batch_size,
+            key_range,
+            projection,
+        )
+    )
+
+    return create_extraction_from_record_batches(
+        record_batches,
+        schema,
+        row_hash_index,
+        compression,
+        batch_size,
+        max_part_bytes,
+        upload_part,
+        on_batch,
+    )
@@ -0,0 +1,197 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Generator
+
+import pyarrow as pa
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.db.db_helpers import (
+    build_column_projection,
+    get_keyset_index_name,
+    get_table_data_page,
+    get_table_primary_key,
+    get_table_projection,
+    select_table_columns,
+)
+from src.utilities.extract_lambda_utils import (
+    create_data_frame_from_list,
+    create_parquet_metadata,
+)
+from src.utilities.extraction.column_requirements import get_required_columns
+from src.utilities.extraction.row_hash_index import RowHashIndex
+from src.utilities.parquets.create_arrow_schema_from_columns import (
+    create_arrow_schema_from_columns,
+)
+from src.utilities.parquets.create_parquet_from_batches import (
+    create_parquet_from_batches,
+)
+from src.utilities.parquets.create_parquet_from_data_frame import (
+    create_parquet_from_data_frame,
+)
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def extract_table_pages_to_s3(
+    conn: Connection[DictRow],
+    s3_client,
+    bucket_name: str,
+    table_name: str,
+    last_updated: datetime | None = None,
+    last_primary_key: int | None = None,
+    page_size: int = 10000,
+    max_pages: int | None = None,
+    row_hash_index: RowHashIndex | None = None,
+    table_catalog: Dict[str, Any] | None = None,
+    key_prefix: str | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+) -> Generator[dict, None, None]:
+    """
+    Extracts new or updated rows from a table in (last_updated, primary key) order,
+    uploading each page of at most page_size rows to S3 as its own Parquet file.
+
+    Every yielded log entry carries the compound watermark of the last row in its
+    page, so recording entries as they are yielded lets a later run resume from the
+    middle of the table.
+
+    Pages are only index range scans with an index on (last_updated, primary key),
+    see get_table_data_page. A warning is logged for tables without one.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket to upload the files to.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): The last_updated value of the last row already
+            extracted. Extracts the whole table when None.
+        last_primary_key (int | None): The primary key of the last row already
+            extracted. When None, only last_updated is used as the watermark.
+        page_size (int): Maximum number of rows per page.
+        max_pages (int | None): Stop after this many pages, leaving the rest of the
+            table to a later run. No limit when None.
+        row_hash_index (RowHashIndex | None): Drops the rows whose content has not
+            changed since they were indexed.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog, see
+            load_catalog. Gives the primary key, the projection and explicit column
+            types without querying the database. Queried and inferred when None.
+        key_prefix (str | None): Prepended to the S3 keys, the namespace of the source
+            database, see get_source_prefix.
+        compression (str): The codec and optional level of the Parquet files, e.g.
+            "zstd:3", see get_parquet_compression_options.
+
+    Yields:
+        dict: The ingest log entry of each page with table_name, extraction_timestamp,
+        last_updated, last_primary_key, file_name, key, row_count, suppressed_rows and
+        has_more, which is False once the page shows the end of the table has been
+        reached. A page of unchanged rows uploads no file, its file_name and key are
+        None.
+
+    Raises:
+        ValueError: If the table has no single-column primary key or page_size is not
+            a positive integer.
+        Exception: If the extraction or an S3 upload fails.
+    """
+    schema = None
+
+    if table_catalog is None:
+        primary_key = get_table_primary_key(conn, table_name)
+        projection = get_table_projection(
+            conn, table_name, get_required_columns(table_name)
+        )
+    else:
+        primary_key = table_catalog["primary_key"]
+
+        if primary_key is None:
+            raise ValueError(f"Table {table_name} has no single-column primary key")
+
+        columns = select_table_columns(
+            table_name, table_catalog["columns"], get_required_columns(table_name)
+        )
+        projection = build_column_projection(table_name, columns)
+        schema = create_arrow_schema_from_columns(table_name, columns)
+
+    if get_keyset_index_name(conn, table_name, primary_key) is None:
+        logger.warning(
+            f"No index on {table_name} (last_updated, {primary_key}), every page "
+            "scans and sorts the whole table"
+        )
+
+    pages_extracted = 0
+
+    while max_pages is None or pages_extracted < max_pages:
+        page = get_table_data_page(
+            conn,
+            table_name,
+            primary_key,
+            last_updated,
+            last_primary_key,
+            page_size,
+            projection,
+        )
+        extraction_timestamp = datetime.now()
+
+        if not page:
+            break
+
+        last_updated = page[-1]["last_updated"]
+        last_primary_key = page[-1][primary_key]
+
+        if schema is None:
+            page_data = create_data_frame_from_list(page)
+
+            if row_hash_index is not None:
+                page_data = row_hash_index.filter_changed_rows(page_data)
+        else:
+            page_data = pa.Table.from_pylist(page, schema=schema)
+
+            if row_hash_index is not None:
+                page_data = page_data.filter(
+                    pa.array(row_hash_index.get_changed_mask(page_data))
+                )
+
+        filename, key = None, None
+
+        if len(page_data):
+            filename, key = create_parquet_metadata(
+                last_updated,  # type: ignore
+                table_name,
+                suffix=str(last_primary_key),
+                prefix=key_prefix,
+            )
+
+            parquet_file = (
+                create_parquet_from_data_frame(page_data, compression)
+                if schema is None
+                else create_parquet_from_batches(
+                    page_data.to_batches(), schema, compression
+                )
+            )
+            response = add_file_to_s3_bucket(s3_client, bucket_name, key, parquet_file)
+
+            if response.get("error"):
+                raise response["error"]["raw_response"]
+
+        pages_extracted += 1
+        logger.info(
+            f"Extracted page {pages_extracted} of {table_name}: {len(page_data)} of "
+            f"{len(page)} rows changed"
+        )
+
+        yield {
+            "table_name": table_name,
+            "extraction_timestamp": extraction_timestamp,
+            "last_updated": last_updated,
+            "last_primary_key": last_primary_key,
+            "file_name": filename,
+            "key": key,
+            "row_count": len(page_data),
+            "suppressed_rows": len(page) - len(page_data),
+            "has_more": len(page) == page_size,
+        }
+
+        if len(page) < page_size:
+            break
@@ -0,0 +1,311 @@
+import logging
+import math
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Literal
+
+import boto3
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.db.connection import connect_db
+from src.db.db_helpers import (
+    KeyRange,
+    export_snapshot,
+    get_table_key_range_stats,
+    get_table_primary_key,
+    import_snapshot,
+)
+from src.utilities.extraction.extract_table import ExtractionEngine, extract_table
+from src.utilities.extraction.extract_table_to_s3 import create_part_uploader
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PartitionExecutor = Literal["process", "thread"]
+
+
+def plan_key_ranges(
+    primary_key: str, min_key: int, max_key: int, partitions: int
+) -> List[KeyRange]:
+    """
+    Splits the keys from min_key to max_key, inclusive, into contiguous ranges of
+    near equal width.
+
+    Args:
+        primary_key (str): The primary key column the ranges apply to.
+        min_key (int): The lowest key to cover.
+        max_key (int): The highest key to cover.
+        partitions (int): The number of ranges wanted. Fewer are returned when there
+            are fewer keys than partitions.
+
+    Returns:
+        List[KeyRange]: Half-open ranges covering every key from min_key to max_key.
+
+    Raises:
+        ValueError: If partitions is not a positive integer.
+    """
+    if partitions < 1:
+        raise ValueError("partitions must be a positive integer")
+
+    key_count = max_key - min_key + 1
+    range_width = math.ceil(key_count / partitions)
+
+    return [
+        KeyRange(primary_key, start, min(start + range_width, max_key + 1))
+        for start in range(min_key, max_key + 1, range_width)
+    ]
+
+
+def plan_table_partitions(
+    conn: Connection[DictRow],
+    table_name: str,
+    last_updated: datetime | None = None,
+    max_partitions: int = 4,
+    rows_per_partition: int = 100000,
+) -> Dict[str, Any] | None:
+    """
+    Plans the primary key ranges a table delta should be extracted in.
+
+    The delta's rows are counted by the query that finds its key range, see
+    get_table_key_range_stats, which scans the table unless last_updated is indexed.
+    One partition is planned per rows_per_partition rows of the delta, up to
+    max_partitions, so a small delta spread over a wide key range is not split.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        table_name (str): The table to plan.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            planned for.
+        max_partitions (int): The most ranges to split the table into.
+        rows_per_partition (int): The rows below which a delta is not worth
+            splitting further.
+
+    Returns:
+        dict | None: None if the delta is empty or too small to split, otherwise a
+        dictionary with:
+            - key_ranges (List[KeyRange]): The ranges to extract.
+            - last_updated (datetime): The latest 'last_updated' value of the delta.
+            - row_count (int): The number of rows in the delta.
+
+    Raises:
+        ValueError: If the table has no single-column primary key.
+        psycopg.Error: On database errors.
+    """
+    primary_key = get_table_primary_key(conn, table_name)
+    stats = get_table_key_range_stats(conn, table_name, primary_key, last_updated)
+
+    if not stats["row_count"]:
+        return None
+
+    partitions = min(max_partitions, math.ceil(stats["row_count"] / rows_per_partition))
+
+    if partitions < 2:
+        return None
+
+    return {
+        "key_ranges": plan_key_ranges(
+            primary_key, stats["min_key"], stats["max_key"], partitions
+        ),
+        "last_updated": stats["last_updated"],
+        "row_count": stats["row_count"],
+    }
+
+
+def extract_partition_to_s3(
+    bucket_name: str,
+    table_name: str,
+    key_range: KeyRange,
+    key_timestamp: datetime,
+    suffix: str,
+    snapshot_id: str,
+    last_updated: datetime | None = None,
+    engine: ExtractionEngine = "fetchall",
+    batch_size: int = 10000,
+    table_catalog: Dict[str, Any] | None = None,
+    db_source: str = "TOTESYS",
+    compression: str = DEFAULT_COMPRESSION,
+    key_prefix: str | None = None,
+    max_part_bytes: int | None = None,
+) -> List[dict]:
+    """
+    Extracts one key range of a table on its own connection, reading the given
+    exported snapshot, and uploads it to S3 as Parquet parts, each as soon as it is
+    written. Opens its own connection and S3 client so it can run in a worker
+    process.
+
+    Args:
+        bucket_name (str): The ingest zone bucket to upload the parts to.
+        table_name (str): The table to extract.
+        key_range (KeyRange): The key range of this partition.
+        key_timestamp (datetime): The timestamp the keys of the parts are named
+            after, see create_part_uploader.
+        suffix (str): Appended to the filenames of the parts before their number,
+            telling the partitions apart.
+        snapshot_id (str): The snapshot every partition of the table reads.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted.
+        engine (ExtractionEngine): The extraction engine passed to extract_table.
+        batch_size (int): Number of rows per batch for the batched engines.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog,
+            passed to extract_table.
+        db_source (str): The source database to connect to, see get_conninfo.
+        compression (str): The codec and optional level of the Parquet file, e.g.
+            "zstd:3", see get_parquet_compression_options.
+        key_prefix (str | None): Prepended to the S3 keys, see get_source_prefix.
+        max_part_bytes (int | None): The size from which a part is closed and
+            uploaded. None uploads the partition as a single part.
+
+    Returns:
+        List[dict]: The file_name, key and row_count of every uploaded part. Empty
+        when the range holds no row.
+
+    Raises:
+        Exception: If the extraction or the S3 upload fails.
+    """
+    with connect_db(db_source) as conn:
+        import_snapshot(conn, snapshot_id)
+        extraction = extract_table(
+            conn,
+            table_name,
+            last_updated,
+            engine=engine,
+            batch_size=batch_size,
+            key_range=key_range,
+            table_catalog=table_catalog,
+            compression=compression,
+            max_part_bytes=max_part_bytes,
+            upload_part=create_part_uploader(
+                boto3.client("s3"),
+                bucket_name,
+                table_name,
+                key_timestamp,
+                suffix,
+                key_prefix,
+            ),
+        )
+
+    if extraction is None:
+        return []
+
+    return [
+        {**part["upload"], "row_count": part["row_count"]}
+        for part in extraction["parts"]
+    ]
+
+
+def extract_table_partitions_to_s3(
+    conn: Connection[DictRow],
+    bucket_name: str,
+    table_name: str,
+    plan: Dict[str, Any],
+    last_updated: datetime | None = None,
+    engine: ExtractionEngine = "fetchall",
+    batch_size: int = 10000,
+    executor: PartitionExecutor = "thread",
+    table_catalog: Dict[str, Any] | None = None,
+    db_source: str = "TOTESYS",
+    key_prefix: str | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+) -> List[dict]:
+    """
+    Extracts the key ranges of a table plan in parallel and uploads the Parquet
+    parts of every range. All parts read the same snapshot exported from conn, so together they
+    hold the table exactly as a single SELECT would have read it.
+
+    Every part's log entry carries the delta's overall last_updated, so the table's
+    watermark is the same whichever part is recorded last. Parts are only returned
+    once all of them have been uploaded.
+
+    Args:
+        conn (Connection[DictRow]): The coordinating connection the snapshot is
+            exported from. Its transaction must stay open until this returns.
+        bucket_name (str): The ingest zone bucket to upload the parts to.
+        table_name (str): The table to extract.
+        plan (dict): A plan returned by plan_table_partitions.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted.
+        engine (ExtractionEngine): The extraction engine passed to extract_table.
+        batch_size (int): Number of rows per batch for the batched engines.
+        executor (PartitionExecutor): "thread" extracts each range in a worker
+            thread, "process" in a worker process. Defaults to "thread", as AWS
+            Lambda lacks the shared memory process pools need.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog,
+            passed to extract_table.
+        db_source (str): The source database conn is connected to, which the
+            workers connect to as well, see get_conninfo.
+        key_prefix (str | None): Prepended to the S3 keys, the namespace of the source
+            database, see get_source_prefix.
+        compression (str): The codec and optional level of the Parquet files, e.g.
+            "zstd:3", see get_parquet_compression_options.
+        max_part_bytes (int | None): The size from which a part of a range is
+            closed and uploaded. None uploads every range as a single part.
+
+    Returns:
+        List[dict]: The ingest log entry of every part with table_name,
+        extraction_timestamp, last_updated, file_name, key and row_count. Parts
+        are named after the plan's last_updated with a "part{range}-{part}" suffix,
+        see create_part_uploader.
+
+    Raises:
+        ValueError: If the executor is not supported.
+        Exception: The first error raised by a part.
+    """
+    key_ranges: List[KeyRange] = plan["key_ranges"]
+    snapshot_id = export_snapshot(conn)
+    logger.info(
+        f"Extracting {table_name} in {len(key_ranges)} key ranges with {executor} "
+        f"workers using snapshot {snapshot_id}"
+    )
+
+    pool: Executor
+    match executor:
+        case "process":
+            pool = ProcessPoolExecutor(
+                max_workers=len(key_ranges),
+                # forking a process that already runs threads can deadlock
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        case "thread":
+            pool = ThreadPoolExecutor(max_workers=len(key_ranges))
+        case _:
+            raise ValueError(
+                f"Invalid partition executor '{executor}', must be 'process' or 'thread'"
+            )
+
+    with pool:
+        range_parts = list(
+            pool.map(
+                extract_partition_to_s3,
+                [bucket_name] * len(key_ranges),
+                [table_name] * len(key_ranges),
+                key_ranges,
+                [plan["last_updated"]] * len(key_ranges),
+                [f"part{number}" for number in range(len(key_ranges))],
+                [snapshot_id] * len(key_ranges),
+                [last_updated] * len(key_ranges),
+                [engine] * len(key_ranges),
+                [batch_size] * len(key_ranges),
+                [table_catalog] * len(key_ranges),
+                [db_source] * len(key_ranges),
+                [compression] * len(key_ranges),
+                [key_prefix] * len(key_ranges),
+                [max_part_bytes] * len(key_ranges),
+            )
+        )
+
+    extraction_timestamp = datetime.now()
+
+    return [
+        {
+            "table_name": table_name,
+            "extraction_timestamp": extraction_timestamp,
+            "last_updated": plan["last_updated"],
+            **part,
+        }
+        for parts in range_parts
+        for part in parts
+    ]
@@ -0,0 +1,170 @@
+import logging
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Callable, Dict, List
+
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.utilities.extract_lambda_utils import create_parquet_metadata
+from src.utilities.extraction.extract_table import ExtractionEngine, extract_table
+from src.utilities.extraction.row_hash_index import RowHashIndex
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def create_part_uploader(
+    s3_client,
+    bucket_name: str,
+    table_name: str,
+    key_timestamp: datetime,
+    suffix: str = "part",
+    key_prefix: str | None = None,
+) -> Callable[[BytesIO, int], Dict[str, str]]:
+    """
+    Gets an upload_part function for extract_table, uploading every Parquet part of
+    a table to its own key as soon as it is written.
+
+    The parts are uploaded before the rows after them are read, so their keys cannot
+    be named after the extracted last_updated like other ingest files. They are
+    named after key_timestamp instead, with suffix and the part number appended,
+    e.g. "currency_2025-6-13_10-35-20_12345_part-1.parquet".
+
+    Args:
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket to upload the parts to.
+        table_name (str): The extracted table.
+        key_timestamp (datetime): The timestamp the keys are named after, e.g. when
+            the extraction started.
+        suffix (str): Appended to the filenames before the part number.
+        key_prefix (str | None): Prepended to the keys, see create_parquet_metadata.
+
+    Returns:
+        Callable[[BytesIO, int], Dict[str, str]]: The function uploading a part,
+        returning its file_name and key. It raises the S3 error when the upload
+        fails.
+    """
+
+    def upload_part(parquet_file: BytesIO, part_number: int) -> Dict[str, str]:
+        filename, key = create_parquet_metadata(
+            key_timestamp,
+            table_name,
+            suffix=f"{suffix}-{part_number}",
+            prefix=key_prefix,
+        )
+        response = add_file_to_s3_bucket(s3_client, bucket_name, key, parquet_file)
+
+        if response.get("error"):
+            raise response["error"]["raw_response"]
+
+        return {"file_name": filename, "key": key}
+
+    return upload_part
+
+
+def extract_table_to_s3(
+    conn: Connection[DictRow],
+    s3_client,
+    bucket_name: str,
+    table_name: str,
+    last_updated: datetime | None = None,
+    engine: ExtractionEngine = "fetchall",
+    batch_size: int = 10000,
+    row_hash_index: RowHashIndex | None = None,
+    table_catalog: Dict[str, Any] | None = None,
+    key_prefix: str | None = None,
+    compression: str = DEFAULT_COMPRESSION,
+    max_part_bytes: int | None = None,
+    on_batch: Callable[[int, float], Any] | None = None,
+) -> List[dict]:
+    """
+    Extracts new or updated rows from a table and uploads them to S3 as Parquet
+    parts, each as soon as it is written, see create_part_uploader.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The ingest zone bucket to upload the file to.
+        table_name (str): The table to extract.
+        last_updated (datetime | None): Only rows updated after this datetime are
+            extracted. Extracts the whole table when None.
+        engine (ExtractionEngine): The extraction engine passed to extract_table.
+        batch_size (int): Number of rows per batch for the batched engines.
+        row_hash_index (RowHashIndex | None): Drops the rows whose content has not
+            changed since they were indexed.
+        table_catalog (Dict[str, Any] | None): The table's entry in the catalog,
+            passed to extract_table.
+        key_prefix (str | None): Prepended to the S3 keys, the namespace of the source
+            database, see get_source_prefix.
+        compression (str): The codec and optional level of the Parquet file, e.g.
+            "zstd:3", see get_parquet_compression_options.
+        max_part_bytes (int | None): The size from which a part is closed and
+            uploaded, and the next rows go to a new one. None uploads a single part
+            once the whole table is written.
+        on_batch (Callable[[int, float], Any] | None): Called with the rows and
+            seconds of every batch of the batched engines, see extract_table.
+
+    Returns:
+        List[dict]: Empty if there is no new data, otherwise the ingest log entry of
+        every part with table_name, extraction_timestamp, last_updated, file_name,
+        key, row_count and suppressed_rows. Every entry carries the table's overall
+        last_updated, and the first its suppressed_rows. When every row was
+        unchanged, no file is uploaded and the single entry has no file_name and
+        key, it only moves the watermark forward.
+
+    Raises:
+        Exception: If the extraction or the S3 upload fails.
+    """
+    extraction = extract_table(
+        conn,
+        table_name,
+        last_updated,
+        engine=engine,
+        batch_size=batch_size,
+        row_hash_index=row_hash_index,
+        table_catalog=table_catalog,
+        compression=compression,
+        max_part_bytes=max_part_bytes,
+        upload_part=create_part_uploader(
+            s3_client, bucket_name, table_name, datetime.now(), key_prefix=key_prefix
+        ),
+        on_batch=on_batch,
+    )
+    extraction_timestamp = datetime.now()
+
+    if extraction is None:
+        logger.info(f"No new data to extract from table: {table_name}")
+        return []
+
+    new_table_data_last_updated: datetime = extraction["last_updated"]
+
+    if not extraction["parts"]:
+        logger.info(f"Every extracted row of {table_name} is unchanged")
+        return [
+            {
+                "table_name": table_name,
+                "extraction_timestamp": extraction_timestamp,
+                "last_updated": new_table_data_last_updated,
+                "file_name": None,
+                "key": None,
+                "row_count": 0,
+                "suppressed_rows": extraction["suppressed_rows"],
+            }
+        ]
+
+    return [
+        {
+            "table_name": table_name,
+            "extraction_timestamp": extraction_timestamp,
+            "last_updated": new_table_data_last_updated,
+            **part["upload"],
+            "row_count": part["row_count"],
+            "suppressed_rows": (
+                extraction.get("suppressed_rows", 0) if part["part_number"] == 1 else 0
+            ),
+        }
+        for part in extraction["parts"]
+    ]
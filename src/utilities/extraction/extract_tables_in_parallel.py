@@ -0,0 +1,161 @@
+import logging
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, ExitStack
+from queue import Queue
+from time import perf_counter
+from typing import Any, Callable, Dict, Generator, List
+
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.db.connection import connect_db
+from src.db.db_helpers import export_snapshot, import_snapshot
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def timed_extraction(
+    conn: Connection[DictRow],
+    table_name: str,
+    extract_func: Callable[[Connection[DictRow], str], Any],
+) -> Dict[str, Any]:
+    """
+    Runs an extraction function for a single table and measures how long it takes.
+
+    Args:
+        conn (Connection[DictRow]): The connection the extraction runs on.
+        table_name (str): The table to extract.
+        extract_func (Callable): Called as extract_func(conn, table_name).
+
+    Returns:
+        dict: table_name, the extraction result and duration_seconds.
+    """
+    start = perf_counter()
+    result = extract_func(conn, table_name)
+    duration = perf_counter() - start
+
+    logger.info(f"Extracted {table_name} in {duration:.3f}s")
+
+    return {
+        "table_name": table_name,
+        "result": result,
+        "duration_seconds": duration,
+    }
+
+
+def extract_tables_in_parallel(
+    conn: Connection[DictRow],
+    table_names: List[str],
+    extract_func: Callable[[Connection[DictRow], str], Any],
+    concurrency: int = 4,
+    connect_func: Callable[
+        [], AbstractContextManager[Connection[DictRow]]
+    ] = lambda: connect_db("TOTESYS"),
+) -> Generator[Dict[str, Any], None, None]:
+    """
+    Extracts several tables concurrently on a small pool of worker connections that
+    all read the same exported snapshot, so the extract is transactionally consistent
+    across tables exactly as if it ran on a single connection.
+
+    The snapshot is exported from conn, whose transaction must stay open until this
+    generator is exhausted.
+
+    Args:
+        conn (Connection[DictRow]): The coordinating connection the snapshot is
+            exported from.
+        table_names (List[str]): The tables to extract.
+        extract_func (Callable): Called as extract_func(worker_conn, table_name) on a
+            worker thread for each table.
+        concurrency (int): Number of worker connections and threads.
+        connect_func (Callable): Returns a worker connection as a context manager,
+            exited once every table is extracted, e.g. a new connection, which is
+            closed, or a connection borrowed from resources, which goes back to its
+            pool.
+
+    Yields:
+        dict: table_name, result and duration_seconds for each table, in completion
+        order.
+
+    Raises:
+        ValueError: If concurrency is not a positive integer.
+        Exception: The first error raised by an extraction. Pending extractions are
+            cancelled.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be a positive integer")
+
+    if not table_names:
+        return
+
+    worker_count = min(concurrency, len(table_names))
+    snapshot_id = export_snapshot(conn)
+    logger.info(
+        f"Extracting {len(table_names)} tables on {worker_count} connections "
+        f"using snapshot {snapshot_id}"
+    )
+
+    worker_conns: Queue[Connection[DictRow]] = Queue()
+
+    def run(table_name: str) -> Dict[str, Any]:
+        worker_conn = worker_conns.get()
+        try:
+            return timed_extraction(worker_conn, table_name, extract_func)
+        finally:
+            worker_conns.put(worker_conn)
+
+    with ExitStack() as stack:
+        for _ in range(worker_count):
+            worker_conn = stack.enter_context(connect_func())
+            import_snapshot(worker_conn, snapshot_id)
+            worker_conns.put(worker_conn)
+
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            pending = {executor.submit(run, table_name) for table_name in table_names}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_EXCEPTION)
+
+                for future in done:
+                    if future.exception():
+                        for pending_future in pending:
+                            pending_future.cancel()
+                        raise future.exception()  # type: ignore
+
+                    yield future.result()
+
+
+def get_extraction_metrics(
+    extractions: List[Dict[str, Any]], wall_time_seconds: float, concurrency: int
+) -> Dict[str, Any]:
+    """
+    Summarises per-table extraction timings and the speed-up over running them
+    one after the other.
+
+    Args:
+        extractions (List[dict]): Items yielded by extract_tables_in_parallel or
+            timed_extraction.
+        wall_time_seconds (float): Elapsed time of the whole extraction.
+        concurrency (int): The concurrency level used.
+
+    Returns:
+        dict: concurrency, wall_time_seconds, table_durations_seconds,
+        total_table_seconds and speed_up (total_table_seconds / wall_time_seconds).
+    """
+    table_durations = {
+        extraction["table_name"]: round(extraction["duration_seconds"], 3)
+        for extraction in extractions
+    }
+    total_table_seconds = sum(
+        extraction["duration_seconds"] for extraction in extractions
+    )
+
+    return {
+        "concurrency": concurrency,
+        "wall_time_seconds": round(wall_time_seconds, 3),
+        "table_durations_seconds": table_durations,
+        "total_table_seconds": round(total_table_seconds, 3),
+        "speed_up": round(total_table_seconds / wall_time_seconds, 2)
+        if wall_time_seconds
+        else None,
+    }
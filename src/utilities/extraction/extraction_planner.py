@@ -0,0 +1,229 @@
+import heapq
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# what a table costs before any of its rows are read: the probe, the query
+# round trips and the upload
+TABLE_OVERHEAD_SECONDS = 0.05
+
+# used until a table's own rate has been measured
+DEFAULT_SECONDS_PER_ROW = 2e-5
+
+# runs of fewer rows are dominated by the overhead and say little about the rate
+MIN_ROWS_TO_LEARN = 1000
+
+# weight of the latest run in the learnt rate, the rest is the previous rate
+HISTORY_WEIGHT = 0.5
+
+
+def estimate_table_rows(
+    table_stats: Dict[str, int] | None,
+    table_history: Dict[str, Any] | None,
+    watermark: Dict[str, Any] | None,
+) -> int:
+    """
+    Estimates the rows the next extraction of a table will read.
+
+    A table never extracted is read whole, so its size is used. Otherwise the rows
+    inserted and updated since the previous run are the difference between the
+    pg_stat_user_tables counters now and the ones recorded in its history. Without
+    a recorded counter, or after the statistics were reset, every change counted so
+    far is used, at most the size of the table.
+
+    Args:
+        table_stats (dict | None): The table's get_table_change_stats entry.
+        table_history (dict | None): The table's entry in the extraction history.
+        watermark (dict | None): The table's entry in the ingest state.
+
+    Returns:
+        int: The estimated rows, 0 if the table has no statistics.
+    """
+    if not table_stats:
+        return 0
+
+    table_rows = max(table_stats["estimated_rows"], table_stats["live_rows"], 0)
+
+    if not (watermark or {}).get("last_updated"):
+        return table_rows
+
+    changed_rows = table_stats["changed_rows"]
+    previous_changed_rows = (table_history or {}).get("changed_rows")
+
+    if previous_changed_rows is not None and changed_rows >= previous_changed_rows:
+        return changed_rows - previous_changed_rows
+
+    return min(changed_rows, table_rows)
+
+
+def estimate_table_seconds(rows: int, table_history: Dict[str, Any] | None) -> float:
+    """
+    Estimates how long extracting a number of rows of a table takes, at the rate
+    measured in its previous runs.
+
+    Args:
+        rows (int): The rows to extract.
+        table_history (dict | None): The table's entry in the extraction history.
+
+    Returns:
+        float: The estimated seconds.
+    """
+    seconds_per_row = (table_history or {}).get(
+        "seconds_per_row", DEFAULT_SECONDS_PER_ROW
+    )
+
+    return TABLE_OVERHEAD_SECONDS + rows * seconds_per_row
+
+
+def plan_extraction(
+    table_names: List[str],
+    table_stats: Dict[str, Dict[str, int]],
+    watermarks: Dict[str, Dict[str, Any]],
+    history: Dict[str, Dict[str, Any]],
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """
+    Orders tables for extraction by their estimated cost, largest first.
+
+    Handing the tables out in this order to whichever worker frees up first is the
+    longest processing time (LPT) schedule, which keeps a large table from starting
+    last and running alone at the end of the run. Its makespan is within 4/3 of the
+    best possible one. The predicted worker of every table is simulated the same
+    way, assigning each table to the least loaded worker.
+
+    Args:
+        table_names (List[str]): The tables to extract.
+        table_stats (dict): get_table_change_stats of the tables.
+        watermarks (dict): The ingest state entry of each table.
+        history (dict): The extraction history of each table, see
+            record_extraction_history.
+        workers (int): The number of tables extracted at a time.
+
+    Returns:
+        dict: A dictionary with:
+            - order (List[str]): The tables, largest estimated cost first.
+            - workers (int): The number of workers planned for.
+            - tables (dict): The estimated rows, seconds and worker of each table.
+            - predicted_seconds (float): The predicted duration of the whole run.
+
+    Raises:
+        ValueError: If workers is not a positive integer.
+    """
+    if workers < 1:
+        raise ValueError("workers must be a positive integer")
+
+    tables = {}
+
+    for table_name in table_names:
+        rows = estimate_table_rows(
+            table_stats.get(table_name),
+            history.get(table_name),
+            watermarks.get(table_name),
+        )
+        tables[table_name] = {
+            "rows": rows,
+            "seconds": round(estimate_table_seconds(rows, history.get(table_name)), 3),
+        }
+
+    order = sorted(table_names, key=lambda name: (-tables[name]["seconds"], name))
+    worker_loads = [(0.0, worker) for worker in range(workers)]
+
+    for table_name in order:
+        load, worker = heapq.heappop(worker_loads)
+        tables[table_name]["worker"] = worker
+        heapq.heappush(worker_loads, (load + tables[table_name]["seconds"], worker))
+
+    return {
+        "order": order,
+        "workers": workers,
+        "tables": tables,
+        "predicted_seconds": round(max(load for load, _ in worker_loads), 3),
+    }
+
+
+def record_extraction_history(
+    history: Dict[str, Dict[str, Any]],
+    table_name: str,
+    table_stats: Dict[str, int] | None,
+    rows: int,
+    seconds: float,
+) -> None:
+    """
+    Records a table's extraction in the history the next plans are estimated from.
+    Mutates the history in place.
+
+    The change counter sampled before the extraction becomes the baseline of the
+    next estimate, so rows changed during the run are counted by the next one. The
+    rate per row is a moving average over the runs that read enough rows to measure
+    it.
+
+    Args:
+        history (dict): The extraction history of each table.
+        table_name (str): The extracted table.
+        table_stats (dict | None): The table's get_table_change_stats entry sampled
+            when the extraction was planned.
+        rows (int): The rows read, including suppressed ones.
+        seconds (float): How long the extraction took.
+
+    Returns:
+        None
+    """
+    table_history = history.setdefault(table_name, {})
+
+    if table_stats:
+        table_history["changed_rows"] = table_stats["changed_rows"]
+
+    table_history["rows"] = rows
+    table_history["seconds"] = round(seconds, 3)
+
+    if rows >= MIN_ROWS_TO_LEARN:
+        seconds_per_row = max(seconds - TABLE_OVERHEAD_SECONDS, 0) / rows
+        previous_seconds_per_row = table_history.get("seconds_per_row")
+
+        if previous_seconds_per_row is not None:
+            seconds_per_row = (
+                HISTORY_WEIGHT * seconds_per_row
+                + (1 - HISTORY_WEIGHT) * previous_seconds_per_row
+            )
+
+        table_history["seconds_per_row"] = seconds_per_row
+
+
+def get_plan_report(
+    plan: Dict[str, Any],
+    extractions: List[Dict[str, Any]],
+    wall_time_seconds: float,
+) -> Dict[str, Any]:
+    """
+    Compares a plan with how the extraction actually went.
+
+    Args:
+        plan (dict): The plan returned by plan_extraction.
+        extractions (List[dict]): The completed extractions, each with table_name,
+            duration_seconds and the rows it read as rows.
+        wall_time_seconds (float): Elapsed time of the whole extraction.
+
+    Returns:
+        dict: The order, workers, predicted_seconds and actual_seconds of the run,
+        and the predicted and actual rows and seconds of every extracted table.
+    """
+    tables = {
+        extraction["table_name"]: {
+            "predicted_rows": plan["tables"][extraction["table_name"]]["rows"],
+            "actual_rows": extraction["rows"],
+            "predicted_seconds": plan["tables"][extraction["table_name"]]["seconds"],
+            "actual_seconds": round(extraction["duration_seconds"], 3),
+        }
+        for extraction in extractions
+        if extraction["table_name"] in plan["tables"]
+    }
+
+    return {
+        "order": plan["order"],
+        "workers": plan["workers"],
+        "predicted_seconds": plan["predicted_seconds"],
+        "actual_seconds": round(wall_time_seconds, 3),
+        "tables": tables,
+    }
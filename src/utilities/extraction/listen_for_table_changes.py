@@ -0,0 +1,75 @@
+import logging
+from time import monotonic
+from typing import Iterator, List
+
+from psycopg import Connection, sql
+from psycopg.rows import DictRow
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def listen_for_table_changes(
+    conn: Connection[DictRow],
+    channel: str,
+    quiet_seconds: float = 1.0,
+    max_delay_seconds: float = 10.0,
+    idle_timeout: float | None = None,
+) -> Iterator[List[str]]:
+    """
+    LISTEN on a channel whose notifications carry table names and yield the touched
+    tables in batches.
+
+    Notifications are coalesced: a batch is yielded once no notification arrived for
+    quiet_seconds, or max_delay_seconds after its first notification at the latest, so
+    a steady stream of writes still gets extracted. Notifications that arrive while
+    the caller processes a batch are buffered by the connection and go into the next.
+
+    Args:
+        conn: An autocommit database connection, notifications are only delivered
+            outside of transactions.
+        channel: The channel to listen on.
+        quiet_seconds: How long the channel must be quiet before a batch is yielded.
+        max_delay_seconds: The longest a notification waits before its batch is
+            yielded.
+        idle_timeout: Stop after this many seconds without any notification. Listens
+            forever when None.
+
+    Yields:
+        The sorted names of the tables notified since the previous batch.
+
+    Raises:
+        ValueError: If the connection is not in autocommit mode.
+        psycopg.Error: On database errors.
+    """
+    if not conn.autocommit:
+        raise ValueError("listen_for_table_changes needs an autocommit connection")
+
+    conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+    logger.info(f"Listening for table changes on {channel}")
+
+    touched_tables: set[str] = set()
+    deadline = None
+
+    while True:
+        timeout = quiet_seconds if touched_tables else idle_timeout
+
+        if deadline is not None:
+            timeout = max(min(timeout, deadline - monotonic()), 0)  # type: ignore
+
+        received = False
+
+        for notify in conn.notifies(timeout=timeout, stop_after=1):
+            received = True
+            touched_tables.add(notify.payload)
+
+            if deadline is None:
+                deadline = monotonic() + max_delay_seconds
+
+        if touched_tables and (not received or monotonic() >= deadline):  # type: ignore
+            yield sorted(touched_tables)
+            touched_tables = set()
+            deadline = None
+
+        elif not received and not touched_tables:
+            return
@@ -0,0 +1,310 @@
+import logging
+from io import BytesIO
+from typing import List, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utilities.parquets.create_arrow_table_from_parquet import (
+    create_arrow_table_from_parquet,
+)
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+from src.utilities.s3.get_file_from_s3_bucket import get_file_from_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ROW_HASH_PREFIX = "row_hashes"
+
+# bumped by touch-updates without any business change, so never hashed
+AUDIT_COLUMNS = ("created_at", "last_updated")
+
+NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash_column(column: pa.Array | pa.ChunkedArray) -> np.ndarray:
+    """
+    Hashes every value of an Arrow column to a uint64.
+
+    Values are hashed by what they are rather than how they happen to be stored:
+    integers are hashed as int64, so bigints differing beyond the precision of a
+    float still hash differently, and floats holding whole numbers are hashed like
+    the same integers, so a column pandas turned into floats because of a NULL
+    hashes like the integer column. Timestamps are hashed in nanoseconds. Other types
+    are hashed as text, once per distinct value.
+
+    Args:
+        column (pa.Array | pa.ChunkedArray): The column to hash.
+
+    Returns:
+        np.ndarray: One uint64 hash per value, NULLs all hash to NULL_HASH.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+
+    column_type = column.type
+
+    if pa.types.is_integer(column_type) or pa.types.is_boolean(column_type):
+        hashes = pd.util.hash_array(column.cast(pa.int64()).fill_null(0).to_numpy())
+    elif pa.types.is_floating(column_type):
+        values = column.cast(pa.float64()).fill_null(0).to_numpy()
+        whole = (np.trunc(values) == values) & (np.abs(values) < 2.0**63)
+        hashes = pd.util.hash_array(values)
+        hashes[whole] = pd.util.hash_array(values[whole].astype(np.int64))
+    elif pa.types.is_timestamp(column_type):
+        values = column.cast(pa.timestamp("ns", tz=column_type.tz))
+        hashes = pd.util.hash_array(values.view(pa.int64()).fill_null(0).to_numpy())
+    elif pa.types.is_date32(column_type):
+        hashes = pd.util.hash_array(
+            column.view(pa.int32()).fill_null(0).to_numpy().astype(np.int64)
+        )
+    else:
+        encoded = column.cast(pa.string()).dictionary_encode()
+        distinct_hashes = pd.util.hash_array(
+            encoded.dictionary.to_numpy(zero_copy_only=False).astype(object)
+        )
+        indices = encoded.indices.fill_null(0).to_numpy()
+        hashes = (
+            distinct_hashes[indices]
+            if len(distinct_hashes)
+            else np.zeros(len(column), dtype=np.uint64)
+        )
+
+    if column.null_count:
+        hashes = np.where(
+            column.is_null().to_numpy(zero_copy_only=False), NULL_HASH, hashes
+        )
+
+    return hashes
+
+
+def hash_rows(table: pa.Table | pa.RecordBatch, columns: Sequence[str]) -> np.ndarray:
+    """
+    Hashes the values of the given columns of every row, column by column, so no row
+    objects are ever built.
+
+    Args:
+        table (pa.Table | pa.RecordBatch): The rows to hash.
+        columns (Sequence[str]): The columns that make up a row's content.
+
+    Returns:
+        np.ndarray: One uint64 hash per row.
+    """
+    row_hashes = np.zeros(table.num_rows, dtype=np.uint64)
+
+    for name in columns:
+        # multiplying first makes the hash depend on the column order
+        row_hashes = row_hashes * np.uint64(1000003) ^ hash_column(table.column(name))
+
+    return row_hashes
+
+
+class RowHashIndex:
+    """
+    A primary key to row hash index of one table, to drop rows whose content has not
+    changed since they were last extracted, like the rows of touch-updates that only
+    move last_updated forward.
+
+    The index is kept as two aligned arrays sorted by key, about 12 bytes per row,
+    and lookups are binary searches. Rows let through are only added to the index
+    when it is saved, which must happen after their files and the ingest state are
+    saved: an index ahead of the state would drop rows that never reached the
+    pipeline, while an index behind it only lets a few unchanged rows through.
+
+    Usage:
+        index = RowHashIndex.load(s3_client, bucket_name, "staff", "staff_id")
+        changed_df = index.filter_changed_rows(staff_df)
+        ...upload changed_df and save the state...
+        index.save(s3_client, bucket_name)
+
+    Args:
+        table_name: The table the index belongs to.
+        key_column: The table's integer primary key column.
+        keys: The sorted keys of the saved index.
+        hashes: The row hash of each key.
+        key_prefix: Prepended to the index's S3 key, the namespace of the source
+            database, see get_source_prefix.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        key_column: str,
+        keys: np.ndarray | None = None,
+        hashes: np.ndarray | None = None,
+        key_prefix: str | None = None,
+    ):
+        self.table_name = table_name
+        self.key_column = key_column
+        self.key_prefix = key_prefix
+        self.keys = keys if keys is not None else np.empty(0, dtype=np.int64)
+        self.hashes = hashes if hashes is not None else np.empty(0, dtype=np.uint64)
+        self.suppressed_rows = 0
+        self._pending_keys: List[np.ndarray] = []
+        self._pending_hashes: List[np.ndarray] = []
+
+    @staticmethod
+    def get_key(table_name: str, key_prefix: str | None = None) -> str:
+        key = f"{ROW_HASH_PREFIX}/{table_name}.parquet"
+
+        return f"{key_prefix}/{key}" if key_prefix else key
+
+    @classmethod
+    def load(
+        cls,
+        s3_client,
+        bucket_name: str,
+        table_name: str,
+        key_column: str,
+        key_prefix: str | None = None,
+    ) -> "RowHashIndex":
+        """
+        Load the saved index of a table, or an empty one if it has none yet.
+
+        Args:
+            s3_client: A boto3 S3 client.
+            bucket_name: The ingest zone bucket.
+            table_name: The table of the index.
+            key_column: The table's integer primary key column.
+            key_prefix: The namespace of the source database, if any.
+
+        Returns:
+            The table's index.
+
+        Raises:
+            Exception: For any S3 error other than a missing index.
+        """
+        response = get_file_from_s3_bucket(
+            s3_client, bucket_name, cls.get_key(table_name, key_prefix)
+        )
+
+        if response.get("error"):
+            if response["error"]["message"].startswith("NoSuchKey"):
+                return cls(table_name, key_column, key_prefix=key_prefix)
+
+            raise Exception(response["error"]["message"])
+
+        saved = create_arrow_table_from_parquet(response["success"]["data"])
+
+        return cls(
+            table_name,
+            key_column,
+            saved.column("key").to_numpy(),
+            saved.column("hash").to_numpy(),
+            key_prefix,
+        )
+
+    def get_changed_mask(self, table: pa.Table | pa.RecordBatch) -> np.ndarray:
+        """
+        Find the rows that are new or whose content changed since they were indexed,
+        and queue their hashes to be indexed on the next save.
+
+        Args:
+            table: Rows of the table, with its key column.
+
+        Returns:
+            A boolean mask of the rows to keep.
+        """
+        columns = [
+            name
+            for name in table.schema.names
+            if name not in AUDIT_COLUMNS and name != self.key_column
+        ]
+        row_hashes = hash_rows(table, columns)
+        keys = table.column(self.key_column).to_numpy(zero_copy_only=False)
+
+        changed = np.ones(len(keys), dtype=bool)
+
+        if len(self.keys):
+            positions = np.searchsorted(self.keys, keys)
+            np.minimum(positions, len(self.keys) - 1, out=positions)
+            changed = (self.keys[positions] != keys) | (
+                self.hashes[positions] != row_hashes
+            )
+
+        self._pending_keys.append(keys[changed].astype(np.int64))
+        self._pending_hashes.append(row_hashes[changed])
+        self.suppressed_rows += int(len(keys) - changed.sum())
+
+        return changed
+
+    def filter_changed_rows(self, data_frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop the unchanged rows of a DataFrame, see get_changed_mask.
+
+        Args:
+            data_frame: Rows of the table, with its key column.
+
+        Returns:
+            The new and changed rows.
+        """
+        changed = self.get_changed_mask(
+            pa.Table.from_pandas(data_frame, preserve_index=False)
+        )
+
+        return data_frame[changed].reset_index(drop=True)
+
+    def filter_changed_batch(self, batch: pa.RecordBatch) -> pa.RecordBatch:
+        """
+        Drop the unchanged rows of a record batch, see get_changed_mask.
+
+        Args:
+            batch: Rows of the table, with its key column.
+
+        Returns:
+            The new and changed rows.
+        """
+        return batch.filter(pa.array(self.get_changed_mask(batch)))
+
+    def save(self, s3_client, bucket_name: str) -> int:
+        """
+        Merge the hashes of the rows let through since loading into the index and
+        save it. Does nothing if no row was let through.
+
+        Args:
+            s3_client: A boto3 S3 client.
+            bucket_name: The ingest zone bucket.
+
+        Returns:
+            The size of the saved index in bytes, 0 if nothing was saved.
+
+        Raises:
+            Exception: If the S3 upload fails.
+        """
+        if not sum(len(keys) for keys in self._pending_keys):
+            return 0
+
+        # later rows of a key replace earlier ones, np.unique keeps the first
+        # occurrence so the newest hashes go first
+        all_keys = np.concatenate([*reversed(self._pending_keys), self.keys])
+        all_hashes = np.concatenate([*reversed(self._pending_hashes), self.hashes])
+        self.keys, first_positions = np.unique(all_keys, return_index=True)
+        self.hashes = all_hashes[first_positions]
+        self._pending_keys, self._pending_hashes = [], []
+
+        index_file = BytesIO()
+        pq.write_table(
+            pa.table({"key": self.keys, "hash": self.hashes}),
+            index_file,
+            compression="zstd",
+            use_dictionary=False,
+            column_encoding={"key": "DELTA_BINARY_PACKED"},
+        )
+
+        response = add_file_to_s3_bucket(
+            s3_client,
+            bucket_name,
+            self.get_key(self.table_name, self.key_prefix),
+            index_file.getvalue(),
+        )
+
+        if response.get("error"):
+            raise response["error"]["raw_response"]
+
+        logger.info(
+            f"Saved the row hash index of {self.table_name}: {len(self.keys)} keys"
+        )
+
+        return index_file.tell()
@@ -1,6 +1,24 @@
 import pandas as pd
 
 
+def to_date_column(column: pd.Series) -> pd.Series:
+    """
+    Converts a column to python dates. Columns already holding dates, as extracted
+    through the date projection of the OLTP varchar date columns, are returned as they
+    are, while ISO strings from files extracted before it are parsed.
+
+    Args:
+        column (pd.Series): A column of dates, ISO date strings or timestamps.
+
+    Returns:
+        pd.Series: The column as python dates.
+    """
+    if pd.api.types.infer_dtype(column, skipna=True) == "date":
+        return column
+
+    return pd.to_datetime(column).dt.date
+
+
 def create_fact_sales_order_from_df(data_frame: pd.DataFrame) -> pd.DataFrame:
     """
     Transforms the sales order DataFrame by converting datetime columns to separate
@@ -8,8 +26,9 @@ def create_fact_sales_order_from_df(data_frame: pd.DataFrame) -> pd.DataFrame:
 
     Args:
         data_frame (pd.DataFrame): Raw sales order DataFrame with columns including
-                                   'created_at', 'last_updated', 'agreed_payment_date',
-                                   'agreed_delivery_date', and 'staff_id'.
+                                   'source', 'created_at', 'last_updated',
+                                   'agreed_payment_date', 'agreed_delivery_date', and
+                                   'staff_id'.
 
     Returns:
         pd.DataFrame: Transformed DataFrame with split date/time columns and renamed staff_id.
@@ -29,13 +48,13 @@ def create_fact_sales_order_from_df(data_frame: pd.DataFrame) -> pd.DataFrame:
         fact_sales_order_df["last_updated"]
     ).dt.date
 
-    fact_sales_order_df["agreed_payment_date"] = pd.to_datetime(
+    fact_sales_order_df["agreed_payment_date"] = to_date_column(
         fact_sales_order_df["agreed_payment_date"]
-    ).dt.date
+    )
 
-    fact_sales_order_df["agreed_delivery_date"] = pd.to_datetime(
+    fact_sales_order_df["agreed_delivery_date"] = to_date_column(
         fact_sales_order_df["agreed_delivery_date"]
-    ).dt.date
+    )
 
     fact_sales_order_df["created_time"] = pd.to_datetime(
         fact_sales_order_df["created_at"]
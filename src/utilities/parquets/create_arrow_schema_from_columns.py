@@ -0,0 +1,48 @@
+import logging
+from typing import List
+
+import pyarrow as pa
+
+from src.db.db_helpers import get_projected_type_name
+from src.utilities.parquets.create_arrow_schema_from_description import (
+    PG_TYPE_TO_ARROW,
+)
+from src.utilities.parquets.table_schemas import get_source_table_schema
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def create_arrow_schema_from_columns(table_name: str, columns: List[dict]) -> pa.Schema:
+    """
+    Builds the Arrow schema of a table's extraction from its catalog column types,
+    without querying the database. Columns are typed as the extraction projection
+    selects them, so the schema matches the one create_arrow_schema_from_description
+    builds from the projected query, and the table's low cardinality string columns
+    are dictionary encoded, see get_source_table_schema.
+
+    Args:
+        table_name (str): The table the columns belong to.
+        columns (List[dict]): The extracted columns in order, as dicts with
+            column_name and udt_name as in information_schema.columns.
+
+    Returns:
+        pa.Schema: An Arrow schema with one nullable field per column. Unknown
+        Postgres types fall back to string.
+    """
+    fields = []
+
+    for column in columns:
+        type_name = get_projected_type_name(table_name, column)
+        arrow_type = PG_TYPE_TO_ARROW.get(type_name)
+
+        if arrow_type is None:
+            logger.warning(
+                f"No Arrow mapping for Postgres type '{type_name}' in column "
+                f"'{column['column_name']}', falling back to string."
+            )
+            arrow_type = pa.string()
+
+        fields.append(pa.field(column["column_name"], arrow_type))
+
+    return get_source_table_schema(table_name, pa.schema(fields))
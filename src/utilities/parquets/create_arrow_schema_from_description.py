@@ -0,0 +1,86 @@
+import logging
+from typing import Sequence
+
+import pyarrow as pa
+from psycopg import Column, postgres
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Integers are widened to int64 and timestamps kept in nanoseconds so files written
+# from record batches match the ones pandas writes for the same table.
+PG_TYPE_TO_ARROW = {
+    "bool": pa.bool_(),
+    "int2": pa.int64(),
+    "int4": pa.int64(),
+    "int8": pa.int64(),
+    "float4": pa.float64(),
+    "float8": pa.float64(),
+    "text": pa.string(),
+    "varchar": pa.string(),
+    "bpchar": pa.string(),
+    "name": pa.string(),
+    "uuid": pa.string(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("ns"),
+    "timestamptz": pa.timestamp("ns", tz="UTC"),
+}
+
+DEFAULT_NUMERIC_PRECISION = 38
+DEFAULT_NUMERIC_SCALE = 18
+
+
+def get_arrow_type_from_column(column: Column) -> pa.DataType:
+    """
+    Maps a single psycopg column description to an Arrow data type.
+
+    Args:
+        column (Column): A column from a psycopg cursor description.
+
+    Returns:
+        pa.DataType: The Arrow type used to store the column. Unknown Postgres types
+        fall back to string.
+    """
+    type_info = postgres.types.get(column.type_code)
+    type_name = type_info.name if type_info else None
+
+    if type_name == "numeric":
+        precision = column.precision or DEFAULT_NUMERIC_PRECISION
+        scale = column.scale if column.precision else DEFAULT_NUMERIC_SCALE
+        arrow_type = pa.decimal128(precision, scale or 0)
+    else:
+        arrow_type = PG_TYPE_TO_ARROW.get(type_name)
+
+    if arrow_type is None:
+        logger.warning(
+            f"No Arrow mapping for Postgres type '{type_name}' in column "
+            f"'{column.name}', falling back to string."
+        )
+        arrow_type = pa.string()
+
+    if type_info and column.type_code == type_info.array_oid:
+        return pa.list_(arrow_type)
+
+    return arrow_type
+
+
+def create_arrow_schema_from_description(description: Sequence[Column]) -> pa.Schema:
+    """
+    Builds an Arrow schema from a psycopg cursor description.
+
+    Deriving the schema from the database column types, rather than inferring it from
+    the values, keeps every batch of a streamed table on the same schema even when a
+    batch only contains NULLs for a nullable column.
+
+    Args:
+        description (Sequence[Column]): The cursor description of the query.
+
+    Returns:
+        pa.Schema: An Arrow schema with one nullable field per column.
+    """
+    return pa.schema(
+        [
+            pa.field(column.name, get_arrow_type_from_column(column))
+            for column in description
+        ]
+    )
@@ -0,0 +1,41 @@
+from typing import List
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+ParquetFilters = pc.Expression | List[tuple] | List[List[tuple]]
+
+
+def create_arrow_table_from_parquet(
+    parquet_file: bytes | pa.Buffer,
+    columns: List[str] | None = None,
+    filters: ParquetFilters | None = None,
+) -> pa.Table:
+    """
+    Reads a Parquet file held in memory into an Arrow table, without copying it.
+
+    The bytes are wrapped in an Arrow buffer the reader slices, instead of a file
+    object it copies every page out of. Only the selected columns are decoded, and
+    row groups whose statistics rule out every row of the filter are skipped before
+    the remaining rows are filtered.
+
+    Args:
+        parquet_file (bytes | pa.Buffer): The contents of a Parquet file, e.g. an S3
+            object body.
+        columns (List[str] | None): The columns to read, in order. Every column
+            when None.
+        filters (ParquetFilters | None): Only the rows matching this filter are
+            read, either a pyarrow.compute expression or predicates in the
+            disjunctive normal form of pq.read_table, e.g.
+            [("last_updated", ">", datetime(2025, 1, 1))].
+
+    Returns:
+        pa.Table: The selected columns and rows.
+
+    Raises:
+        pa.ArrowInvalid: If the file is not valid Parquet or a column is missing.
+    """
+    return pq.read_table(
+        pa.BufferReader(parquet_file), columns=columns, filters=filters
+    )
@@ -1,14 +1,30 @@
-from io import BytesIO
+from typing import List, Literal
 
 import pandas as pd
 
+from src.utilities.parquets.create_arrow_table_from_parquet import (
+    ParquetFilters,
+    create_arrow_table_from_parquet,
+)
 
-def create_data_frame_from_parquet(parquet_file) -> pd.DataFrame:
+
+def create_data_frame_from_parquet(
+    parquet_file,
+    columns: List[str] | None = None,
+    filters: ParquetFilters | None = None,
+    dtype_backend: Literal["numpy", "pyarrow"] = "numpy",
+) -> pd.DataFrame:
     """
     Converts a Parquet file in bytes into a Pandas DataFrame.
 
     Args:
-    parquet_file (bytes): The contents of a Parquet file as a byte object.
+    parquet_file (bytes | pa.Buffer): The contents of a Parquet file, read without
+    copying, see create_arrow_table_from_parquet.
+    columns (List[str] | None): The columns to read. Every column when None.
+    filters (ParquetFilters | None): Only the rows matching this filter are read.
+    dtype_backend (str): "numpy" converts the columns to the dtypes pd.read_parquet
+    gives them, "pyarrow" keeps them as Arrow backed pd.ArrowDtype columns, which
+    skips building python objects for decimal, date and time values.
 
     Returns:
     pd.DataFrame: DataFrame containing the data extracted from the Parquet file.
@@ -17,7 +33,11 @@ def create_data_frame_from_parquet(parquet_file) -> pd.DataFrame:
     ValueError: If the Parquet file cannot be converted into a DataFrame.
     """
     try:
-        restored_data_frame = pd.read_parquet(BytesIO(parquet_file))
-        return restored_data_frame
+        table = create_arrow_table_from_parquet(parquet_file, columns, filters)
+
+        if dtype_backend == "pyarrow":
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+        return table.to_pandas()
     except Exception as e:
         raise ValueError(f"Failed to convert Parquet file to DataFrame: {e}")
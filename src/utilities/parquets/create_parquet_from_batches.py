@@ -0,0 +1,51 @@
+import logging
+from io import BytesIO
+from typing import Iterable
+
+import pyarrow as pa
+
+from src.utilities.parquets.parquet_compression import DEFAULT_COMPRESSION
+from src.utilities.parquets.parquet_part_writer import (
+    DEFAULT_ROW_GROUP_SIZE,
+    ParquetPartWriter,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def create_parquet_from_batches(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    compression: str = DEFAULT_COMPRESSION,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> BytesIO:
+    """
+    Writes record batches as they are received to a compressed Parquet file stored in
+    memory, see ParquetPartWriter.
+
+    Batches are encoded once they add up to a row group and can then be released, so
+    the uncompressed rows held at any time are bounded by the row group size. The
+    compressed file itself still grows in one buffer until the last batch is
+    written, so memory use scales with the compressed size of the table.
+
+    Args:
+        batches (Iterable[pa.RecordBatch]): The record batches to write, typically a
+            generator producing them lazily.
+        schema (pa.Schema): The schema every batch is written with.
+        compression (str): The codec and optional level, e.g. "zstd:3", see
+            get_parquet_compression_options. Defaults to "zstd".
+        row_group_size (int): The rows of every row group but the last.
+
+    Returns:
+        BytesIO: A memory buffer containing the compressed Parquet file.
+
+    Raises:
+        pa.ArrowInvalid: If a batch cannot be converted to the given schema.
+        ValueError: If the compression setting or row_group_size is invalid.
+    """
+    with ParquetPartWriter(schema, compression, row_group_size) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+    return writer.parts[0]["parquet_file"]
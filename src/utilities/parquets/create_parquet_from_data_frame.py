@@ -2,25 +2,43 @@ import logging
 from io import BytesIO
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from src.utilities.custom_errors import InvalidDataFrame
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.parquets.table_schemas import create_arrow_table_from_data_frame
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
-def create_parquet_from_data_frame(data_frame: pd.DataFrame) -> BytesIO:
+def create_parquet_from_data_frame(
+    data_frame: pd.DataFrame,
+    compression: str = DEFAULT_COMPRESSION,
+    schema: pa.Schema | None = None,
+) -> BytesIO:
     """
-    Converts a valid, non-empty pandas DataFrame to a gzipped Parquet file stored in memory.
+    Converts a valid, non-empty pandas DataFrame to a compressed Parquet file stored in memory.
 
     Args:
         data_frame (pd.DataFrame): The DataFrame to convert.
+        compression (str): The codec and optional level, e.g. "zstd:3", see
+            get_parquet_compression_options. Defaults to "zstd".
+        schema (pa.Schema | None): The schema the file is written with, see
+            create_arrow_table_from_data_frame. The column types are inferred by
+            pandas when None.
 
     Returns:
-        BytesIO: A memory buffer containing the gzipped Parquet file.
+        BytesIO: A memory buffer containing the compressed Parquet file.
 
     Raises:
         InvalidDataFrame: If the input is not a DataFrame or is empty.
+        ValueError: If the compression setting is invalid or a column of the schema
+            is missing.
     """
     if not isinstance(data_frame, pd.DataFrame) or data_frame.empty:
         error = InvalidDataFrame("ERROR: invalid DataFrame")
@@ -28,7 +46,20 @@ def create_parquet_from_data_frame(data_frame: pd.DataFrame) -> BytesIO:
         raise error
 
     parquet_file: BytesIO = BytesIO()
-    data_frame.to_parquet(parquet_file, engine="pyarrow", compression="gzip")
+
+    if schema is None:
+        data_frame.to_parquet(
+            parquet_file,
+            engine="pyarrow",
+            **get_parquet_compression_options(compression),
+        )
+    else:
+        pq.write_table(
+            create_arrow_table_from_data_frame(data_frame, schema),
+            parquet_file,
+            **get_parquet_compression_options(compression),
+        )
+
     parquet_file.seek(0)
 
     return parquet_file
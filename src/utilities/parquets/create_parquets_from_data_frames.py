@@ -1,12 +1,73 @@
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
-from typing import Any, Dict, Union
+from time import perf_counter
+from typing import Any, Dict, List, Literal, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+from src.utilities.parquets.table_schemas import create_arrow_table_from_data_frame
+
+EncodeExecutor = Literal["thread", "process"]
+
+
+def encode_data_frame(
+    data_frame: pd.DataFrame, compression: str, schema: pa.Schema | None = None
+) -> Dict[str, Any]:
+    """
+    Serializes a DataFrame into an in-memory Parquet file and times it.
+
+    Args:
+        data_frame (pd.DataFrame): The DataFrame to serialize.
+        compression (str): The codec and optional level, e.g. "zstd:3", see
+            get_parquet_compression_options.
+        schema (pa.Schema | None): The schema the file is written with, see
+            create_arrow_table_from_data_frame. The column types are inferred by
+            pandas when None.
+
+    Returns:
+        dict: The parquet_file (BytesIO), how long encoding it took in
+        encode_seconds and its size in bytes.
+    """
+    start = perf_counter()
+    buffer: BytesIO = BytesIO()
+
+    if schema is None:
+        data_frame.to_parquet(
+            buffer,
+            engine="pyarrow",
+            **get_parquet_compression_options(compression),
+        )
+    else:
+        pq.write_table(
+            create_arrow_table_from_data_frame(data_frame, schema),
+            buffer,
+            **get_parquet_compression_options(compression),
+        )
+
+    size = buffer.tell()
+    buffer.seek(0)
+
+    return {
+        "parquet_file": buffer,
+        "encode_seconds": round(perf_counter() - start, 3),
+        "size": size,
+    }
 
 
 def create_parquets_from_data_frames(
     data: list,
+    compression: str = DEFAULT_COMPRESSION,
+    table_compression: Dict[str, str] | None = None,
+    max_workers: int = 1,
+    executor: EncodeExecutor = "thread",
 ) -> Dict[str, Union[Dict[str, Any], Dict[str, str]]]:
     """
     Converts a list of data frames into in-memory Parquet files.
@@ -15,14 +76,33 @@ def create_parquets_from_data_frames(
     with metadata and a pandas DataFrame. It serializes each DataFrame into a compressed
     Parquet file stored in a BytesIO buffer.
 
+    With max_workers above 1 the tables are encoded concurrently. Arrow releases the
+    GIL while it converts and compresses columns, so worker threads encode on as many
+    cores as there are workers. Frames of python objects, whose conversion holds the
+    GIL, can be encoded in worker processes instead, at the cost of pickling every
+    frame and file between processes.
+
     If any conversion fails, the function returns an error dictionary containing the table name
     and the error message. Otherwise, it returns a success dictionary with all converted files.
+    When several tables fail, the error is the one of the first in the list, as when they are
+    encoded one after the other.
 
     Args:
         data (list): A list of dictionaries, each containing:
             - table_name (str): Name of the table.
             - last_updated (str): ISO timestamp of the latest data update.
             - data_frame (pandas.DataFrame): DataFrame to be serialized.
+            - schema (pa.Schema | None): Optional schema the file is written with,
+              e.g. get_output_table_schema. Inferred by pandas when missing.
+        compression (str): The codec and optional level of every table, e.g.
+            "zstd:3", see get_parquet_compression_options. Defaults to "zstd".
+        table_compression (Dict[str, str] | None): Overrides compression for
+            individual tables, by table name.
+        max_workers (int): The number of tables encoded at a time. Defaults to 1,
+            encoding the tables one after the other.
+        executor (EncodeExecutor): "thread" encodes in worker threads, "process" in
+            worker processes. Defaults to "thread", as AWS Lambda lacks the shared
+            memory process pools need.
 
     Returns:
         dict: A JSON-style response indicating success or failure.
@@ -35,7 +115,9 @@ def create_parquets_from_data_frames(
                         {
                             "table_name": "example_table",
                             "last_updated": "2025-05-27 12:00:00",
-                            "parquet_file": <_io.BytesIO>
+                            "parquet_file": <_io.BytesIO>,
+                            "encode_seconds": 0.012,
+                            "size": 5120
                         },
                         ...
                     ]
@@ -48,32 +130,78 @@ def create_parquets_from_data_frames(
                     "message": "table_name: error_description"
                 }
             }
+
+    Raises:
+        ValueError: If max_workers is not a positive integer or the executor is not
+            supported.
     """
-    parquet_files = []
+    if max_workers < 1:
+        raise ValueError("max_workers must be a positive integer")
 
-    for table in data:
-        table_name: str = table.get("table_name")
-        last_updated: datetime = table.get("last_updated")
-        data_frame = table.get("data_frame")
+    pool: Executor | None = None
 
-        if not isinstance(data_frame, pd.DataFrame):
-            return {"error": {"message": f"{table_name}: invalid data type."}}
+    if max_workers > 1 and len(data) > 1:
+        match executor:
+            case "thread":
+                pool = ThreadPoolExecutor(max_workers=min(max_workers, len(data)))
+            case "process":
+                pool = ProcessPoolExecutor(
+                    max_workers=min(max_workers, len(data)),
+                    # forking a process that already runs threads can deadlock
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            case _:
+                raise ValueError(
+                    f"Invalid encode executor '{executor}', must be 'process' or 'thread'"
+                )
 
-        buffer: BytesIO = BytesIO()
+    def get_compression(table_name: str) -> str:
+        return (table_compression or {}).get(table_name, compression)
 
-        try:
-            data_frame.to_parquet(buffer, engine="pyarrow", compression="gzip")
-            buffer.seek(0)
+    encodings: List[Future | None] = [
+        pool.submit(
+            encode_data_frame,
+            table.get("data_frame"),
+            get_compression(table.get("table_name")),
+            table.get("schema"),
+        )
+        if pool is not None and isinstance(table.get("data_frame"), pd.DataFrame)
+        else None
+        for table in data
+    ]
 
-            parquet_files.append(
-                {
-                    "table_name": table_name,
-                    "last_updated": last_updated,
-                    "parquet_file": buffer,
-                }
-            )
-        except Exception as err:
-            return {"error": {"message": f"{table_name}: {err}"}}
+    parquet_files = []
+
+    try:
+        for table, encoding in zip(data, encodings):
+            table_name: str = table.get("table_name")
+            last_updated: datetime = table.get("last_updated")
+            data_frame = table.get("data_frame")
+
+            if not isinstance(data_frame, pd.DataFrame):
+                return {"error": {"message": f"{table_name}: invalid data type."}}
+
+            try:
+                encoded = (
+                    encode_data_frame(
+                        data_frame, get_compression(table_name), table.get("schema")
+                    )
+                    if encoding is None
+                    else encoding.result()
+                )
+
+                parquet_files.append(
+                    {
+                        "table_name": table_name,
+                        "last_updated": last_updated,
+                        **encoded,
+                    }
+                )
+            except Exception as err:
+                return {"error": {"message": f"{table_name}: {err}"}}
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
 
     return {
         "success": {
@@ -0,0 +1,246 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Callable, Dict, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utilities.parquets.parquet_compression import (
+    DEFAULT_COMPRESSION,
+    get_parquet_compression_options,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# one row group per 10000 row extraction batch made sales_order files over 60%
+# larger than 131072 row groups, which still let filtered reads skip most of a file
+DEFAULT_ROW_GROUP_SIZE = 131072
+
+
+class ParquetPartWriter:
+    """
+    Writes record batches, as they arrive, to one or more in-memory Parquet files
+    called parts.
+
+    Batches are buffered until they add up to row_group_size rows, which are then
+    written as one row group, so the row groups do not depend on the size of the
+    incoming batches. Once a part reaches max_part_bytes it is closed and the next
+    batches go to a new part. As a row group is only flushed whole, a part can
+    exceed max_part_bytes by up to one row group.
+
+    Given upload_part, every closed part is handed to it on a background thread
+    while the next part is filled, and released once uploaded. A part waits for the
+    previous upload to finish before it is handed over, so at most one part is
+    filling and one uploading at any time.
+
+    Usage:
+        with ParquetPartWriter(schema, upload_part=upload) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        parts = writer.parts
+
+    Args:
+        schema: The schema of the parts, batches are cast to it.
+        compression: The codec and optional level, e.g. "zstd:3", see
+            get_parquet_compression_options.
+        row_group_size: The rows of every row group but the last of each part.
+        max_part_bytes: The size from which a part is closed, None to write a
+            single part.
+        upload_part: Called with the Parquet file and the number of each closed
+            part, starting at 1. Its return value is kept as the part's upload.
+
+    Raises:
+        ValueError: If row_group_size or max_part_bytes is not positive, or the
+            compression setting is invalid.
+    """
+
+    def __init__(
+        self,
+        schema: pa.Schema,
+        compression: str = DEFAULT_COMPRESSION,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        max_part_bytes: int | None = None,
+        upload_part: Callable[[BytesIO, int], Any] | None = None,
+    ):
+        if row_group_size < 1:
+            raise ValueError("row_group_size must be a positive integer")
+
+        if max_part_bytes is not None and max_part_bytes < 1:
+            raise ValueError("max_part_bytes must be a positive integer")
+
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.max_part_bytes = max_part_bytes
+        self.upload_part = upload_part
+        self.parts: List[Dict[str, Any]] = []
+
+        self._options = get_parquet_compression_options(compression)
+        self._pending: List[pa.RecordBatch] = []
+        self._pending_rows = 0
+        self._sink: BytesIO | None = None
+        self._writer: pq.ParquetWriter | None = None
+        self._part_rows = 0
+        self._part_row_groups = 0
+        self._upload: Future | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1) if upload_part else None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_batch(self, batch: pa.RecordBatch) -> None:
+        """
+        Adds a batch to the parts, writing the row groups it completes.
+
+        Args:
+            batch (pa.RecordBatch): The rows to write.
+
+        Returns:
+            None
+
+        Raises:
+            pa.ArrowInvalid: If the batch cannot be cast to the schema.
+            ValueError: If the writer is closed.
+        """
+        if self._closed:
+            raise ValueError("ParquetPartWriter is closed")
+
+        if batch.schema != self.schema:
+            batch = batch.cast(self.schema)
+
+        if not batch.num_rows:
+            return
+
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+
+        while self._pending_rows >= self.row_group_size:
+            self._write_row_group(self.row_group_size)
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Writes the buffered rows, closes the last part and waits for the uploads. A
+        writer closed without any row writes one empty part, so there is always a
+        file of the schema. Closing twice does nothing.
+
+        Returns:
+            List[dict]: The parts in order, each with:
+                - part_number (int): The number of the part, starting at 1.
+                - row_count (int): The rows of the part.
+                - row_groups (int): The row groups of the part.
+                - size (int): The size of the Parquet file in bytes.
+                - parquet_file (BytesIO | None): The Parquet file, None once
+                  handed to upload_part.
+                - upload (Any): What upload_part returned for the part.
+
+        Raises:
+            Exception: What upload_part raised for any part.
+        """
+        if self._closed:
+            return self.parts
+
+        if self._pending_rows:
+            self._write_row_group(self._pending_rows)
+
+        if self._writer is None and not self.parts:
+            self._open_part()
+
+        if self._writer is not None:
+            self._close_part()
+
+        self._closed = True
+
+        try:
+            self._wait_for_upload()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+        return self.parts
+
+    def abort(self) -> None:
+        """
+        Stops writing after an error, dropping the buffered rows and the part being
+        filled. Uploads already started are waited for, the others cancelled.
+
+        Returns:
+            None
+        """
+        self._closed = True
+        self._pending = []
+        self._pending_rows = 0
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _open_part(self) -> None:
+        self._sink = BytesIO()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, **self._options)
+        self._part_rows = 0
+        self._part_row_groups = 0
+
+    def _write_row_group(self, rows: int) -> None:
+        table = pa.Table.from_batches(self._pending, schema=self.schema)
+        row_group = table.slice(0, rows)
+        self._pending = table.slice(rows).to_batches()
+        self._pending_rows -= row_group.num_rows
+
+        if self._writer is None:
+            self._open_part()
+
+        self._writer.write_table(row_group, row_group_size=rows)  # type: ignore
+        self._part_rows += row_group.num_rows
+        self._part_row_groups += 1
+
+        part_bytes = self._sink.tell()  # type: ignore
+
+        if self.max_part_bytes is not None and part_bytes >= self.max_part_bytes:
+            self._close_part()
+
+    def _close_part(self) -> None:
+        self._writer.close()  # type: ignore
+        size = self._sink.tell()  # type: ignore
+        self._sink.seek(0)  # type: ignore
+
+        part = {
+            "part_number": len(self.parts) + 1,
+            "row_count": self._part_rows,
+            "row_groups": self._part_row_groups,
+            "size": size,
+            "parquet_file": self._sink,
+            "upload": None,
+        }
+        self.parts.append(part)
+        self._sink, self._writer = None, None
+
+        if self.max_part_bytes is not None:
+            logger.info(
+                f"Wrote Parquet part {part['part_number']}: {part['row_count']} rows "
+                f"in {part['row_groups']} row groups, {part['size']} bytes"
+            )
+
+        if self._executor is not None:
+            self._wait_for_upload()
+            self._upload = self._executor.submit(self._upload_part, part)
+
+    def _upload_part(self, part: Dict[str, Any]) -> None:
+        upload_part: Callable[[BytesIO, int], Any] = self.upload_part  # type: ignore
+        part["upload"] = upload_part(part["parquet_file"], part["part_number"])
+        part["parquet_file"] = None
+
+    def _wait_for_upload(self) -> None:
+        if self._upload is not None:
+            upload, self._upload = self._upload, None
+            upload.result()
@@ -0,0 +1,186 @@
+import logging
+from typing import Dict, List
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# a column of few distinct strings is stored once per value and read back as a
+# pandas categorical instead of one python string per row
+DICTIONARY_STRING = pa.dictionary(pa.int32(), pa.string())
+
+# low cardinality string columns of the source tables, their other types come from
+# the catalog, see create_arrow_schema_from_columns
+SOURCE_DICTIONARY_COLUMNS: Dict[str, List[str]] = {
+    "address": ["district", "country"],
+    "currency": ["currency_code"],
+    "department": ["department_name", "location"],
+    "design": ["design_name", "file_location"],
+    "payment_type": ["payment_type_name"],
+    "transaction": ["transaction_type"],
+}
+
+# the transform outputs, typed as the data warehouse columns they are loaded into,
+# see sql_local_tests/create_local_totesys_datawarehouse.sql. Every table but dim_date
+# keeps the source database of its rows, whose ids are only unique within it
+OUTPUT_TABLE_SCHEMAS: Dict[str, pa.Schema] = {
+    "dim_date": pa.schema(
+        [
+            ("date_id", pa.date32()),
+            ("year", pa.int32()),
+            ("month", pa.int32()),
+            ("day", pa.int32()),
+            ("day_of_week", pa.int32()),
+            ("day_name", DICTIONARY_STRING),
+            ("month_name", DICTIONARY_STRING),
+            ("quarter", pa.int32()),
+        ]
+    ),
+    "dim_staff": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("staff_id", pa.int32()),
+            ("first_name", pa.string()),
+            ("last_name", pa.string()),
+            ("department_name", DICTIONARY_STRING),
+            ("location", DICTIONARY_STRING),
+            ("email_address", pa.string()),
+        ]
+    ),
+    "dim_location": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("location_id", pa.int32()),
+            ("address_line_1", pa.string()),
+            ("address_line_2", pa.string()),
+            ("district", DICTIONARY_STRING),
+            ("city", pa.string()),
+            ("postal_code", pa.string()),
+            ("country", DICTIONARY_STRING),
+            ("phone", pa.string()),
+        ]
+    ),
+    "dim_currency": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("currency_id", pa.int32()),
+            ("currency_code", DICTIONARY_STRING),
+            ("currency_name", DICTIONARY_STRING),
+        ]
+    ),
+    "dim_design": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("design_id", pa.int32()),
+            ("design_name", DICTIONARY_STRING),
+            ("file_location", DICTIONARY_STRING),
+            ("file_name", pa.string()),
+        ]
+    ),
+    "dim_counterparty": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("counterparty_id", pa.int32()),
+            ("counterparty_legal_name", pa.string()),
+            ("counterparty_legal_address_line_1", pa.string()),
+            ("counterparty_legal_address_line_2", pa.string()),
+            ("counterparty_legal_district", DICTIONARY_STRING),
+            ("counterparty_legal_city", pa.string()),
+            ("counterparty_legal_postal_code", pa.string()),
+            ("counterparty_legal_country", DICTIONARY_STRING),
+            ("counterparty_legal_phone_number", pa.string()),
+        ]
+    ),
+    "fact_sales_order": pa.schema(
+        [
+            ("source", DICTIONARY_STRING),
+            ("sales_order_id", pa.int32()),
+            ("design_id", pa.int32()),
+            ("sales_staff_id", pa.int32()),
+            ("counterparty_id", pa.int32()),
+            ("units_sold", pa.int32()),
+            ("unit_price", pa.decimal128(10, 2)),
+            ("currency_id", pa.int32()),
+            ("agreed_delivery_date", pa.date32()),
+            ("agreed_payment_date", pa.date32()),
+            ("agreed_delivery_location_id", pa.int32()),
+            ("created_date", pa.date32()),
+            ("last_updated_date", pa.date32()),
+            ("created_time", pa.time64("us")),
+            ("last_updated_time", pa.time64("us")),
+        ]
+    ),
+}
+
+
+def get_source_table_schema(table_name: str, schema: pa.Schema) -> pa.Schema:
+    """
+    Pins the low cardinality string columns of a source table's extraction schema to
+    dictionary encoded strings, see SOURCE_DICTIONARY_COLUMNS.
+
+    Args:
+        table_name (str): The extracted table.
+        schema (pa.Schema): The schema built from the table's column types.
+
+    Returns:
+        pa.Schema: The schema with the table's dictionary columns, the same schema
+        if it has none.
+    """
+    for column_name in SOURCE_DICTIONARY_COLUMNS.get(table_name, []):
+        index = schema.get_field_index(column_name)
+
+        if index != -1 and pa.types.is_string(schema.field(index).type):
+            schema = schema.set(index, schema.field(index).with_type(DICTIONARY_STRING))
+
+    return schema
+
+
+def get_output_table_schema(table_name: str) -> pa.Schema | None:
+    """
+    Get the pinned schema of a dimension or fact table.
+
+    Args:
+        table_name (str): The output table, e.g. "dim_staff".
+
+    Returns:
+        pa.Schema | None: The table's schema, None if it is not registered.
+    """
+    return OUTPUT_TABLE_SCHEMAS.get(table_name)
+
+
+def create_arrow_table_from_data_frame(
+    data_frame: pd.DataFrame, schema: pa.Schema
+) -> pa.Table:
+    """
+    Converts a DataFrame to an Arrow table of the given schema, whatever dtypes pandas
+    gave its columns: integers are narrowed, floats rounded to decimals, date and
+    time objects typed and strings dictionary encoded as the schema says. Columns
+    are ordered as in the schema, and columns the schema does not have are dropped.
+
+    Args:
+        data_frame (pd.DataFrame): The DataFrame to convert.
+        schema (pa.Schema): The schema the table must have.
+
+    Returns:
+        pa.Table: The table, without pandas metadata so it is read back by its
+        Arrow types.
+
+    Raises:
+        ValueError: If a column of the schema is missing.
+        pa.ArrowInvalid: If a column cannot be converted, e.g. an integer overflows.
+    """
+    missing_columns = [name for name in schema.names if name not in data_frame]
+
+    if missing_columns:
+        raise ValueError(f"Missing columns {missing_columns} of the table schema")
+
+    extra_columns = [name for name in data_frame.columns if name not in schema.names]
+
+    if extra_columns:
+        logger.warning(f"Dropping columns {extra_columns} not in the table schema")
+
+    table = pa.Table.from_pandas(data_frame[schema.names], preserve_index=False)
+
+    return table.cast(schema)
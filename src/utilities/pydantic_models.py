@@ -14,6 +14,7 @@ class FilesToProcessItem(BaseModel):
     last_updated: datetime
     file_name: str
     key: str
+    source: str | None = None
 
 
 FilesToProcessList = TypeAdapter(List[FilesToProcessItem])
@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import boto3
+from psycopg import Connection
+from psycopg.rows import DictRow, dict_row
+from psycopg_pool import ConnectionPool
+
+from src.db.connection import get_conninfo
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# "TOTESYS", "DATAWAREHOUSE" or a source listed in EXTRACT_SOURCES
+DbSource = str
+
+
+class ResourceManager:
+    """
+    Keeps a connection pool per database and a single S3 client alive for the life of
+    the process, so warm Lambda invocations reuse them instead of reconnecting.
+
+    Pooled connections are health-checked before they are handed out. A connection
+    that was dropped while the Lambda was frozen is discarded and replaced without the
+    caller noticing, and a pool whose connection settings changed is rebuilt. Returned
+    connections get the server's default isolation level back, as worker connections
+    leave REPEATABLE READ set by import_snapshot.
+
+    Args:
+        pool_min_size (int): Connections each pool keeps open.
+        pool_max_size (int): The most connections a pool opens.
+        pool_timeout (float): Seconds to wait for a connection before failing.
+    """
+
+    def __init__(
+        self, pool_min_size: int = 1, pool_max_size: int = 2, pool_timeout: float = 30
+    ):
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_timeout = pool_timeout
+        self._pools: Dict[str, ConnectionPool] = {}
+        self._s3_client = None
+        self._lock = threading.Lock()
+
+    def get_connection_pool(
+        self, db_source: DbSource, max_size: int | None = None
+    ) -> ConnectionPool:
+        """
+        Returns the open connection pool of a database, creating it on first use or
+        when the database's connection settings have changed.
+
+        Args:
+            db_source (DbSource): The database, see get_conninfo.
+            max_size (int | None): The most connections the caller borrows at once,
+                e.g. a coordinating connection and one per worker. The pool grows to
+                it if it is smaller, it never shrinks.
+
+        Returns:
+            ConnectionPool: A pool of connections returning rows as dictionaries.
+
+        Raises:
+            ValueError: If db_source is not valid.
+            psycopg_pool.PoolTimeout: If no connection can be opened in time.
+        """
+        conninfo = get_conninfo(db_source)
+
+        with self._lock:
+            pool = self._pools.get(db_source)
+
+            if pool is not None and (pool.closed or pool.conninfo != conninfo):
+                logger.info(f"Rebuilding the {db_source} connection pool")
+                pool.close()
+                pool = None
+
+            if pool is None:
+                pool = ConnectionPool(
+                    conninfo,
+                    kwargs={"row_factory": dict_row},
+                    min_size=self.pool_min_size,
+                    max_size=max(self.pool_max_size, max_size or 0),
+                    check=ConnectionPool.check_connection,
+                    reset=reset_connection,
+                    name=db_source,
+                    open=False,
+                )
+                pool.open(wait=True, timeout=self.pool_timeout)
+                self._pools[db_source] = pool
+            elif max_size is not None and max_size > pool.max_size:
+                logger.info(
+                    f"Resizing the {db_source} connection pool to {max_size} connections"
+                )
+                pool.resize(pool.min_size, max_size)
+
+        return pool
+
+    @contextmanager
+    def connection(self, db_source: DbSource) -> Iterator[Connection[DictRow]]:
+        """
+        Borrows a healthy connection from the database's pool. Like using a psycopg
+        connection as a context manager, the transaction is committed on exit, or
+        rolled back on error, but the connection goes back to the pool instead of
+        being closed.
+
+        Args:
+            db_source (DbSource): The database, see get_conninfo.
+
+        Yields:
+            Connection[DictRow]: A connection returning rows as dictionaries.
+
+        Raises:
+            ValueError: If db_source is not valid.
+            psycopg_pool.PoolTimeout: If no connection is available in time.
+        """
+        pool = self.get_connection_pool(db_source)
+
+        with pool.connection(timeout=self.pool_timeout) as conn:
+            yield conn
+
+    def get_s3_client(self):
+        """
+        Returns the shared boto3 S3 client, creating it on first use. Clients are
+        thread safe, so worker threads can share it.
+
+        Returns:
+            A boto3 S3 client.
+        """
+        with self._lock:
+            if self._s3_client is None:
+                self._s3_client = boto3.client("s3")
+
+        return self._s3_client
+
+    def close(self) -> None:
+        """
+        Closes every pool and forgets the S3 client, so the next use starts afresh.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+
+            self._pools.clear()
+            self._s3_client = None
+
+
+def reset_connection(conn: Connection) -> None:
+    """
+    Restores the server's default isolation level of a connection going back to its
+    pool, see import_snapshot.
+
+    Args:
+        conn (Connection): An idle pooled connection.
+
+    Returns:
+        None
+    """
+    conn.isolation_level = None
+
+
+resources = ResourceManager()
+# stop the pool worker threads cleanly when a script or test run exits
+atexit.register(resources.close)
@@ -0,0 +1,143 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict
+
+import orjson
+from psycopg import Connection
+from psycopg.rows import DictRow
+
+from src.db.catalog_helpers import get_catalog_fingerprint, get_catalog_tables
+from src.utilities.s3.add_file_to_s3_bucket import add_file_to_s3_bucket
+from src.utilities.s3.get_file_from_s3_bucket import get_file_from_s3_bucket
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CATALOG_KEY = "catalog.json"
+
+
+def get_schema_drift(
+    previous_tables: Dict[str, Dict[str, Any]],
+    current_tables: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Compares two catalogs table by table.
+
+    Args:
+        previous_tables (dict): The tables of the cached catalog.
+        current_tables (dict): The tables of the current catalog.
+
+    Returns:
+        dict: A dictionary with:
+            - added_tables (List[str]): Tables only in the current catalog.
+            - removed_tables (List[str]): Tables only in the previous catalog.
+            - changed_tables (dict): For every table in both whose columns or primary
+              key changed, its added_columns, removed_columns, retyped_columns (each
+              with its previous and current type) and primary_key change, if any.
+    """
+    changed_tables = {}
+
+    for table_name in sorted(set(previous_tables) & set(current_tables)):
+        previous_types = {
+            column["column_name"]: column["udt_name"]
+            for column in previous_tables[table_name]["columns"]
+        }
+        current_types = {
+            column["column_name"]: column["udt_name"]
+            for column in current_tables[table_name]["columns"]
+        }
+        changes: Dict[str, Any] = {
+            "added_columns": sorted(set(current_types) - set(previous_types)),
+            "removed_columns": sorted(set(previous_types) - set(current_types)),
+            "retyped_columns": {
+                name: {"from": previous_types[name], "to": current_types[name]}
+                for name in sorted(set(previous_types) & set(current_types))
+                if previous_types[name] != current_types[name]
+            },
+        }
+        previous_key = previous_tables[table_name]["primary_key"]
+        current_key = current_tables[table_name]["primary_key"]
+
+        if previous_key != current_key:
+            changes["primary_key"] = {"from": previous_key, "to": current_key}
+
+        if any(changes.values()):
+            changed_tables[table_name] = changes
+
+    return {
+        "added_tables": sorted(set(current_tables) - set(previous_tables)),
+        "removed_tables": sorted(set(previous_tables) - set(current_tables)),
+        "changed_tables": changed_tables,
+    }
+
+
+def load_catalog(
+    conn: Connection[DictRow], s3_client, bucket_name: str, key: str = CATALOG_KEY
+) -> Dict[str, Any]:
+    """
+    Gets the catalog of the TOTESYS tables, their columns, column types and primary
+    keys, from a cache in the state bucket.
+
+    Only the catalog fingerprint is queried on every call. The tables are read from
+    pg_catalog again only when the fingerprint differs from the cached one, and the
+    refreshed catalog is cached together with the drift from the previous one.
+
+    Args:
+        conn (Connection[DictRow]): An open connection to the TOTESYS database.
+        s3_client: A boto3 S3 client.
+        bucket_name (str): The state bucket.
+        key (str): The key of the cached catalog. Defaults to "catalog.json".
+
+    Returns:
+        dict: A dictionary with:
+            - fingerprint (str): See get_catalog_fingerprint.
+            - tables (dict): See get_catalog_tables.
+            - refreshed_at (str): When the catalog was last read from the database.
+            - drift (dict | None): The schema drift event when this call refreshed a
+              previously cached catalog, with the previous and current fingerprint,
+              detected_at and the changes of get_schema_drift. None otherwise.
+
+    Raises:
+        psycopg.Error: On database errors.
+        Exception: For any S3 error other than a missing cache, or if the upload of
+            a refreshed catalog fails.
+    """
+    fingerprint = get_catalog_fingerprint(conn)
+    cached = None
+    response = get_file_from_s3_bucket(s3_client, bucket_name, key)
+
+    if response.get("error"):
+        if not response["error"]["message"].startswith("NoSuchKey"):
+            raise Exception(response["error"]["message"])
+    else:
+        cached = orjson.loads(response["success"]["data"])
+
+    if cached and cached["fingerprint"] == fingerprint:
+        return {**cached, "drift": None}
+
+    tables = get_catalog_tables(conn)
+    refreshed_at = datetime.now().isoformat()
+    drift = None
+
+    if cached:
+        drift = {
+            "previous_fingerprint": cached["fingerprint"],
+            "fingerprint": fingerprint,
+            "detected_at": refreshed_at,
+            **get_schema_drift(cached["tables"], tables),
+        }
+        logger.warning(f"Schema drift detected: {drift}")
+
+    catalog = {
+        "fingerprint": fingerprint,
+        "tables": tables,
+        "refreshed_at": refreshed_at,
+    }
+    response = add_file_to_s3_bucket(s3_client, bucket_name, key, orjson.dumps(catalog))
+
+    if response.get("error"):
+        raise response["error"]["raw_response"]
+
+    logger.info(f"Refreshed the catalog of {len(tables)} tables")
+
+    return {**catalog, "drift": drift}
@@ -0,0 +1,38 @@
+from typing import Any, Dict
+
+
+def get_checkpoint(state: Dict[str, Any], stage: str) -> Dict[str, Any] | None:
+    """
+    Gets the checkpoint a stage saved when it stopped before its deadline.
+
+    Args:
+        state (dict): The pipeline state.
+        stage (str): The stage, e.g. "extract", "transform" or "load".
+
+    Returns:
+        dict | None: The checkpoint, None if the stage finished its last run.
+    """
+    return state.get("checkpoints", {}).get(stage)
+
+
+def set_checkpoint(
+    state: Dict[str, Any], stage: str, checkpoint: Dict[str, Any] | None
+) -> None:
+    """
+    Saves the work a stage still has to do in the state, or clears it when
+    checkpoint is None. Mutates the state in place.
+
+    Args:
+        state (dict): The pipeline state.
+        stage (str): The stage, e.g. "extract", "transform" or "load".
+        checkpoint (dict | None): The checkpoint to save.
+
+    Returns:
+        None
+    """
+    checkpoints = state.setdefault("checkpoints", {})
+
+    if checkpoint is None:
+        checkpoints.pop(stage, None)
+    else:
+        checkpoints[stage] = checkpoint
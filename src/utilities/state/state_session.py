@@ -0,0 +1,105 @@
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from src.utilities.state.get_current_state import get_current_state
+from src.utilities.state.set_current_state import set_current_state
+
+logger = logging.getLogger(__name__)
+
+
+class StateSession:
+    """
+    Holds the pipeline state in memory for the duration of a lambda run.
+
+    The state file is read once when the session is created. Mutations are applied
+    to the in-memory copy and written back to S3 in a single upload when the session
+    is flushed, instead of one read and one write per table. Setting
+    checkpoint_interval also flushes after every N table updates, so a crash
+    mid-run only loses the updates since the last checkpoint.
+
+    Can be used as a context manager, in which case pending updates are flushed on
+    exit (including when an exception is raised, since every recorded update
+    describes work that was already completed).
+
+    Args:
+        s3_client: Boto3 S3 client instance.
+        bucket_name (str): Name of the state bucket.
+        key (str, optional): Key of the state file. Defaults to "lambda_state.json".
+        checkpoint_interval (int | None, optional): Number of table updates between
+            intermediate flushes. None or 0 only flushes when explicitly asked to.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name,
+        key: str = "lambda_state.json",
+        checkpoint_interval: int | None = None,
+    ):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.checkpoint_interval = checkpoint_interval
+        self.state: Dict[str, Any] = get_current_state(s3_client, bucket_name, key)
+        self.dirty_tables: set[str] = set()
+        self.updates_since_flush = 0
+        self.flush_count = 0
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "StateSession":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def update(self, table_name: str, mutation: Callable[[Dict[str, Any]], Any]) -> Any:
+        """
+        Applies a mutation to the in-memory state and records the table it touched.
+
+        Args:
+            table_name (str): The table the mutation belongs to.
+            mutation (Callable): Called with the state dictionary, mutating it in place.
+
+        Returns:
+            Any: Whatever the mutation returns.
+        """
+        with self._lock:
+            mutation_result = mutation(self.state)
+            self.dirty_tables.add(table_name)
+            self.updates_since_flush += 1
+
+            if (
+                self.checkpoint_interval
+                and self.updates_since_flush >= self.checkpoint_interval
+            ):
+                logger.info(f"Checkpointing state after {table_name}")
+                self.flush()
+
+            return mutation_result
+
+    def flush(self) -> bool:
+        """
+        Writes the in-memory state to S3 if it has changed since the last flush.
+
+        Returns:
+            bool: True if the state was written, False if there was nothing to write.
+
+        Raises:
+            Exception: If the upload fails.
+        """
+        with self._lock:
+            if not self.updates_since_flush:
+                return False
+
+            set_current_state(self.state, self.bucket_name, self.s3_client, self.key)
+
+            logger.info(
+                f"Saved state for {len(self.dirty_tables)} table(s): "
+                f"{sorted(self.dirty_tables)}"
+            )
+            self.dirty_tables = set()
+            self.updates_since_flush = 0
+            self.flush_count += 1
+
+            return True
@@ -0,0 +1,67 @@
+import logging
+from time import monotonic
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class LocalContext:
+    """
+    Stand-in for the AWS Lambda context when a handler runs outside of Lambda, e.g.
+    locally or from the change listener, giving it the same kind of deadline.
+
+    Args:
+        timeout_seconds (float): Seconds from creation until the deadline. Defaults to
+            900, the longest a Lambda function can run.
+    """
+
+    def __init__(self, timeout_seconds: float = 900):
+        self.deadline = monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(int((self.deadline - monotonic()) * 1000), 0)
+
+
+class TimeBudget:
+    """
+    Tells a handler when to stop starting new work so it can save a checkpoint before
+    the Lambda timeout kills it.
+
+    Contexts without get_remaining_time_in_millis, like the {} passed by tests, have
+    no deadline and the budget is never exhausted.
+
+    Args:
+        context: The Lambda context, or a LocalContext.
+        reserve_seconds (float): The time kept back for saving the checkpoint and
+            finishing the work in flight.
+    """
+
+    def __init__(self, context, reserve_seconds: float = 60):
+        self.get_remaining_millis = getattr(
+            context, "get_remaining_time_in_millis", None
+        )
+        self.reserve_seconds = reserve_seconds
+
+    def remaining_seconds(self) -> float | None:
+        """
+        Returns:
+            float | None: Seconds left until the deadline, None without a deadline.
+        """
+        if self.get_remaining_millis is None:
+            return None
+
+        return self.get_remaining_millis() / 1000
+
+    def exhausted(self) -> bool:
+        """
+        Returns:
+            bool: True once less than reserve_seconds are left.
+        """
+        remaining_seconds = self.remaining_seconds()
+
+        if remaining_seconds is None or remaining_seconds > self.reserve_seconds:
+            return False
+
+        logger.info(f"Time budget exhausted with {remaining_seconds:.1f}s left")
+
+        return True
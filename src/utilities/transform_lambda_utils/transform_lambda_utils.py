@@ -1,11 +1,14 @@
 from copy import deepcopy
 from datetime import datetime
+from io import BytesIO
 from types import FunctionType
 from typing import List
 
 import pandas as pd
 
+from src.db.source_registry import DEFAULT_SOURCE
 from src.utilities.extract_lambda_utils import create_parquet_metadata
+from src.utilities.extraction.column_requirements import get_required_columns
 from src.utilities.parquets.create_data_frame_from_parquet import (
     create_data_frame_from_parquet,
 )
@@ -20,6 +23,23 @@ from src.utilities.s3.get_file_from_s3_bucket import get_file_from_s3_bucket
 def get_dataframes_from_files_to_process(
     client, bucket: str, files_to_process: List[FilesToProcessItem]
 ):
+    """
+    Reads the ingest files listed in the event into one DataFrame per table. Only
+    the columns the transforms need are decoded, see SOURCE_COLUMN_REQUIREMENTS, so
+    whole-table files, like the change data capture ones, cost no more to read than
+    projected extractions.
+
+    Every row is tagged with the source database of its file in a "source" column,
+    so rows of different sources sharing an id stay apart.
+
+    Args:
+        client (BaseClient): Boto3 S3 client instance.
+        bucket (str): The ingest bucket.
+        files_to_process (List[FilesToProcessItem]): The files listed in the event.
+
+    Returns:
+        dict: The DataFrame of each table, by table name.
+    """
     all_df_to_process = {}
     for file_data in files_to_process:
         table_name = file_data.table_name
@@ -29,13 +49,46 @@ def get_dataframes_from_files_to_process(
 
         parquet = response["success"]["data"]
 
-        df = create_data_frame_from_parquet(parquet)
+        df = create_data_frame_from_parquet(
+            parquet, columns=get_required_columns(table_name)
+        )
+        df.insert(0, "source", file_data.source or DEFAULT_SOURCE)
+
+        # paginated and multi-source extractions upload several files for the same
+        # table, their rows are unioned
+        if table_name in all_df_to_process:
+            df = pd.concat([all_df_to_process[table_name], df], ignore_index=True)
 
         all_df_to_process[table_name] = df
 
     return all_df_to_process
 
 
+def get_latest_file_per_table(
+    files_to_process: List[FilesToProcessItem],
+) -> List[FilesToProcessItem]:
+    """
+    Keeps one entry per table, the one with the latest last_updated, in the order the
+    tables first appear. Paginated extractions list one file per page, but each table
+    only needs to be transformed once.
+
+    Args:
+        files_to_process (List[FilesToProcessItem]): The files listed in the event.
+
+    Returns:
+        List[FilesToProcessItem]: The latest file of each table.
+    """
+    latest_files: dict[str, FilesToProcessItem] = {}
+
+    for file_data in files_to_process:
+        latest_file = latest_files.get(file_data.table_name)
+
+        if latest_file is None or file_data.last_updated > latest_file.last_updated:
+            latest_files[file_data.table_name] = file_data
+
+    return list(latest_files.values())
+
+
 def initialize_transform_state(state, table_names):
     initialized_state = deepcopy(state)
     initialized_state["transform_state"] = {"last_updated": None, "tables": {}}
@@ -74,6 +127,7 @@ def initialize_dim_date(
     bucket_name: str,
     result: dict,
     final_state,
+    create_parquet_from_df_func: FunctionType = create_parquet_from_data_frame,  # type: ignore
 ):
     new_table_name = "dim_date"
     dim_date_df = create_dim_date_df_func("20221102", "20400101")
@@ -85,7 +139,7 @@ def initialize_dim_date(
         new_table_name=new_table_name,
         df=dim_date_df,
         transformation_timestamp=dim_date_transformation_time_stamp,
-        create_parquet_from_df_func=create_parquet_from_data_frame,  # type: ignore
+        create_parquet_from_df_func=create_parquet_from_df_func,
     )
 
     add_log_to_result_and_state(
@@ -107,7 +161,25 @@ def get_log_item_df_s3_upload(
     transformation_timestamp: datetime,
     create_parquet_from_df_func: FunctionType,
 ):
-    parquet = create_parquet_from_df_func(df)
+    return get_log_item_parquet_s3_upload(
+        s3_client=s3_client,
+        bucket_name=bucket_name,
+        last_updated=last_updated,
+        new_table_name=new_table_name,
+        parquet=create_parquet_from_df_func(df),
+        transformation_timestamp=transformation_timestamp,
+    )
+
+
+# uploads a file encoded beforehand, e.g. by encode_data_frame
+def get_log_item_parquet_s3_upload(
+    s3_client,
+    bucket_name: str,
+    last_updated: datetime,
+    new_table_name: str,
+    parquet: BytesIO,
+    transformation_timestamp: datetime,
+):
     filename, key = create_parquet_metadata(
         last_updated,
         new_table_name,
@@ -1,5 +1,9 @@
-from typing import TypedDict
+from typing import List, TypedDict
 
 
 class EmptyDict(TypedDict):
     pass
+
+
+class ExtractEvent(TypedDict, total=False):
+    tables: List[str]
@@ -18,7 +18,7 @@ module "etl_state_machine" {
   type   = var.step_function_type
 
   lambda_arns = {
-    extract   = module.extract_lambda.lambda.arn
+    extract   = var.extract_mode == "cdc" ? module.extract_changes_lambda.lambda.arn : module.extract_lambda.lambda.arn
     transform = module.transform_lambda.lambda.arn
     load      = module.load_lambda.lambda.arn
   }
@@ -28,7 +28,17 @@ module "etl_scheduler" {
   source              = "./modules/scheduler"
   name                = "etl-sfn-scheduler"
   schedule_expression = "rate(20 minutes)"
-  state_machine_arn   = module.etl_state_machine.state_machine["arn"]
+  target_arn          = module.etl_state_machine.state_machine["arn"]
+}
+
+# a last_updated watermark cannot see hard deletes, the key snapshots are diffed
+# on their own schedule
+module "detect_deletes_scheduler" {
+  source              = "./modules/scheduler"
+  name                = "detect-deletes-scheduler"
+  schedule_expression = "rate(1 hour)"
+  target_arn          = module.detect_deletes_lambda.lambda.arn
+  target_action       = "lambda:InvokeFunction"
 }
 
 module "extract_lambda" {
@@ -46,6 +56,78 @@ module "extract_lambda" {
     arn = aws_s3_bucket.ingest_zone.arn
     id  = aws_s3_bucket.ingest_zone.id
   }
+  # the row hash indexes are read back from the ingest bucket, ListBucket makes a
+  # table without an index yet NoSuchKey rather than AccessDenied
+  ingest_zone_bucket_actions = (
+    var.extract_row_hashing
+    ? ["s3:PutObject", "s3:GetObject", "s3:ListBucket"]
+    : ["s3:PutObject"]
+  )
+  environment_variables = {
+    EXTRACT_ROW_HASHING    = tostring(var.extract_row_hashing)
+    EXTRACT_MAX_PART_BYTES = tostring(var.extract_max_part_bytes)
+    EXTRACT_PAGE_SIZE      = tostring(var.extract_page_size)
+  }
+  lambda_state_bucket = {
+    arn = aws_s3_bucket.lambda_state.arn
+    id  = aws_s3_bucket.lambda_state.id
+  }
+
+  TOTESYS_DB_USER     = var.TOTESYS_DB_USER
+  TOTESYS_DB_PASSWORD = var.TOTESYS_DB_PASSWORD
+  TOTESYS_DB_HOST     = var.TOTESYS_DB_HOST
+  TOTESYS_DB_DATABASE = var.TOTESYS_DB_DATABASE
+  TOTESYS_DB_PORT     = var.TOTESYS_DB_PORT
+}
+
+module "extract_changes_lambda" {
+  source         = "./modules/extract_lambda"
+  function_name  = "extract_changes_lambda"
+  python_runtime = var.python_runtime
+  s3_bucket = {
+    arn = aws_s3_bucket.lambda_source_code.arn
+    id  = aws_s3_bucket.lambda_source_code.id
+  }
+  lambda_layers_bucket = {
+    arn = aws_s3_bucket.extract_lambda_layers.arn
+    id  = aws_s3_bucket.extract_lambda_layers.id
+  }
+  ingest_zone_bucket = {
+    arn = aws_s3_bucket.ingest_zone.arn
+    id  = aws_s3_bucket.ingest_zone.id
+  }
+  lambda_state_bucket = {
+    arn = aws_s3_bucket.lambda_state.arn
+    id  = aws_s3_bucket.lambda_state.id
+  }
+
+  TOTESYS_DB_USER     = var.TOTESYS_DB_USER
+  TOTESYS_DB_PASSWORD = var.TOTESYS_DB_PASSWORD
+  TOTESYS_DB_HOST     = var.TOTESYS_DB_HOST
+  TOTESYS_DB_DATABASE = var.TOTESYS_DB_DATABASE
+  TOTESYS_DB_PORT     = var.TOTESYS_DB_PORT
+}
+
+module "detect_deletes_lambda" {
+  source         = "./modules/extract_lambda"
+  function_name  = "detect_deletes_lambda"
+  python_runtime = var.python_runtime
+  timeout        = 900
+  s3_bucket = {
+    arn = aws_s3_bucket.lambda_source_code.arn
+    id  = aws_s3_bucket.lambda_source_code.id
+  }
+  lambda_layers_bucket = {
+    arn = aws_s3_bucket.extract_lambda_layers.arn
+    id  = aws_s3_bucket.extract_lambda_layers.id
+  }
+  ingest_zone_bucket = {
+    arn = aws_s3_bucket.ingest_zone.arn
+    id  = aws_s3_bucket.ingest_zone.id
+  }
+  # reads back the key snapshot of the previous run, ListBucket makes a missing
+  # snapshot NoSuchKey rather than AccessDenied
+  ingest_zone_bucket_actions = ["s3:PutObject", "s3:GetObject", "s3:ListBucket"]
   lambda_state_bucket = {
     arn = aws_s3_bucket.lambda_state.arn
     id  = aws_s3_bucket.lambda_state.id
@@ -124,3 +206,11 @@ module "load_lambda_alert" {
   source      = "./modules/lambda_alert"
   lambda_name = "load_lambda"
 }
+module "extract_changes_lambda_alert" {
+  source      = "./modules/lambda_alert"
+  lambda_name = "extract_changes_lambda"
+}
+module "detect_deletes_lambda_alert" {
+  source      = "./modules/lambda_alert"
+  lambda_name = "detect_deletes_lambda"
+}
@@ -65,8 +65,8 @@ resource "aws_iam_role_policy_attachment" "lambda_logging" {
 data "aws_iam_policy_document" "ingest_zone_bucket_policy_doc" {
   statement {
     effect    = "Allow"
-    actions   = ["s3:PutObject"]
-    resources = ["${var.ingest_zone_bucket.arn}/*"]
+    actions   = var.ingest_zone_bucket_actions
+    resources = ["${var.ingest_zone_bucket.arn}/*", "${var.ingest_zone_bucket.arn}"]
   }
 }
 
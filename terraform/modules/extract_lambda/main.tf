@@ -6,9 +6,9 @@ resource "aws_lambda_function" "lambda" {
   runtime          = var.python_runtime
   source_code_hash = filebase64sha256("${path.root}/../dist/${var.function_name}.zip")
   role             = aws_iam_role.iam_for_lambda.arn
-  timeout          = 200
+  timeout          = var.timeout
   environment {
-    variables = {
+    variables = merge(var.environment_variables, {
       INGEST_ZONE_BUCKET_NAME  = var.ingest_zone_bucket.id
       LAMBDA_STATE_BUCKET_NAME = var.lambda_state_bucket.id
       TOTESYS_DB_USER          = var.TOTESYS_DB_USER
@@ -16,7 +16,7 @@ resource "aws_lambda_function" "lambda" {
       TOTESYS_DB_HOST          = var.TOTESYS_DB_HOST
       TOTESYS_DB_DATABASE      = var.TOTESYS_DB_DATABASE
       TOTESYS_DB_PORT          = var.TOTESYS_DB_PORT
-    }
+    })
   }
 
   layers     = [module.dependency_layer.aws_lambda_layer_version.arn, "arn:aws:lambda:eu-west-2:336392948345:layer:AWSSDKPandas-Python313:1"]
@@ -6,6 +6,24 @@ variable "python_runtime" {
   type = string
 }
 
+variable "timeout" {
+  description = "Lambda timeout in seconds"
+  type        = number
+  default     = 200
+}
+
+variable "ingest_zone_bucket_actions" {
+  description = "S3 actions the lambda may perform on the ingestion zone bucket objects"
+  type        = list(string)
+  default     = ["s3:PutObject"]
+}
+
+variable "environment_variables" {
+  description = "Settings added to the lambda's environment, e.g. EXTRACT_ROW_HASHING"
+  type        = map(string)
+  default     = {}
+}
+
 variable "s3_bucket" {
   description = "Lambda S3 source code bucket ARN and ID."
   type = object({
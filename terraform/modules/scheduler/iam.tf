@@ -21,8 +21,8 @@ resource "aws_iam_role_policy" "scheduler_policy" {
     Version = "2012-10-17",
     Statement = [{
       Effect   = "Allow",
-      Action   = "states:StartExecution",
-      Resource = var.state_machine_arn
+      Action   = var.target_action,
+      Resource = var.target_arn
     }]
   })
 }
\ No newline at end of file
@@ -10,7 +10,7 @@ resource "aws_scheduler_schedule" "schedule" {
   schedule_expression_timezone = var.schedule_timezone
 
   target {
-    arn      = var.state_machine_arn
+    arn      = var.target_arn
     role_arn = aws_iam_role.scheduler_role.arn
     input = jsonencode({
       source = "scheduler"
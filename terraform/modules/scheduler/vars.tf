@@ -4,7 +4,7 @@ variable "name" {
 }
 
 variable "schedule_expression" {
-  description = "The schedule expression to trigger the Step Function"
+  description = "The schedule expression to trigger the target"
   type        = string
   default     = "rate(20 minutes)"
 }
@@ -15,7 +15,13 @@ variable "schedule_timezone" {
   default     = "UTC"
 }
 
-variable "state_machine_arn" {
-  description = "ARN of the target Step Function"
+variable "target_arn" {
+  description = "ARN of the Step Function or Lambda function to trigger"
   type        = string
 }
+
+variable "target_action" {
+  description = "IAM action the schedule needs on the target: states:StartExecution for a Step Function, lambda:InvokeFunction for a Lambda function"
+  type        = string
+  default     = "states:StartExecution"
+}
@@ -10,17 +10,37 @@ resource "aws_sfn_state_machine" "state_machine" {
       extract = {
         Type     = "Task"
         Resource = var.lambda_arns["extract"]
-        Next     = "transform"
+        Next     = "extract_continue"
+      }
+      # a handler that stopped before its timeout returns "continue": true and
+      # resumes from the checkpoint it saved in the state file
+      extract_continue = {
+        Type    = "Choice"
+        Choices = [{ Variable = "$.continue", BooleanEquals = true, Next = "extract" }]
+        Default = "transform"
       }
       transform = {
         Type     = "Task"
         Resource = var.lambda_arns["transform"]
-        Next     = "load"
+        Next     = "transform_continue"
+      }
+      transform_continue = {
+        Type    = "Choice"
+        Choices = [{ Variable = "$.continue", BooleanEquals = true, Next = "transform" }]
+        Default = "load"
       }
       load = {
         Type     = "Task"
         Resource = var.lambda_arns["load"]
-        End      = true
+        Next     = "load_continue"
+      }
+      load_continue = {
+        Type    = "Choice"
+        Choices = [{ Variable = "$.continue", BooleanEquals = true, Next = "load" }]
+        Default = "done"
+      }
+      done = {
+        Type = "Succeed"
       }
     }
   })
@@ -3,6 +3,35 @@ variable "python_runtime" {
   default = "python3.13"
 }
 
+variable "extract_mode" {
+  description = "Extract step of the ETL state machine: poll runs extract_lambda, cdc runs extract_changes_lambda, which needs wal_level=logical on the source and a poll run to extract the rows that existed before its replication slot"
+  type        = string
+  default     = "poll"
+
+  validation {
+    condition     = contains(["poll", "cdc"], var.extract_mode)
+    error_message = "extract_mode must be poll or cdc."
+  }
+}
+
+variable "extract_row_hashing" {
+  description = "Drop rows whose content has not changed since the last extraction, using the row hash indexes extract_lambda keeps under row_hashes/ in the ingest bucket"
+  type        = bool
+  default     = false
+}
+
+variable "extract_max_part_bytes" {
+  description = "Size from which extract_lambda closes and uploads a Parquet part of a table while it reads the rest, 0 writes every table as one file"
+  type        = number
+  default     = 67108864
+}
+
+variable "extract_page_size" {
+  description = "Rows per keyset page extract_lambda uploads and checkpoints before the Lambda timeout"
+  type        = number
+  default     = 100000
+}
+
 variable "step_function_type" {
   description = "Step Function type: STANDARD or EXPRESS"
   type        = string
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.db.catalog_helpers import get_catalog_fingerprint, get_catalog_tables
+
+
+@pytest.fixture
+def mock_conn_cursor():
+    mock_cursor = MagicMock()
+    mock_conn = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    return mock_conn, mock_cursor
+
+
+def catalog_row(table_name, column_name, udt_name, is_primary_key=False):
+    return {
+        "table_name": table_name,
+        "column_name": column_name,
+        "udt_name": udt_name,
+        "is_primary_key": is_primary_key,
+    }
+
+
+@pytest.mark.describe("get_catalog_fingerprint (mocked unit tests)")
+class TestGetCatalogFingerprint:
+    @pytest.mark.it("check it returns the md5 of the catalog in a single row")
+    def test_fingerprint(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = {"fingerprint": "abc123"}
+
+        assert get_catalog_fingerprint(mock_conn) == "abc123"
+        assert "md5" in mock_cursor.execute.call_args.args[0]
+
+
+@pytest.mark.describe("get_catalog_tables (mocked unit tests)")
+class TestGetCatalogTables:
+    @pytest.mark.it("check columns and primary keys are grouped by table")
+    def test_tables(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            catalog_row("currency", "currency_id", "int4", True),
+            catalog_row("currency", "currency_code", "varchar"),
+            catalog_row("sales_order", "sales_order_id", "int4", True),
+            catalog_row("sales_order", "unit_price", "numeric"),
+        ]
+
+        assert get_catalog_tables(mock_conn) == {
+            "currency": {
+                "columns": [
+                    {"column_name": "currency_id", "udt_name": "int4"},
+                    {"column_name": "currency_code", "udt_name": "varchar"},
+                ],
+                "primary_key": "currency_id",
+            },
+            "sales_order": {
+                "columns": [
+                    {"column_name": "sales_order_id", "udt_name": "int4"},
+                    {"column_name": "unit_price", "udt_name": "numeric"},
+                ],
+                "primary_key": "sales_order_id",
+            },
+        }
+
+    @pytest.mark.it("check a composite primary key is not reported as a key")
+    def test_composite_key(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            catalog_row("link", "a_id", "int4", True),
+            catalog_row("link", "b_id", "int4", True),
+        ]
+
+        assert get_catalog_tables(mock_conn)["link"]["primary_key"] is None
+
+    @pytest.mark.it("check filtered out tables are left out")
+    def test_filtered_out(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            catalog_row("_prisma_migrations", "id", "varchar", True),
+        ]
+
+        assert get_catalog_tables(mock_conn) == {}
@@ -5,7 +5,7 @@ import pytest
 from psycopg import Connection, OperationalError
 from psycopg.rows import dict_row
 
-from src.db.connection import connect_db
+from src.db.connection import connect_db, get_conninfo
 
 
 @pytest.mark.describe("Tests connect_db")
@@ -56,3 +56,35 @@ class TestConnectDb:
             logged_record = caplog.records[0]
             assert logged_record.levelname == "ERROR"
             assert error_massage in logged_record.message
+
+
+@pytest.mark.describe("Tests get_conninfo")
+class TestGetConninfo:
+    @pytest.mark.it("check that it builds the connection string from the environment")
+    def test_conninfo(self, patched_envs, connection_info):
+        assert get_conninfo("TOTESYS") == connection_info
+
+    @pytest.mark.it("check that it raises a ValueError for an unknown database")
+    def test_invalid_db_source(self):
+        with pytest.raises(ValueError):
+            get_conninfo("UNKNOWN")  # type: ignore
+
+    @pytest.mark.it("check that it builds the connection string of a listed source")
+    def test_listed_source(self, monkeypatch):
+        monkeypatch.setenv("EXTRACT_SOURCES", "TOTESYS,TOTESYS_EU")
+        monkeypatch.setenv("TOTESYS_EU_DB_USER", "user")
+        monkeypatch.setenv("TOTESYS_EU_DB_PASSWORD", "pass")
+        monkeypatch.setenv("TOTESYS_EU_DB_HOST", "eu.example.com")
+        monkeypatch.setenv("TOTESYS_EU_DB_DATABASE", "totesys")
+        monkeypatch.setenv("TOTESYS_EU_DB_PORT", "5432")
+
+        assert get_conninfo("TOTESYS_EU") == (
+            "user=user password=pass host=eu.example.com dbname=totesys port=5432"
+        )
+
+    @pytest.mark.it("check that it raises a ValueError for a source not listed")
+    def test_unlisted_source(self, monkeypatch):
+        monkeypatch.setenv("EXTRACT_SOURCES", "TOTESYS")
+
+        with pytest.raises(ValueError):
+            get_conninfo("TOTESYS_EU")
@@ -1,17 +1,41 @@
 import logging
 from copy import copy
 from datetime import datetime
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
 
 import pytest
-from psycopg import Connection, errors
+from psycopg import Connection, IsolationLevel, errors
+from psycopg.rows import tuple_row
 
 from src.db.connection import connect_db
 from src.db.db_helpers import (
+    VARCHAR_DATE_COLUMNS,
+    KeyRange,
+    build_column_projection,
+    build_table_data_query,
+    copy_table_columns,
+    export_snapshot,
+    fetch_columns,
     filter_out_values,
+    get_keyset_index_name,
+    get_projected_type_name,
+    get_source_load,
+    get_table_change_stats,
     get_table_data,
+    get_table_data_columns,
+    get_table_data_page,
+    get_table_description,
+    get_table_key_range_stats,
     get_table_last_updated_timestamp,
+    get_table_primary_key,
+    get_table_projection,
+    get_tables_last_updated_timestamps,
     get_totesys_table_names,
+    import_snapshot,
+    select_table_columns,
+    stream_primary_keys,
+    stream_table_data,
 )
 from src.db.error_map import ERROR_MAP
 
@@ -168,6 +192,34 @@ class TestGetTableLastUpdatedTimestamp:
         assert result["error"]["message"] == "invalid database response"
 
 
+@pytest.mark.describe("Test get_tables_last_updated_timestamps (mocked unit tests)")
+class TestGetTablesLastUpdatedTimestampsMocked:
+    @pytest.mark.it("check that it probes every table in a single query")
+    def test_single_query(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            {"table_name": "currency", "last_updated": datetime(2025, 1, 1)},
+            {"table_name": "design", "last_updated": None},
+        ]
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = get_tables_last_updated_timestamps(mock_conn, ["currency", "design"])
+
+        assert result == {"currency": datetime(2025, 1, 1), "design": None}
+        mock_cursor.execute.assert_called_once()
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert query.count("MAX(last_updated)") == 2
+        assert " UNION ALL " in query
+
+    @pytest.mark.it("check that it does not query the database without tables")
+    def test_no_tables(self):
+        mock_conn = MagicMock()
+
+        assert get_tables_last_updated_timestamps(mock_conn, []) == {}
+        mock_conn.cursor.assert_not_called()
+
+
 @pytest.mark.describe("Test get_table_data (mocked unit tests)")
 class TestGetTableDataMocked:
     @pytest.fixture
@@ -217,3 +269,633 @@ class TestGetTableDataMocked:
         result = get_table_data(mock_conn, "currency", datetime(2100, 1, 1))
 
         assert result == []
+
+
+@pytest.mark.describe("Test get_table_data_columns (mocked unit tests)")
+class TestGetTableDataColumnsMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_cursor.description = [Mock(), Mock()]
+        mock_cursor.description[0].name = "currency_id"
+        mock_cursor.description[1].name = "currency_code"
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it transposes every fetched chunk into columns")
+    def test_columns(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.side_effect = [
+            [(1, "GBP"), (2, "USD")],
+            [(3, None)],
+            [],
+        ]
+
+        result = get_table_data_columns(mock_conn, "currency", chunk_size=2)
+
+        assert result == {
+            "currency_id": [1, 2, 3],
+            "currency_code": ["GBP", "USD", None],
+        }
+        mock_cursor.fetchmany.assert_called_with(2)
+
+    @pytest.mark.it("check that it reads tuples rather than row dictionaries")
+    def test_tuple_rows(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.return_value = []
+
+        get_table_data_columns(mock_conn, "currency", datetime(2025, 1, 1))
+
+        assert mock_conn.cursor.call_args.kwargs["row_factory"] is tuple_row
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert "WHERE last_updated > '2025-01-01" in query
+
+    @pytest.mark.it("check that it returns empty columns when there is no data")
+    def test_no_data(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.return_value = []
+
+        result = get_table_data_columns(mock_conn, "currency")
+
+        assert result == {"currency_id": [], "currency_code": []}
+
+    @pytest.mark.it("check that fetch_columns raises a ValueError for a bad chunk size")
+    def test_invalid_chunk_size(self, mock_conn_cursor):
+        _, mock_cursor = mock_conn_cursor
+
+        with pytest.raises(ValueError):
+            fetch_columns(mock_cursor, chunk_size=0)
+
+
+@pytest.mark.describe("Test stream_table_data (mocked unit tests)")
+class TestStreamTableDataMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it yields every batch returned by the cursor")
+    def test_yields_batches(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        first_batch = [{"currency_id": 1}, {"currency_id": 2}]
+        second_batch = [{"currency_id": 3}]
+        mock_cursor.fetchmany.side_effect = [first_batch, second_batch, []]
+
+        result = list(stream_table_data(mock_conn, "currency", batch_size=2))
+
+        assert result == [first_batch, second_batch]
+        mock_cursor.fetchmany.assert_called_with(2)
+
+    @pytest.mark.it("check that it uses a named server-side cursor")
+    def test_named_cursor(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.side_effect = [[]]
+
+        list(stream_table_data(mock_conn, "currency"))
+
+        assert mock_conn.cursor.call_args.kwargs["name"]
+
+    @pytest.mark.it("check that it filters by last_updated when one is passed")
+    def test_last_updated_filter(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.side_effect = [[]]
+
+        list(stream_table_data(mock_conn, "currency", datetime(2025, 1, 1)))
+
+        query = mock_cursor.execute.call_args.args[0]
+        assert "WHERE last_updated >" in query.as_string()
+
+    @pytest.mark.it("check that it yields nothing when there is no new data")
+    def test_no_data(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.side_effect = [[]]
+
+        result = list(stream_table_data(mock_conn, "currency"))
+
+        assert result == []
+
+    @pytest.mark.it("check that it raises a ValueError for a non positive batch size")
+    def test_invalid_batch_size(self, mock_conn_cursor):
+        mock_conn, _ = mock_conn_cursor
+
+        with pytest.raises(ValueError):
+            list(stream_table_data(mock_conn, "currency", batch_size=0))
+
+
+@pytest.mark.describe("Test stream_primary_keys (mocked unit tests)")
+class TestStreamPrimaryKeysMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it yields the keys of every batch in key order")
+    def test_yields_keys(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(5,)], []]
+
+        result = list(stream_primary_keys(mock_conn, "currency", "currency_id", 2))
+
+        assert result == [[1, 2], [5]]
+        assert mock_conn.cursor.call_args.kwargs["name"]
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert query == (
+            'SELECT "currency_id" FROM public."currency" ORDER BY "currency_id"'
+        )
+
+    @pytest.mark.it("check that it raises a ValueError for a non positive batch size")
+    def test_invalid_batch_size(self, mock_conn_cursor):
+        mock_conn, _ = mock_conn_cursor
+
+        with pytest.raises(ValueError):
+            list(stream_primary_keys(mock_conn, "currency", "currency_id", 0))
+
+
+@pytest.mark.describe("Test copy_table_columns (mocked unit tests)")
+class TestCopyTableColumnsMocked:
+    @pytest.fixture
+    def mock_conn_copy(self):
+        mock_copy = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.copy.return_value.__enter__.return_value = mock_copy
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor, mock_copy
+
+    @pytest.mark.it("check that it yields the copied rows transposed into columns")
+    def test_yields_columns(self, mock_conn_copy):
+        mock_conn, _, mock_copy = mock_conn_copy
+        mock_copy.rows.return_value = iter([(1, "GBP"), (2, "USD"), (3, "EUR")])
+
+        result = list(
+            copy_table_columns(mock_conn, "currency", [23, 1043], batch_size=2)
+        )
+
+        assert result == [[[1, 2], ["GBP", "USD"]], [[3], ["EUR"]]]
+        mock_copy.set_types.assert_called_once_with([23, 1043])
+
+    @pytest.mark.it("check that it runs a binary COPY of the table query")
+    def test_binary_copy(self, mock_conn_copy):
+        mock_conn, mock_cursor, mock_copy = mock_conn_copy
+        mock_copy.rows.return_value = iter([])
+
+        list(copy_table_columns(mock_conn, "currency", [23], datetime(2025, 1, 1)))
+
+        query = mock_cursor.copy.call_args.args[0].as_string()
+        assert query.startswith('COPY (SELECT * FROM public."currency"')
+        assert "WHERE last_updated >" in query
+        assert query.endswith("TO STDOUT (FORMAT BINARY)")
+
+    @pytest.mark.it("check that it yields nothing when there is no new data")
+    def test_no_data(self, mock_conn_copy):
+        mock_conn, _, mock_copy = mock_conn_copy
+        mock_copy.rows.return_value = iter([])
+
+        assert list(copy_table_columns(mock_conn, "currency", [23])) == []
+
+    @pytest.mark.it("check that it raises a ValueError for a non positive batch size")
+    def test_invalid_batch_size(self, mock_conn_copy):
+        mock_conn, _, _ = mock_conn_copy
+
+        with pytest.raises(ValueError):
+            list(copy_table_columns(mock_conn, "currency", [23], batch_size=0))
+
+
+@pytest.mark.describe("Test get_table_primary_key (mocked unit tests)")
+class TestGetTablePrimaryKeyMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it returns the primary key column")
+    def test_returns_primary_key(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [{"column_name": "currency_id"}]
+
+        assert get_table_primary_key(mock_conn, "currency") == "currency_id"
+        assert mock_cursor.execute.call_args.args[1] == ("public.currency",)
+
+    @pytest.mark.it("check that it raises a ValueError without a single column key")
+    @pytest.mark.parametrize(
+        "response", [[], [{"column_name": "a"}, {"column_name": "b"}]]
+    )
+    def test_no_single_primary_key(self, mock_conn_cursor, response):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = response
+
+        with pytest.raises(ValueError):
+            get_table_primary_key(mock_conn, "currency")
+
+
+@pytest.mark.describe("Test get_keyset_index_name (mocked unit tests)")
+class TestGetKeysetIndexNameMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it returns the index leading with the keyset columns")
+    def test_index(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [{"index_name": "currency_keyset_idx"}]
+
+        index_name = get_keyset_index_name(mock_conn, "currency", "currency_id")
+
+        assert index_name == "currency_keyset_idx"
+        assert mock_cursor.execute.call_args.args[1] == (
+            "public.currency",
+            "currency_id",
+        )
+
+    @pytest.mark.it("check that it returns None without such an index")
+    def test_no_index(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = []
+
+        assert get_keyset_index_name(mock_conn, "currency", "currency_id") is None
+
+
+@pytest.mark.describe("Test get_table_data_page (mocked unit tests)")
+class TestGetTableDataPageMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it reads the first page in keyset order")
+    def test_first_page(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        get_table_data_page(mock_conn, "currency", "currency_id", page_size=500)
+
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert "WHERE" not in query
+        assert query.endswith('ORDER BY last_updated, "currency_id" LIMIT 500')
+
+    @pytest.mark.it("check that it starts after the compound watermark")
+    def test_compound_watermark(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        get_table_data_page(
+            mock_conn, "currency", "currency_id", datetime(2025, 1, 1), 42
+        )
+
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert 'WHERE (last_updated, "currency_id") > (\'2025-01-01' in query
+        assert ", 42)" in query
+
+    @pytest.mark.it("check that a timestamp only watermark filters on last_updated")
+    def test_timestamp_watermark(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        get_table_data_page(mock_conn, "currency", "currency_id", datetime(2025, 1, 1))
+
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert "WHERE last_updated > '2025-01-01" in query
+
+    @pytest.mark.it("check that it raises a ValueError for a non positive page size")
+    def test_invalid_page_size(self, mock_conn_cursor):
+        mock_conn, _ = mock_conn_cursor
+
+        with pytest.raises(ValueError):
+            get_table_data_page(mock_conn, "currency", "currency_id", page_size=0)
+
+
+@pytest.mark.describe("Test build_table_data_query")
+class TestBuildTableDataQuery:
+    @pytest.mark.it("check that it filters by last_updated and key range together")
+    def test_key_range(self):
+        query = build_table_data_query(
+            "sales_order",
+            datetime(2025, 1, 1),
+            KeyRange("sales_order_id", 1, 101),
+        ).as_string()
+
+        assert query.startswith(
+            'SELECT * FROM public."sales_order" WHERE last_updated > '
+        )
+        assert query.endswith(' AND "sales_order_id" >= 1 AND "sales_order_id" < 101')
+
+    @pytest.mark.it("check that it has no WHERE clause without filters")
+    def test_no_filters(self):
+        query = build_table_data_query("sales_order").as_string()
+
+        assert query == 'SELECT * FROM public."sales_order"'
+
+    @pytest.mark.it("check that it selects the given projection")
+    def test_projection(self):
+        projection = build_column_projection(
+            "currency",
+            [
+                {"column_name": "currency_id", "udt_name": "int4"},
+                {"column_name": "currency_code", "udt_name": "_varchar"},
+            ],
+        )
+
+        query = build_table_data_query("currency", projection=projection).as_string()
+
+        assert query == (
+            'SELECT "currency_id", array_to_string("currency_code", \',\') AS '
+            '"currency_code" FROM public."currency"'
+        )
+
+
+@pytest.mark.describe("Test build_column_projection")
+class TestBuildColumnProjection:
+    @pytest.mark.it("check that numeric columns are cast to float8")
+    def test_numeric(self):
+        projection = build_column_projection(
+            "sales_order", [{"column_name": "unit_price", "udt_name": "numeric"}]
+        ).as_string()
+
+        assert projection == '"unit_price"::float8 AS "unit_price"'
+
+    @pytest.mark.it("check that the table's varchar date columns are cast to date")
+    def test_varchar_dates(self):
+        columns = [
+            {"column_name": "agreed_delivery_date", "udt_name": "varchar"},
+            {"column_name": "agreed_payment_date", "udt_name": "varchar"},
+        ]
+
+        projection = build_column_projection("sales_order", columns).as_string()
+
+        assert projection == (
+            'NULLIF("agreed_delivery_date", \'\')::date AS "agreed_delivery_date", '
+            'NULLIF("agreed_payment_date", \'\')::date AS "agreed_payment_date"'
+        )
+
+    @pytest.mark.it("check that other columns are selected unchanged")
+    def test_unchanged(self):
+        columns = [
+            {"column_name": "design_name", "udt_name": "varchar"},
+            {"column_name": "agreed_delivery_date", "udt_name": "varchar"},
+            {"column_name": "last_updated", "udt_name": "timestamp"},
+        ]
+
+        projection = build_column_projection("design", columns).as_string()
+
+        assert projection == '"design_name", "agreed_delivery_date", "last_updated"'
+
+
+@pytest.mark.describe("Test get_table_projection (mocked unit tests)")
+class TestGetTableProjectionMocked:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check that it builds the projection from information_schema")
+    def test_projection(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            {"column_name": "payment_id", "udt_name": "int4"},
+            {"column_name": "payment_amount", "udt_name": "numeric"},
+        ]
+
+        projection = get_table_projection(mock_conn, "payment").as_string()
+
+        assert projection == (
+            '"payment_id", "payment_amount"::float8 AS "payment_amount"'
+        )
+        assert mock_cursor.execute.call_args.args[1] == ("payment",)
+
+    @pytest.mark.it("check that it raises a ValueError for a table without columns")
+    def test_no_columns(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = []
+
+        with pytest.raises(ValueError):
+            get_table_projection(mock_conn, "missing")
+
+    @pytest.mark.it("check that it only selects the requested columns")
+    def test_columns(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            {"column_name": "staff_id", "udt_name": "int4"},
+            {"column_name": "manager", "udt_name": "varchar"},
+            {"column_name": "last_updated", "udt_name": "timestamp"},
+        ]
+
+        projection = get_table_projection(
+            mock_conn, "staff", ["last_updated", "staff_id"]
+        ).as_string()
+
+        assert projection == '"staff_id", "last_updated"'
+
+    @pytest.mark.it("check that it raises a ValueError for a missing requested column")
+    def test_missing_column(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [
+            {"column_name": "staff_id", "udt_name": "int4"}
+        ]
+
+        with pytest.raises(ValueError, match="email_address"):
+            get_table_projection(mock_conn, "staff", ["staff_id", "email_address"])
+
+
+@pytest.mark.describe("Test get_table_key_range_stats (mocked unit tests)")
+class TestGetTableKeyRangeStatsMocked:
+    @pytest.mark.it("check that it returns the key range and row count of the delta")
+    def test_returns_stats(self):
+        stats = {
+            "row_count": 100,
+            "min_key": 1,
+            "max_key": 100,
+            "last_updated": datetime(2025, 1, 1),
+        }
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = stats
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = get_table_key_range_stats(
+            mock_conn, "sales_order", "sales_order_id", datetime(2024, 1, 1)
+        )
+
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert result == stats
+        assert "COUNT(*)" in query
+        assert "WHERE last_updated >" in query
+
+
+@pytest.mark.describe("Test get_table_description (mocked unit tests)")
+class TestGetTableDescriptionMocked:
+    @pytest.mark.it("check that it returns the cursor description without fetching")
+    def test_returns_description(self):
+        mock_cursor = MagicMock()
+        mock_cursor.description = ["currency_id", "currency_code"]
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+
+        result = get_table_description(mock_conn, "currency")
+
+        assert result == ["currency_id", "currency_code"]
+        assert "LIMIT 0" in mock_cursor.execute.call_args.args[0].as_string()
+        mock_cursor.fetchall.assert_not_called()
+
+
+@pytest.mark.describe("Test export_snapshot and import_snapshot (mocked unit tests)")
+class TestSnapshots:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check export_snapshot returns the id from pg_export_snapshot")
+    def test_export(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = {"snapshot_id": "00000003-0000001B-1"}
+
+        result = export_snapshot(mock_conn)
+
+        assert result == "00000003-0000001B-1"
+        assert "pg_export_snapshot()" in mock_cursor.execute.call_args.args[0]
+
+    @pytest.mark.it(
+        "check import_snapshot sets the snapshot on a repeatable read transaction"
+    )
+    def test_import(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        import_snapshot(mock_conn, "00000003-0000001B-1")
+
+        assert mock_conn.isolation_level == IsolationLevel.REPEATABLE_READ
+        query = mock_cursor.execute.call_args.args[0].as_string()
+        assert query == "SET TRANSACTION SNAPSHOT '00000003-0000001B-1'"
+
+
+@pytest.mark.describe("Test get_source_load (mocked unit tests)")
+class TestGetSourceLoad:
+    @pytest.fixture
+    def mock_conn_cursor(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return mock_conn, mock_cursor
+
+    @pytest.mark.it("check it samples fresh activity without the excluded backends")
+    def test_load(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = {"active_sessions": 3, "lock_waits": 1}
+
+        result = get_source_load(mock_conn, [101, 102])
+
+        first_call, second_call = mock_cursor.execute.call_args_list
+        assert first_call.args[0] == "SELECT pg_stat_clear_snapshot()"
+        assert second_call.args[1] == ([101, 102],)
+        assert result == {"active_sessions": 3, "lock_waits": 1}
+
+
+@pytest.mark.describe("Test get_table_change_stats (mocked unit tests)")
+class TestGetTableChangeStats:
+    @pytest.mark.it("check it returns fresh size and change counters by table")
+    def test_stats(self):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchall.return_value = [
+            {
+                "table_name": "staff",
+                "estimated_rows": 20,
+                "live_rows": 21,
+                "changed_rows": 40,
+            }
+        ]
+
+        result = get_table_change_stats(mock_conn, ["staff"])
+
+        first_call, second_call = mock_cursor.execute.call_args_list
+        assert first_call.args[0] == "SELECT pg_stat_clear_snapshot()"
+        assert second_call.args[1] == (["staff"],)
+        assert result == {
+            "staff": {"estimated_rows": 20, "live_rows": 21, "changed_rows": 40}
+        }
+
+    @pytest.mark.it("check it does not query the database without tables")
+    def test_no_tables(self):
+        mock_conn = MagicMock()
+
+        assert get_table_change_stats(mock_conn, []) == {}
+        mock_conn.cursor.assert_not_called()
+
+
+@pytest.mark.describe("Test select_table_columns")
+class TestSelectTableColumns:
+    columns = [
+        {"column_name": "currency_id", "udt_name": "int4"},
+        {"column_name": "currency_code", "udt_name": "varchar"},
+        {"column_name": "last_updated", "udt_name": "timestamp"},
+    ]
+
+    @pytest.mark.it("check that it keeps the requested columns in table order")
+    def test_selects(self):
+        result = select_table_columns(
+            "currency", self.columns, ["last_updated", "currency_id"]
+        )
+
+        assert [column["column_name"] for column in result] == [
+            "currency_id",
+            "last_updated",
+        ]
+
+    @pytest.mark.it("check that it raises a ValueError naming missing columns")
+    def test_missing(self):
+        with pytest.raises(ValueError, match="currency_name"):
+            select_table_columns("currency", self.columns, ["currency_name"])
+
+
+@pytest.mark.describe("Test get_projected_type_name")
+class TestGetProjectedTypeName:
+    @pytest.mark.it("check that it returns the type each column is extracted as")
+    def test_types(self):
+        def projected(table_name, column_name, udt_name):
+            return get_projected_type_name(
+                table_name, {"column_name": column_name, "udt_name": udt_name}
+            )
+
+        assert projected("sales_order", "unit_price", "numeric") == "float8"
+        assert projected("sales_order", "agreed_payment_date", "varchar") == "date"
+        assert projected("staff", "tags", "_text") == "text"
+        assert projected("staff", "email_address", "varchar") == "varchar"
+
+    @pytest.mark.it("check that a listed date column that is not varchar is kept")
+    def test_listed_column_not_varchar(self, caplog):
+        result = get_projected_type_name(
+            "payment", {"column_name": "payment_date", "udt_name": "date"}
+        )
+
+        assert result == "date"
+        assert "payment.payment_date is listed in VARCHAR_DATE_COLUMNS" in caplog.text
+
+    @pytest.mark.it("check that every listed date column is varchar in the schema")
+    def test_listed_columns_are_varchar(self):
+        schema_path = (
+            Path(__file__).parents[2]
+            / "sql_local_tests"
+            / "create_local_totesys_db.sql"
+        )
+        schema = schema_path.read_text()
+
+        for table_name, column_names in VARCHAR_DATE_COLUMNS.items():
+            table_definition = schema.split(f'CREATE TABLE "{table_name}" (')[1]
+            table_definition = table_definition.split(");")[0]
+
+            for column_name in column_names:
+                assert f'"{column_name}" varchar' in table_definition
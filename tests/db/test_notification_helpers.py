@@ -0,0 +1,51 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.db.notification_helpers import (
+    install_change_notify_triggers,
+    remove_change_notify_triggers,
+)
+
+
+@pytest.fixture
+def mock_conn_cursor():
+    mock_cursor = MagicMock()
+    mock_conn = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    return mock_conn, mock_cursor
+
+
+def executed_statements(mock_cursor):
+    return [call.args[0].as_string() for call in mock_cursor.execute.call_args_list]
+
+
+@pytest.mark.describe("Test install_change_notify_triggers (mocked unit tests)")
+class TestInstallChangeNotifyTriggers:
+    @pytest.mark.it("check that it replaces a statement trigger on every table")
+    def test_install(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        install_change_notify_triggers(
+            mock_conn, ["currency", "staff"], "totesys_changes"
+        )
+
+        statements = executed_statements(mock_cursor)
+        assert "pg_notify(TG_ARGV[0], TG_TABLE_NAME)" in statements[0]
+        assert statements[1:3] == [
+            'DROP TRIGGER IF EXISTS notify_table_change ON public."currency"',
+            "CREATE TRIGGER notify_table_change AFTER INSERT OR UPDATE OR DELETE"
+            ' OR TRUNCATE ON public."currency" FOR EACH STATEMENT EXECUTE FUNCTION'
+            " public.notify_table_change('totesys_changes')",
+        ]
+        assert len(statements) == 5
+
+    @pytest.mark.it("check that remove_change_notify_triggers drops the triggers")
+    def test_remove(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        remove_change_notify_triggers(mock_conn, ["currency"])
+
+        assert executed_statements(mock_cursor) == [
+            'DROP TRIGGER IF EXISTS notify_table_change ON public."currency"'
+        ]
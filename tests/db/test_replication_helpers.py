@@ -0,0 +1,128 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.db.replication_helpers import (
+    advance_replication_slot,
+    ensure_publication,
+    ensure_replication_slot,
+    get_replication_slot_lag,
+    peek_replication_changes,
+)
+
+
+@pytest.fixture
+def mock_conn_cursor():
+    mock_cursor = MagicMock()
+    mock_conn = MagicMock()
+    mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
+    return mock_conn, mock_cursor
+
+
+def executed_statements(mock_cursor):
+    return [
+        call.args[0] if isinstance(call.args[0], str) else call.args[0].as_string()
+        for call in mock_cursor.execute.call_args_list
+    ]
+
+
+@pytest.mark.describe("Test ensure_publication (mocked unit tests)")
+class TestEnsurePublication:
+    @pytest.mark.it("check that it creates a missing publication of the tables")
+    def test_create(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = []
+        mock_cursor.fetchone.return_value = None
+
+        ensure_publication(mock_conn, "totesys_cdc", ["currency", "staff"])
+
+        assert executed_statements(mock_cursor)[-1] == (
+            'CREATE PUBLICATION "totesys_cdc" FOR TABLE public."currency", '
+            'public."staff"'
+        )
+
+    @pytest.mark.it("check that it only adds the tables not published yet")
+    def test_alter(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [{"tablename": "currency"}]
+        mock_cursor.fetchone.return_value = {"?column?": 1}
+
+        ensure_publication(mock_conn, "totesys_cdc", ["currency", "staff"])
+
+        assert executed_statements(mock_cursor)[-1] == (
+            'ALTER PUBLICATION "totesys_cdc" ADD TABLE public."staff"'
+        )
+
+    @pytest.mark.it("check that it changes nothing when every table is published")
+    def test_up_to_date(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [{"tablename": "currency"}]
+        mock_cursor.fetchone.return_value = {"?column?": 1}
+
+        ensure_publication(mock_conn, "totesys_cdc", ["currency"])
+
+        assert mock_cursor.execute.call_count == 2
+
+
+@pytest.mark.describe("Test ensure_replication_slot (mocked unit tests)")
+class TestEnsureReplicationSlot:
+    @pytest.mark.it("check that it creates a pgoutput slot when there is none")
+    def test_create(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = None
+
+        assert ensure_replication_slot(mock_conn, "totesys_cdc") is True
+        assert "'pgoutput'" in executed_statements(mock_cursor)[-1]
+
+    @pytest.mark.it("check that it keeps an existing slot")
+    def test_existing(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = {"?column?": 1}
+
+        assert ensure_replication_slot(mock_conn, "totesys_cdc") is False
+        assert mock_cursor.execute.call_count == 1
+
+
+@pytest.mark.describe("Test peek and advance of a replication slot (mocked)")
+class TestPeekAndAdvance:
+    @pytest.mark.it("check that peeking returns the messages without consuming them")
+    def test_peek(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchall.return_value = [{"data": memoryview(b"B123")}]
+
+        messages = peek_replication_changes(mock_conn, "slot", "pub", 500)
+
+        assert messages == [b"B123"]
+        query, params = mock_cursor.execute.call_args.args
+        assert "pg_logical_slot_peek_binary_changes" in query
+        assert params == ("slot", 500, "pub")
+
+    @pytest.mark.it("check that advancing moves the slot to the given LSN")
+    def test_advance(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+
+        advance_replication_slot(mock_conn, "slot", "0/2F18FC8")
+
+        assert mock_cursor.execute.call_args.args[1] == ("slot", "0/2F18FC8")
+
+
+@pytest.mark.describe("Test get_replication_slot_lag (mocked unit tests)")
+class TestGetReplicationSlotLag:
+    @pytest.mark.it("check that it returns the slot position and lag in bytes")
+    def test_lag(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = {
+            "confirmed_flush_lsn": "0/10",
+            "current_lsn": "0/20",
+            "lag_bytes": 16,
+        }
+
+        assert get_replication_slot_lag(mock_conn, "slot")["lag_bytes"] == 16
+
+    @pytest.mark.it("check that it raises a ValueError for a missing slot")
+    def test_missing(self, mock_conn_cursor):
+        mock_conn, mock_cursor = mock_conn_cursor
+        mock_cursor.fetchone.return_value = None
+
+        with pytest.raises(ValueError):
+            get_replication_slot_lag(mock_conn, "slot")
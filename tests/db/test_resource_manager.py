@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg import IsolationLevel
+
+from src.utilities.resource_manager import ResourceManager
+
+MODULE = "src.utilities.resource_manager"
+
+
+@pytest.fixture
+def patched_pool(patched_envs):
+    def make_pool(conninfo, **kwargs):
+        pool = MagicMock()
+        pool.conninfo = conninfo
+        pool.closed = False
+        return pool
+
+    with patch(f"{MODULE}.ConnectionPool", side_effect=make_pool) as mock_pool_class:
+        yield mock_pool_class
+
+
+@pytest.mark.describe("Test ResourceManager")
+class TestResourceManager:
+    @pytest.mark.it("check that warm calls reuse the same open pool")
+    def test_reuses_pool(self, patched_pool):
+        resources = ResourceManager()
+
+        first_pool = resources.get_connection_pool("TOTESYS")
+        second_pool = resources.get_connection_pool("TOTESYS")
+
+        assert first_pool is second_pool
+        patched_pool.assert_called_once()
+        first_pool.open.assert_called_once()
+        assert patched_pool.call_args.kwargs["check"] is not None
+
+    @pytest.mark.it("check that each database gets its own pool")
+    def test_pool_per_db_source(self, patched_pool, monkeypatch):
+        monkeypatch.setenv("DATAWAREHOUSE_DB_HOST", "warehouse")
+        resources = ResourceManager()
+
+        totesys_pool = resources.get_connection_pool("TOTESYS")
+        warehouse_pool = resources.get_connection_pool("DATAWAREHOUSE")
+
+        assert totesys_pool is not warehouse_pool
+        assert "host=warehouse" in warehouse_pool.conninfo
+
+    @pytest.mark.it("check that a closed pool is replaced")
+    def test_replaces_closed_pool(self, patched_pool):
+        resources = ResourceManager()
+        first_pool = resources.get_connection_pool("TOTESYS")
+        first_pool.closed = True
+
+        second_pool = resources.get_connection_pool("TOTESYS")
+
+        assert second_pool is not first_pool
+        assert patched_pool.call_count == 2
+
+    @pytest.mark.it(
+        "check that the pool is rebuilt when the connection settings change"
+    )
+    def test_rebuilds_on_new_settings(self, patched_pool, monkeypatch):
+        resources = ResourceManager()
+        first_pool = resources.get_connection_pool("TOTESYS")
+
+        monkeypatch.setenv("TOTESYS_DB_PASSWORD", "rotated")
+        second_pool = resources.get_connection_pool("TOTESYS")
+
+        assert second_pool is not first_pool
+        first_pool.close.assert_called_once()
+        assert "password=rotated" in second_pool.conninfo
+
+    @pytest.mark.it("check that a pool grows to the size a caller needs")
+    def test_max_size(self, patched_pool):
+        resources = ResourceManager(pool_max_size=2)
+        pool = resources.get_connection_pool("TOTESYS", max_size=5)
+        pool.min_size, pool.max_size = 1, 5
+
+        assert patched_pool.call_args.kwargs["max_size"] == 5
+        resources.get_connection_pool("TOTESYS", max_size=3)
+        pool.resize.assert_not_called()
+
+        resources.get_connection_pool("TOTESYS", max_size=8)
+        pool.resize.assert_called_once_with(1, 8)
+
+    @pytest.mark.it("check that returned connections get the default isolation level")
+    def test_reset(self, patched_pool):
+        conn = MagicMock(isolation_level=IsolationLevel.REPEATABLE_READ)
+
+        ResourceManager().get_connection_pool("TOTESYS")
+        patched_pool.call_args.kwargs["reset"](conn)
+
+        assert conn.isolation_level is None
+
+    @pytest.mark.it("check that connection borrows a connection from the pool")
+    def test_connection(self, patched_pool):
+        resources = ResourceManager(pool_timeout=5)
+        pool = resources.get_connection_pool("TOTESYS")
+        mock_conn = MagicMock()
+        pool.connection.return_value.__enter__.return_value = mock_conn
+
+        with resources.connection("TOTESYS") as conn:
+            assert conn is mock_conn
+
+        pool.connection.assert_called_once_with(timeout=5)
+        pool.connection.return_value.__exit__.assert_called_once()
+
+    @pytest.mark.it("check that it raises a ValueError for an unknown database")
+    def test_invalid_db_source(self, patched_pool):
+        with pytest.raises(ValueError):
+            ResourceManager().get_connection_pool("UNKNOWN")  # type: ignore
+
+    @pytest.mark.it("check that the S3 client is created once")
+    def test_s3_client(self):
+        resources = ResourceManager()
+
+        with patch(f"{MODULE}.boto3.client") as mock_client:
+            first_client = resources.get_s3_client()
+            second_client = resources.get_s3_client()
+
+        assert first_client is second_client
+        mock_client.assert_called_once_with("s3")
+
+    @pytest.mark.it("check that close closes every pool and forgets the client")
+    def test_close(self, patched_pool):
+        resources = ResourceManager()
+        pool = resources.get_connection_pool("TOTESYS")
+
+        with patch(f"{MODULE}.boto3.client") as mock_client:
+            resources.get_s3_client()
+            resources.close()
+            resources.get_s3_client()
+
+        pool.close.assert_called_once()
+        assert mock_client.call_count == 2
+        assert resources.get_connection_pool("TOTESYS") is not pool
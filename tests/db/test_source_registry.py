@@ -0,0 +1,47 @@
+import pytest
+
+from src.db.source_registry import (
+    add_source_prefix,
+    get_source_names,
+    get_source_prefix,
+)
+
+
+@pytest.mark.describe("Tests get_source_names")
+class TestGetSourceNames:
+    @pytest.mark.it("check that it defaults to the TOTESYS source")
+    def test_default(self, monkeypatch):
+        monkeypatch.delenv("EXTRACT_SOURCES", raising=False)
+
+        assert get_source_names() == ["TOTESYS"]
+
+    @pytest.mark.it("check that it reads the sources in order")
+    def test_sources(self, monkeypatch):
+        monkeypatch.setenv("EXTRACT_SOURCES", "TOTESYS, TOTESYS_EU,TOTESYS_US")
+
+        assert get_source_names() == ["TOTESYS", "TOTESYS_EU", "TOTESYS_US"]
+
+    @pytest.mark.it("check that it raises a ValueError for invalid or repeated names")
+    @pytest.mark.parametrize(
+        "setting", ["totesys_eu", "TOTESYS-EU", "DATAWAREHOUSE", "TOTESYS,TOTESYS"]
+    )
+    def test_invalid(self, monkeypatch, setting):
+        monkeypatch.setenv("EXTRACT_SOURCES", setting)
+
+        with pytest.raises(ValueError):
+            get_source_names()
+
+
+@pytest.mark.describe("Tests add_source_prefix")
+class TestAddSourcePrefix:
+    @pytest.mark.it("check that the keys of the TOTESYS source are not namespaced")
+    def test_default_source(self):
+        assert get_source_prefix("TOTESYS") is None
+        assert add_source_prefix("TOTESYS", "lambda_state.json") == "lambda_state.json"
+
+    @pytest.mark.it("check that other sources are namespaced by their name")
+    def test_other_source(self):
+        assert get_source_prefix("TOTESYS_EU") == "totesys_eu"
+        assert (
+            add_source_prefix("TOTESYS_EU", "catalog.json") == "totesys_eu/catalog.json"
+        )
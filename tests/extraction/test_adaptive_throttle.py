@@ -0,0 +1,176 @@
+from threading import Thread
+from time import sleep
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utilities.extraction.adaptive_throttle import AdaptiveThrottle
+
+IDLE = {"active_sessions": 0, "lock_waits": 0}
+
+
+def make_throttle(sample_load=None, **settings):
+    settings = {
+        "max_concurrency": 4,
+        "batch_size": 4000,
+        "min_batch_size": 1000,
+        "max_batch_size": 6000,
+        "max_active_sessions": 5,
+        "max_lock_waits": 0,
+        "max_batch_seconds": 1.0,
+        "sample_interval_seconds": 0,
+        **settings,
+    }
+    return AdaptiveThrottle(sample_load or MagicMock(return_value=IDLE), **settings)
+
+
+def extract(throttle, table_name, rows=10):
+    with throttle.permit(table_name) as ticket:
+        ticket["rows"] = rows
+
+    return ticket
+
+
+@pytest.mark.describe("AdaptiveThrottle Behaviour")
+class TestAdaptiveThrottle:
+    @pytest.mark.it("check it ramps up additively while the source is within budget")
+    def test_increase(self):
+        throttle = make_throttle()
+
+        extract(throttle, "currency")
+        extract(throttle, "staff")
+        extract(throttle, "design")
+
+        assert throttle.concurrency == 4
+        assert throttle.batch_size == 6000
+        assert throttle.get_metrics()["adjustments"] == 3
+
+    @pytest.mark.it(
+        "check it halves concurrency and batch size over the session budget"
+    )
+    def test_busy_sessions(self):
+        sample_load = MagicMock(side_effect=[IDLE, IDLE, IDLE, {"active_sessions": 9}])
+        throttle = make_throttle(sample_load)
+
+        for table_name in ["currency", "staff", "design", "address"]:
+            extract(throttle, table_name)
+
+        assert throttle.concurrency == 2
+        assert throttle.batch_size == 3000
+
+    @pytest.mark.it("check it backs off when sessions wait on locks")
+    def test_lock_waits(self):
+        throttle = make_throttle(
+            MagicMock(return_value={"active_sessions": 0, "lock_waits": 2}),
+            batch_size=1000,
+        )
+
+        extract(throttle, "currency")
+
+        assert throttle.concurrency == 1
+        assert throttle.batch_size == 1000
+
+    @pytest.mark.it("check it backs off when its own batches are slow")
+    def test_slow_batches(self):
+        throttle = make_throttle(max_batch_seconds=0.01)
+
+        with throttle.permit("sales_order") as ticket:
+            sleep(0.05)
+            ticket["rows"] = 4000
+
+        assert throttle.batch_size == 2000
+
+    @pytest.mark.it("check it adjusts after every reported batch, not again per table")
+    def test_batches(self):
+        throttle = make_throttle()
+
+        with throttle.permit("sales_order") as ticket:
+            ticket["on_batch"](4000, 0.1)
+            ticket["on_batch"](4000, 0.1)
+            assert throttle.concurrency == 3
+            ticket["on_batch"](4000, 2.0)
+            ticket["rows"] = 12000
+
+        assert throttle.concurrency == 1
+        assert throttle.batch_size == 3000
+        assert throttle.get_metrics()["adjustments"] == 3
+        assert throttle.get_metrics()["table_rates"]["sales_order"]["batches"] == 3
+
+    @pytest.mark.it("check the source load is sampled without holding the lock")
+    def test_sample_unlocked(self):
+        throttle = None
+        metrics = []
+
+        def sample_load():
+            # another table's thread reads the throttle while the sample runs
+            reader = Thread(target=lambda: metrics.append(throttle.get_metrics()))
+            reader.start()
+            reader.join(timeout=1)
+            return IDLE
+
+        throttle = make_throttle(sample_load)
+        extract(throttle, "currency")
+
+        assert len(metrics) == 1
+
+    @pytest.mark.it("check it reports the rate each table was extracted with")
+    def test_table_rates(self):
+        throttle = make_throttle()
+
+        extract(throttle, "currency", rows=3)
+        rates = throttle.get_metrics()["table_rates"]
+
+        assert rates["currency"]["concurrency"] == 1
+        assert rates["currency"]["batch_size"] == 4000
+        assert rates["currency"]["rows"] == 3
+
+    @pytest.mark.it("check tables not read in batches leave the batch size alone")
+    def test_unbatched(self):
+        throttle = make_throttle()
+
+        with throttle.permit("currency", batched=False) as ticket:
+            ticket["rows"] = 3
+
+        rates = throttle.get_metrics()["table_rates"]
+
+        assert ticket["batch_size"] is None
+        assert rates["currency"]["batch_size"] is None
+        assert throttle.concurrency == 2
+        assert throttle.batch_size == 4000
+
+    @pytest.mark.it("check it never runs more tables at a time than the concurrency")
+    def test_limits_concurrency(self):
+        throttle = make_throttle(max_concurrency=1)
+        running = []
+        peak = []
+
+        def worker(table_name):
+            with throttle.permit(table_name):
+                running.append(table_name)
+                peak.append(len(running))
+                sleep(0.01)
+                running.remove(table_name)
+
+        threads = [Thread(target=worker, args=(str(i),)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 1
+
+    @pytest.mark.it("check a failed extraction releases its permit without adjusting")
+    def test_failure(self):
+        throttle = make_throttle()
+
+        with pytest.raises(RuntimeError):
+            with throttle.permit("currency"):
+                raise RuntimeError("extraction failed")
+
+        assert throttle.in_flight == 0
+        assert throttle.get_metrics()["adjustments"] == 0
+
+    @pytest.mark.it("check it raises a ValueError for an out of range batch size")
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            make_throttle(batch_size=500)
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from src.utilities.dimensions.dim_counterparty_transform import (
+    dim_counterparty_dataframe,
+)
+from src.utilities.dimensions.dim_currency_transform import dim_currency_dataframe
+from src.utilities.dimensions.dim_design_transform import dim_design_dataframe
+from src.utilities.dimensions.dim_location_transform import dim_location_dataframe
+from src.utilities.dimensions.dim_staff_transform import dim_staff_dataframe
+from src.utilities.extraction.column_requirements import (
+    SOURCE_COLUMN_REQUIREMENTS,
+    get_missing_required_columns,
+    get_required_columns,
+)
+
+
+def projected_frame(table_name):
+    """A one row frame holding the source and the columns extracted from the table."""
+    return pd.DataFrame(
+        {
+            "source": ["TOTESYS"],
+            **{
+                column: [1 if column.endswith("_id") else "GBP"]
+                for column in SOURCE_COLUMN_REQUIREMENTS[table_name]
+            },
+        }
+    )
+
+
+@pytest.mark.describe("Source column requirements Behaviour")
+class TestColumnRequirements:
+    @pytest.mark.it("check every projected table keeps its watermark column")
+    def test_watermark(self):
+        for columns in SOURCE_COLUMN_REQUIREMENTS.values():
+            assert "last_updated" in columns
+
+    @pytest.mark.it("check tables without requirements are extracted whole")
+    def test_unlisted(self):
+        assert get_required_columns("sales_order") is None
+
+    @pytest.mark.it("check the required columns a table lost are reported")
+    def test_missing_columns(self):
+        columns = [
+            {"column_name": name}
+            for name in SOURCE_COLUMN_REQUIREMENTS["currency"]
+            if name != "currency_code"
+        ]
+
+        assert get_missing_required_columns("currency", columns) == ["currency_code"]
+        assert get_missing_required_columns("sales_order", []) == ["last_updated"]
+        assert get_missing_required_columns("sales_order", columns[-1:]) == []
+
+    @pytest.mark.it("check the dimensions can be built from the projected columns")
+    def test_dimensions(self):
+        frames = {
+            table_name: projected_frame(table_name)
+            for table_name in SOURCE_COLUMN_REQUIREMENTS
+        }
+
+        dim_counterparty = dim_counterparty_dataframe(
+            counterparty=frames["counterparty"], address=frames["address"]
+        )
+
+        assert len(dim_counterparty) == 1
+        dim_currency_dataframe(currency=frames["currency"])
+        dim_design_dataframe(design=frames["design"])
+        dim_location_dataframe(address=frames["address"])
+        dim_staff_dataframe(staff=frames["staff"], department=frames["department"])
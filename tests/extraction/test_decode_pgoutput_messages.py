@@ -0,0 +1,157 @@
+import struct
+from datetime import datetime, timezone
+
+import pytest
+
+from src.utilities.extraction.decode_pgoutput_messages import (
+    decode_pgoutput_messages,
+    format_lsn,
+)
+
+COMMIT_TIMESTAMP = 800000000000000  # microseconds after 2000-01-01
+
+
+def begin():
+    return b"B" + struct.pack("!QqI", 0x2F00000, COMMIT_TIMESTAMP, 775)
+
+
+def commit(end_lsn):
+    return b"C" + struct.pack("!BQQq", 0, end_lsn - 8, end_lsn, COMMIT_TIMESTAMP)
+
+
+def relation(relation_id, table_name, columns):
+    data = b"R" + struct.pack("!I", relation_id) + b"public\0"
+    data += table_name.encode() + b"\0" + struct.pack("!BH", ord("d"), len(columns))
+
+    for name, type_oid, is_key in columns:
+        data += struct.pack("!B", 1 if is_key else 0) + name.encode() + b"\0"
+        data += struct.pack("!Ii", type_oid, -1)
+
+    return data
+
+
+def tuple_data(values):
+    data = struct.pack("!H", len(values))
+
+    for value in values:
+        if value is None:
+            data += b"n"
+        elif value is ...:
+            data += b"u"
+        else:
+            data += b"t" + struct.pack("!i", len(value)) + value.encode()
+
+    return data
+
+
+def change(message_type, relation_id, *tuples):
+    data = message_type + struct.pack("!I", relation_id)
+
+    for kind, values in tuples:
+        data += kind + tuple_data(values)
+
+    return data
+
+
+CURRENCY = relation(
+    16400, "currency", [("currency_id", 23, True), ("currency_code", 1043, False)]
+)
+
+
+@pytest.mark.describe("decode_pgoutput_messages Utility Function Behaviour")
+class TestDecodePgoutputMessages:
+    @pytest.mark.it("check it decodes the keys of inserted, updated and deleted rows")
+    def test_changes(self):
+        decoded = decode_pgoutput_messages(
+            [
+                begin(),
+                CURRENCY,
+                change(b"I", 16400, (b"N", ["1", "GBP"])),
+                change(b"U", 16400, (b"N", ["2", "USD"])),
+                change(b"D", 16400, (b"K", ["3", None])),
+                commit(0x2F18FC8),
+            ]
+        )
+
+        assert [(c.operation, c.key) for c in decoded["changes"]] == [
+            ("insert", "1"),
+            ("update", "2"),
+            ("delete", "3"),
+        ]
+        assert decoded["changes"][0].key_column == "currency_id"
+        assert decoded["changes"][0].key_type_oid == 23
+        assert decoded["changes"][0].commit_timestamp == datetime(
+            2025, 5, 8, 6, 13, 20, tzinfo=timezone.utc
+        )
+        assert decoded["transactions"] == 1
+        assert decoded["end_lsn"] == "0/2F18FC8"
+
+    @pytest.mark.it("check upserts carry their new row values and column types")
+    def test_values(self):
+        decoded = decode_pgoutput_messages(
+            [
+                begin(),
+                CURRENCY,
+                change(b"I", 16400, (b"N", ["1", None])),
+                change(b"U", 16400, (b"N", ["2", ...])),
+                change(b"D", 16400, (b"K", ["3", None])),
+                commit(0x2F18FC8),
+            ]
+        )
+
+        insert, update, delete = decoded["changes"]
+        assert insert.values == {"currency_id": "1", "currency_code": None}
+        assert insert.column_type_oids == {"currency_id": 23, "currency_code": 1043}
+        # unchanged TOASTed values are not sent
+        assert update.values == {"currency_id": "2"}
+        assert delete.values is None
+
+    @pytest.mark.it("check an update of the key deletes the old key")
+    def test_key_update(self):
+        decoded = decode_pgoutput_messages(
+            [
+                begin(),
+                CURRENCY,
+                change(b"U", 16400, (b"K", ["1", None]), (b"N", ["4", "GBP"])),
+                commit(0x2F18FC8),
+            ]
+        )
+
+        assert [(c.operation, c.key) for c in decoded["changes"]] == [
+            ("delete", "1"),
+            ("update", "4"),
+        ]
+
+    @pytest.mark.it("check it reports truncated tables separately")
+    def test_truncate(self):
+        decoded = decode_pgoutput_messages(
+            [
+                begin(),
+                CURRENCY,
+                b"T" + struct.pack("!IBI", 1, 0, 16400),
+                commit(0x2F18FC8),
+            ]
+        )
+
+        assert decoded["changes"] == []
+        assert decoded["truncated_tables"] == ["currency"]
+
+    @pytest.mark.it("check it returns no end position when nothing was read")
+    def test_no_messages(self):
+        decoded = decode_pgoutput_messages([])
+
+        assert decoded["end_lsn"] is None
+        assert decoded["first_commit_timestamp"] is None
+
+    @pytest.mark.it("check it raises a ValueError for tables without a single key")
+    def test_no_key(self):
+        keyless = relation(16401, "staff", [("staff_id", 23, False)])
+
+        with pytest.raises(ValueError):
+            decode_pgoutput_messages(
+                [begin(), keyless, change(b"I", 16401, (b"N", ["1"]))]
+            )
+
+    @pytest.mark.it("check format_lsn prints LSNs as Postgres does")
+    def test_format_lsn(self):
+        assert format_lsn(0x1_00000010) == "1/10"
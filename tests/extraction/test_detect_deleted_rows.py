@@ -0,0 +1,212 @@
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utilities.extraction.detect_deleted_rows import (
+    add_log_to_delete_state,
+    detect_deleted_rows_to_s3,
+    find_deleted_keys,
+    load_key_snapshot,
+    read_primary_keys,
+    save_key_snapshot,
+)
+
+MODULE = "src.utilities.extraction.detect_deleted_rows"
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+def detect(s3_client, bucket, keys, record_log_entry=None, source_name="TOTESYS"):
+    with (
+        patch(f"{MODULE}.get_table_primary_key", return_value="currency_id"),
+        patch(f"{MODULE}.stream_primary_keys", return_value=iter([keys])),
+    ):
+        return detect_deleted_rows_to_s3(
+            MagicMock(),
+            s3_client,
+            bucket,
+            "currency",
+            record_log_entry=record_log_entry,
+            source_name=source_name,
+        )
+
+
+@pytest.mark.describe("find_deleted_keys Utility Function Behaviour")
+class TestFindDeletedKeys:
+    @pytest.mark.it("check the previous keys missing from the current keys are found")
+    def test_deleted(self):
+        previous = np.array([1, 2, 3, 5, 8, 13], dtype=np.int32)
+        current = np.array([2, 3, 4, 8], dtype=np.int32)
+
+        assert find_deleted_keys(previous, current).tolist() == [1, 5, 13]
+
+    @pytest.mark.it("check every previous key is deleted when the table is empty")
+    def test_empty_table(self):
+        previous = np.array([1, 2], dtype=np.int32)
+
+        assert find_deleted_keys(previous, np.empty(0, np.int32)).tolist() == [1, 2]
+
+    @pytest.mark.it("check nothing is deleted when keys were only added")
+    def test_only_inserts(self):
+        previous = np.array([1, 2], dtype=np.int32)
+        current = np.array([1, 2, 3], dtype=np.int32)
+
+        assert find_deleted_keys(previous, current).tolist() == []
+
+
+@pytest.mark.describe("read_primary_keys Utility Function Behaviour")
+class TestReadPrimaryKeys:
+    @pytest.mark.it("check the streamed keys are packed into an int32 array")
+    def test_int32(self):
+        with patch(f"{MODULE}.stream_primary_keys", return_value=iter([[1, 2], [7]])):
+            keys = read_primary_keys(MagicMock(), "currency", "currency_id", 2)
+
+        assert keys.dtype == np.int32
+        assert keys.tolist() == [1, 2, 7]
+
+    @pytest.mark.it("check keys too large for int32 are kept as int64")
+    def test_int64(self):
+        with patch(f"{MODULE}.stream_primary_keys", return_value=iter([[1, 2**40]])):
+            keys = read_primary_keys(MagicMock(), "currency", "currency_id", 2)
+
+        assert keys.dtype == np.int64
+        assert keys.tolist() == [1, 2**40]
+
+
+@pytest.mark.describe("Key snapshot Behaviour")
+class TestKeySnapshot:
+    @pytest.mark.it("check a saved snapshot loads back the same keys")
+    def test_round_trip(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        keys = np.arange(1, 100001, dtype=np.int32)
+
+        size = save_key_snapshot(s3_client, bucket, "currency", keys)
+
+        assert size < len(keys)
+        assert np.array_equal(load_key_snapshot(s3_client, bucket, "currency"), keys)
+
+    @pytest.mark.it("check None is returned when there is no snapshot yet")
+    def test_missing(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        assert load_key_snapshot(s3_client, bucket, "currency") is None
+
+
+@pytest.mark.describe("detect_deleted_rows_to_s3 Utility Function Behaviour")
+class TestDetectDeletedRowsToS3:
+    @pytest.mark.it("check the first run only saves a snapshot")
+    def test_first_run(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        result = detect(s3_client, bucket, [1, 2, 3])
+
+        assert result["log_entry"] is None
+        assert result["key_count"] == 3
+        assert load_key_snapshot(s3_client, bucket, "currency").tolist() == [1, 2, 3]
+
+    @pytest.mark.it("check deleted keys are uploaded as a tombstone file")
+    def test_tombstones(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        detect(s3_client, bucket, [1, 2, 3, 4])
+
+        result = detect(s3_client, bucket, [2, 4, 5])
+
+        log_entry = result["log_entry"]
+        assert log_entry["table_name"] == "currency"
+        assert log_entry["row_count"] == 2
+        assert log_entry["key"].endswith("_deletes_snapshot.parquet")
+        body = s3_client.get_object(Bucket=bucket, Key=log_entry["key"])["Body"]
+        tombstones = pd.read_parquet(BytesIO(body.read()))
+        assert list(tombstones.columns) == ["currency_id", "deleted_at"]
+        assert tombstones["currency_id"].tolist() == [1, 3]
+        # the same types as the delete files of the change data capture
+        assert tombstones.dtypes.tolist() == ["int64", "datetime64[ns, UTC]"]
+        assert load_key_snapshot(s3_client, bucket, "currency").tolist() == [2, 4, 5]
+
+    @pytest.mark.it("check the snapshot is kept when the tombstone upload fails")
+    def test_failed_upload(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        detect(s3_client, bucket, [1, 2])
+
+        with (
+            patch(f"{MODULE}.upload_data_frame", side_effect=Exception("S3 error")),
+            pytest.raises(Exception),
+        ):
+            detect(s3_client, bucket, [2])
+
+        assert load_key_snapshot(s3_client, bucket, "currency").tolist() == [1, 2]
+
+    @pytest.mark.it("check the tombstone file is recorded before the snapshot moves")
+    def test_record_log_entry(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        detect(s3_client, bucket, [1, 2])
+        snapshots = []
+
+        result = detect(
+            s3_client,
+            bucket,
+            [2],
+            record_log_entry=lambda entry: snapshots.append(
+                load_key_snapshot(s3_client, bucket, "currency").tolist()
+            ),
+        )
+
+        assert result["log_entry"]["row_count"] == 1
+        assert snapshots == [[1, 2]]
+
+    @pytest.mark.it("check the snapshot is kept when recording the tombstones fails")
+    def test_failed_record(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        detect(s3_client, bucket, [1, 2])
+
+        with pytest.raises(Exception):
+            detect(
+                s3_client,
+                bucket,
+                [2],
+                record_log_entry=MagicMock(side_effect=Exception("S3 error")),
+            )
+
+        assert load_key_snapshot(s3_client, bucket, "currency").tolist() == [1, 2]
+
+    @pytest.mark.it("check the snapshots and tombstones of each source are separate")
+    def test_sources(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        detect(s3_client, bucket, [1, 2, 3])
+        detect(s3_client, bucket, [1, 2], source_name="TOTESYS_EU")
+
+        result = detect(s3_client, bucket, [1], source_name="TOTESYS_EU")
+
+        assert result["log_entry"]["row_count"] == 1
+        assert result["log_entry"]["source"] == "TOTESYS_EU"
+        assert result["log_entry"]["key"].startswith("totesys_eu/")
+        assert load_key_snapshot(s3_client, bucket, "currency").tolist() == [1, 2, 3]
+        assert load_key_snapshot(
+            s3_client, bucket, "currency", "TOTESYS_EU"
+        ).tolist() == [1]
+
+
+@pytest.mark.describe("add_log_to_delete_state Utility Function Behaviour")
+class TestAddLogToDeleteState:
+    @pytest.mark.it("check tombstone files are appended to their table's delete log")
+    def test_delete_log(self):
+        state = {"ingest_state": {}}
+        first = {"table_name": "currency", "last_updated": "2025-01-01", "key": "a"}
+        second = {"table_name": "currency", "last_updated": "2025-01-02", "key": "b"}
+
+        add_log_to_delete_state(state, first)
+        add_log_to_delete_state(state, second)
+
+        assert state["delete_state"] == {
+            "currency": {"last_detected": "2025-01-02", "delete_log": [first, second]}
+        }
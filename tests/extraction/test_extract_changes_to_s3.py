@@ -0,0 +1,314 @@
+from datetime import datetime, timezone
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import psycopg
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utilities.extraction.decode_pgoutput_messages import RowChange
+from src.utilities.extraction.extract_changes_to_s3 import (
+    extract_changes_to_s3,
+    get_latest_changes,
+)
+from src.utilities.parquets.table_schemas import DICTIONARY_STRING
+
+COMMITTED = datetime(2025, 1, 2, 10, 0, tzinfo=timezone.utc)
+
+CURRENCY_CATALOG = {
+    "currency": {
+        "columns": [
+            {"column_name": "currency_id", "udt_name": "int4"},
+            {"column_name": "currency_code", "udt_name": "varchar"},
+            {"column_name": "last_updated", "udt_name": "timestamp"},
+        ],
+        "primary_key": "currency_id",
+    }
+}
+
+
+CURRENCY_TYPE_OIDS = {"currency_id": 23, "currency_code": 1043, "last_updated": 1114}
+
+
+def row_change(operation, key, table_name="currency", values=None):
+    return RowChange(
+        table_name,
+        operation,
+        f"{table_name}_id",
+        23,
+        key,
+        COMMITTED,
+        values,
+        CURRENCY_TYPE_OIDS if values is not None else None,
+    )
+
+
+def currency_values(key, code, last_updated):
+    return {"currency_id": key, "currency_code": code, "last_updated": last_updated}
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+@pytest.fixture
+def mock_conn():
+    conn = MagicMock()
+    conn.adapters = psycopg.adapters
+    return conn
+
+
+def read_parquet(s3_client, bucket, key):
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return pd.read_parquet(BytesIO(body))
+
+
+def read_parquet_metadata(s3_client, bucket, key):
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return pq.ParquetFile(BytesIO(body))
+
+
+@pytest.mark.describe("get_latest_changes Utility Function Behaviour")
+class TestGetLatestChanges:
+    @pytest.mark.it("check only the last change of every key is kept, per table")
+    def test_latest(self):
+        latest = get_latest_changes(
+            [
+                row_change("insert", "1"),
+                row_change("update", "2"),
+                row_change("update", "1"),
+                row_change("delete", "2"),
+                row_change("insert", "7", "staff"),
+            ]
+        )
+
+        assert {
+            table: [(c.key, c.operation) for c in changes.values()]
+            for table, changes in latest.items()
+        } == {
+            "currency": [("1", "update"), ("2", "delete")],
+            "staff": [("7", "insert")],
+        }
+
+
+@pytest.mark.describe("extract_changes_to_s3 Utility Function Behaviour")
+class TestExtractChangesToS3:
+    @pytest.mark.it("check upserted rows are built from their decoded values")
+    def test_upserts(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_changes_to_s3.get_table_columns"
+            ) as mock_get_columns,
+            patch(
+                "src.utilities.extraction.extract_changes_to_s3.get_table_rows_by_keys"
+            ) as mock_get_rows,
+        ):
+            result = extract_changes_to_s3(
+                mock_conn,
+                s3_client,
+                bucket,
+                [
+                    row_change(
+                        "insert",
+                        "1",
+                        values=currency_values("1", "GBP", "2025-01-01 00:00:00"),
+                    ),
+                    row_change(
+                        "update",
+                        "2",
+                        values=currency_values("2", "USD", "2025-01-02 00:00:00"),
+                    ),
+                ],
+                suffix="cdc_0-10",
+                table_catalogs=CURRENCY_CATALOG,
+            )
+
+        [entry] = result["files_to_process"]
+        mock_get_columns.assert_not_called()
+        mock_get_rows.assert_not_called()
+        assert entry["last_updated"] == datetime(2025, 1, 2)
+        assert entry["key"].endswith("_cdc_0-10.parquet")
+        uploaded = read_parquet(s3_client, bucket, entry["key"])
+        assert uploaded["currency_id"].tolist() == [1, 2]
+        assert uploaded["currency_code"].tolist() == ["GBP", "USD"]
+        assert result["deletes_to_process"] == []
+
+    @pytest.mark.it("check rows missing unchanged TOASTed values are read back by key")
+    def test_toasted_upserts(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+        toasted = currency_values("2", "USD", "2025-01-02 00:00:00")
+        del toasted["currency_code"]
+
+        with patch(
+            "src.utilities.extraction.extract_changes_to_s3.get_table_rows_by_keys",
+            return_value={
+                "currency_id": [2],
+                "currency_code": ["USD"],
+                "last_updated": [datetime(2025, 1, 2)],
+            },
+        ) as mock_get_rows:
+            result = extract_changes_to_s3(
+                mock_conn,
+                s3_client,
+                bucket,
+                [
+                    row_change(
+                        "insert",
+                        "1",
+                        values=currency_values("1", "GBP", "2025-01-01 00:00:00"),
+                    ),
+                    row_change("update", "2", values=toasted),
+                ],
+                suffix="cdc_0-10",
+                table_catalogs=CURRENCY_CATALOG,
+            )
+
+        [entry] = result["files_to_process"]
+        assert mock_get_rows.call_args.args[2:4] == ("currency_id", [2])
+        uploaded = read_parquet(s3_client, bucket, entry["key"])
+        assert uploaded["currency_id"].tolist() == [1, 2]
+        assert uploaded["currency_code"].tolist() == ["GBP", "USD"]
+
+    @pytest.mark.it("check decoded values are projected as the polling extraction")
+    def test_projected_values(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+        catalog = {
+            "payment": {
+                "columns": [
+                    {"column_name": "payment_id", "udt_name": "int4"},
+                    {"column_name": "payment_amount", "udt_name": "numeric"},
+                    {"column_name": "payment_date", "udt_name": "varchar"},
+                    {"column_name": "last_updated", "udt_name": "timestamp"},
+                ],
+                "primary_key": "payment_id",
+            }
+        }
+        change = RowChange(
+            "payment",
+            "insert",
+            "payment_id",
+            23,
+            "1",
+            COMMITTED,
+            {
+                "payment_id": "1",
+                "payment_amount": "1.50",
+                "payment_date": "",
+                "last_updated": "2025-01-01 00:00:00",
+            },
+            {
+                "payment_id": 23,
+                "payment_amount": 1700,
+                "payment_date": 1043,
+                "last_updated": 1114,
+            },
+        )
+
+        result = extract_changes_to_s3(
+            mock_conn,
+            s3_client,
+            bucket,
+            [change],
+            suffix="cdc_0-10",
+            table_catalogs=catalog,
+        )
+
+        [entry] = result["files_to_process"]
+        parquet_file = read_parquet_metadata(s3_client, bucket, entry["key"])
+        uploaded = parquet_file.read().to_pydict()
+        assert parquet_file.schema_arrow.field("payment_amount").type == pa.float64()
+        assert uploaded["payment_amount"] == [1.5]
+        assert uploaded["payment_date"] == [None]
+
+    @pytest.mark.it("check upsert files have the catalog schema and compression")
+    def test_upsert_schema(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+
+        result = extract_changes_to_s3(
+            mock_conn,
+            s3_client,
+            bucket,
+            [
+                row_change(
+                    "update",
+                    "1",
+                    values=currency_values("1", None, "2025-01-01 00:00:00"),
+                )
+            ],
+            suffix="cdc_0-10",
+            table_catalogs=CURRENCY_CATALOG,
+            table_compression={"currency": "snappy"},
+        )
+
+        [entry] = result["files_to_process"]
+        parquet_file = read_parquet_metadata(s3_client, bucket, entry["key"])
+        # an all-null column would otherwise be written as the null type
+        assert parquet_file.schema_arrow == pa.schema(
+            [
+                ("currency_id", pa.int64()),
+                ("currency_code", DICTIONARY_STRING),
+                ("last_updated", pa.timestamp("ns")),
+            ]
+        )
+        assert parquet_file.metadata.row_group(0).column(0).compression == "SNAPPY"
+
+    @pytest.mark.it("check deleted keys are uploaded to a separate delete file")
+    def test_deletes(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+
+        with patch(
+            "src.utilities.extraction.extract_changes_to_s3.get_table_rows_by_keys"
+        ) as mock_get_rows:
+            result = extract_changes_to_s3(
+                mock_conn,
+                s3_client,
+                bucket,
+                [row_change("insert", "3"), row_change("delete", "3")],
+                suffix="cdc_0-10",
+            )
+
+        [entry] = result["deletes_to_process"]
+        deletes = read_parquet(s3_client, bucket, entry["key"])
+
+        mock_get_rows.assert_not_called()
+        assert result["files_to_process"] == []
+        assert entry["key"].endswith("_deletes_cdc_0-10.parquet")
+        assert deletes["currency_id"].tolist() == [3]
+        assert deletes["deleted_at"].tolist() == [pd.Timestamp(COMMITTED)]
+        assert read_parquet_metadata(
+            s3_client, bucket, entry["key"]
+        ).schema_arrow == pa.schema(
+            [
+                ("currency_id", pa.int64()),
+                ("deleted_at", pa.timestamp("ns", tz="UTC")),
+            ]
+        )
+
+    @pytest.mark.it("check no upsert file is written when TOASTed rows no longer exist")
+    def test_rows_gone(self, s3_bucket, mock_conn):
+        s3_client, bucket = s3_bucket
+
+        with patch(
+            "src.utilities.extraction.extract_changes_to_s3.get_table_rows_by_keys",
+            return_value={"currency_id": [], "currency_code": [], "last_updated": []},
+        ):
+            result = extract_changes_to_s3(
+                mock_conn,
+                s3_client,
+                bucket,
+                [row_change("update", "1", values={"currency_id": "1"})],
+                "cdc_0-10",
+                table_catalogs=CURRENCY_CATALOG,
+            )
+
+        assert result == {"files_to_process": [], "deletes_to_process": []}
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
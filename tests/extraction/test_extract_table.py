@@ -0,0 +1,447 @@
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import MagicMock, Mock, patch
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from psycopg import sql
+
+from src.utilities.extraction.extract_table import extract_table
+from src.utilities.extraction.row_hash_index import RowHashIndex
+
+
+def make_column(name, type_code):
+    column = Mock()
+    column.name = name
+    column.type_code = type_code
+    column.precision = None
+    column.scale = None
+    return column
+
+
+@pytest.fixture
+def test_description():
+    return [
+        make_column("currency_id", 23),
+        make_column("currency_code", 1043),
+        make_column("last_updated", 1114),
+    ]
+
+
+@pytest.fixture
+def test_rows():
+    return [
+        {
+            "currency_id": 1,
+            "currency_code": "GBP",
+            "last_updated": datetime(2025, 1, 1, 10, 0, 0, 123456),
+        },
+        {
+            "currency_id": 2,
+            "currency_code": "USD",
+            "last_updated": datetime(2025, 1, 3, 10, 0),
+        },
+        {
+            "currency_id": 3,
+            "currency_code": None,
+            "last_updated": datetime(2025, 1, 2, 10, 0),
+        },
+    ]
+
+
+@pytest.fixture
+def test_columns(test_rows):
+    return {name: [row[name] for row in test_rows] for name in test_rows[0]}
+
+
+@pytest.fixture(autouse=True)
+def patched_projection():
+    with patch(
+        "src.utilities.extraction.extract_table.get_table_projection",
+        return_value=sql.SQL("*"),
+    ) as mock_get_table_projection:
+        yield mock_get_table_projection
+
+
+@pytest.mark.describe("extract_table Utility Function Behaviour")
+class TestExtractTable:
+    @pytest.mark.it("check the fetchall engine returns a parquet file with all rows")
+    def test_fetchall(self, test_columns, test_description):
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value=test_columns,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+        ):
+            result = extract_table(MagicMock(), "currency", engine="fetchall")
+
+        assert isinstance(result["parts"][0]["parquet_file"], BytesIO)
+        assert result["row_count"] == 3
+        assert result["last_updated"] == datetime(2025, 1, 3, 10, 0)
+        assert len(pd.read_parquet(result["parts"][0]["parquet_file"])) == 3
+
+    @pytest.mark.it("check the stream engine writes every streamed batch to parquet")
+    def test_stream(self, test_rows, test_description):
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows[:2], test_rows[2:]]),
+            ),
+        ):
+            result = extract_table(
+                MagicMock(), "currency", engine="stream", batch_size=2
+            )
+
+        data_frame = pd.read_parquet(result["parts"][0]["parquet_file"])
+
+        assert result["row_count"] == 3
+        assert result["last_updated"] == datetime(2025, 1, 3, 10, 0)
+        assert type(result["last_updated"]) is datetime
+        assert data_frame["currency_id"].tolist() == [1, 2, 3]
+
+    @pytest.mark.it("check the batched engines write a row group per batch")
+    def test_batch_row_groups(self, test_rows, test_description):
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows[:2], test_rows[2:]]),
+            ),
+        ):
+            result = extract_table(
+                MagicMock(), "currency", engine="stream", batch_size=2
+            )
+
+        [part] = result["parts"]
+        assert part["row_groups"] == 2
+        assert pq.ParquetFile(part["parquet_file"]).metadata.row_group(0).num_rows == 2
+
+    @pytest.mark.it("check parts are handed to upload_part as soon as they fill")
+    def test_upload_parts(self, test_rows, test_description):
+        uploaded = []
+
+        def upload_part(parquet_file, part_number):
+            uploaded.append(len(pd.read_parquet(parquet_file)))
+            return f"part-{part_number}"
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([[row] for row in test_rows]),
+            ),
+        ):
+            result = extract_table(
+                MagicMock(),
+                "currency",
+                engine="stream",
+                batch_size=1,
+                max_part_bytes=1,
+                upload_part=upload_part,
+            )
+
+        assert uploaded == [1, 1, 1]
+        assert [part["upload"] for part in result["parts"]] == [
+            "part-1",
+            "part-2",
+            "part-3",
+        ]
+        assert all(part["parquet_file"] is None for part in result["parts"])
+        assert result["row_count"] == 3
+
+    @pytest.mark.it("check the batched engines report every batch once it is written")
+    def test_on_batch(self, test_rows, test_description):
+        batches = []
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows[:2], test_rows[2:]]),
+            ),
+        ):
+            extract_table(
+                MagicMock(),
+                "currency",
+                engine="stream",
+                batch_size=2,
+                on_batch=lambda rows, seconds: batches.append((rows, seconds)),
+            )
+
+        assert [rows for rows, _ in batches] == [2, 1]
+        assert all(seconds >= 0 for _, seconds in batches)
+
+    @pytest.mark.it("check the copy engine builds parquet from the copied columns")
+    def test_copy(self, test_rows, test_description):
+        columns = [[row[name] for row in test_rows] for name in test_rows[0]]
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([columns]),
+            ) as mock_copy_table_columns,
+        ):
+            result = extract_table(MagicMock(), "currency", engine="copy")
+
+        data_frame = pd.read_parquet(result["parts"][0]["parquet_file"])
+
+        assert result["row_count"] == 3
+        assert result["last_updated"] == datetime(2025, 1, 3, 10, 0)
+        assert data_frame["currency_code"].tolist()[:2] == ["GBP", "USD"]
+        assert mock_copy_table_columns.call_args.args[2] == [23, 1043, 1114]
+
+    @pytest.mark.it("check every engine produces the same data")
+    def test_engines_match(self, test_rows, test_columns, test_description):
+        columns = list(test_columns.values())
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value=test_columns,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows]),
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([columns]),
+            ),
+        ):
+            fetchall_result = extract_table(MagicMock(), "currency")
+            stream_result = extract_table(MagicMock(), "currency", engine="stream")
+            copy_result = extract_table(MagicMock(), "currency", engine="copy")
+
+        fetchall_data_frame = pd.read_parquet(
+            fetchall_result["parts"][0]["parquet_file"]
+        )
+
+        for result in [stream_result, copy_result]:
+            pd.testing.assert_frame_equal(
+                fetchall_data_frame,
+                pd.read_parquet(result["parts"][0]["parquet_file"]),
+                check_dtype=False,
+            )
+
+    @pytest.mark.it("check every engine dictionary encodes low cardinality columns")
+    @pytest.mark.parametrize("engine", ["fetchall", "stream", "copy"])
+    def test_dictionary_columns(
+        self, engine, test_rows, test_columns, test_description
+    ):
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value=test_columns,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows]),
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([list(test_columns.values())]),
+            ),
+        ):
+            result = extract_table(MagicMock(), "currency", engine=engine)
+
+        schema = pq.read_schema(result["parts"][0]["parquet_file"])
+
+        assert schema.field("currency_code").type == pa.dictionary(
+            pa.int32(), pa.string()
+        )
+        assert schema.field("currency_id").type == pa.int64()
+
+    @pytest.mark.it("check every engine reads the table through its projection")
+    def test_projection(self, test_columns, test_description, patched_projection):
+        projection = sql.SQL("{}::float8 AS {}").format(
+            sql.Identifier("unit_price"), sql.Identifier("unit_price")
+        )
+        patched_projection.return_value = projection
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value=test_columns,
+            ) as mock_get_table_data_columns,
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ) as mock_get_table_description,
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([list(test_columns.values())]),
+            ) as mock_copy_table_columns,
+        ):
+            extract_table(MagicMock(), "currency")
+            extract_table(MagicMock(), "currency", engine="copy")
+
+        assert mock_get_table_data_columns.call_args.kwargs["projection"] is projection
+        assert mock_get_table_description.call_args.args[2] is projection
+        assert mock_copy_table_columns.call_args.args[6] is projection
+
+    @pytest.mark.it("check it returns None when there is no new data")
+    @pytest.mark.parametrize("engine", ["fetchall", "stream", "copy"])
+    def test_no_data(self, engine, test_description):
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value={"currency_id": [], "last_updated": []},
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+                return_value=test_description,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([]),
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([]),
+            ),
+        ):
+            result = extract_table(MagicMock(), "currency", engine=engine)
+
+        assert result is None
+
+    @pytest.mark.it("check every engine drops the rows the row hash index has seen")
+    @pytest.mark.parametrize("engine", ["fetchall", "stream", "copy"])
+    def test_row_hash_index(self, engine, test_rows, s3_client, test_description):
+        s3_client.create_bucket(
+            Bucket="test-ingest-bucket",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        row_hash_index = RowHashIndex("currency", "currency_id")
+        touched_rows = [
+            {**row, "last_updated": datetime(2025, 2, 1)} for row in test_rows
+        ]
+        touched_rows[1]["currency_code"] = "EUR"
+
+        def extract(rows):
+            columns = {name: [row[name] for row in rows] for name in rows[0]}
+
+            with (
+                patch(
+                    "src.utilities.extraction.extract_table.get_table_data_columns",
+                    return_value=columns,
+                ),
+                patch(
+                    "src.utilities.extraction.extract_table.get_table_description",
+                    return_value=test_description,
+                ),
+                patch(
+                    "src.utilities.extraction.extract_table.stream_table_data",
+                    return_value=iter([rows]),
+                ),
+                patch(
+                    "src.utilities.extraction.extract_table.copy_table_columns",
+                    return_value=iter([list(columns.values())]),
+                ),
+            ):
+                return extract_table(
+                    MagicMock(),
+                    "currency",
+                    engine=engine,
+                    row_hash_index=row_hash_index,
+                )
+
+        extract(test_rows)
+        row_hash_index.save(s3_client, "test-ingest-bucket")
+        result = extract(touched_rows)
+
+        assert result["row_count"] == 1
+        assert result["suppressed_rows"] == 2
+        assert result["last_updated"] == datetime(2025, 2, 1)
+        assert pd.read_parquet(result["parts"][0]["parquet_file"])[
+            "currency_code"
+        ].tolist() == ["EUR"]
+
+        row_hash_index.save(s3_client, "test-ingest-bucket")
+        result = extract(touched_rows)
+
+        assert result["parts"] == []
+        assert result["suppressed_rows"] == 3
+
+    @pytest.mark.it("check a catalog entry replaces the projection and type queries")
+    @pytest.mark.parametrize("engine", ["fetchall", "stream", "copy"])
+    def test_table_catalog(self, engine, test_rows, test_columns, patched_projection):
+        table_catalog = {
+            "columns": [
+                {"column_name": "currency_id", "udt_name": "int4"},
+                {"column_name": "currency_code", "udt_name": "varchar"},
+                {"column_name": "last_updated", "udt_name": "timestamp"},
+            ],
+            "primary_key": "currency_id",
+        }
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table.get_table_data_columns",
+                return_value=test_columns,
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.get_table_description",
+            ) as mock_get_table_description,
+            patch(
+                "src.utilities.extraction.extract_table.stream_table_data",
+                return_value=iter([test_rows]),
+            ),
+            patch(
+                "src.utilities.extraction.extract_table.copy_table_columns",
+                return_value=iter([list(test_columns.values())]),
+            ) as mock_copy_table_columns,
+        ):
+            result = extract_table(
+                MagicMock(), "currency", engine=engine, table_catalog=table_catalog
+            )
+
+        data_frame = pd.read_parquet(result["parts"][0]["parquet_file"])
+
+        patched_projection.assert_not_called()
+        mock_get_table_description.assert_not_called()
+        if engine == "copy":
+            assert mock_copy_table_columns.call_args.args[2] == [
+                "int4",
+                "varchar",
+                "timestamp",
+            ]
+        assert result["row_count"] == 3
+        assert str(data_frame["currency_id"].dtype) == "int64"
+        assert data_frame["currency_code"].tolist()[:2] == ["GBP", "USD"]
+        assert data_frame["currency_code"].isna().iloc[2]
+
+    @pytest.mark.it("check it raises a ValueError for an unknown engine")
+    def test_invalid_engine(self):
+        with pytest.raises(ValueError, match="Invalid extraction engine"):
+            extract_table(MagicMock(), "currency", engine="magic")  # type: ignore
@@ -0,0 +1,136 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utilities.extraction.extract_table_pages_to_s3 import (
+    extract_table_pages_to_s3,
+)
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+@pytest.fixture
+def test_pages():
+    boundary = datetime(2025, 1, 2, 10, 0)
+    return [
+        [
+            {"currency_id": 1, "last_updated": datetime(2025, 1, 1, 10, 0)},
+            {"currency_id": 2, "last_updated": boundary},
+        ],
+        [
+            {"currency_id": 3, "last_updated": boundary},
+            {"currency_id": 4, "last_updated": datetime(2025, 1, 3, 10, 0)},
+        ],
+        [
+            {"currency_id": 5, "last_updated": datetime(2025, 1, 4, 10, 0)},
+        ],
+    ]
+
+
+@pytest.fixture
+def patched_pages(test_pages):
+    with (
+        patch(
+            "src.utilities.extraction.extract_table_pages_to_s3.get_table_primary_key",
+            return_value="currency_id",
+        ),
+        patch(
+            "src.utilities.extraction.extract_table_pages_to_s3.get_table_projection",
+        ),
+        patch(
+            "src.utilities.extraction.extract_table_pages_to_s3.get_keyset_index_name",
+            return_value="currency_keyset_idx",
+        ),
+        patch(
+            "src.utilities.extraction.extract_table_pages_to_s3.get_table_data_page",
+            side_effect=test_pages,
+        ) as mock_get_table_data_page,
+    ):
+        yield mock_get_table_data_page
+
+
+@pytest.mark.describe("extract_table_pages_to_s3 Utility Function Behaviour")
+class TestExtractTablePagesToS3:
+    @pytest.mark.it("check it uploads one file per page and stops at a short page")
+    def test_uploads_pages(self, s3_bucket, patched_pages):
+        s3_client, bucket = s3_bucket
+
+        result = list(
+            extract_table_pages_to_s3(
+                MagicMock(), s3_client, bucket, "currency", page_size=2
+            )
+        )
+
+        assert [entry["last_primary_key"] for entry in result] == [2, 4, 5]
+        assert [entry["has_more"] for entry in result] == [True, True, False]
+        assert len({entry["key"] for entry in result}) == 3
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 3
+
+    @pytest.mark.it("check each page starts after the compound watermark of the last")
+    def test_compound_watermark(self, s3_bucket, patched_pages):
+        s3_client, bucket = s3_bucket
+
+        list(
+            extract_table_pages_to_s3(
+                MagicMock(),
+                s3_client,
+                bucket,
+                "currency",
+                last_updated=datetime(2024, 1, 1),
+                last_primary_key=9,
+                page_size=2,
+            )
+        )
+
+        watermarks = [call.args[3:5] for call in patched_pages.call_args_list]
+        assert watermarks == [
+            (datetime(2024, 1, 1), 9),
+            (datetime(2025, 1, 2, 10, 0), 2),
+            (datetime(2025, 1, 3, 10, 0), 4),
+        ]
+
+    @pytest.mark.it("check it stops after max_pages so a later run can resume")
+    def test_max_pages(self, s3_bucket, patched_pages):
+        s3_client, bucket = s3_bucket
+
+        result = list(
+            extract_table_pages_to_s3(
+                MagicMock(), s3_client, bucket, "currency", page_size=2, max_pages=1
+            )
+        )
+
+        assert len(result) == 1
+        assert result[0]["last_updated"] == datetime(2025, 1, 2, 10, 0)
+        assert patched_pages.call_count == 1
+
+    @pytest.mark.it("check it yields nothing when there is no new data")
+    def test_no_data(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        with (
+            patch(
+                "src.utilities.extraction.extract_table_pages_to_s3.get_table_primary_key",
+                return_value="currency_id",
+            ),
+            patch(
+                "src.utilities.extraction.extract_table_pages_to_s3.get_table_projection",
+            ),
+            patch(
+                "src.utilities.extraction.extract_table_pages_to_s3.get_table_data_page",
+                return_value=[],
+            ),
+        ):
+            result = list(
+                extract_table_pages_to_s3(MagicMock(), s3_client, bucket, "currency")
+            )
+
+        assert result == []
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
@@ -0,0 +1,254 @@
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.db.db_helpers import KeyRange
+from src.utilities.extraction.extract_table_partitions_to_s3 import (
+    extract_partition_to_s3,
+    extract_table_partitions_to_s3,
+    plan_key_ranges,
+    plan_table_partitions,
+)
+
+MODULE = "src.utilities.extraction.extract_table_partitions_to_s3"
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+@pytest.mark.describe("plan_key_ranges Utility Function Behaviour")
+class TestPlanKeyRanges:
+    @pytest.mark.it("check the ranges are contiguous and cover every key")
+    def test_covers_keys(self):
+        result = plan_key_ranges("sales_order_id", 1, 10, 3)
+
+        assert result == [
+            KeyRange("sales_order_id", 1, 5),
+            KeyRange("sales_order_id", 5, 9),
+            KeyRange("sales_order_id", 9, 11),
+        ]
+
+    @pytest.mark.it("check it returns fewer ranges when there are fewer keys")
+    def test_fewer_keys(self):
+        result = plan_key_ranges("sales_order_id", 7, 8, 4)
+
+        assert result == [
+            KeyRange("sales_order_id", 7, 8),
+            KeyRange("sales_order_id", 8, 9),
+        ]
+
+    @pytest.mark.it("check it raises a ValueError for a non positive partition count")
+    def test_invalid_partitions(self):
+        with pytest.raises(ValueError):
+            plan_key_ranges("sales_order_id", 1, 10, 0)
+
+
+@pytest.mark.describe("plan_table_partitions Utility Function Behaviour")
+class TestPlanTablePartitions:
+    def plan(self, stats, **kwargs):
+        with (
+            patch(f"{MODULE}.get_table_primary_key", return_value="sales_order_id"),
+            patch(f"{MODULE}.get_table_key_range_stats", return_value=stats),
+        ):
+            return plan_table_partitions(MagicMock(), "sales_order", **kwargs)
+
+    @pytest.mark.it("check it plans one range per rows_per_partition delta rows")
+    def test_plans_ranges(self):
+        stats = {
+            "row_count": 300,
+            "min_key": 1,
+            "max_key": 1000,
+            "last_updated": datetime(2025, 1, 1),
+        }
+
+        result = self.plan(stats, max_partitions=8, rows_per_partition=100)
+
+        assert len(result["key_ranges"]) == 3
+        assert result["last_updated"] == datetime(2025, 1, 1)
+        assert result["row_count"] == 300
+
+    @pytest.mark.it("check a small delta over a wide key range is not split")
+    def test_sparse_keys(self):
+        stats = {
+            "row_count": 2,
+            "min_key": 1,
+            "max_key": 10**6,
+            "last_updated": datetime(2025, 1, 1),
+        }
+
+        assert self.plan(stats, max_partitions=8, rows_per_partition=100) is None
+
+    @pytest.mark.it("check it plans no more than max_partitions ranges")
+    def test_max_partitions(self):
+        stats = {
+            "row_count": 10**6,
+            "min_key": 1,
+            "max_key": 10**6,
+            "last_updated": datetime(2025, 1, 1),
+        }
+
+        result = self.plan(stats, max_partitions=4, rows_per_partition=100)
+
+        assert len(result["key_ranges"]) == 4
+
+    @pytest.mark.it("check it returns None for an empty or small delta")
+    @pytest.mark.parametrize(
+        "row_count, min_key, max_key", [(0, None, None), (50, 1, 1000)]
+    )
+    def test_nothing_to_split(self, row_count, min_key, max_key):
+        stats = {
+            "row_count": row_count,
+            "min_key": min_key,
+            "max_key": max_key,
+            "last_updated": None,
+        }
+
+        assert self.plan(stats, rows_per_partition=100) is None
+
+
+@pytest.mark.describe("extract_table_partitions_to_s3 Utility Function Behaviour")
+class TestExtractTablePartitionsToS3:
+    @pytest.fixture
+    def test_plan(self):
+        return {
+            "key_ranges": plan_key_ranges("sales_order_id", 1, 30, 3),
+            "last_updated": datetime(2025, 6, 13, 10, 35, 20),
+            "row_count": 30,
+        }
+
+    @pytest.mark.it("check it returns a log entry for every non-empty part")
+    def test_log_entries(self, test_plan):
+        with (
+            patch(f"{MODULE}.export_snapshot", return_value="snapshot-1"),
+            patch(
+                f"{MODULE}.extract_partition_to_s3",
+                side_effect=[
+                    [{"file_name": "a", "key": "a", "row_count": 10}],
+                    [],
+                    [
+                        {"file_name": "c", "key": "c", "row_count": 4},
+                        {"file_name": "d", "key": "d", "row_count": 1},
+                    ],
+                ],
+            ) as mock_extract_partition,
+        ):
+            result = extract_table_partitions_to_s3(
+                MagicMock(), "bucket", "sales_order", test_plan, executor="thread"
+            )
+
+        assert [(entry["key"], entry["row_count"]) for entry in result] == [
+            ("a", 10),
+            ("c", 4),
+            ("d", 1),
+        ]
+        assert all(
+            entry["last_updated"] == test_plan["last_updated"] for entry in result
+        )
+        assert [call.args[4] for call in mock_extract_partition.call_args_list] == [
+            "part0",
+            "part1",
+            "part2",
+        ]
+        assert {call.args[5] for call in mock_extract_partition.call_args_list} == {
+            "snapshot-1"
+        }
+
+    @pytest.mark.it("check it raises the error of a failed part")
+    def test_part_error(self, test_plan):
+        with (
+            patch(f"{MODULE}.export_snapshot", return_value="snapshot-1"),
+            patch(
+                f"{MODULE}.extract_partition_to_s3",
+                side_effect=[[], RuntimeError("lost connection"), []],
+            ),
+        ):
+            with pytest.raises(RuntimeError, match="lost connection"):
+                extract_table_partitions_to_s3(
+                    MagicMock(), "bucket", "sales_order", test_plan, executor="thread"
+                )
+
+    @pytest.mark.it("check it raises a ValueError for an unknown executor")
+    def test_invalid_executor(self, test_plan):
+        with patch(f"{MODULE}.export_snapshot", return_value="snapshot-1"):
+            with pytest.raises(ValueError, match="Invalid partition executor"):
+                extract_table_partitions_to_s3(
+                    MagicMock(), "bucket", "sales_order", test_plan, executor="gpu"
+                )
+
+
+@pytest.mark.describe("extract_partition_to_s3 Utility Function Behaviour")
+class TestExtractPartitionToS3:
+    @pytest.mark.it("check it extracts the range on the snapshot and uploads its parts")
+    def test_uploads_part(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        key_range = KeyRange("sales_order_id", 1, 11)
+
+        def extract_table(*args, upload_part, **kwargs):
+            return {
+                "parts": [
+                    {
+                        "part_number": 1,
+                        "row_count": 10,
+                        "upload": upload_part(BytesIO(b"parquet"), 1),
+                    }
+                ],
+                "last_updated": datetime(2025, 1, 1),
+                "row_count": 10,
+            }
+
+        with (
+            patch(f"{MODULE}.connect_db"),
+            patch(f"{MODULE}.import_snapshot") as mock_import_snapshot,
+            patch(
+                f"{MODULE}.extract_table", side_effect=extract_table
+            ) as mock_extract_table,
+        ):
+            result = extract_partition_to_s3(
+                bucket,
+                "sales_order",
+                key_range,
+                datetime(2025, 6, 13, 10, 35, 20),
+                "part0",
+                "snapshot-1",
+            )
+
+        assert result == [
+            {
+                "file_name": "sales_order_2025-6-13_10-35-20_0_part0-1.parquet",
+                "key": "2025/6/13/sales_order_2025-6-13_10-35-20_0_part0-1.parquet",
+                "row_count": 10,
+            }
+        ]
+        assert mock_import_snapshot.call_args.args[1] == "snapshot-1"
+        assert mock_extract_table.call_args.kwargs["key_range"] == key_range
+        body = s3_client.get_object(Bucket=bucket, Key=result[0]["key"])["Body"].read()
+        assert body == b"parquet"
+
+    @pytest.mark.it("check it uploads nothing for an empty range")
+    def test_empty_part(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        with (
+            patch(f"{MODULE}.connect_db"),
+            patch(f"{MODULE}.import_snapshot"),
+            patch(f"{MODULE}.extract_table", return_value=None),
+        ):
+            result = extract_partition_to_s3(
+                bucket,
+                "sales_order",
+                KeyRange("sales_order_id", 1, 11),
+                datetime(2025, 6, 13, 10, 35, 20),
+                "part0",
+                "snapshot-1",
+            )
+
+        assert result == []
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
@@ -0,0 +1,143 @@
+from datetime import datetime
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utilities.extraction.extract_table_to_s3 import (
+    create_part_uploader,
+    extract_table_to_s3,
+)
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+def fake_extract_table(bodies, last_updated, suppressed_rows=0):
+    def extract_table(*args, upload_part, **kwargs):
+        return {
+            "parts": [
+                {
+                    "part_number": part_number,
+                    "row_count": 1,
+                    "parquet_file": None,
+                    "upload": upload_part(BytesIO(body), part_number),
+                }
+                for part_number, body in enumerate(bodies, 1)
+            ],
+            "last_updated": last_updated,
+            "row_count": len(bodies),
+            "suppressed_rows": suppressed_rows,
+        }
+
+    return extract_table
+
+
+@pytest.mark.describe("create_part_uploader Utility Function Behaviour")
+class TestCreatePartUploader:
+    @pytest.mark.it("check it uploads every part to a numbered key")
+    def test_uploads(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        upload_part = create_part_uploader(
+            s3_client,
+            bucket,
+            "currency",
+            datetime(2025, 6, 13, 10, 35, 20, 12345),
+            suffix="part0",
+            key_prefix="totesys_eu",
+        )
+
+        result = upload_part(BytesIO(b"parquet"), 2)
+
+        assert result == {
+            "file_name": "currency_2025-6-13_10-35-20_12345_part0-2.parquet",
+            "key": "totesys_eu/2025/6/13/currency_2025-6-13_10-35-20_12345_part0-2.parquet",
+        }
+        body = s3_client.get_object(Bucket=bucket, Key=result["key"])["Body"].read()
+        assert body == b"parquet"
+
+    @pytest.mark.it("check it raises the S3 error when the upload fails")
+    def test_upload_error(self, s3_client):
+        upload_part = create_part_uploader(
+            s3_client, "missing-bucket", "currency", datetime(2025, 1, 1)
+        )
+
+        with pytest.raises(Exception):
+            upload_part(BytesIO(b"parquet"), 1)
+
+
+@pytest.mark.describe("extract_table_to_s3 Utility Function Behaviour")
+class TestExtractTableToS3:
+    @pytest.mark.it("check it uploads every part and returns their log entries")
+    def test_uploads(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        last_updated = datetime(2025, 6, 13, 10, 35, 20, 12345)
+
+        with patch(
+            "src.utilities.extraction.extract_table_to_s3.extract_table",
+            side_effect=fake_extract_table([b"one", b"two"], last_updated, 4),
+        ):
+            result = extract_table_to_s3(MagicMock(), s3_client, bucket, "currency")
+
+        assert [entry["key"].rsplit("_", 1)[1] for entry in result] == [
+            "part-1.parquet",
+            "part-2.parquet",
+        ]
+        assert all(entry["table_name"] == "currency" for entry in result)
+        assert all(entry["last_updated"] == last_updated for entry in result)
+        assert isinstance(result[0]["extraction_timestamp"], datetime)
+        assert result[0]["key"].endswith(result[0]["file_name"])
+        assert [entry["row_count"] for entry in result] == [1, 1]
+        assert [entry["suppressed_rows"] for entry in result] == [4, 0]
+
+        bodies = [
+            s3_client.get_object(Bucket=bucket, Key=entry["key"])["Body"].read()
+            for entry in result
+        ]
+        assert bodies == [b"one", b"two"]
+
+    @pytest.mark.it("check it returns no entry when there is no data")
+    def test_no_data(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        with patch(
+            "src.utilities.extraction.extract_table_to_s3.extract_table",
+            return_value=None,
+        ):
+            result = extract_table_to_s3(MagicMock(), s3_client, bucket, "currency")
+
+        assert result == []
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
+
+    @pytest.mark.it("check it uploads nothing when every row was unchanged")
+    def test_unchanged_rows(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        last_updated = datetime(2025, 6, 13, 10, 35, 20, 12345)
+
+        with patch(
+            "src.utilities.extraction.extract_table_to_s3.extract_table",
+            side_effect=fake_extract_table([], last_updated, 4),
+        ):
+            [result] = extract_table_to_s3(MagicMock(), s3_client, bucket, "currency")
+
+        assert result["last_updated"] == last_updated
+        assert result["key"] is None
+        assert result["suppressed_rows"] == 4
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
+
+    @pytest.mark.it("check it raises the S3 error when the upload fails")
+    def test_upload_error(self, s3_client):
+        with patch(
+            "src.utilities.extraction.extract_table_to_s3.extract_table",
+            side_effect=fake_extract_table([b"parquet"], datetime(2025, 1, 1)),
+        ):
+            with pytest.raises(Exception):
+                extract_table_to_s3(
+                    MagicMock(), s3_client, "missing-bucket", "currency"
+                )
@@ -0,0 +1,180 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.utilities.extraction.extract_tables_in_parallel import (
+    extract_tables_in_parallel,
+    get_extraction_metrics,
+    timed_extraction,
+)
+
+
+@pytest.fixture
+def patched_snapshot():
+    with (
+        patch(
+            "src.utilities.extraction.extract_tables_in_parallel.export_snapshot",
+            return_value="00000003-0000001B-1",
+        ) as mock_export,
+        patch(
+            "src.utilities.extraction.extract_tables_in_parallel.import_snapshot"
+        ) as mock_import,
+    ):
+        yield mock_export, mock_import
+
+
+@pytest.mark.describe("extract_tables_in_parallel Utility Function Behaviour")
+class TestExtractTablesInParallel:
+    @pytest.mark.it("check it yields one timed result per table")
+    def test_all_tables(self, patched_snapshot):
+        table_names = ["currency", "staff", "design", "address"]
+
+        result = list(
+            extract_tables_in_parallel(
+                MagicMock(),
+                table_names,
+                lambda conn, table_name: f"{table_name} done",
+                concurrency=2,
+                connect_func=MagicMock,
+            )
+        )
+
+        assert sorted(item["table_name"] for item in result) == sorted(table_names)
+        for item in result:
+            assert item["result"] == f"{item['table_name']} done"
+            assert item["duration_seconds"] >= 0
+
+    @pytest.mark.it("check every worker connection imports the exported snapshot")
+    def test_snapshot_imported(self, patched_snapshot):
+        mock_export, mock_import = patched_snapshot
+        coordinator = MagicMock()
+
+        list(
+            extract_tables_in_parallel(
+                coordinator,
+                ["currency", "staff", "design"],
+                lambda conn, table_name: None,
+                concurrency=3,
+                connect_func=MagicMock,
+            )
+        )
+
+        mock_export.assert_called_once_with(coordinator)
+        assert mock_import.call_count == 3
+        for call in mock_import.call_args_list:
+            assert call.args[1] == "00000003-0000001B-1"
+
+    @pytest.mark.it("check it never opens more connections than there are tables")
+    def test_worker_count(self, patched_snapshot):
+        connect_func = MagicMock()
+
+        list(
+            extract_tables_in_parallel(
+                MagicMock(),
+                ["currency"],
+                lambda conn, table_name: None,
+                concurrency=8,
+                connect_func=connect_func,
+            )
+        )
+
+        assert connect_func.call_count == 1
+
+    @pytest.mark.it("check tables run concurrently and never share a connection")
+    def test_concurrent(self, patched_snapshot):
+        barrier = threading.Barrier(2, timeout=5)
+        conns_in_use = set()
+        lock = threading.Lock()
+
+        def extract_func(conn, table_name):
+            with lock:
+                assert conn not in conns_in_use
+                conns_in_use.add(conn)
+            barrier.wait()
+            with lock:
+                conns_in_use.discard(conn)
+
+        result = list(
+            extract_tables_in_parallel(
+                MagicMock(),
+                ["currency", "staff"],
+                extract_func,
+                concurrency=2,
+                connect_func=MagicMock,
+            )
+        )
+
+        assert len(result) == 2
+
+    @pytest.mark.it("check worker connections are released, also when a table fails")
+    def test_closes_connections(self, patched_snapshot):
+        worker_conns = [MagicMock(), MagicMock()]
+
+        def extract_func(conn, table_name):
+            raise RuntimeError(f"{table_name} failed")
+
+        with pytest.raises(RuntimeError, match="failed"):
+            list(
+                extract_tables_in_parallel(
+                    MagicMock(),
+                    ["currency", "staff"],
+                    extract_func,
+                    concurrency=2,
+                    connect_func=iter(worker_conns).__next__,
+                )
+            )
+
+        for worker_conn in worker_conns:
+            worker_conn.__exit__.assert_called_once()
+
+    @pytest.mark.it("check it yields nothing and exports no snapshot without tables")
+    def test_no_tables(self, patched_snapshot):
+        mock_export, _ = patched_snapshot
+
+        result = list(
+            extract_tables_in_parallel(MagicMock(), [], lambda conn, table: None)
+        )
+
+        assert result == []
+        mock_export.assert_not_called()
+
+    @pytest.mark.it("check it raises a ValueError for a non positive concurrency")
+    def test_invalid_concurrency(self, patched_snapshot):
+        with pytest.raises(ValueError):
+            list(
+                extract_tables_in_parallel(
+                    MagicMock(), ["currency"], lambda conn, table: None, concurrency=0
+                )
+            )
+
+
+@pytest.mark.describe("timed_extraction Utility Function Behaviour")
+class TestTimedExtraction:
+    @pytest.mark.it("check it passes the connection and table name to the function")
+    def test_calls_function(self):
+        conn = MagicMock()
+        extract_func = MagicMock(return_value="result")
+
+        result = timed_extraction(conn, "currency", extract_func)
+
+        extract_func.assert_called_once_with(conn, "currency")
+        assert result["table_name"] == "currency"
+        assert result["result"] == "result"
+
+
+@pytest.mark.describe("get_extraction_metrics Utility Function Behaviour")
+class TestGetExtractionMetrics:
+    @pytest.mark.it("check it reports per table durations and the speed-up")
+    def test_metrics(self):
+        extractions = [
+            {"table_name": "currency", "result": None, "duration_seconds": 1.0},
+            {"table_name": "staff", "result": None, "duration_seconds": 3.0},
+        ]
+
+        result = get_extraction_metrics(extractions, 2.0, 2)
+
+        assert result["table_durations_seconds"] == {"currency": 1.0, "staff": 3.0}
+        assert result["total_table_seconds"] == 4.0
+        assert result["speed_up"] == 2.0
+        assert result["concurrency"] == 2
@@ -0,0 +1,132 @@
+import pytest
+
+from src.utilities.extraction.extraction_planner import (
+    DEFAULT_SECONDS_PER_ROW,
+    TABLE_OVERHEAD_SECONDS,
+    estimate_table_rows,
+    get_plan_report,
+    plan_extraction,
+    record_extraction_history,
+)
+
+WATERMARK = {"last_updated": "2025-06-10T20:51:34.260407"}
+
+
+def stats(estimated_rows=1000, live_rows=1000, changed_rows=0):
+    return {
+        "estimated_rows": estimated_rows,
+        "live_rows": live_rows,
+        "changed_rows": changed_rows,
+    }
+
+
+@pytest.mark.describe("estimate_table_rows Utility Function Behaviour")
+class TestEstimateTableRows:
+    @pytest.mark.it("check a table never extracted is estimated at its size")
+    def test_first_extraction(self):
+        assert (
+            estimate_table_rows(stats(estimated_rows=-1, live_rows=500), {}, {}) == 500
+        )
+
+    @pytest.mark.it("check the changes since the previous run are estimated")
+    def test_changes(self):
+        history = {"changed_rows": 1200}
+
+        assert estimate_table_rows(stats(changed_rows=1500), history, WATERMARK) == 300
+
+    @pytest.mark.it("check reset statistics are capped at the table size")
+    def test_reset(self):
+        history = {"changed_rows": 90000}
+
+        assert estimate_table_rows(stats(changed_rows=5000), history, WATERMARK) == 1000
+        assert estimate_table_rows(stats(changed_rows=30), None, WATERMARK) == 30
+
+    @pytest.mark.it("check a table without statistics is estimated empty")
+    def test_no_stats(self):
+        assert estimate_table_rows(None, None, WATERMARK) == 0
+
+
+@pytest.mark.describe("plan_extraction Utility Function Behaviour")
+class TestPlanExtraction:
+    @pytest.mark.it("check tables are ordered largest first and packed onto workers")
+    def test_lpt(self):
+        history = {
+            name: {"changed_rows": 0, "seconds_per_row": 0.001}
+            for name in ("a", "b", "c", "d")
+        }
+        table_stats = {
+            "a": stats(changed_rows=1000),
+            "b": stats(changed_rows=3000),
+            "c": stats(changed_rows=2000),
+            "d": stats(changed_rows=2000),
+        }
+        watermarks = {name: WATERMARK for name in history}
+
+        plan = plan_extraction(
+            ["a", "b", "c", "d"], table_stats, watermarks, history, workers=2
+        )
+
+        assert plan["order"] == ["b", "c", "d", "a"]
+        assert plan["tables"]["b"]["worker"] == plan["tables"]["a"]["worker"]
+        assert plan["tables"]["c"]["worker"] == plan["tables"]["d"]["worker"]
+        assert plan["predicted_seconds"] == pytest.approx(
+            4 + 2 * TABLE_OVERHEAD_SECONDS
+        )
+
+    @pytest.mark.it("check tables without history use the default rate")
+    def test_default_rate(self):
+        plan = plan_extraction(["a"], {"a": stats(live_rows=5000)}, {}, {})
+
+        assert plan["tables"]["a"]["seconds"] == round(
+            TABLE_OVERHEAD_SECONDS + 5000 * DEFAULT_SECONDS_PER_ROW, 3
+        )
+
+    @pytest.mark.it("check it raises a ValueError without workers")
+    def test_no_workers(self):
+        with pytest.raises(ValueError):
+            plan_extraction(["a"], {}, {}, {}, workers=0)
+
+
+@pytest.mark.describe("record_extraction_history Utility Function Behaviour")
+class TestRecordExtractionHistory:
+    @pytest.mark.it("check the counter baseline and a moving average rate are kept")
+    def test_record(self):
+        history = {}
+
+        record_extraction_history(
+            history, "a", stats(changed_rows=70), 10000, 1 + TABLE_OVERHEAD_SECONDS
+        )
+        record_extraction_history(
+            history, "a", stats(changed_rows=90), 10000, 3 + TABLE_OVERHEAD_SECONDS
+        )
+
+        assert history["a"]["changed_rows"] == 90
+        assert history["a"]["rows"] == 10000
+        assert history["a"]["seconds_per_row"] == pytest.approx(0.0002)
+
+    @pytest.mark.it("check small runs do not change the learnt rate")
+    def test_small_run(self):
+        history = {"a": {"seconds_per_row": 0.001}}
+
+        record_extraction_history(history, "a", stats(), 3, 0.5)
+
+        assert history["a"]["seconds_per_row"] == 0.001
+        assert history["a"]["seconds"] == 0.5
+
+
+@pytest.mark.describe("get_plan_report Utility Function Behaviour")
+class TestGetPlanReport:
+    @pytest.mark.it("check predicted and actual rows and seconds are reported")
+    def test_report(self):
+        plan = plan_extraction(["a"], {"a": stats(live_rows=5000)}, {}, {})
+        extractions = [{"table_name": "a", "rows": 4900, "duration_seconds": 0.21}]
+
+        report = get_plan_report(plan, extractions, 0.25)
+
+        assert report["actual_seconds"] == 0.25
+        assert report["tables"]["a"] == {
+            "predicted_rows": 5000,
+            "actual_rows": 4900,
+            "predicted_seconds": plan["tables"]["a"]["seconds"],
+            "actual_seconds": 0.21,
+        }
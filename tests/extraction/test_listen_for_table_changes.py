@@ -0,0 +1,87 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg import Notify
+
+from src.listeners.change_listener import get_step_function_trigger
+from src.utilities.extraction.listen_for_table_changes import (
+    listen_for_table_changes,
+)
+
+
+def listening_conn(*rounds):
+    """A connection whose successive notifies calls deliver the given tables."""
+    conn = MagicMock()
+    conn.autocommit = True
+    pending = list(rounds)
+
+    def notifies(timeout=None, stop_after=None):
+        tables = pending.pop(0) if pending else []
+        return iter([Notify("totesys_changes", table, 1) for table in tables])
+
+    conn.notifies.side_effect = notifies
+    return conn
+
+
+@pytest.mark.describe("listen_for_table_changes Utility Function Behaviour")
+class TestListenForTableChanges:
+    @pytest.mark.it("check it listens on the channel")
+    def test_listen(self):
+        conn = listening_conn()
+
+        assert list(listen_for_table_changes(conn, "totesys_changes", 0, 10, 0)) == []
+        assert conn.execute.call_args.args[0].as_string() == 'LISTEN "totesys_changes"'
+
+    @pytest.mark.it("check notifications are coalesced until the channel is quiet")
+    def test_coalesce(self):
+        conn = listening_conn(["staff"], ["currency"], ["staff"], [], ["design"])
+
+        batches = list(listen_for_table_changes(conn, "totesys_changes", 0, 10, 0))
+
+        assert batches == [["currency", "staff"], ["design"]]
+
+    @pytest.mark.it("check a batch is yielded after the maximum delay under load")
+    def test_max_delay(self):
+        conn = listening_conn(["staff"], ["currency"], ["design"])
+
+        with patch(
+            "src.utilities.extraction.listen_for_table_changes.monotonic",
+            side_effect=[0, 1, 2, 11, 12, 13, 14],
+        ):
+            batches = list(listen_for_table_changes(conn, "totesys_changes", 0, 10, 0))
+
+        assert batches == [["currency", "staff"], ["design"]]
+
+    @pytest.mark.it("check it raises a ValueError outside of autocommit mode")
+    def test_autocommit(self):
+        conn = listening_conn()
+        conn.autocommit = False
+
+        with pytest.raises(ValueError):
+            next(listen_for_table_changes(conn, "totesys_changes"))
+
+
+@pytest.mark.describe("get_step_function_trigger Behaviour")
+class TestGetStepFunctionTrigger:
+    @pytest.mark.it("check it waits for any running execution before starting one")
+    def test_waits_for_running(self):
+        sfn_client = MagicMock()
+        sfn_client.list_executions.side_effect = [
+            {"executions": [{"name": "scheduled"}]},
+            {"executions": []},
+        ]
+
+        with patch("src.listeners.change_listener.boto3") as mock_boto3:
+            mock_boto3.client.return_value = sfn_client
+            trigger = get_step_function_trigger("arn:sfn", poll_seconds=0)
+            trigger(["staff"])
+
+        assert sfn_client.list_executions.call_count == 2
+        assert sfn_client.list_executions.call_args.kwargs == {
+            "stateMachineArn": "arn:sfn",
+            "statusFilter": "RUNNING",
+            "maxResults": 1,
+        }
+        sfn_client.start_execution.assert_called_once_with(
+            stateMachineArn="arn:sfn", input='{"tables":["staff"]}'
+        )
@@ -0,0 +1,170 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.utilities.extraction.row_hash_index import (
+    RowHashIndex,
+    hash_column,
+    hash_rows,
+)
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-ingest-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-ingest-bucket"
+
+
+@pytest.fixture
+def staff_df():
+    return pd.DataFrame(
+        {
+            "staff_id": [1, 2, 3],
+            "first_name": ["Jeremie", "Deron", "Jeanette"],
+            "department_id": [2, 6, 6],
+            "created_at": [datetime(2022, 11, 3)] * 3,
+            "last_updated": [datetime(2022, 11, 3)] * 3,
+        }
+    )
+
+
+@pytest.mark.describe("hash_column Utility Function Behaviour")
+class TestHashColumn:
+    @pytest.mark.it("check a value hashes the same whatever batch it is in")
+    def test_stable(self):
+        first = hash_column(pa.array(["a", "b", None]))
+        second = hash_column(pa.array(["c", "b"]))
+
+        assert first[1] == second[1]
+        assert first[0] != first[1]
+
+    @pytest.mark.it("check an integer hashes like the same float, NULLs included")
+    def test_numbers(self):
+        integers = hash_column(pa.array([1, 2], type=pa.int64()))
+        floats = hash_column(pa.array([1.0, None]))
+
+        assert integers[0] == floats[0]
+        assert floats[1] != integers[1]
+
+    @pytest.mark.it("check bigints beyond float precision hash differently")
+    def test_bigints(self):
+        hashes = hash_column(pa.array([2**53, 2**53 + 1], type=pa.int64()))
+
+        assert hashes[0] != hashes[1]
+
+    @pytest.mark.it("check fractional floats are not hashed like their integer part")
+    def test_fractions(self):
+        floats = hash_column(pa.array([1.5, 1.0]))
+        integers = hash_column(pa.array([1], type=pa.int64()))
+
+        assert floats[0] != integers[0]
+        assert floats[1] == integers[0]
+
+    @pytest.mark.it("check dates and timestamps are hashed")
+    def test_temporal(self):
+        dates = hash_column(pa.array([date(2025, 1, 1), date(2025, 1, 2)]))
+        timestamps = hash_column(pa.array([datetime(2025, 1, 1), None]))
+
+        assert dates[0] != dates[1]
+        assert timestamps[0] != timestamps[1]
+
+
+@pytest.mark.describe("hash_rows Utility Function Behaviour")
+class TestHashRows:
+    @pytest.mark.it("check rows differing in any hashed column hash differently")
+    def test_rows(self):
+        table = pa.table({"a": [1, 1, 2], "b": ["x", "y", "x"]})
+
+        hashes = hash_rows(table, ["a", "b"])
+
+        assert len(set(hashes.tolist())) == 3
+
+    @pytest.mark.it("check columns that are not hashed are ignored")
+    def test_ignored_columns(self):
+        table = pa.table({"a": [1, 1], "last_updated": [1, 2]})
+
+        hashes = hash_rows(table, ["a"])
+
+        assert hashes[0] == hashes[1]
+
+
+@pytest.mark.describe("RowHashIndex Behaviour")
+class TestRowHashIndex:
+    @pytest.mark.it("check every row is new to an empty index")
+    def test_empty_index(self, staff_df):
+        index = RowHashIndex("staff", "staff_id")
+
+        assert len(index.filter_changed_rows(staff_df)) == 3
+        assert index.suppressed_rows == 0
+
+    @pytest.mark.it("check touch-updated rows are dropped and changed rows are kept")
+    def test_touch_updates(self, s3_bucket, staff_df):
+        s3_client, bucket = s3_bucket
+        index = RowHashIndex("staff", "staff_id")
+        index.filter_changed_rows(staff_df)
+        index.save(s3_client, bucket)
+
+        touched_df = staff_df.assign(last_updated=datetime(2025, 1, 1))
+        touched_df.loc[1, "department_id"] = 3
+        touched_df.loc[3] = [4, "Ana", 1, datetime(2025, 1, 1), datetime(2025, 1, 1)]
+
+        index = RowHashIndex.load(s3_client, bucket, "staff", "staff_id")
+        changed_df = index.filter_changed_rows(touched_df)
+
+        assert changed_df["staff_id"].tolist() == [2, 4]
+        assert index.suppressed_rows == 2
+
+    @pytest.mark.it("check saving merges the new hashes, the latest one per key")
+    def test_save_merges(self, s3_bucket, staff_df):
+        s3_client, bucket = s3_bucket
+        index = RowHashIndex("staff", "staff_id")
+        index.filter_changed_rows(staff_df)
+        index.filter_changed_rows(staff_df.assign(first_name="Changed").iloc[:1])
+        index.save(s3_client, bucket)
+
+        loaded = RowHashIndex.load(s3_client, bucket, "staff", "staff_id")
+
+        assert loaded.keys.tolist() == [1, 2, 3]
+        assert np.array_equal(loaded.hashes, index.hashes)
+        assert loaded.filter_changed_rows(staff_df)["staff_id"].tolist() == [1]
+
+    @pytest.mark.it("check a record batch is filtered like a DataFrame")
+    def test_record_batch(self, s3_bucket, staff_df):
+        s3_client, bucket = s3_bucket
+        index = RowHashIndex("staff", "staff_id")
+        index.filter_changed_rows(staff_df)
+        index.save(s3_client, bucket)
+
+        batch = pa.RecordBatch.from_pandas(staff_df, preserve_index=False)
+
+        assert index.filter_changed_batch(batch).num_rows == 0
+        assert index.suppressed_rows == 3
+
+    @pytest.mark.it("check nothing is saved when no row was let through")
+    def test_nothing_to_save(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        assert RowHashIndex("staff", "staff_id").save(s3_client, bucket) == 0
+        assert s3_client.list_objects_v2(Bucket=bucket)["KeyCount"] == 0
+
+    @pytest.mark.it("check the index of another source is kept under its namespace")
+    def test_key_prefix(self, s3_bucket, staff_df):
+        s3_client, bucket = s3_bucket
+        index = RowHashIndex("staff", "staff_id", key_prefix="totesys_eu")
+        index.filter_changed_rows(staff_df)
+        index.save(s3_client, bucket)
+
+        keys = [
+            item["Key"] for item in s3_client.list_objects_v2(Bucket=bucket)["Contents"]
+        ]
+        loaded = RowHashIndex.load(s3_client, bucket, "staff", "staff_id", "totesys_eu")
+
+        assert keys == ["totesys_eu/row_hashes/staff.parquet"]
+        assert loaded.keys.tolist() == [1, 2, 3]
+        assert RowHashIndex.load(s3_client, bucket, "staff", "staff_id").keys.size == 0
@@ -0,0 +1,52 @@
+import pyarrow as pa
+import pytest
+
+from src.utilities.parquets.create_arrow_schema_from_columns import (
+    create_arrow_schema_from_columns,
+)
+
+
+@pytest.mark.describe("create_arrow_schema_from_columns Utility Function Behaviour")
+class TestCreateArrowSchemaFromColumns:
+    @pytest.mark.it("check columns are typed as the extraction projection selects them")
+    def test_projected_types(self):
+        columns = [
+            {"column_name": "sales_order_id", "udt_name": "int4"},
+            {"column_name": "unit_price", "udt_name": "numeric"},
+            {"column_name": "agreed_payment_date", "udt_name": "varchar"},
+            {"column_name": "tags", "udt_name": "_text"},
+            {"column_name": "last_updated", "udt_name": "timestamp"},
+        ]
+
+        schema = create_arrow_schema_from_columns("sales_order", columns)
+
+        assert schema == pa.schema(
+            [
+                ("sales_order_id", pa.int64()),
+                ("unit_price", pa.float64()),
+                ("agreed_payment_date", pa.date32()),
+                ("tags", pa.string()),
+                ("last_updated", pa.timestamp("ns")),
+            ]
+        )
+
+    @pytest.mark.it("check unknown types fall back to string")
+    def test_unknown_type(self):
+        columns = [{"column_name": "location", "udt_name": "point"}]
+
+        schema = create_arrow_schema_from_columns("address", columns)
+
+        assert schema.field("location").type == pa.string()
+
+    @pytest.mark.it("check low cardinality string columns are dictionary encoded")
+    def test_dictionary_columns(self):
+        columns = [
+            {"column_name": "currency_id", "udt_name": "int4"},
+            {"column_name": "currency_code", "udt_name": "_varchar"},
+        ]
+
+        schema = create_arrow_schema_from_columns("currency", columns)
+
+        assert schema.field("currency_code").type == pa.dictionary(
+            pa.int32(), pa.string()
+        )
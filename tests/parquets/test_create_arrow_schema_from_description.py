@@ -0,0 +1,77 @@
+from unittest.mock import Mock
+
+import pyarrow as pa
+import pytest
+
+from src.utilities.parquets.create_arrow_schema_from_description import (
+    create_arrow_schema_from_description,
+    get_arrow_type_from_column,
+)
+
+
+def make_column(name, type_code, precision=None, scale=None):
+    column = Mock()
+    column.name = name
+    column.type_code = type_code
+    column.precision = precision
+    column.scale = scale
+    return column
+
+
+@pytest.mark.describe("get_arrow_type_from_column Utility Function Behaviour")
+class TestGetArrowTypeFromColumn:
+    @pytest.mark.it("check Postgres integer columns are mapped to int64")
+    @pytest.mark.parametrize("type_code", [21, 23, 20])
+    def test_integers(self, type_code):
+        assert get_arrow_type_from_column(make_column("id", type_code)) == pa.int64()
+
+    @pytest.mark.it("check varchar and text columns are mapped to string")
+    @pytest.mark.parametrize("type_code", [1043, 25])
+    def test_strings(self, type_code):
+        assert get_arrow_type_from_column(make_column("name", type_code)) == pa.string()
+
+    @pytest.mark.it("check timestamp columns are mapped to nanosecond timestamps")
+    def test_timestamp(self):
+        result = get_arrow_type_from_column(make_column("last_updated", 1114))
+
+        assert result == pa.timestamp("ns")
+
+    @pytest.mark.it("check numeric columns keep their declared precision and scale")
+    def test_constrained_numeric(self):
+        result = get_arrow_type_from_column(make_column("price", 1700, 10, 2))
+
+        assert result == pa.decimal128(10, 2)
+
+    @pytest.mark.it("check unconstrained numeric columns get a default decimal type")
+    def test_unconstrained_numeric(self):
+        result = get_arrow_type_from_column(make_column("price", 1700))
+
+        assert result == pa.decimal128(38, 18)
+
+    @pytest.mark.it("check array columns are mapped to Arrow lists")
+    def test_array(self):
+        result = get_arrow_type_from_column(make_column("currency_code", 1015))
+
+        assert result == pa.list_(pa.string())
+
+    @pytest.mark.it("check unknown types fall back to string")
+    def test_unknown(self):
+        result = get_arrow_type_from_column(make_column("mystery", 999999))
+
+        assert result == pa.string()
+
+
+@pytest.mark.describe("create_arrow_schema_from_description Utility Function Behaviour")
+class TestCreateArrowSchemaFromDescription:
+    @pytest.mark.it("check it returns a schema with one field per column in order")
+    def test_schema(self):
+        description = [
+            make_column("currency_id", 23),
+            make_column("currency_code", 1043),
+            make_column("last_updated", 1114),
+        ]
+
+        result = create_arrow_schema_from_description(description)
+
+        assert isinstance(result, pa.Schema)
+        assert result.names == ["currency_id", "currency_code", "last_updated"]
@@ -0,0 +1,66 @@
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+from src.utilities.parquets.create_arrow_table_from_parquet import (
+    create_arrow_table_from_parquet,
+)
+
+
+@pytest.fixture
+def test_parquet():
+    parquet_file = BytesIO()
+    pq.write_table(
+        pa.table(
+            {
+                "staff_id": list(range(1, 7)),
+                "first_name": ["Jeremie", "Deron", "Jeanette", "Ana", "Magdalena", "K"],
+                "department_id": [2, 6, 6, 3, 8, 1],
+            }
+        ),
+        parquet_file,
+        row_group_size=2,
+    )
+    return parquet_file.getvalue()
+
+
+@pytest.mark.describe("create_arrow_table_from_parquet Utility Function Behaviour")
+class TestCreateArrowTableFromParquet:
+    @pytest.mark.it("check it reads every column and row of bytes or a buffer")
+    @pytest.mark.parametrize("wrap", [bytes, pa.py_buffer])
+    def test_whole_file(self, test_parquet, wrap):
+        table = create_arrow_table_from_parquet(wrap(test_parquet))
+
+        assert table.num_rows == 6
+        assert table.schema.names == ["staff_id", "first_name", "department_id"]
+
+    @pytest.mark.it("check only the selected columns are read, in the order given")
+    def test_columns(self, test_parquet):
+        table = create_arrow_table_from_parquet(
+            test_parquet, columns=["department_id", "staff_id"]
+        )
+
+        assert table.schema.names == ["department_id", "staff_id"]
+
+    @pytest.mark.it("check only the rows matching a filter are read")
+    @pytest.mark.parametrize(
+        "filters",
+        [[("staff_id", ">", 4)], pc.field("staff_id") > 4],
+    )
+    def test_filters(self, test_parquet, filters):
+        table = create_arrow_table_from_parquet(
+            test_parquet, columns=["first_name"], filters=filters
+        )
+
+        assert table.column("first_name").to_pylist() == ["Magdalena", "K"]
+
+    @pytest.mark.it("check it raises for a missing column or invalid file")
+    def test_invalid(self, test_parquet):
+        with pytest.raises(pa.ArrowInvalid):
+            create_arrow_table_from_parquet(test_parquet, columns=["email_address"])
+
+        with pytest.raises(pa.ArrowInvalid):
+            create_arrow_table_from_parquet(b"not parquet")
@@ -0,0 +1,110 @@
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utilities.parquets.create_parquet_from_batches import (
+    create_parquet_from_batches,
+)
+
+
+@pytest.fixture
+def test_schema():
+    return pa.schema(
+        [
+            pa.field("currency_id", pa.int64()),
+            pa.field("currency_code", pa.string()),
+        ]
+    )
+
+
+@pytest.fixture
+def test_batches(test_schema):
+    return [
+        pa.RecordBatch.from_pylist(
+            [
+                {"currency_id": 1, "currency_code": "GBP"},
+                {"currency_id": 2, "currency_code": "USD"},
+            ],
+            schema=test_schema,
+        ),
+        pa.RecordBatch.from_pylist(
+            [{"currency_id": 3, "currency_code": "EUR"}], schema=test_schema
+        ),
+    ]
+
+
+@pytest.mark.describe("create_parquet_from_batches Utility Function Behaviour")
+class TestCreateParquetFromBatches:
+    @pytest.mark.it("check it returns a parquet file in a BytesIO buffer")
+    def test_returns_bytes_io(self, test_batches, test_schema):
+        result = create_parquet_from_batches(test_batches, test_schema)
+
+        assert isinstance(result, BytesIO)
+        assert result.tell() == 0
+
+    @pytest.mark.it("check generated parquet file contains the rows of every batch")
+    def test_parquet_has_expected_data(self, test_batches, test_schema):
+        result = create_parquet_from_batches(test_batches, test_schema)
+
+        data_frame = pd.read_parquet(result)
+
+        assert data_frame["currency_id"].tolist() == [1, 2, 3]
+        assert data_frame["currency_code"].tolist() == ["GBP", "USD", "EUR"]
+
+    @pytest.mark.it("check it consumes batches lazily from a generator")
+    def test_generator(self, test_batches, test_schema):
+        consumed = []
+
+        def batch_generator():
+            for batch in test_batches:
+                consumed.append(batch)
+                yield batch
+
+        result = create_parquet_from_batches(batch_generator(), test_schema)
+
+        assert len(consumed) == len(test_batches)
+        assert pq.read_metadata(result).num_rows == 3
+
+    @pytest.mark.it("check batches with an all NULL column keep the given schema")
+    def test_all_null_batch(self, test_schema):
+        null_batch = pa.RecordBatch.from_pylist(
+            [{"currency_id": 4, "currency_code": None}]
+        )
+
+        result = create_parquet_from_batches([null_batch], test_schema)
+
+        assert pq.read_schema(result).field("currency_code").type == pa.string()
+
+    @pytest.mark.it("check the parquet file is zstd compressed by default")
+    def test_default_compression(self, test_batches, test_schema):
+        result = create_parquet_from_batches(test_batches, test_schema)
+
+        metadata = pq.read_metadata(result)
+        assert metadata.row_group(0).column(0).compression == "ZSTD"
+
+    @pytest.mark.it("check the parquet file is written with the given codec")
+    @pytest.mark.parametrize(
+        "compression, codec",
+        [("gzip:6", "GZIP"), ("snappy", "SNAPPY"), ("none", "UNCOMPRESSED")],
+    )
+    def test_compression(self, test_batches, test_schema, compression, codec):
+        result = create_parquet_from_batches(test_batches, test_schema, compression)
+
+        metadata = pq.read_metadata(result)
+        assert metadata.row_group(0).column(0).compression == codec
+
+    @pytest.mark.it("check batches are merged into row groups of the given size")
+    def test_row_group_size(self, test_batches, test_schema):
+        result = create_parquet_from_batches(
+            test_batches * 3, test_schema, row_group_size=4
+        )
+
+        metadata = pq.ParquetFile(result).metadata
+
+        assert [
+            metadata.row_group(index).num_rows
+            for index in range(metadata.num_row_groups)
+        ] == [4, 4, 1]
@@ -3,6 +3,8 @@ from copy import deepcopy
 from io import BytesIO
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
 from src.utilities.custom_errors import InvalidDataFrame
@@ -28,6 +30,20 @@ class TestCreateParquetFromDataFrame:
 
         assert isinstance(result, BytesIO)
 
+    @pytest.mark.it("check the file is written with the schema given")
+    def test_schema(self):
+        data_frame = pd.DataFrame({"staff_id": [1, 2], "location": ["Leeds", "Leeds"]})
+        schema = pa.schema(
+            [
+                ("staff_id", pa.int32()),
+                ("location", pa.dictionary(pa.int32(), pa.string())),
+            ]
+        )
+
+        result = create_parquet_from_data_frame(data_frame, schema=schema)
+
+        assert pq.read_schema(result) == schema
+
     # @pytest.mark.skip
     @pytest.mark.it("check generated parquet file contains expected data")
     def test_parquet_has_expected_data(self):
@@ -2,6 +2,8 @@ from io import BytesIO
 from unittest.mock import Mock
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 
 from src.utilities.parquets.create_parquets_from_data_frames import (
@@ -39,6 +41,50 @@ class TestCreateParquetsFromDataFrames:
             assert data[i]["table_name"] == valid_data_frame_data[i]["table_name"]
             assert data[i]["last_updated"] == valid_data_frame_data[i]["last_updated"]
 
+    @pytest.mark.it("check a table's codec can be overridden by name")
+    def test_table_compression(self, valid_data_frame_data):
+        table_name = valid_data_frame_data[0]["table_name"]
+
+        result = create_parquets_from_data_frames(
+            valid_data_frame_data,
+            compression="snappy",
+            table_compression={table_name: "gzip:1"},
+        )
+
+        codecs = [
+            pq.read_metadata(item["parquet_file"]).row_group(0).column(0).compression
+            for item in result["success"]["data"]
+        ]
+        assert codecs[0] == "GZIP"
+        assert set(codecs[1:]) <= {"SNAPPY"}
+
+    @pytest.mark.it("check a table with a schema is written with it")
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_table_schema(self, max_workers):
+        schema = pa.schema([("currency_id", pa.int32()), ("rate", pa.float32())])
+        data = [
+            {
+                "table_name": "typed",
+                "last_updated": None,
+                "data_frame": pd.DataFrame({"currency_id": [1, 2], "rate": [0.5, 1]}),
+                "schema": schema,
+            },
+            {
+                "table_name": "inferred",
+                "last_updated": None,
+                "data_frame": pd.DataFrame({"currency_id": [1, 2]}),
+            },
+        ]
+
+        result = create_parquets_from_data_frames(data, max_workers=max_workers)
+
+        typed, inferred = result["success"]["data"]
+        assert pq.read_schema(typed["parquet_file"]) == schema
+        assert (
+            pq.read_schema(inferred["parquet_file"]).field("currency_id").type
+            == pa.int64()
+        )
+
     @pytest.mark.it(
         "check should return an error if the data_frame is not a valid DataFrame"
     )
@@ -78,3 +124,56 @@ class TestCreateParquetsFromDataFrames:
 
         assert "error" in result
         assert result["error"]["message"] == "failed_table: Failed Conversion"
+
+    @pytest.mark.it("check each table reports its encode time and size")
+    def test_encode_metrics(self, valid_data_frame_data):
+        result = create_parquets_from_data_frames(valid_data_frame_data)
+
+        for item in result["success"]["data"]:
+            assert item["encode_seconds"] >= 0
+            assert item["size"] == len(item["parquet_file"].getvalue())
+
+    @pytest.mark.it("check concurrent encoding returns the same files in order")
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_concurrent(self, valid_data_frame_data, executor):
+        sequential = create_parquets_from_data_frames(valid_data_frame_data)
+        concurrent = create_parquets_from_data_frames(
+            valid_data_frame_data, max_workers=4, executor=executor
+        )
+
+        assert [item["table_name"] for item in concurrent["success"]["data"]] == [
+            item["table_name"] for item in valid_data_frame_data
+        ]
+        for expected, item in zip(
+            sequential["success"]["data"], concurrent["success"]["data"]
+        ):
+            pd.testing.assert_frame_equal(
+                pd.read_parquet(item["parquet_file"]),
+                pd.read_parquet(expected["parquet_file"]),
+            )
+
+    @pytest.mark.it("check concurrent encoding returns the first table's error")
+    def test_concurrent_error(self, valid_data_frame_data):
+        failing_df = Mock(spec=pd.DataFrame)
+        failing_df.to_parquet.side_effect = Exception("Failed Conversion")
+        data = [
+            valid_data_frame_data[0],
+            {
+                "table_name": "failed_table",
+                "last_updated": None,
+                "data_frame": failing_df,
+            },
+            {"table_name": "bad_table", "last_updated": None, "data_frame": {}},
+        ]
+
+        result = create_parquets_from_data_frames(data, max_workers=3)
+
+        assert result["error"]["message"] == "failed_table: Failed Conversion"
+
+    @pytest.mark.it("check invalid concurrency settings raise a ValueError")
+    @pytest.mark.parametrize(
+        "options", [{"max_workers": 0}, {"max_workers": 2, "executor": "fibre"}]
+    )
+    def test_invalid_concurrency(self, valid_data_frame_data, options):
+        with pytest.raises(ValueError):
+            create_parquets_from_data_frames(valid_data_frame_data, **options)
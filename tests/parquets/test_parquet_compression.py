@@ -0,0 +1,28 @@
+import pytest
+
+from src.utilities.parquets.parquet_compression import (
+    get_parquet_compression_options,
+)
+
+
+@pytest.mark.describe("get_parquet_compression_options Utility Function Behaviour")
+class TestGetParquetCompressionOptions:
+    @pytest.mark.it("check a codec is parsed with its optional level")
+    @pytest.mark.parametrize(
+        "compression, options",
+        [
+            ("zstd", {"compression": "zstd", "compression_level": None}),
+            ("ZSTD:9", {"compression": "zstd", "compression_level": 9}),
+            ("gzip:1", {"compression": "gzip", "compression_level": 1}),
+            ("lz4", {"compression": "lz4", "compression_level": None}),
+            ("none", {"compression": None, "compression_level": None}),
+        ],
+    )
+    def test_options(self, compression, options):
+        assert get_parquet_compression_options(compression) == options
+
+    @pytest.mark.it("check invalid settings raise a ValueError")
+    @pytest.mark.parametrize("compression", ["lzo", "snappy:3", "zstd:fast", ""])
+    def test_invalid(self, compression):
+        with pytest.raises(ValueError):
+            get_parquet_compression_options(compression)
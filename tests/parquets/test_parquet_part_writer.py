@@ -0,0 +1,175 @@
+import threading
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utilities.parquets.parquet_part_writer import ParquetPartWriter
+
+
+@pytest.fixture
+def test_schema():
+    return pa.schema([("staff_id", pa.int64()), ("first_name", pa.string())])
+
+
+def make_batches(schema, batch_count, batch_rows):
+    return [
+        pa.RecordBatch.from_pydict(
+            {
+                "staff_id": list(range(start, start + batch_rows)),
+                "first_name": [f"name {id}" for id in range(start, start + batch_rows)],
+            },
+            schema=schema,
+        )
+        for start in range(0, batch_count * batch_rows, batch_rows)
+    ]
+
+
+def get_row_group_sizes(parquet_file):
+    metadata = pq.ParquetFile(parquet_file).metadata
+    return [
+        metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)
+    ]
+
+
+@pytest.mark.describe("ParquetPartWriter Class Behaviour")
+class TestParquetPartWriter:
+    @pytest.mark.it("check row groups have row_group_size rows whatever the batches")
+    def test_row_group_size(self, test_schema):
+        with ParquetPartWriter(test_schema, row_group_size=4) as writer:
+            for batch in make_batches(test_schema, 4, 3):
+                writer.write_batch(batch)
+
+        [part] = writer.parts
+
+        assert get_row_group_sizes(part["parquet_file"]) == [4, 4, 4]
+        assert part["row_count"] == 12
+        assert part["row_groups"] == 3
+        assert pq.read_table(part["parquet_file"]).column("staff_id").to_pylist() == (
+            list(range(12))
+        )
+
+    @pytest.mark.it("check a part is closed once it reaches max_part_bytes")
+    def test_rollover(self, test_schema):
+        with ParquetPartWriter(
+            test_schema, row_group_size=100, max_part_bytes=1
+        ) as writer:
+            for batch in make_batches(test_schema, 5, 50):
+                writer.write_batch(batch)
+
+        assert [part["part_number"] for part in writer.parts] == [1, 2, 3]
+        assert [part["row_count"] for part in writer.parts] == [100, 100, 50]
+        assert all(
+            part["size"] == len(part["parquet_file"].getvalue())
+            for part in writer.parts
+        )
+        assert pa.concat_tables(
+            pq.read_table(part["parquet_file"]) for part in writer.parts
+        ).column("staff_id").to_pylist() == list(range(250))
+
+    @pytest.mark.it("check parts are uploaded in order on a background thread")
+    def test_upload_part(self, test_schema):
+        uploads = []
+
+        def upload_part(parquet_file, part_number):
+            uploads.append(
+                (
+                    part_number,
+                    pq.read_table(parquet_file).num_rows,
+                    threading.get_ident(),
+                )
+            )
+            return f"part_{part_number}.parquet"
+
+        with ParquetPartWriter(
+            test_schema, row_group_size=10, max_part_bytes=1, upload_part=upload_part
+        ) as writer:
+            for batch in make_batches(test_schema, 3, 10):
+                writer.write_batch(batch)
+
+        assert [(number, rows) for number, rows, _ in uploads] == [
+            (1, 10),
+            (2, 10),
+            (3, 10),
+        ]
+        assert all(thread != threading.get_ident() for _, _, thread in uploads)
+        assert [part["upload"] for part in writer.parts] == [
+            "part_1.parquet",
+            "part_2.parquet",
+            "part_3.parquet",
+        ]
+        assert all(part["parquet_file"] is None for part in writer.parts)
+
+    @pytest.mark.it("check a failed upload is raised when the writer is closed")
+    def test_failed_upload(self, test_schema):
+        def upload_part(parquet_file, part_number):
+            raise RuntimeError("upload failed")
+
+        writer = ParquetPartWriter(test_schema, upload_part=upload_part)
+        writer.write_batch(make_batches(test_schema, 1, 5)[0])
+
+        with pytest.raises(RuntimeError, match="upload failed"):
+            writer.close()
+
+    @pytest.mark.it("check the part being filled is dropped when writing fails")
+    def test_abort(self, test_schema):
+        uploaded = []
+
+        with pytest.raises(ValueError):
+            with ParquetPartWriter(
+                test_schema,
+                row_group_size=10,
+                max_part_bytes=1,
+                upload_part=lambda parquet_file, number: uploaded.append(number),
+            ) as writer:
+                for batch in make_batches(test_schema, 2, 10):
+                    writer.write_batch(batch)
+                writer.write_batch(make_batches(test_schema, 1, 5)[0])
+                raise ValueError("extraction failed")
+
+        assert uploaded == [1, 2]
+        assert len(writer.parts) == 2
+
+    @pytest.mark.it("check a writer without rows writes one empty part")
+    def test_empty(self, test_schema):
+        with ParquetPartWriter(test_schema) as writer:
+            writer.write_batch(pa.RecordBatch.from_pylist([], schema=test_schema))
+
+        [part] = writer.parts
+
+        assert part["row_count"] == 0
+        assert pq.read_table(part["parquet_file"]).schema == test_schema
+
+    @pytest.mark.it("check batches are cast to the schema")
+    def test_cast(self, test_schema):
+        batch = pa.RecordBatch.from_pydict(
+            {"staff_id": pa.array([1], pa.int32()), "first_name": ["Ana"]}
+        )
+
+        with ParquetPartWriter(test_schema) as writer:
+            writer.write_batch(batch)
+
+        assert pq.read_schema(writer.parts[0]["parquet_file"]) == test_schema
+
+    @pytest.mark.it("check writing to a closed writer raises a ValueError")
+    def test_closed(self, test_schema):
+        writer = ParquetPartWriter(test_schema)
+        writer.close()
+
+        with pytest.raises(ValueError, match="closed"):
+            writer.write_batch(make_batches(test_schema, 1, 1)[0])
+
+    @pytest.mark.it("check invalid sizes raise a ValueError")
+    @pytest.mark.parametrize("options", [{"row_group_size": 0}, {"max_part_bytes": 0}])
+    def test_invalid_sizes(self, test_schema, options):
+        with pytest.raises(ValueError, match="positive integer"):
+            ParquetPartWriter(test_schema, **options)
+
+    @pytest.mark.it("check the parts are in memory Parquet files")
+    def test_bytes_io(self, test_schema):
+        with ParquetPartWriter(test_schema) as writer:
+            writer.write_batch(make_batches(test_schema, 1, 1)[0])
+
+        assert isinstance(writer.parts[0]["parquet_file"], BytesIO)
+        assert writer.parts[0]["parquet_file"].tell() == 0
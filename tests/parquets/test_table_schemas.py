@@ -0,0 +1,152 @@
+from datetime import date, time
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.utilities.parquets.table_schemas import (
+    DICTIONARY_STRING,
+    OUTPUT_TABLE_SCHEMAS,
+    create_arrow_table_from_data_frame,
+    get_output_table_schema,
+    get_source_table_schema,
+)
+
+
+@pytest.fixture
+def test_fact_data_frame():
+    return pd.DataFrame(
+        {
+            "source": ["TOTESYS", "TOTESYS_EU"],
+            "sales_order_id": [1, 2],
+            "design_id": [3, 4],
+            "sales_staff_id": [5, 6],
+            "counterparty_id": [7, 8],
+            "units_sold": [1000, 2000],
+            "unit_price": [2.96, 3.1],
+            "currency_id": [1, 2],
+            "agreed_delivery_date": [date(2025, 1, 1), date(2025, 1, 2)],
+            "agreed_payment_date": [date(2025, 1, 3), date(2025, 1, 4)],
+            "agreed_delivery_location_id": [9, 10],
+            "created_date": [date(2024, 12, 1), date(2024, 12, 2)],
+            "last_updated_date": [date(2024, 12, 3), date(2024, 12, 4)],
+            "created_time": [time(10, 0, 0, 123000), time(11, 0)],
+            "last_updated_time": [time(12, 0), time(13, 0)],
+        }
+    )
+
+
+@pytest.mark.describe("get_source_table_schema Utility Function Behaviour")
+class TestGetSourceTableSchema:
+    @pytest.mark.it("check a table's low cardinality strings are dictionary encoded")
+    def test_dictionary_columns(self):
+        schema = pa.schema(
+            [
+                ("department_id", pa.int64()),
+                ("department_name", pa.string()),
+                ("manager", pa.string()),
+            ]
+        )
+
+        result = get_source_table_schema("department", schema)
+
+        assert result.field("department_name").type == DICTIONARY_STRING
+        assert result.field("manager").type == pa.string()
+        assert result.field("department_id").type == pa.int64()
+
+    @pytest.mark.it("check other tables and non string columns are left as they are")
+    def test_unchanged(self):
+        schema = pa.schema([("country", pa.int64())])
+
+        assert get_source_table_schema("address", schema) == schema
+        assert get_source_table_schema("staff", schema) == schema
+
+
+@pytest.mark.describe("get_output_table_schema Utility Function Behaviour")
+class TestGetOutputTableSchema:
+    @pytest.mark.it("check every dimension and fact of the transform is registered")
+    @pytest.mark.parametrize(
+        "table_name",
+        [
+            "dim_date",
+            "dim_staff",
+            "dim_location",
+            "dim_currency",
+            "dim_design",
+            "dim_counterparty",
+            "fact_sales_order",
+        ],
+    )
+    def test_registered(self, table_name):
+        assert get_output_table_schema(table_name) is OUTPUT_TABLE_SCHEMAS[table_name]
+
+    @pytest.mark.it("check an unknown table has no schema")
+    def test_unknown(self):
+        assert get_output_table_schema("fact_purchase_order") is None
+
+
+@pytest.mark.describe("create_arrow_table_from_data_frame Utility Function Behaviour")
+class TestCreateArrowTableFromDataFrame:
+    @pytest.mark.it("check the inferred dtypes are converted to the schema types")
+    def test_schema_types(self, test_fact_data_frame):
+        schema = get_output_table_schema("fact_sales_order")
+
+        table = create_arrow_table_from_data_frame(test_fact_data_frame, schema)
+
+        assert table.schema == schema
+        assert table.column("unit_price").to_pylist() == [
+            Decimal("2.96"),
+            Decimal("3.10"),
+        ]
+
+    @pytest.mark.it("check columns follow the schema order and others are dropped")
+    def test_column_order(self, test_fact_data_frame, caplog):
+        schema = get_output_table_schema("fact_sales_order")
+        data_frame = test_fact_data_frame[test_fact_data_frame.columns[::-1]].assign(
+            extra=1
+        )
+
+        table = create_arrow_table_from_data_frame(data_frame, schema)
+
+        assert table.schema.names == schema.names
+        assert "Dropping columns ['extra']" in caplog.text
+
+    @pytest.mark.it("check strings and categoricals are dictionary encoded")
+    def test_dictionary(self):
+        data_frame = pd.DataFrame(
+            {
+                "source": "TOTESYS",
+                "currency_id": [1, 2, 3],
+                "currency_code": pd.Categorical(["GBP", "USD", "GBP"]),
+                "currency_name": ["British Pound", "US Dollar", None],
+            }
+        )
+
+        table = create_arrow_table_from_data_frame(
+            data_frame, get_output_table_schema("dim_currency")
+        )
+        restored = table.to_pandas()
+
+        assert table.column("currency_name").type == DICTIONARY_STRING
+        assert restored["currency_code"].tolist() == ["GBP", "USD", "GBP"]
+        assert restored["currency_name"].isna().iloc[2]
+
+    @pytest.mark.it("check it raises a ValueError if a schema column is missing")
+    def test_missing_column(self, test_fact_data_frame):
+        with pytest.raises(ValueError, match="unit_price"):
+            create_arrow_table_from_data_frame(
+                test_fact_data_frame.drop(columns="unit_price"),
+                get_output_table_schema("fact_sales_order"),
+            )
+
+    @pytest.mark.it("check values out of range of the schema type raise")
+    def test_overflow(self):
+        data_frame = pd.DataFrame(
+            {"design_id": [2**40], "design_name": ["Wooden"]}
+        ).assign(source="TOTESYS", file_location="/usr", file_name="wooden.json")
+
+        with pytest.raises(pa.ArrowInvalid):
+            create_arrow_table_from_data_frame(
+                data_frame, get_output_table_schema("dim_design")
+            )
@@ -0,0 +1,116 @@
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from src.utilities.state.catalog_cache import get_schema_drift, load_catalog
+
+MODULE = "src.utilities.state.catalog_cache"
+
+CURRENCY = {
+    "columns": [
+        {"column_name": "currency_id", "udt_name": "int4"},
+        {"column_name": "currency_code", "udt_name": "varchar"},
+    ],
+    "primary_key": "currency_id",
+}
+
+
+@pytest.fixture
+def s3_bucket(s3_client):
+    s3_client.create_bucket(
+        Bucket="test-state-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    yield s3_client, "test-state-bucket"
+
+
+def load(s3_client, bucket, fingerprint, tables):
+    with (
+        patch(f"{MODULE}.get_catalog_fingerprint", return_value=fingerprint),
+        patch(f"{MODULE}.get_catalog_tables", return_value=tables) as mock_tables,
+    ):
+        return load_catalog(MagicMock(), s3_client, bucket), mock_tables
+
+
+@pytest.mark.describe("get_schema_drift Utility Function Behaviour")
+class TestGetSchemaDrift:
+    @pytest.mark.it("check added and removed tables are reported")
+    def test_tables(self):
+        drift = get_schema_drift({"currency": CURRENCY}, {"staff": CURRENCY})
+
+        assert drift["added_tables"] == ["staff"]
+        assert drift["removed_tables"] == ["currency"]
+        assert drift["changed_tables"] == {}
+
+    @pytest.mark.it("check added, removed and retyped columns are reported")
+    def test_columns(self):
+        current = {
+            "columns": [
+                {"column_name": "currency_id", "udt_name": "int8"},
+                {"column_name": "currency_name", "udt_name": "text"},
+            ],
+            "primary_key": None,
+        }
+
+        drift = get_schema_drift({"currency": CURRENCY}, {"currency": current})
+
+        assert drift["changed_tables"] == {
+            "currency": {
+                "added_columns": ["currency_name"],
+                "removed_columns": ["currency_code"],
+                "retyped_columns": {"currency_id": {"from": "int4", "to": "int8"}},
+                "primary_key": {"from": "currency_id", "to": None},
+            }
+        }
+
+    @pytest.mark.it("check unchanged tables are not reported")
+    def test_unchanged(self):
+        drift = get_schema_drift({"currency": CURRENCY}, {"currency": CURRENCY})
+
+        assert drift == {"added_tables": [], "removed_tables": [], "changed_tables": {}}
+
+
+@pytest.mark.describe("load_catalog Utility Function Behaviour")
+class TestLoadCatalog:
+    @pytest.mark.it("check the first load reads the tables and caches them")
+    def test_first_load(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+
+        catalog, mock_tables = load(s3_client, bucket, "v1", {"currency": CURRENCY})
+
+        assert catalog["tables"] == {"currency": CURRENCY}
+        assert catalog["drift"] is None
+        mock_tables.assert_called_once()
+        cached = orjson.loads(
+            s3_client.get_object(Bucket=bucket, Key="catalog.json")["Body"].read()
+        )
+        assert cached["fingerprint"] == "v1"
+
+    @pytest.mark.it("check the cached tables are used while the fingerprint matches")
+    def test_cached(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        load(s3_client, bucket, "v1", {"currency": CURRENCY})
+
+        catalog, mock_tables = load(s3_client, bucket, "v1", {})
+
+        assert catalog["tables"] == {"currency": CURRENCY}
+        assert catalog["drift"] is None
+        mock_tables.assert_not_called()
+
+    @pytest.mark.it(
+        "check a changed fingerprint refreshes the tables with a drift event"
+    )
+    def test_drift(self, s3_bucket):
+        s3_client, bucket = s3_bucket
+        load(s3_client, bucket, "v1", {"currency": CURRENCY})
+
+        catalog, _ = load(
+            s3_client, bucket, "v2", {"currency": CURRENCY, "staff": CURRENCY}
+        )
+
+        assert catalog["tables"] == {"currency": CURRENCY, "staff": CURRENCY}
+        assert catalog["drift"]["previous_fingerprint"] == "v1"
+        assert catalog["drift"]["fingerprint"] == "v2"
+        assert catalog["drift"]["added_tables"] == ["staff"]
+        assert load(s3_client, bucket, "v2", {})[0]["drift"] is None
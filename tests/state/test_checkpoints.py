@@ -0,0 +1,28 @@
+import pytest
+
+from src.utilities.state.checkpoints import get_checkpoint, set_checkpoint
+
+
+@pytest.mark.describe("Checkpoint Utility Functions Behaviour")
+class TestCheckpoints:
+    @pytest.mark.it("check a saved checkpoint is returned for its stage only")
+    def test_round_trip(self):
+        state = {"ingest_state": {}}
+
+        set_checkpoint(state, "extract", {"pending_tables": ["sales_order"]})
+
+        assert get_checkpoint(state, "extract") == {"pending_tables": ["sales_order"]}
+        assert get_checkpoint(state, "load") is None
+
+    @pytest.mark.it("check setting None clears the checkpoint")
+    def test_clear(self):
+        state = {"checkpoints": {"extract": {"pending_tables": ["sales_order"]}}}
+
+        set_checkpoint(state, "extract", None)
+
+        assert get_checkpoint(state, "extract") is None
+        assert state["checkpoints"] == {}
+
+    @pytest.mark.it("check a state without checkpoints has none")
+    def test_no_checkpoints(self):
+        assert get_checkpoint({"ingest_state": {}}, "transform") is None
@@ -0,0 +1,127 @@
+import json
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from src.utilities.state.state_session import StateSession
+
+
+@pytest.fixture
+def s3_fixture():
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="eu-west-2")
+        bucket = "test-bucket"
+        s3.create_bucket(
+            Bucket=bucket,
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        s3.put_object(
+            Bucket=bucket,
+            Key="lambda_state.json",
+            Body=json.dumps({"ingest_state": {}}).encode("utf-8"),
+        )
+        yield s3, bucket
+
+
+def read_state(s3, bucket):
+    response = s3.get_object(Bucket=bucket, Key="lambda_state.json")
+    return json.loads(response["Body"].read())
+
+
+def set_table(table_name):
+    def mutation(state):
+        state["ingest_state"][table_name] = {"last_updated": "2025-01-01"}
+
+    return mutation
+
+
+@pytest.mark.describe("StateSession Behaviour")
+class TestStateSession:
+    @pytest.mark.it("Reads the state file once when created")
+    def test_reads_once(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        with patch(
+            "src.utilities.state.state_session.get_current_state",
+            return_value={"ingest_state": {}},
+        ) as mock_get:
+            session = StateSession(s3, bucket)
+            session.update("currency", set_table("currency"))
+            session.update("staff", set_table("staff"))
+
+        mock_get.assert_called_once()
+        assert session.state["ingest_state"]["currency"]
+
+    @pytest.mark.it("Writes all table updates in a single flush")
+    def test_single_write(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        with patch("src.utilities.state.state_session.set_current_state") as mock_set:
+            with StateSession(s3, bucket) as session:
+                for table_name in ["currency", "staff", "design"]:
+                    session.update(table_name, set_table(table_name))
+
+        mock_set.assert_called_once()
+        written_state = mock_set.call_args.args[0]
+        assert set(written_state["ingest_state"]) == {"currency", "staff", "design"}
+
+    @pytest.mark.it("Persists the updated state to S3 when flushed")
+    def test_flush_persists(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        session = StateSession(s3, bucket)
+        session.update("currency", set_table("currency"))
+
+        assert read_state(s3, bucket) == {"ingest_state": {}}
+        assert session.flush() is True
+        assert read_state(s3, bucket)["ingest_state"]["currency"] == {
+            "last_updated": "2025-01-01"
+        }
+
+    @pytest.mark.it("Does not write when there are no pending updates")
+    def test_no_updates(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        with patch("src.utilities.state.state_session.set_current_state") as mock_set:
+            with StateSession(s3, bucket) as session:
+                pass
+
+        mock_set.assert_not_called()
+        assert session.flush() is False
+
+    @pytest.mark.it("Checkpoints after every checkpoint_interval updates")
+    def test_checkpoint_interval(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        with patch("src.utilities.state.state_session.set_current_state") as mock_set:
+            with StateSession(s3, bucket, checkpoint_interval=2) as session:
+                for table_name in ["a", "b", "c", "d", "e"]:
+                    session.update(table_name, set_table(table_name))
+
+                assert mock_set.call_count == 2
+
+        assert mock_set.call_count == 3
+        assert session.flush_count == 3
+
+    @pytest.mark.it("Flushes completed updates when the block raises an exception")
+    def test_flush_on_exception(self, s3_fixture):
+        s3, bucket = s3_fixture
+
+        with pytest.raises(RuntimeError):
+            with StateSession(s3, bucket) as session:
+                session.update("currency", set_table("currency"))
+                raise RuntimeError("extraction failed")
+
+        assert "currency" in read_state(s3, bucket)["ingest_state"]
+
+    @pytest.mark.it("Returns the value returned by the mutation")
+    def test_update_returns(self, s3_fixture):
+        s3, bucket = s3_fixture
+        session = StateSession(s3, bucket)
+
+        result = session.update("currency", lambda state: "returned")
+
+        assert result == "returned"
+        assert session.dirty_tables == {"currency"}
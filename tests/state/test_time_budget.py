@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utilities.time_budget import LocalContext, TimeBudget
+
+
+@pytest.mark.describe("TimeBudget Behaviour")
+class TestTimeBudget:
+    @pytest.mark.it("check it is exhausted once the time left drops under the reserve")
+    def test_exhausted(self):
+        context = MagicMock()
+        context.get_remaining_time_in_millis.side_effect = [90000, 30000]
+        budget = TimeBudget(context, reserve_seconds=60)
+
+        assert not budget.exhausted()
+        assert budget.exhausted()
+
+    @pytest.mark.it("check contexts without a deadline never exhaust it")
+    def test_no_deadline(self):
+        budget = TimeBudget({}, reserve_seconds=60)
+
+        assert budget.remaining_seconds() is None
+        assert not budget.exhausted()
+
+    @pytest.mark.it("check the local stand-in counts down from its timeout")
+    def test_local_context(self):
+        assert 0 < LocalContext(5).get_remaining_time_in_millis() <= 5000
+        assert TimeBudget(LocalContext(0), reserve_seconds=1).exhausted()
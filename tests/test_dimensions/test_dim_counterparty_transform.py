@@ -10,6 +10,7 @@ from src.utilities.dimensions.dim_counterparty_transform import (
 def valid_dataframes():
     counterparty_df = pd.DataFrame(
         {
+            "source": "TOTESYS",
             "counterparty_id": [1],
             "counterparty_legal_name": ["ABC Corp"],
             "legal_address_id": [10],
@@ -18,6 +19,7 @@ def valid_dataframes():
 
     address_df = pd.DataFrame(
         {
+            "source": "TOTESYS",
             "legal_address_id": [10],
             "address_line_1": ["123 Main St"],
             "address_line_2": ["Suite 100"],
@@ -38,6 +40,7 @@ class TestDimCounterpartyDataframe:
     def test_columns(self, valid_dataframes):
         result = dim_counterparty_dataframe(**valid_dataframes)
         expected = {
+            "source",
             "counterparty_id",
             "counterparty_legal_name",
             "counterparty_legal_address_line_1",
@@ -55,9 +58,10 @@ class TestDimCounterpartyDataframe:
     def test_values_and_merge(self, valid_dataframes):
         result = dim_counterparty_dataframe(**valid_dataframes)
 
-        assert result.shape == (1, 9)
+        assert result.shape == (1, 10)
         row = result.iloc[0]
 
+        assert row["source"] == "TOTESYS"
         assert row["counterparty_id"] == 1
         assert row["counterparty_legal_name"] == "ABC Corp"
         assert row["counterparty_legal_address_line_1"] == "123 Main St"
@@ -90,6 +94,7 @@ class TestDimCounterpartyDataframe:
     def test_missing_address_column(self):
         address_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "legal_address_id": [10],
                 # 'address_line_1' : intentionally missing
                 "address_line_2": ["Suite 100"],
@@ -103,6 +108,7 @@ class TestDimCounterpartyDataframe:
 
         counterparty_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "counterparty_id": [1],
                 "counterparty_legal_name": ["ABC Corp"],
                 "legal_address_id": [10],
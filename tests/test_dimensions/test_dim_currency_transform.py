@@ -9,6 +9,7 @@ def valid_currency_dataframe():
     return {
         "currency": pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "currency_id": [1, 2, 3],
                 "currency_code": ["USD", "EUR", "JPY"],
             }
@@ -26,7 +27,12 @@ class TestCurrencyDimensions:
     @pytest.mark.it("should have correct column names")
     def test_columns(self, valid_currency_dataframe):
         result = dim_currency_dataframe(**valid_currency_dataframe)
-        assert list(result.columns) == ["currency_id", "currency_code", "currency_name"]
+        assert list(result.columns) == [
+            "source",
+            "currency_id",
+            "currency_code",
+            "currency_name",
+        ]
 
     @pytest.mark.it("should return correct currency names")
     def test_currency_lookup_merge(self, valid_currency_dataframe):
@@ -39,6 +45,27 @@ class TestCurrencyDimensions:
         for _, row in result.iterrows():
             assert row["currency_name"] == expected_names[row["currency_code"]]
 
+    @pytest.mark.it("should match codes extracted from the varchar[] column")
+    def test_array_currency_codes(self):
+        df = pd.DataFrame(
+            {
+                "source": "TOTESYS",
+                "currency_id": [1, 2, 3],
+                "currency_code": ["GBP", "EUR,GBP", None],
+            }
+        )
+        legacy_df = pd.DataFrame(
+            {"source": "TOTESYS", "currency_id": [4], "currency_code": [["USD"]]}
+        )
+
+        result = dim_currency_dataframe(currency=pd.concat([df, legacy_df]))
+
+        assert result["currency_code"].tolist()[:2] == ["GBP", "EUR"]
+        assert result["currency_code"].tolist()[3] == "USD"
+        assert result["currency_name"].tolist()[:2] == ["British Pound", "Euro"]
+        assert result["currency_name"].tolist()[3] == "US Dollar"
+        assert pd.isna(result["currency_code"].iloc[2])
+
     @pytest.mark.it("should raise ValueError if 'currency' key is missing")
     def test_missing_currency_key(self):
         with pytest.raises(ValueError) as exc:
@@ -53,6 +80,7 @@ class TestCurrencyDimensions:
 
         df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "currency_id": [1],
                 "currency_code": ["USD"],
             }
@@ -8,6 +8,7 @@ from src.utilities.dimensions.dim_design_transform import dim_design_dataframe
 def mock_design_df():
     return pd.DataFrame(
         {
+            "source": "TOTESYS",
             "design_id": [1, 25],
             "created_at": ["02/04/2021", "30/05/2024"],
             "design_name": ["Logo", "Motif"],
@@ -23,6 +24,7 @@ def test_dim_design_in_DF(mock_design_df):
 
     assert not result.empty
     assert list(result.columns) == [
+        "source",
         "design_id",
         "design_name",
         "file_location",
@@ -38,7 +40,7 @@ def test_dim_design_missing_design_table(mock_design_df):
 
 def test_dim_design_empty_DF(mock_design_df):
     empty_df = pd.DataFrame(
-        columns=["design_id", "design_name", "file_location", "file_name"]
+        columns=["source", "design_id", "design_name", "file_location", "file_name"]
     )
     dfs = {"design": empty_df}
 
@@ -46,6 +48,7 @@ def test_dim_design_empty_DF(mock_design_df):
 
     assert result.empty
     assert list(result.columns) == [
+        "source",
         "design_id",
         "design_name",
         "file_location",
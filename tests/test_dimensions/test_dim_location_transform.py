@@ -8,6 +8,7 @@ from src.utilities.dimensions.dim_location_transform import dim_location_datafra
 def mock_address_df():
     return pd.DataFrame(
         {
+            "source": "TOTESYS",
             "address_id": ["1", "25"],
             "address_line_1": ["123 Lane", "456 Avenue"],
             "address_line_2": ["Suite 4", "Flat 5"],
@@ -30,6 +31,7 @@ class TestDimLocationDataframe:
         assert isinstance(result, pd.DataFrame)
 
         columns = [
+            "source",
             "location_id",
             "address_line_1",
             "address_line_2",
@@ -55,6 +57,7 @@ class TestDimLocationDataframe:
     def test_dim_address_empty_DF(self):
         test_empty_dataframe = pd.DataFrame(
             columns=[
+                "source",
                 "address_id",
                 "address_line_1",
                 "address_line_2",
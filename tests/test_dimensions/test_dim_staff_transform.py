@@ -8,6 +8,7 @@ from src.utilities.dimensions.dim_staff_transform import dim_staff_dataframe
 def valid_dataframes():
     staff_df = pd.DataFrame(
         {
+            "source": "TOTESYS",
             "staff_id": [1],
             "first_name": ["John"],
             "last_name": ["Doe"],
@@ -18,6 +19,7 @@ def valid_dataframes():
 
     department_df = pd.DataFrame(
         {
+            "source": "TOTESYS",
             "department_id": [100],
             "department_name": ["Engineering"],
             "location": ["Building A"],
@@ -33,6 +35,7 @@ class TestDimStaffDataframe:
     def test_columns(self, valid_dataframes):
         result = dim_staff_dataframe(**valid_dataframes)
         expected = {
+            "source",
             "staff_id",
             "first_name",
             "last_name",
@@ -47,9 +50,10 @@ class TestDimStaffDataframe:
     def test_values_and_merge(self, valid_dataframes):
         result = dim_staff_dataframe(**valid_dataframes)
 
-        assert result.shape == (1, 6)
+        assert result.shape == (1, 7)
         row = result.iloc[0]
 
+        assert row["source"] == "TOTESYS"
         assert row["staff_id"] == 1
         assert row["first_name"] == "John"
         assert row["last_name"] == "Doe"
@@ -57,10 +61,39 @@ class TestDimStaffDataframe:
         assert row["location"] == "Building A"
         assert row["email_address"] == "john.doe@example.com"
 
+    @pytest.mark.it("check staff are joined to the departments of their own source")
+    def test_sources(self):
+        staff_df = pd.DataFrame(
+            {
+                "source": ["TOTESYS", "TOTESYS_EU"],
+                "staff_id": [1, 1],
+                "first_name": ["John", "Jean"],
+                "last_name": ["Doe", "Dupont"],
+                "department_id": [100, 100],
+                "email_address": ["john.doe@example.com", "jean@example.com"],
+            }
+        )
+        department_df = pd.DataFrame(
+            {
+                "source": ["TOTESYS_EU", "TOTESYS"],
+                "department_id": [100, 100],
+                "department_name": ["Sales", "Engineering"],
+                "location": ["Paris", "Leeds"],
+            }
+        )
+
+        result = dim_staff_dataframe(staff=staff_df, department=department_df)
+
+        assert result[["source", "staff_id", "location"]].values.tolist() == [
+            ["TOTESYS", 1, "Leeds"],
+            ["TOTESYS_EU", 1, "Paris"],
+        ]
+
     @pytest.mark.it("check .drop_duplicates() removes duplicate rows")
     def test_drop_duplicates_effect(self):
         staff_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "staff_id": [1, 1],
                 "first_name": ["John", "John"],
                 "last_name": ["Doe", "Doe"],
@@ -70,6 +103,7 @@ class TestDimStaffDataframe:
         )
         department_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "department_id": [100],
                 "department_name": ["Engineering"],
                 "location": ["Building A"],
@@ -84,6 +118,7 @@ class TestDimStaffDataframe:
     def test_left_join_with_no_matching_department(self):
         staff_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "staff_id": [1, 2],
                 "first_name": ["John", "Jane"],
                 "last_name": ["Doe", "Smith"],
@@ -93,6 +128,7 @@ class TestDimStaffDataframe:
         )
         department_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "department_id": [100],
                 "department_name": ["Engineering"],
                 "location": ["Building A"],
@@ -128,6 +164,7 @@ class TestDimStaffDataframe:
     def test_missing_department_column(self):
         staff_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "staff_id": [1],
                 "first_name": ["John"],
                 "last_name": ["Doe"],
@@ -138,6 +175,7 @@ class TestDimStaffDataframe:
 
         department_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "department_id": [100],
                 # "department_name" intentionally missing
                 "location": ["Building A"],
@@ -1,3 +1,5 @@
+from datetime import date
+
 import pandas as pd
 import pytest
 
@@ -10,6 +12,7 @@ from src.utilities.facts.create_fact_sales_order_from_df import (
 def mock_sales_order_df():
     return pd.DataFrame(
         {
+            "source": "TOTESYS",
             "sales_order_id": [1],
             "created_at": ["2025-06-01T10:30:00"],
             "last_updated": ["2025-06-02T15:45:00"],
@@ -67,6 +70,16 @@ class TestFactSalesOrder:
         assert result["last_updated_time"].iloc[0].hour == 15
         assert result["last_updated_time"].iloc[0].minute == 45
 
+    @pytest.mark.it("Should keep agreed dates that were extracted as dates")
+    def test_fact_sales_order_date_columns(self, mock_sales_order_df):
+        mock_sales_order_df["agreed_payment_date"] = [date(2025, 6, 10)]
+        mock_sales_order_df["agreed_delivery_date"] = [None]
+
+        result = create_fact_sales_order_from_df(mock_sales_order_df)
+
+        assert result["agreed_payment_date"].iloc[0] == date(2025, 6, 10)
+        assert result["agreed_delivery_date"].isna().all()
+
     @pytest.mark.it("Should rename 'staff_id' to 'sales_staff_id'")
     def test_fact_sales_order_column_rename(self, mock_sales_order_df):
         result = create_fact_sales_order_from_df(mock_sales_order_df)
@@ -93,6 +106,7 @@ class TestFactSalesOrder:
     def test_fact_sales_order_minimal_required_columns(self):
         minimal_df = pd.DataFrame(
             {
+                "source": "TOTESYS",
                 "created_at": ["2025-01-01T08:00:00"],
                 "last_updated": ["2025-01-02T09:00:00"],
                 "staff_id": [999],
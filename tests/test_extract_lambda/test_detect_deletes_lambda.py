@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from src.lambdas.detect_deletes_lambda import lambda_handler
+
+MODULE = "src.lambdas.detect_deletes_lambda"
+
+
+@pytest.fixture
+def state_bucket(s3_client, monkeypatch):
+    s3_client.create_bucket(
+        Bucket="test-state-bucket",
+        CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+    )
+    monkeypatch.setenv("LAMBDA_STATE_BUCKET_NAME", "test-state-bucket")
+    monkeypatch.setenv("INGEST_ZONE_BUCKET_NAME", "test-ingest-bucket")
+    yield s3_client
+
+
+@pytest.mark.describe("detect_deletes_lambda handler")
+class TestDetectDeletesLambda:
+    @pytest.mark.it("check tombstone files are recorded in the delete state")
+    def test_records_tombstones(self, state_bucket):
+        log_entry = {
+            "table_name": "currency",
+            "last_updated": "2025-01-02T10:00:00",
+            "key": "2025/1/2/currency_deletes_snapshot.parquet",
+            "row_count": 2,
+        }
+
+        def detect(
+            conn, s3_client, bucket, table_name, *args, record_log_entry, source_name
+        ):
+            record_log_entry(log_entry)
+            return {"log_entry": log_entry, "key_count": 3, "snapshot_bytes": 10}
+
+        with (
+            patch(f"{MODULE}.resources") as mock_resources,
+            patch(f"{MODULE}.get_totesys_table_names", return_value=["currency"]),
+            patch(f"{MODULE}.detect_deleted_rows_to_s3", side_effect=detect),
+        ):
+            mock_resources.get_s3_client.return_value = state_bucket
+            mock_resources.connection.return_value.__enter__.return_value = MagicMock()
+            result = orjson.loads(lambda_handler({}, {}))
+
+        state = orjson.loads(
+            state_bucket.get_object(
+                Bucket="test-state-bucket", Key="delete_state.json"
+            )["Body"].read()
+        )
+        assert result["deletes_to_process"] == [log_entry]
+        assert state["delete_state"]["currency"]["delete_log"] == [log_entry]
+
+    @pytest.mark.it("check every source is checked with its own namespaced state")
+    def test_namespaces_sources(self, state_bucket, monkeypatch):
+        monkeypatch.setenv("EXTRACT_SOURCES", "TOTESYS,TOTESYS_EU")
+        detected_sources = []
+
+        def detect(
+            conn, s3_client, bucket, table_name, *args, record_log_entry, source_name
+        ):
+            detected_sources.append(source_name)
+            log_entry = {
+                "table_name": table_name,
+                "last_updated": "2025-01-02T10:00:00",
+                "key": f"{source_name.lower()}/currency_deletes_snapshot.parquet",
+                "row_count": 1,
+                "source": source_name,
+            }
+            record_log_entry(log_entry)
+            return {"log_entry": log_entry, "key_count": 3, "snapshot_bytes": 10}
+
+        with (
+            patch(f"{MODULE}.resources") as mock_resources,
+            patch(f"{MODULE}.get_totesys_table_names", return_value=["currency"]),
+            patch(f"{MODULE}.detect_deleted_rows_to_s3", side_effect=detect),
+        ):
+            mock_resources.get_s3_client.return_value = state_bucket
+            mock_resources.connection.return_value.__enter__.return_value = MagicMock()
+            result = orjson.loads(lambda_handler({}, {}))
+
+        eu_state = orjson.loads(
+            state_bucket.get_object(
+                Bucket="test-state-bucket", Key="totesys_eu/delete_state.json"
+            )["Body"].read()
+        )
+        assert detected_sources == ["TOTESYS", "TOTESYS_EU"]
+        assert [call.args[0] for call in mock_resources.connection.call_args_list] == [
+            "TOTESYS",
+            "TOTESYS_EU",
+        ]
+        assert list(result["delete_metrics"]) == ["currency", "totesys_eu/currency"]
+        assert eu_state["delete_state"]["currency"]["delete_log"][0]["source"] == (
+            "TOTESYS_EU"
+        )
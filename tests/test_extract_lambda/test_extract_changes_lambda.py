@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from src.lambdas.extract_changes_lambda import lambda_handler
+from src.utilities.extraction.decode_pgoutput_messages import RowChange
+
+MODULE = "src.lambdas.extract_changes_lambda"
+
+
+@pytest.fixture
+def decoded_changes():
+    return {
+        "changes": [
+            RowChange(
+                "currency",
+                "update",
+                "currency_id",
+                23,
+                "1",
+                datetime(2025, 1, 2, tzinfo=timezone.utc),
+            )
+        ],
+        "transactions": 1,
+        "end_lsn": "0/2F18FC8",
+        "first_commit_timestamp": datetime(2025, 1, 2, tzinfo=timezone.utc),
+        "truncated_tables": [],
+    }
+
+
+@pytest.fixture
+def patched_handler(decoded_changes):
+    no_changes = {**decoded_changes, "changes": [], "end_lsn": None, "transactions": 0}
+    no_changes["first_commit_timestamp"] = None
+
+    with (
+        patch(f"{MODULE}.resources") as mock_resources,
+        patch(f"{MODULE}.get_totesys_table_names", return_value=["currency"]),
+        patch(f"{MODULE}.ensure_publication"),
+        patch(f"{MODULE}.ensure_replication_slot"),
+        patch(f"{MODULE}.peek_replication_changes"),
+        patch(
+            f"{MODULE}.decode_pgoutput_messages",
+            side_effect=[decoded_changes, no_changes],
+        ),
+        patch(f"{MODULE}.load_catalog", return_value={"tables": {}}),
+        patch(f"{MODULE}.StateSession") as mock_state_session,
+        patch(f"{MODULE}.extract_changes_to_s3") as mock_extract_changes,
+        patch(f"{MODULE}.advance_replication_slot") as mock_advance,
+        patch(
+            f"{MODULE}.get_replication_slot_lag",
+            return_value={
+                "confirmed_flush_lsn": "0/2F18FC8",
+                "current_lsn": "0/2F18FC8",
+                "lag_bytes": 0,
+            },
+        ),
+    ):
+        mock_resources.connection.return_value.__enter__.return_value = MagicMock()
+        mock_state_session.return_value.__enter__.return_value = MagicMock()
+        yield mock_extract_changes, mock_advance
+
+
+@pytest.mark.describe("extract_changes_lambda handler")
+class TestExtractChangesLambda:
+    @pytest.mark.it("check the slot is advanced past the changes once they are saved")
+    def test_advances_slot(self, patched_handler):
+        mock_extract_changes, mock_advance = patched_handler
+        mock_extract_changes.return_value = {
+            "files_to_process": [
+                {"table_name": "currency", "last_updated": datetime(2025, 1, 2)}
+            ],
+            "deletes_to_process": [],
+        }
+
+        result = orjson.loads(lambda_handler({}, {}))
+
+        assert mock_extract_changes.call_args.kwargs["suffix"] == "cdc_0-2F18FC8"
+        assert mock_extract_changes.call_args.kwargs["table_catalogs"] == {}
+        assert mock_extract_changes.call_args.kwargs["compression"] == "zstd"
+        mock_advance.assert_called_once_with(
+            mock_advance.call_args.args[0], "totesys_cdc", "0/2F18FC8"
+        )
+        assert result["replication_metrics"]["changes"] == 1
+        assert result["replication_metrics"]["lag_seconds"] == 0.0
+        assert result["continue"] is False
+
+    @pytest.mark.it("check the slot is not advanced when saving the changes fails")
+    def test_failure_keeps_slot(self, patched_handler):
+        mock_extract_changes, mock_advance = patched_handler
+        mock_extract_changes.side_effect = RuntimeError("upload failed")
+
+        with pytest.raises(RuntimeError):
+            lambda_handler({}, {})
+
+        mock_advance.assert_not_called()
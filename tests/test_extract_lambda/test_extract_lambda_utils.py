@@ -6,10 +6,15 @@ import pytest
 
 from src.utilities.custom_errors import InvalidEmptyList
 from src.utilities.extract_lambda_utils import (
+    add_log_to_ingest_state,
+    create_data_frame_from_columns,
     create_data_frame_from_list,
     create_parquet_metadata,
+    get_last_updated_from_columns,
     get_last_updated_from_raw_table_data,
+    get_tables_with_new_data,
     initialize_table_state,
+    parse_table_settings,
 )
 
 
@@ -92,6 +97,45 @@ class TestCreateDataFramFromList:
         assert len(result) == len(test_table_data)
 
 
+@pytest.mark.describe("Test create_data_frame_from_columns")
+class TestCreateDataFrameFromColumns:
+    @pytest.mark.it("check that it builds the same dataframe as the equivalent rows")
+    def test_matches_rows(self, test_table_data_list):
+        columns = {
+            name: [row[name] for row in test_table_data_list]
+            for name in test_table_data_list[0]
+        }
+
+        pd.testing.assert_frame_equal(
+            create_data_frame_from_columns(columns),
+            create_data_frame_from_list(test_table_data_list),
+        )
+
+    @pytest.mark.it("check that it raises an Exception if there are no rows")
+    @pytest.mark.parametrize("columns", [{}, {"currency_id": []}])
+    def test_empty_columns(self, columns):
+        with pytest.raises(InvalidEmptyList):
+            create_data_frame_from_columns(columns)
+
+
+@pytest.mark.describe("Test get_last_updated_from_columns")
+class TestGetLastUpdatedFromColumns:
+    @pytest.mark.it("check that it returns the latest datetime, ignoring NULLs")
+    def test_latest(self):
+        columns = {
+            "currency_id": [1, 2, 3],
+            "last_updated": [datetime(2025, 1, 2), None, datetime(2025, 1, 1)],
+        }
+
+        assert get_last_updated_from_columns(columns) == datetime(2025, 1, 2)
+
+    @pytest.mark.it("check that it raises an Exception if there is no last_updated")
+    @pytest.mark.parametrize("columns", [{"currency_id": [1]}, {"last_updated": []}])
+    def test_missing(self, columns):
+        with pytest.raises(InvalidEmptyList):
+            get_last_updated_from_columns(columns)
+
+
 @pytest.mark.describe("Test get_last_updated_from_raw_table_data")
 class TestGetLastUpdatedFromRawTableData:
     # @pytest.mark.skip
@@ -208,3 +252,148 @@ def test_create_parquet_metadata_returns_correct_filename_and_key():
     assert key.startswith(expected_key_start)
     assert key.endswith(".parquet")
     assert key == f"2025/6/13/{filename}"
+
+
+@pytest.mark.it("Should append the suffix to the filename when one is given.")
+def test_create_parquet_metadata_with_suffix():
+    dt = datetime(2025, 6, 13, 10, 35, 20, 12345)
+
+    filename, key = create_parquet_metadata(dt, "currency", suffix="42")
+
+    assert filename == "currency_2025-6-13_10-35-20_12345_42.parquet"
+    assert key == f"2025/6/13/{filename}"
+
+
+@pytest.mark.it("Should prepend the prefix to the key when one is given.")
+def test_create_parquet_metadata_with_prefix():
+    dt = datetime(2025, 6, 13, 10, 35, 20, 12345)
+
+    filename, key = create_parquet_metadata(dt, "currency", prefix="totesys_eu")
+
+    assert filename == "currency_2025-6-13_10-35-20_12345.parquet"
+    assert key == f"totesys_eu/2025/6/13/{filename}"
+
+
+@pytest.mark.describe("Test add_log_to_ingest_state")
+class TestAddLogToIngestState:
+    @pytest.mark.it("check it initializes a table missing from the state")
+    def test_new_table(self):
+        last_updated = datetime(2025, 6, 13, 10, 35, 20)
+        log_entry = {"table_name": "currency", "last_updated": last_updated}
+        current_state = {"ingest_state": {}}
+
+        add_log_to_ingest_state(current_state, log_entry)
+
+        assert current_state["ingest_state"]["currency"] == {
+            "last_updated": last_updated,
+            "ingest_log": [log_entry],
+        }
+
+    @pytest.mark.it("check it moves the watermark and appends to an existing log")
+    def test_existing_table(self):
+        old_entry = {"table_name": "currency", "last_updated": datetime(2025, 1, 1)}
+        new_entry = {"table_name": "currency", "last_updated": datetime(2025, 2, 1)}
+        current_state = {
+            "ingest_state": {
+                "currency": {
+                    "last_updated": datetime(2025, 1, 1),
+                    "ingest_log": [old_entry],
+                }
+            }
+        }
+
+        add_log_to_ingest_state(current_state, new_entry)
+
+        table_state = current_state["ingest_state"]["currency"]
+        assert table_state["last_updated"] == datetime(2025, 2, 1)
+        assert table_state["ingest_log"] == [old_entry, new_entry]
+
+    @pytest.mark.it("check it stores the primary key of a keyset watermark")
+    def test_keyset_watermark(self):
+        current_state = {"ingest_state": {}}
+        page_entry = {
+            "table_name": "currency",
+            "last_updated": datetime(2025, 1, 1),
+            "last_primary_key": 42,
+        }
+
+        add_log_to_ingest_state(current_state, page_entry)
+        assert current_state["ingest_state"]["currency"]["last_primary_key"] == 42
+
+        add_log_to_ingest_state(
+            current_state,
+            {"table_name": "currency", "last_updated": datetime(2025, 2, 1)},
+        )
+        assert "last_primary_key" not in current_state["ingest_state"]["currency"]
+
+
+@pytest.mark.describe("Test parse_table_settings")
+class TestParseTableSettings:
+    @pytest.mark.it("check it maps each table to its value")
+    def test_parses_settings(self):
+        result = parse_table_settings("sales_order=copy, payment = stream")
+
+        assert result == {"sales_order": "copy", "payment": "stream"}
+
+    @pytest.mark.it("check it returns no overrides for an empty or missing setting")
+    @pytest.mark.parametrize("setting", [None, "", " , "])
+    def test_empty(self, setting):
+        assert parse_table_settings(setting) == {}
+
+    @pytest.mark.it("check it raises a ValueError for a malformed entry")
+    @pytest.mark.parametrize("setting", ["sales_order", "=copy", "sales_order="])
+    def test_malformed(self, setting):
+        with pytest.raises(ValueError, match="Invalid table setting"):
+            parse_table_settings(setting)
+
+
+@pytest.mark.describe("Test get_tables_with_new_data")
+class TestGetTablesWithNewData:
+    @pytest.mark.it("check it keeps tables updated after their watermark")
+    def test_new_data(self):
+        tables_last_updated = {
+            "currency": datetime(2025, 1, 2),
+            "design": datetime(2025, 1, 1),
+            "staff": datetime(2025, 1, 1),
+        }
+        ingest_state = {
+            "currency": {"last_updated": datetime(2025, 1, 1)},
+            "design": {"last_updated": datetime(2025, 1, 1)},
+        }
+
+        result = get_tables_with_new_data(tables_last_updated, ingest_state)
+
+        assert result == ["currency", "staff"]
+
+    @pytest.mark.it("check it compares against watermarks read back as ISO strings")
+    def test_iso_watermark(self):
+        result = get_tables_with_new_data(
+            {"currency": datetime(2025, 1, 1, 0, 0, 1)},
+            {"currency": {"last_updated": "2025-01-01T00:00:00"}},
+        )
+
+        assert result == ["currency"]
+
+    @pytest.mark.it("check it skips empty tables")
+    def test_empty_table(self):
+        assert get_tables_with_new_data({"currency": None}, {}) == []
+
+    @pytest.mark.it(
+        "check it keeps a table a keyset extraction stopped part way through"
+    )
+    def test_stopped_mid_table(self):
+        last_updated = datetime(2025, 1, 1)
+
+        def table_state(has_more):
+            return {
+                "last_updated": last_updated,
+                "last_primary_key": 10,
+                "ingest_log": [{"last_updated": last_updated, "has_more": has_more}],
+            }
+
+        result = get_tables_with_new_data(
+            {"currency": last_updated, "design": last_updated},
+            {"currency": table_state(True), "design": table_state(False)},
+        )
+
+        assert result == ["currency"]
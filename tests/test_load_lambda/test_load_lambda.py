@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from src.lambdas.load_lambda import lambda_handler
+
+MODULE = "src.lambdas.load_lambda"
+
+
+def file_entry(table_name):
+    return {"table_name": table_name, "key": f"2025/1/2/{table_name}.parquet"}
+
+
+@pytest.fixture
+def patched_handler():
+    state = {"ingest_state": {}}
+
+    with (
+        patch(f"{MODULE}.resources"),
+        patch(f"{MODULE}.StateSession") as mock_state_session,
+        patch(f"{MODULE}.get_file_from_s3_bucket"),
+        patch(f"{MODULE}.create_data_frame_from_parquet"),
+        patch(f"{MODULE}.create_db_entries_from_df") as mock_create_entries,
+    ):
+        session = MagicMock(state=state)
+        session.update.side_effect = lambda _, mutation: mutation(state)
+        mock_state_session.return_value.__enter__.return_value = session
+        yield state, mock_create_entries
+
+
+def loaded_tables(mock_create_entries):
+    return [call.args[1] for call in mock_create_entries.call_args_list]
+
+
+@pytest.mark.describe("load_lambda handler")
+class TestLoadLambda:
+    @pytest.mark.it("check dimensions are loaded before facts")
+    def test_order(self, patched_handler):
+        state, mock_create_entries = patched_handler
+        event = {
+            "files_to_process": [
+                file_entry("fact_sales_order"),
+                file_entry("dim_staff"),
+            ]
+        }
+
+        result = orjson.loads(lambda_handler(event, {}))
+
+        assert loaded_tables(mock_create_entries) == ["dim_staff", "fact_sales_order"]
+        assert result == {"continue": False}
+
+    @pytest.mark.it("check it saves the files left when the time budget runs out")
+    def test_stops_before_deadline(self, patched_handler):
+        state, mock_create_entries = patched_handler
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 10000
+        event = {
+            "files_to_process": [
+                file_entry("dim_staff"),
+                file_entry("fact_sales_order"),
+            ]
+        }
+
+        result = orjson.loads(lambda_handler(event, context))
+
+        assert loaded_tables(mock_create_entries) == ["dim_staff"]
+        assert result == {"continue": True}
+        assert state["checkpoints"]["load"] == {
+            "files_to_process": [file_entry("fact_sales_order")]
+        }
+
+    @pytest.mark.it("check a continued run loads the saved files and clears them")
+    def test_resumes(self, patched_handler):
+        state, mock_create_entries = patched_handler
+        state["checkpoints"] = {
+            "load": {"files_to_process": [file_entry("fact_sales_order")]}
+        }
+
+        result = orjson.loads(lambda_handler({"continue": True}, {}))
+
+        assert loaded_tables(mock_create_entries) == ["fact_sales_order"]
+        assert result == {"continue": False}
+        assert state["checkpoints"] == {}
@@ -61,3 +61,29 @@ class TestCreateDataFramesfromParquets:
 
         assert isinstance(e.value, Exception)
         assert str(e.value)
+
+    @pytest.mark.it("Should only read the columns and rows selected")
+    def test_columns_and_filters(self, test_dataframe):
+        buffer = BytesIO()
+        test_dataframe.to_parquet(buffer, index=False)
+
+        result = create_data_frame_from_parquet(
+            buffer.getvalue(),
+            columns=["name"],
+            filters=[("favourite_icecream", "!=", "Chocolate")],
+        )
+
+        assert result["name"].tolist() == ["Charley", "Oliver"]
+        assert list(result.columns) == ["name"]
+
+    @pytest.mark.it("Should keep Arrow types with the pyarrow dtype backend")
+    def test_pyarrow_dtype_backend(self, test_dataframe):
+        buffer = BytesIO()
+        test_dataframe.to_parquet(buffer, index=False)
+
+        result = create_data_frame_from_parquet(
+            buffer.getvalue(), dtype_backend="pyarrow"
+        )
+
+        assert isinstance(result["name"].dtype, pd.ArrowDtype)
+        assert result["name"].tolist() == test_dataframe["name"].tolist()
@@ -0,0 +1,124 @@
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from src.utilities.pydantic_models import FilesToProcessItem
+from src.utilities.transform_lambda_utils.transform_lambda_utils import (
+    get_dataframes_from_files_to_process,
+    get_latest_file_per_table,
+)
+
+
+def make_file(table_name, last_updated, key):
+    return FilesToProcessItem(
+        table_name=table_name,
+        extraction_timestamp=datetime(2025, 6, 1),
+        last_updated=last_updated,
+        file_name=key,
+        key=key,
+    )
+
+
+def put_currency_file(s3_client, key, ids):
+    parquet = BytesIO()
+    pd.DataFrame(
+        {
+            "currency_id": ids,
+            "currency_code": ["GBP"] * len(ids),
+            "created_at": [datetime(2025, 1, 1)] * len(ids),
+            "last_updated": [datetime(2025, 1, 1)] * len(ids),
+        }
+    ).to_parquet(parquet)
+    s3_client.put_object(Bucket="test-ingest-bucket", Key=key, Body=parquet.getvalue())
+
+
+@pytest.mark.describe("get_dataframes_from_files_to_process Utility Function Behaviour")
+class TestGetDataframesFromFilesToProcess:
+    @pytest.mark.it("check the pages of one table are combined into one data frame")
+    def test_combines_pages(self, s3_client):
+        s3_client.create_bucket(
+            Bucket="test-ingest-bucket",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        for key, ids in [("page_1.parquet", [1, 2]), ("page_2.parquet", [3])]:
+            put_currency_file(s3_client, key, ids)
+
+        result = get_dataframes_from_files_to_process(
+            s3_client,
+            "test-ingest-bucket",
+            [
+                make_file("currency", datetime(2025, 1, 1), "page_1.parquet"),
+                make_file("currency", datetime(2025, 1, 2), "page_2.parquet"),
+            ],
+        )
+
+        assert result["currency"]["currency_id"].tolist() == [1, 2, 3]
+
+    @pytest.mark.it("check the files of several sources are unioned with their source")
+    def test_unions_sources(self, s3_client):
+        s3_client.create_bucket(
+            Bucket="test-ingest-bucket",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        for key, ids in [
+            ("currency.parquet", [1]),
+            ("totesys_eu/currency.parquet", [2]),
+        ]:
+            put_currency_file(s3_client, key, ids)
+        eu_file = make_file(
+            "currency", datetime(2025, 1, 1), "totesys_eu/currency.parquet"
+        ).model_copy(update={"source": "TOTESYS_EU"})
+
+        result = get_dataframes_from_files_to_process(
+            s3_client,
+            "test-ingest-bucket",
+            [make_file("currency", datetime(2025, 1, 2), "currency.parquet"), eu_file],
+        )
+
+        assert result["currency"][["source", "currency_id"]].values.tolist() == [
+            ["TOTESYS", 1],
+            ["TOTESYS_EU", 2],
+        ]
+
+    @pytest.mark.it("check only the columns the transforms need are read")
+    def test_required_columns(self, s3_client):
+        s3_client.create_bucket(
+            Bucket="test-ingest-bucket",
+            CreateBucketConfiguration={"LocationConstraint": "eu-west-2"},
+        )
+        put_currency_file(s3_client, "currency.parquet", [1])
+
+        result = get_dataframes_from_files_to_process(
+            s3_client,
+            "test-ingest-bucket",
+            [make_file("currency", datetime(2025, 1, 1), "currency.parquet")],
+        )
+
+        assert list(result["currency"].columns) == [
+            "source",
+            "currency_id",
+            "currency_code",
+            "last_updated",
+        ]
+
+
+@pytest.mark.describe("get_latest_file_per_table Utility Function Behaviour")
+class TestGetLatestFilePerTable:
+    @pytest.mark.it("check it keeps the latest file of each table in table order")
+    def test_latest_file(self):
+        files_to_process = [
+            make_file("currency", datetime(2025, 1, 1), "currency_1"),
+            make_file("design", datetime(2025, 1, 5), "design_1"),
+            make_file("currency", datetime(2025, 1, 3), "currency_2"),
+            make_file("currency", datetime(2025, 1, 2), "currency_3"),
+        ]
+
+        result = get_latest_file_per_table(files_to_process)
+
+        assert [file.key for file in result] == ["currency_2", "design_1"]
+
+    @pytest.mark.it("check it returns an empty list when there are no files")
+    def test_empty(self):
+        assert get_latest_file_per_table([]) == []